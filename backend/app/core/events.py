@@ -91,6 +91,13 @@ def create_start_handler() -> Callable:
             except Exception as e:
                 logger.warning("data_loader_init_skipped", component="data_loader", error=str(e))
 
+            # 预构建知识图谱内存快照（KG_SNAPSHOT_ENABLED 开启时，后台线程执行）
+            try:
+                from domains.mcp_core.knowledge_graph import get_graph_snapshot_manager
+                get_graph_snapshot_manager().warm_up()
+            except Exception as e:
+                logger.warning("kg_snapshot_warm_up_skipped", component="knowledge_graph", error=str(e))
+
             logger.info(
                 "services_initialized",
                 component="registry",
@@ -111,6 +118,13 @@ def create_stop_handler() -> Callable:
     async def stop_app() -> None:
         logger.info("api_stopping", component="api")
 
+        # Drain write-behind sync queue
+        try:
+            from domains.mcp_core.sync import get_sync_trigger
+            get_sync_trigger().shutdown()
+        except Exception as e:
+            logger.warning("sync_queue_flush_error", component="sync_manager", error=str(e))
+
         # Export private data to files before shutdown
         try:
             from domains.mcp_core.sync import SyncManager
@@ -148,6 +162,21 @@ def create_stop_handler() -> Callable:
         except Exception as e:
             logger.warning("service_registry_stop_error", component="registry", error=str(e))
 
+        # 等待后台向量化队列写完（需在关闭连接池之前）
+        try:
+            from domains.mcp_core.database.hybrid import reset_embedding_indexer, get_embedding_indexer
+            get_embedding_indexer().flush(timeout=5)
+            reset_embedding_indexer()
+        except Exception as e:
+            logger.warning("embedding_indexer_stop_error", component="database", error=str(e))
+
+        # 关闭共享数据库连接池
+        try:
+            from domains.mcp_core.database.pool import close_all_pools
+            close_all_pools()
+        except Exception as e:
+            logger.warning("db_pool_close_error", component="database", error=str(e))
+
         logger.info("api_stopped", component="api", status="success")
 
     return stop_app
@@ -16,6 +16,8 @@ from app.core.exceptions import register_exception_handlers
 
 # 配置结构化日志
 from domains.mcp_core.logging import configure_logging, get_logger, bind_request_context, clear_request_context
+from domains.mcp_core.observability.endpoints import metrics_endpoint, profile_endpoint
+from domains.mcp_core.observability.metrics import get_metrics_registry
 
 configure_logging(service_name="api")
 logger = get_logger(__name__)
@@ -25,7 +27,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
     """HTTP 请求日志中间件"""
 
     # 不记录日志的路径前缀
-    SKIP_PATHS = {"/health", "/docs", "/redoc", "/openapi.json", "/favicon.ico"}
+    SKIP_PATHS = {"/health", "/metrics", "/debug/profile", "/docs", "/redoc", "/openapi.json", "/favicon.ico"}
 
     async def dispatch(self, request: Request, call_next) -> Response:
         # 跳过不需要记录的路径
@@ -48,6 +50,15 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             response = await call_next(request)
             duration_ms = (time.time() - start_time) * 1000
 
+            # 按路由模板聚合延迟，避免路径参数造成指标膨胀
+            route = request.scope.get("route")
+            get_metrics_registry().record_call(
+                "http",
+                f"{method} {getattr(route, 'path', 'unmatched')}",
+                duration_ms,
+                success=response.status_code < 500,
+            )
+
             # 记录响应
             logger.info(
                 "http_request",
@@ -121,10 +132,23 @@ def create_application() -> FastAPI:
     # Register exception handlers
     register_exception_handlers(app)
 
+    # 调用指标（Prometheus / JSON）与按需采样分析
+    app.add_route("/metrics", metrics_endpoint, methods=["GET"])
+    app.add_route("/debug/profile", profile_endpoint, methods=["GET"])
+
     # Health check endpoint
     @app.get("/health")
     async def health_check():
-        return {"status": "healthy", "version": settings.VERSION}
+        from domains.mcp_core.database.pool import get_pool_stats
+        from domains.mcp_core.logging import get_log_store
+
+        log_store = get_log_store()
+        return {
+            "status": "healthy",
+            "version": settings.VERSION,
+            "db_pools": get_pool_stats(),
+            "log_ingest": log_store.get_ingest_stats() if log_store else None,
+        }
 
     return app
 
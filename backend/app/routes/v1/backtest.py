@@ -106,8 +106,12 @@ def _convert_request_to_engine_format(request: BacktestRequest) -> list:
     return strategy_list
 
 
-def _submit_single_backtest(request: BacktestRequest, runner) -> str:
-    """提交单个回测任务，返回 task_id"""
+def _submit_single_backtest(request: BacktestRequest, runner, priority=None) -> str:
+    """提交单个回测任务，返回 task_id
+
+    Args:
+        priority: 调度优先级，默认 interactive
+    """
     from domains.strategy_hub.services.backtest_runner import (
         BacktestRequest as RunnerRequest,
     )
@@ -136,6 +140,7 @@ def _submit_single_backtest(request: BacktestRequest, runner) -> str:
         min_kline_num=request.min_kline_num,
         black_list=request.black_list,
         white_list=request.white_list,
+        priority=priority,
     )
 
     return runner.submit(runner_request)
@@ -150,17 +155,22 @@ async def submit_batch_backtest(
 
     支持一次提交多个回测任务，后端并行执行。
     单个回测是批量的特例（tasks 只包含一个元素）。
+    多任务提交按 batch 优先级排队，不阻塞交互式回测。
     """
+    from domains.mcp_core.queue import JobPriority
+
+    priority = JobPriority.BATCH if len(request.tasks) > 1 else None
     try:
         tasks_status = []
         for task_request in request.tasks:
-            task_id = await run_sync(_submit_single_backtest, task_request, runner)
+            task_id = await run_sync(_submit_single_backtest, task_request, runner, priority)
             tasks_status.append(
                 BacktestStatus(
                     task_id=task_id,
                     status="pending",
                     progress=0.0,
                     message="回测任务已提交",
+                    queue_position=runner.get_queue_position(task_id),
                 )
             )
 
@@ -194,6 +204,7 @@ async def submit_backtest(
                 status="pending",
                 progress=0.0,
                 message="回测任务已提交",
+                queue_position=runner.get_queue_position(task_id),
             )
         )
     except Exception as e:
@@ -236,6 +247,7 @@ async def submit_simple_backtest(
                 status="pending",
                 progress=0.0,
                 message="回测任务已提交",
+                queue_position=runner.get_queue_position(task_id),
             )
         )
     except Exception as e:
@@ -262,6 +274,7 @@ def _get_task_status(task_id: str, runner) -> BacktestStatus:
         message=status.error_message,
         started_at=str(status.started_at) if status.started_at else None,
         completed_at=str(status.completed_at) if status.completed_at else None,
+        queue_position=status.queue_position,
     )
 
 
@@ -306,6 +319,7 @@ async def get_backtest_status(task_id: str, runner=Depends(get_backtest_runner))
                 message=status.error_message,
                 started_at=str(status.started_at) if status.started_at else None,
                 completed_at=str(status.completed_at) if status.completed_at else None,
+                queue_position=status.queue_position,
             )
         )
     except HTTPException:
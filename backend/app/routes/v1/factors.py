@@ -26,6 +26,7 @@ from app.schemas.factor import (
 )
 from app.core.deps import get_factor_or_404, get_factor_service
 from app.core.async_utils import run_sync
+from domains.factor_hub.core.store import FactorStore
 
 logger = logging.getLogger(__name__)
 
@@ -95,6 +96,7 @@ async def list_factors(
         include_excluded=include_excluded,
         page=page,
         page_size=page_size,
+        columns=FactorStore.list_columns,  # 列表视图不加载代码和分析长文本，详情单独获取
     )
 
     # Convert to response model
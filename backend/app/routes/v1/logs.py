@@ -15,6 +15,8 @@ from app.schemas.log import (
     LogQueryResult,
     LogFieldValues,
     LogStats,
+    LogMetric,
+    LogMetrics,
 )
 from domains.mcp_core.logging import get_log_store, get_logger
 
@@ -257,3 +259,34 @@ async def get_stats(
     except Exception as e:
         logger.error("log_stats_error", error=str(e))
         raise HTTPException(status_code=500, detail=f"Failed to get stats: {str(e)}")
+
+
+@router.get("/metrics", response_model=LogMetrics)
+async def get_metrics(
+    group_by: str = Query("tool_name", pattern="^(tool_name|model|service|status)$", description="分组字段"),
+    topic: Optional[str] = Query(None, description="日志主题"),
+    start_time: Optional[datetime] = Query(None, description="开始时间"),
+    end_time: Optional[datetime] = Query(None, description="结束时间"),
+    limit: int = Query(50, ge=1, le=500, description="返回数量限制"),
+):
+    """
+    获取按工具/模型汇总的调用指标（次数、错误数、耗时分位数、token 合计）。
+
+    数据来自分钟级预聚合表，不扫描原始日志。
+
+    Returns:
+        指标列表
+    """
+    store = get_log_store()
+    if not store:
+        raise HTTPException(status_code=503, detail="Log store not initialized")
+
+    try:
+        items = await store.get_metrics(
+            group_by=group_by, topic=topic,
+            start_time=start_time, end_time=end_time, limit=limit,
+        )
+        return LogMetrics(group_by=group_by, items=[LogMetric(**item) for item in items])
+    except Exception as e:
+        logger.error("log_metrics_error", error=str(e))
+        raise HTTPException(status_code=500, detail=f"Failed to get metrics: {str(e)}")
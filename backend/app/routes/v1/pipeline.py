@@ -23,6 +23,7 @@ from app.schemas.common import ApiResponse
 from app.core.deps import get_factor_store, get_field_filler
 from app.core.async_utils import run_sync
 from domains.mcp_core.server.sse import get_task_manager, TaskStatus
+from domains.mcp_core.queue import JobPriority, get_scheduler
 from domains.mcp_core.paths import get_factors_dir, get_sections_dir
 
 router = APIRouter()
@@ -84,8 +85,9 @@ class FillRequest(BaseModel):
     - fields: 要填充的字段列表
     - mode: incremental 只填空值，full 全量覆盖
     - preview: 预览模式，生成内容但不保存到数据库（用于编辑面板）
-    - concurrency: 并发数（同时进行的 LLM 请求数）
+    - concurrency: 并发数（同时进行的 LLM 请求数，0 表示由模型限流器自适应）
     - delay: 每个请求之间的间隔时间
+    - batch_size: 单次 LLM 请求最多填充的因子数（>1 时启用批量模式）
     """
 
     factors: Optional[List[str]] = Field(
@@ -94,8 +96,9 @@ class FillRequest(BaseModel):
     )
     fields: List[FillableField] = Field(description="Fields to fill")
     mode: FillMode = Field(default=FillMode.incremental)
-    concurrency: int = Field(default=1, ge=1, le=10, description="Number of concurrent LLM calls")
+    concurrency: int = Field(default=1, ge=0, le=10, description="Number of concurrent LLM calls (0 = adaptive)")
     delay: float = Field(default=15.0, ge=0, le=120, description="Delay between each request in seconds")
+    batch_size: int = Field(default=1, ge=1, le=50, description="Max factors per LLM request (>1 enables batching)")
     dry_run: bool = Field(default=False, description="Count only, no LLM calls")
     preview: bool = Field(default=False, description="Generate but don't save to database")
 
@@ -145,7 +148,7 @@ class ReviewRequest(BaseModel):
     filter_verification_status: Optional[int] = Field(default=None, description="验证状态筛选（0=未验证, 1=通过, 2=废弃）")
     filter_score_min: Optional[float] = Field(default=None)
     filter_score_max: Optional[float] = Field(default=None)
-    concurrency: int = Field(default=1, ge=1, le=10, description="Number of concurrent LLM calls")
+    concurrency: int = Field(default=1, ge=0, le=10, description="Number of concurrent LLM calls (0 = adaptive)")
     delay: float = Field(default=15.0, ge=0, le=120, description="Delay between each LLM call in seconds")
     dry_run: bool = Field(default=False)
 
@@ -507,6 +510,7 @@ async def fill_fields(
                 concurrency=request.concurrency,
                 delay=request.delay,
                 save_to_store=False,
+                batch_size=request.batch_size,
             )
 
             # 转换结果为可序列化格式
@@ -575,6 +579,7 @@ async def fill_fields(
             delay=request.delay,
             filler=filler,
             total_to_fill=total_to_fill,
+            batch_size=request.batch_size,
         ))
 
         return ApiResponse(
@@ -602,11 +607,20 @@ async def _execute_fill_task(
     delay: float,
     filler,
     total_to_fill: int,
+    batch_size: int = 1,
 ):
     """后台执行填充任务，推送实时进度"""
     manager = get_task_manager()
 
-    try:
+    async def on_queued(position: int):
+        await manager.update_progress(
+            task_id,
+            status=TaskStatus.PENDING,
+            progress=0,
+            message=f"排队中，前方还有 {position} 个任务",
+        )
+
+    async def run_fill():
         # 标记任务开始
         manager.start_task(task_id)
         await manager.update_progress(
@@ -619,7 +633,7 @@ async def _execute_fill_task(
         )
 
         # 执行填充（带进度回调）
-        result = await filler.fill_fields_async(
+        return await filler.fill_fields_async(
             factors=factors,
             fields=fields,
             mode=mode,
@@ -627,6 +641,18 @@ async def _execute_fill_task(
             delay=delay,
             save_to_store=True,
             task_id=task_id,  # 传递 task_id 用于进度推送
+            batch_size=batch_size,
+        )
+
+    try:
+        # 经调度器准入后执行；LLM 调用为 I/O 型，不占用 CPU 槽位
+        result = await get_scheduler().run_async(
+            run_fill,
+            group="llm_fill",
+            priority=JobPriority.BATCH,
+            name=f"llm_fill:{task_id}",
+            cpu_bound=False,
+            on_queued=on_queued,
         )
 
         # 汇总结果
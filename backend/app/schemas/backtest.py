@@ -241,6 +241,7 @@ class BacktestStatus(BaseModel):
     message: Optional[str] = None
     started_at: Optional[str] = None
     completed_at: Optional[str] = None
+    queue_position: Optional[int] = None  # 调度器排队位置（0 表示下一个执行）
 
 
 class BatchBacktestRequest(BaseModel):
@@ -104,3 +104,26 @@ class LogStats(BaseModel):
     by_service: Dict[str, int] = Field(default_factory=dict, description="按服务统计")
     by_topic: Dict[str, int] = Field(default_factory=dict, description="按主题统计")
     time_range: Optional[Dict[str, datetime]] = Field(None, description="时间范围")
+
+
+class LogMetric(BaseModel):
+    """Aggregated call metrics for one tool/model (from minute rollups)."""
+
+    name: str = Field(..., description="工具名/模型名等分组值")
+    count: int = Field(0, description="调用次数")
+    error_count: int = Field(0, description="错误次数")
+    avg_ms: Optional[float] = Field(None, description="平均耗时(ms)")
+    p50_ms: Optional[float] = Field(None, description="P50 耗时(ms，近似)")
+    p95_ms: Optional[float] = Field(None, description="P95 耗时(ms，近似)")
+    p99_ms: Optional[float] = Field(None, description="P99 耗时(ms，近似)")
+    max_ms: Optional[float] = Field(None, description="最大耗时(ms)")
+    input_tokens: int = Field(0, description="输入 token 合计")
+    output_tokens: int = Field(0, description="输出 token 合计")
+    total_tokens: int = Field(0, description="总 token 合计")
+
+
+class LogMetrics(BaseModel):
+    """Metrics response."""
+
+    group_by: str = Field(..., description="分组字段")
+    items: List[LogMetric] = Field(default_factory=list, description="指标列表")
@@ -42,6 +42,7 @@ from .tools.signal_tools import (
     DetectSymbolEventsTool,
     ScreenMarketTool,
     SimulateHoldingStrategyTool,
+    SweepSignalStrategyTool,
 )
 from .tools.tag_tools import (
     AddTagTool,
@@ -94,6 +95,7 @@ class DataHubMCPServer(BaseMCPServer):
         self.register_tool(DetectSymbolEventsTool(), "signal")
         self.register_tool(ScreenMarketTool(), "signal")
         self.register_tool(SimulateHoldingStrategyTool(), "signal")
+        self.register_tool(SweepSignalStrategyTool(), "signal")
 
         # 标签管理工具
         self.register_tool(AddTagTool(), "tag")
@@ -24,6 +24,7 @@ from .signal_tools import (
     DetectSymbolEventsTool,
     ScreenMarketTool,
     SimulateHoldingStrategyTool,
+    SweepSignalStrategyTool,
 )
 from .research_tools import (
     CalculateReturnsTool,
@@ -55,6 +56,7 @@ __all__ = [
     "DetectSymbolEventsTool",
     "ScreenMarketTool",
     "SimulateHoldingStrategyTool",
+    "SweepSignalStrategyTool",
     # 研究工具
     "CalculateReturnsTool",
     "CalculateDrawdownTool",
@@ -9,6 +9,7 @@ from datetime import datetime
 
 from .base import BaseTool, ToolResult
 from domains.mcp_core.base.tool import ExecutionMode
+from domains.mcp_core.base.tool_cache import factor_cache_tag
 
 
 class ListFactorsTool(BaseTool):
@@ -53,6 +54,7 @@ class CalculateFactorTool(BaseTool):
 
     execution_mode = ExecutionMode.COMPUTE  # CPU 密集型计算
     execution_timeout = 60.0
+    page_results = True  # 逐 K 线返回因子值
 
     @property
     def name(self) -> str:
@@ -234,6 +236,11 @@ class GetSymbolRankAtTool(BaseTool):
 
     execution_mode = ExecutionMode.COMPUTE
     execution_timeout = 60.0
+    cache_ttl = 300.0
+
+    def cache_tags_for(self, params: Dict[str, Any]) -> List[str]:
+        # 因子名即因子文件名，与 FactorStore 写入时失效的标签同一规则
+        return ["market_data", factor_cache_tag(params.get("factor_name", ""))]
 
     @property
     def name(self) -> str:
@@ -363,6 +370,12 @@ class GetFactorRankingTool(BaseTool):
 
     execution_mode = ExecutionMode.COMPUTE  # CPU 密集型计算
     execution_timeout = 60.0
+    cache_ttl = 60.0
+    page_results = True  # 全市场排名
+
+    def cache_tags_for(self, params: Dict[str, Any]) -> List[str]:
+        # 因子名即因子文件名，与 FactorStore 写入时失效的标签同一规则
+        return ["market_data", factor_cache_tag(params.get("factor_name", ""))]
 
     @property
     def name(self) -> str:
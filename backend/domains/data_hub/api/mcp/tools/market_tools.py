@@ -19,6 +19,8 @@ class GetMarketOverviewTool(BaseTool):
     """获取市场概览工具"""
 
     category = "market"
+    cache_ttl = 30.0
+    cache_tags = ("market_data",)
 
     @property
     def name(self) -> str:
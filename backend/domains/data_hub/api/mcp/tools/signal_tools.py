@@ -4,12 +4,19 @@
 提供信号检测、市场筛选、信号表现分析等能力。
 """
 
-from typing import Any, Dict, List
+import asyncio
+from typing import Any, Dict
 import numpy as np
 import pandas as pd
 
 from .base import BaseTool, ToolResult
 from domains.mcp_core.base.tool import ExecutionMode
+from domains.data_hub.services.signal_backtester import (
+    SIZING_RULES,
+    SignalBacktestConfig,
+    SignalBacktester,
+    build_condition_mask,
+)
 
 
 class DetectSymbolEventsTool(BaseTool):
@@ -113,24 +120,10 @@ class DetectSymbolEventsTool(BaseTool):
                 return ToolResult(success=False, error=f"无法计算因子: {factor_col}")
 
             # 根据操作符筛选
-            if operator == ">":
-                mask = df[factor_col] > threshold
-            elif operator == "<":
-                mask = df[factor_col] < threshold
-            elif operator == ">=":
-                mask = df[factor_col] >= threshold
-            elif operator == "<=":
-                mask = df[factor_col] <= threshold
-            elif operator == "==":
-                mask = df[factor_col] == threshold
-            elif operator == "cross_up":
-                prev = df[factor_col].shift(1)
-                mask = (prev < threshold) & (df[factor_col] >= threshold)
-            elif operator == "cross_down":
-                prev = df[factor_col].shift(1)
-                mask = (prev > threshold) & (df[factor_col] <= threshold)
-            else:
-                return ToolResult(success=False, error=f"不支持的操作符: {operator}")
+            try:
+                mask = build_condition_mask(df[factor_col], operator, threshold)
+            except ValueError as e:
+                return ToolResult(success=False, error=str(e))
 
             # 获取符合条件的事件
             events_df = df[mask][['candle_begin_time', factor_col, 'close']].copy()
@@ -498,3 +491,222 @@ class SimulateHoldingStrategyTool(BaseTool):
 
         except Exception as e:
             return ToolResult(success=False, error=str(e))
+
+
+class SweepSignalStrategyTool(BaseTool):
+    """信号策略参数网格扫描工具"""
+
+    execution_mode = ExecutionMode.COMPUTE
+    execution_timeout = 300.0
+
+    @property
+    def name(self) -> str:
+        return "sweep_signal_strategy"
+
+    @property
+    def description(self) -> str:
+        return """单币种信号策略参数网格扫描（向量化批量回测）。
+
+信号由因子条件生成（同 detect_symbol_events），对 阈值 × 持仓时间 × 止损 × 止盈
+的全部组合一次性批量回测，计入手续费和资金费率，支持仓位管理规则。
+数千个参数组合可在数秒内完成。
+
+可用参数:
+- symbol: 币种名称 (必填), 如 ETH-USDT
+- factor_name / param / operator: 信号条件 (必填)
+- thresholds: 阈值列表 (必填), 每个阈值生成一组信号
+- holding_hours: 持仓时间列表（小时）, 默认 [24]
+- stop_loss: 止损比例列表, 如 [-0.03, -0.05], 默认不止损
+- take_profit: 止盈比例列表, 如 [0.05, 0.1], 默认不止盈
+- direction: long 或 short, 默认 long
+- fee_rate: 单边手续费率, 默认 0.0006
+- sizing: 仓位规则 fixed(固定比例) / vol_target(波动率目标) / kelly(样本内凯利), 默认 fixed
+- position_size: 固定仓位比例或凯利乘数, 默认 1.0
+- target_vol: vol_target 的年化目标波动率, 默认 0.5
+- max_leverage: 仓位上限, 默认 3
+- start_date / end_date: 日期范围
+- sort_by: 排序指标, 默认 sharpe
+- top_n: 返回前 N 个组合, 默认 20
+
+持仓不重叠（持仓期间的信号忽略），信号K线收盘价入场。
+返回排名靠前的参数组合及其交易数、胜率、总收益、最大回撤、盈亏比、凯利比例等指标。"""
+
+    @property
+    def input_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "symbol": {
+                    "type": "string",
+                    "description": "币种名称，如 ETH-USDT"
+                },
+                "factor_name": {
+                    "type": "string",
+                    "description": "因子名称，如 Bias, RSI"
+                },
+                "param": {
+                    "type": "integer",
+                    "description": "因子参数，如 20"
+                },
+                "operator": {
+                    "type": "string",
+                    "description": "比较操作符",
+                    "enum": [">", "<", ">=", "<=", "==", "cross_up", "cross_down"]
+                },
+                "thresholds": {
+                    "type": "array",
+                    "items": {"type": "number"},
+                    "description": "阈值列表"
+                },
+                "holding_hours": {
+                    "type": "array",
+                    "items": {"type": "integer"},
+                    "description": "持仓时间列表（小时）"
+                },
+                "stop_loss": {
+                    "type": "array",
+                    "items": {"type": "number"},
+                    "description": "止损比例列表，如 [-0.03, -0.05]"
+                },
+                "take_profit": {
+                    "type": "array",
+                    "items": {"type": "number"},
+                    "description": "止盈比例列表，如 [0.05, 0.1]"
+                },
+                "direction": {
+                    "type": "string",
+                    "description": "交易方向",
+                    "enum": ["long", "short"],
+                    "default": "long"
+                },
+                "fee_rate": {
+                    "type": "number",
+                    "description": "单边手续费率（含滑点）",
+                    "default": 0.0006
+                },
+                "sizing": {
+                    "type": "string",
+                    "description": "仓位管理规则",
+                    "enum": list(SIZING_RULES),
+                    "default": "fixed"
+                },
+                "position_size": {
+                    "type": "number",
+                    "description": "固定仓位比例，或 kelly 规则下的凯利乘数",
+                    "default": 1.0
+                },
+                "target_vol": {
+                    "type": "number",
+                    "description": "vol_target 规则的年化目标波动率",
+                    "default": 0.5
+                },
+                "max_leverage": {
+                    "type": "number",
+                    "description": "仓位上限",
+                    "default": 3.0
+                },
+                "start_date": {
+                    "type": "string",
+                    "description": "开始日期，格式 YYYY-MM-DD"
+                },
+                "end_date": {
+                    "type": "string",
+                    "description": "结束日期，格式 YYYY-MM-DD"
+                },
+                "data_type": {
+                    "type": "string",
+                    "description": "数据类型：swap 或 spot",
+                    "enum": ["swap", "spot"],
+                    "default": "swap"
+                },
+                "sort_by": {
+                    "type": "string",
+                    "description": "排序指标",
+                    "enum": ["sharpe", "total_return", "win_rate", "profit_factor", "max_drawdown"],
+                    "default": "sharpe"
+                },
+                "top_n": {
+                    "type": "integer",
+                    "description": "返回前 N 个参数组合",
+                    "default": 20,
+                    "minimum": 1,
+                    "maximum": 200
+                }
+            },
+            "required": ["symbol", "factor_name", "param", "operator", "thresholds"]
+        }
+
+    async def execute(self, **params) -> ToolResult:
+        try:
+            symbol = params["symbol"]
+            factor_name = params["factor_name"]
+            param = params["param"]
+            operator = params["operator"]
+            thresholds = params["thresholds"]
+            data_type = params.get("data_type", "swap")
+            sort_by = params.get("sort_by", "sharpe")
+            top_n = params.get("top_n", 20)
+
+            if not thresholds:
+                return ToolResult(success=False, error="阈值列表为空")
+
+            config = SignalBacktestConfig(
+                direction=1 if params.get("direction", "long") == "long" else -1,
+                fee_rate=params.get("fee_rate", 0.0006),
+                sizing=params.get("sizing", "fixed"),
+                position_size=params.get("position_size", 1.0),
+                target_vol=params.get("target_vol", 0.5),
+                max_leverage=params.get("max_leverage", 3.0),
+            )
+
+            # 获取 K 线数据并计算因子
+            df = await self.data_loader.get_kline_async(
+                symbol=symbol,
+                data_type=data_type,
+                start_date=params.get("start_date"),
+                end_date=params.get("end_date")
+            )
+            if df.empty:
+                return ToolResult(success=False, error=f"无数据: {symbol}")
+
+            df = self.factor_calculator.add_factors_to_df(df, {factor_name: [param]})
+            factor_col = f"{factor_name}_{param}"
+            if factor_col not in df.columns:
+                return ToolResult(success=False, error=f"无法计算因子: {factor_col}")
+
+            signals = {
+                f"{factor_col} {operator} {threshold}": build_condition_mask(
+                    df[factor_col], operator, threshold
+                ).fillna(False).to_numpy(dtype=bool)
+                for threshold in thresholds
+            }
+
+            backtester = SignalBacktester(df, config)
+            grid = await asyncio.to_thread(
+                backtester.run_grid,
+                signals,
+                params.get("holding_hours") or [24],
+                params.get("stop_loss") or [None],
+                params.get("take_profit") or [None],
+            )
+
+            # max_drawdown 为负数，越大越好；其余指标同样降序
+            ranked = grid.sort_values(sort_by, ascending=False, na_position="last").head(top_n)
+            ranked = ranked.astype(object).where(ranked.notna(), None)
+
+            return ToolResult(
+                success=True,
+                data={
+                    "symbol": symbol,
+                    "period": {
+                        "start": str(df['candle_begin_time'].min()),
+                        "end": str(df['candle_begin_time'].max())
+                    },
+                    "total_combinations": len(grid),
+                    "sort_by": sort_by,
+                    "results": ranked.to_dict("records")
+                }
+            )
+
+        except Exception as e:
+            return ToolResult(success=False, error=str(e))
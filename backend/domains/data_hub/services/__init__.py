@@ -7,6 +7,7 @@
 from .data_loader import DataLoader
 from .factor_calculator import FactorCalculator
 from .data_slicer import DataSlicer
+from .signal_backtester import SignalBacktestConfig, SignalBacktester
 from .factor_data_loader import (
     FactorDataLoader,
     get_factor_data_loader,
@@ -17,6 +18,8 @@ __all__ = [
     "DataLoader",
     "FactorCalculator",
     "DataSlicer",
+    "SignalBacktestConfig",
+    "SignalBacktester",
     "FactorDataLoader",
     "get_factor_data_loader",
     "reset_factor_data_loader",
@@ -13,6 +13,7 @@ import pandas as pd
 
 from ..core.models import DataConfig, SymbolInfo
 from domains.core.exceptions import DataNotFoundError, ConfigError
+from domains.mcp_core.base.tool_cache import invalidate_tool_cache
 
 # 使用 engine 服务
 from domains.engine.services import (
@@ -184,8 +185,9 @@ class DataLoader:
         return pd.concat(dfs, ignore_index=True)
 
     def clear_cache(self):
-        """清除数据缓存"""
+        """清除数据缓存（同时使依赖行情数据的工具缓存失效）"""
         self._engine_loader.clear_cache()
+        invalidate_tool_cache("market_data")
 
     def get_stats(self) -> Dict:
         """
@@ -10,6 +10,7 @@ import pandas as pd
 
 from ..core.models import FactorResult, FactorInfo
 from domains.core.exceptions import FactorNotFoundError, CalculationError
+from domains.mcp_core.base.tool_cache import invalidate_tool_cache
 
 # 使用 engine 服务
 from domains.engine.services import (
@@ -197,5 +198,6 @@ class FactorCalculator:
         return self._engine_calculator.add_factors_to_df(df, factor_params)
 
     def clear_cache(self):
-        """清除因子缓存"""
+        """清除因子缓存（同时使依赖行情数据的工具缓存失效）"""
         FactorHub.clear_cache()
+        invalidate_tool_cache("market_data")
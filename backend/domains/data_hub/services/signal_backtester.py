@@ -0,0 +1,437 @@
+"""
+向量化单币种信号回测服务
+
+面向单币种 CTA 研究：信号 → 持仓 → 收益，支持止损止盈、手续费、资金费率
+和仓位管理规则，并以数组批量计算的方式一次评估整个参数网格。
+
+计算方式:
+- 对每个入场点构建未来 max(holding_bars) 根 K 线的价格路径矩阵
+- 止损/止盈的首次触发时间由路径的累计最小/最大值与阈值比较得到，
+  对所有阈值同时计算，不需要逐根 K 线循环
+- 持仓不重叠时，通过"下一笔可入场信号"指针在所有参数组合上同步跳转，
+  循环次数只与成交笔数有关
+
+约定（与 simulate_holding_strategy 一致）:
+- 信号在 K 线收盘时产生，按该 K 线收盘价入场
+- 止损/止盈按 K 线最高/最低价判断触发，按阈值价格成交；同一根 K 线
+  同时触发时按止损处理（保守）
+- 到期离场按第 holding_bars 根 K 线收盘价成交，数据不足的交易不计入
+"""
+
+import itertools
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# 仓位管理规则
+SIZING_FIXED = "fixed"  # 固定仓位比例
+SIZING_VOL_TARGET = "vol_target"  # 按入场时已实现波动率调整仓位
+SIZING_KELLY = "kelly"  # 按参数组合自身交易统计的凯利比例（样本内）
+SIZING_RULES = (SIZING_FIXED, SIZING_VOL_TARGET, SIZING_KELLY)
+
+EXIT_TIME = 0
+EXIT_STOP_LOSS = 1
+EXIT_TAKE_PROFIT = 2
+_EXIT_REASONS = {
+    EXIT_TIME: "holding_period",
+    EXIT_STOP_LOSS: "stop_loss",
+    EXIT_TAKE_PROFIT: "take_profit",
+}
+
+
+def build_condition_mask(series: pd.Series, operator: str, threshold: float) -> pd.Series:
+    """
+    根据比较操作符生成信号布尔序列
+
+    Args:
+        series: 因子序列
+        operator: 比较操作符，支持 ">", "<", ">=", "<=", "==", "cross_up", "cross_down"
+        threshold: 阈值
+
+    Returns:
+        布尔序列
+    """
+    if operator == ">":
+        return series > threshold
+    if operator == "<":
+        return series < threshold
+    if operator == ">=":
+        return series >= threshold
+    if operator == "<=":
+        return series <= threshold
+    if operator == "==":
+        return series == threshold
+    if operator == "cross_up":
+        prev = series.shift(1)
+        return (prev < threshold) & (series >= threshold)
+    if operator == "cross_down":
+        prev = series.shift(1)
+        return (prev > threshold) & (series <= threshold)
+    raise ValueError(f"不支持的操作符: {operator}")
+
+
+@dataclass
+class SignalBacktestConfig:
+    """信号回测配置（参数网格之外的固定项）"""
+    direction: int = 1  # 1=做多, -1=做空
+    fee_rate: float = 0.0006  # 单边手续费率（含滑点）
+    sizing: str = SIZING_FIXED  # 仓位管理规则
+    position_size: float = 1.0  # 固定仓位比例 / 凯利乘数（如 0.5=半凯利）
+    target_vol: float = 0.5  # vol_target 的年化目标波动率
+    vol_lookback: int = 168  # vol_target 的波动率回看 K 线数
+    max_leverage: float = 3.0  # 仓位上限
+    allow_overlap: bool = False  # 是否允许持仓期间重复入场
+    periods_per_year: int = 24 * 365  # 每年 K 线数（默认 1H）
+
+    def __post_init__(self):
+        if self.direction not in (1, -1):
+            raise ValueError(f"direction 必须为 1 或 -1: {self.direction}")
+        if self.sizing not in SIZING_RULES:
+            raise ValueError(f"不支持的仓位规则: {self.sizing}，可选 {SIZING_RULES}")
+
+
+def _threshold_array(values: Sequence[Optional[float]], sign: int) -> np.ndarray:
+    """将阈值列表转换为数组，None 表示不设置（永不触发）"""
+    return np.array(
+        [sign * np.inf if v is None else float(v) for v in values], dtype=float
+    )
+
+
+class SignalBacktester:
+    """
+    向量化单币种信号回测器
+
+    以单币种 K 线数据初始化，可对多组信号和参数网格批量回测。
+    """
+
+    def __init__(self, df: pd.DataFrame, config: Optional[SignalBacktestConfig] = None):
+        """
+        初始化回测器
+
+        Args:
+            df: K 线数据，需包含 candle_begin_time 和 close，
+                可选 high/low（止损止盈判断）与 funding_fee（资金费率）
+            config: 回测配置
+        """
+        if "close" not in df.columns:
+            raise ValueError("K 线数据缺少 close 列")
+
+        self.config = config or SignalBacktestConfig()
+        df = df.reset_index(drop=True)
+
+        self.times = pd.to_datetime(df["candle_begin_time"]).to_numpy()
+        self.close = df["close"].to_numpy(dtype=float)
+        self.high = df["high"].to_numpy(dtype=float) if "high" in df.columns else self.close
+        self.low = df["low"].to_numpy(dtype=float) if "low" in df.columns else self.close
+
+        funding = (
+            df["funding_fee"].fillna(0).to_numpy(dtype=float)
+            if "funding_fee" in df.columns else np.zeros(len(df))
+        )
+        # 累计资金费率，持仓 (entry, exit] 区间的费率和 = cum[exit] - cum[entry]
+        self._cum_funding = np.cumsum(funding)
+
+        self._size_cache: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def _position_size(self, entries: np.ndarray) -> np.ndarray:
+        """按入场点计算与参数组合无关的仓位（fixed / vol_target）"""
+        cfg = self.config
+        if cfg.sizing != SIZING_VOL_TARGET:
+            return np.full(len(entries), cfg.position_size if cfg.sizing == SIZING_FIXED else 1.0)
+
+        if self._size_cache is None:
+            log_ret = pd.Series(np.log(self.close)).diff()
+            vol = log_ret.rolling(cfg.vol_lookback, min_periods=max(2, cfg.vol_lookback // 2)).std()
+            vol = vol.to_numpy() * np.sqrt(cfg.periods_per_year)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                size = np.where(vol > 0, cfg.target_vol / vol, 0.0)
+            self._size_cache = np.clip(np.nan_to_num(size), 0.0, cfg.max_leverage)
+        return self._size_cache[entries]
+
+    def _evaluate(
+        self,
+        signal: np.ndarray,
+        holding_bars: Sequence[int],
+        stop_loss: Sequence[Optional[float]],
+        take_profit: Sequence[Optional[float]],
+    ) -> Dict[str, Any]:
+        """
+        对单组信号评估整个参数网格
+
+        Returns:
+            包含入场点、参数网格和 (组合数, 入场数) 形状的结果矩阵
+        """
+        cfg = self.config
+        n_bars = len(self.close)
+        signal = np.asarray(signal, dtype=bool)
+        if signal.shape != (n_bars,):
+            raise ValueError(f"信号长度 {signal.shape} 与 K 线数量 {n_bars} 不一致")
+
+        holding = np.asarray(holding_bars, dtype=int)
+        if (holding <= 0).any():
+            raise ValueError("holding_bars 必须为正整数")
+        sl = _threshold_array(stop_loss, -1)
+        tp = _threshold_array(take_profit, 1)
+
+        entries = np.flatnonzero(signal & np.isfinite(self.close))
+        entries = entries[entries < n_bars - 1]
+        grid = list(itertools.product(holding, sl, tp))
+        n_combo, n_entry = len(grid), len(entries)
+
+        result: Dict[str, Any] = {"entries": entries, "grid": grid}
+        if n_entry == 0:
+            empty = np.zeros((n_combo, 0))
+            result.update(
+                returns=empty, taken=empty.astype(bool), exit_pos=empty.astype(int),
+                reason=empty.astype(int), size=empty,
+            )
+            return result
+
+        # 价格路径矩阵: (入场数, 最长持仓)
+        max_hold = int(holding.max())
+        offsets = np.arange(1, max_hold + 1)
+        path_idx = entries[:, None] + offsets[None, :]
+        in_range = path_idx < n_bars
+        path_idx = np.minimum(path_idx, n_bars - 1)
+        entry_price = self.close[entries][:, None]
+
+        direction = cfg.direction
+        close_ret = direction * (self.close[path_idx] / entry_price - 1)
+        if direction == 1:
+            adverse = self.low[path_idx] / entry_price - 1
+            favorable = self.high[path_idx] / entry_price - 1
+        else:
+            adverse = -(self.high[path_idx] / entry_price - 1)
+            favorable = -(self.low[path_idx] / entry_price - 1)
+        adverse = np.where(in_range, np.nan_to_num(adverse, nan=np.inf), np.inf)
+        favorable = np.where(in_range, np.nan_to_num(favorable, nan=-np.inf), -np.inf)
+
+        # 首次触发位置 = 累计极值仍未越过阈值的 K 线数（累计极值单调）
+        run_min = np.minimum.accumulate(adverse, axis=1)
+        run_max = np.maximum.accumulate(favorable, axis=1)
+        first_sl = (run_min[:, :, None] > sl[None, None, :]).sum(axis=1)  # (入场数, 止损数)
+        first_tp = (run_max[:, :, None] < tp[None, None, :]).sum(axis=1)  # (入场数, 止盈数)
+        last_pos = np.minimum(max_hold, n_bars - 1 - entries) - 1  # 最后一根可用 K 线的位置
+
+        combo_hold = np.array([g[0] for g in grid])
+        combo_sl_idx = np.repeat(np.arange(len(sl)), len(tp))
+        combo_sl_idx = np.tile(combo_sl_idx, len(holding))
+        combo_tp_idx = np.tile(np.arange(len(tp)), len(holding) * len(sl))
+        combo_sl = sl[combo_sl_idx]
+        combo_tp = tp[combo_tp_idx]
+
+        sl_pos = first_sl[:, combo_sl_idx].T  # (组合数, 入场数)
+        tp_pos = first_tp[:, combo_tp_idx].T
+        time_pos = (combo_hold - 1)[:, None]
+
+        hit_sl = (sl_pos <= tp_pos) & (sl_pos <= time_pos)
+        hit_tp = ~hit_sl & (tp_pos <= time_pos)
+        exit_pos = np.where(hit_sl, sl_pos, np.where(hit_tp, tp_pos, time_pos))
+        exit_pos = np.broadcast_to(exit_pos, (n_combo, n_entry))
+        valid = exit_pos <= last_pos[None, :]
+        exit_pos = np.where(valid, exit_pos, 0)
+
+        reason = np.where(hit_sl, EXIT_STOP_LOSS, np.where(hit_tp, EXIT_TAKE_PROFIT, EXIT_TIME))
+        time_ret = close_ret[np.arange(n_entry)[None, :], exit_pos]
+        gross = np.where(
+            hit_sl, combo_sl[:, None], np.where(hit_tp, combo_tp[:, None], time_ret)
+        )
+
+        # 资金费率: 多头在正费率时付费，空头收费
+        exit_abs = entries[None, :] + exit_pos + 1
+        funding = self._cum_funding[exit_abs] - self._cum_funding[entries][None, :]
+        unit_ret = gross - direction * funding - 2 * cfg.fee_rate
+
+        taken = valid if cfg.allow_overlap else self._non_overlapping(entries, exit_abs, valid)
+
+        if cfg.sizing == SIZING_KELLY:
+            size = self._kelly_size(np.where(taken, unit_ret, np.nan))[:, None]
+        else:
+            size = self._position_size(entries)[None, :]
+        size = np.broadcast_to(size, (n_combo, n_entry))
+
+        result.update(
+            returns=np.where(taken, np.maximum(unit_ret * size, -1.0), np.nan),
+            taken=taken,
+            exit_pos=exit_pos,
+            reason=reason,
+            size=size,
+        )
+        return result
+
+    @staticmethod
+    def _non_overlapping(entries: np.ndarray, exit_abs: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        """
+        剔除持仓期间的重复入场
+
+        每个组合从第一个有效信号出发，跳转到离场后的第一个信号；
+        所有组合同步跳转，循环次数等于最大成交笔数。
+        """
+        n_combo, n_entry = exit_abs.shape
+        # 离场 K 线之后的第一个入场点（离场当根收盘不再入场）
+        next_idx = np.searchsorted(entries, exit_abs, side="right")
+        # 无效交易（数据不足）直接跳到下一个信号
+        next_idx = np.where(valid, next_idx, np.arange(1, n_entry + 1)[None, :])
+
+        taken = np.zeros((n_combo, n_entry), dtype=bool)
+        cursor = np.zeros(n_combo, dtype=int)
+        rows = np.arange(n_combo)
+        active = cursor < n_entry
+        while active.any():
+            r, c = rows[active], cursor[active]
+            taken[r, c] = valid[r, c]
+            cursor[active] = next_idx[r, c]
+            active = cursor < n_entry
+        return taken
+
+    def _kelly_size(self, returns: np.ndarray) -> np.ndarray:
+        """按每个组合的交易统计计算凯利仓位（乘以 position_size，截断到 [0, max_leverage]）"""
+        kelly = _kelly_fraction(returns)
+        return np.clip(kelly * self.config.position_size, 0.0, self.config.max_leverage)
+
+    def run_grid(
+        self,
+        signals: Dict[str, np.ndarray],
+        holding_bars: Sequence[int] = (24,),
+        stop_loss: Sequence[Optional[float]] = (None,),
+        take_profit: Sequence[Optional[float]] = (None,),
+    ) -> pd.DataFrame:
+        """
+        批量回测：信号组 × 持仓周期 × 止损 × 止盈
+
+        Args:
+            signals: {信号名称: 布尔信号数组}
+            holding_bars: 持仓 K 线数列表
+            stop_loss: 止损比例列表（负数，如 -0.05），None 表示不止损
+            take_profit: 止盈比例列表（正数，如 0.1），None 表示不止盈
+
+        Returns:
+            每个参数组合一行的指标表
+        """
+        frames = []
+        span_years = self._span_years()
+        for signal_name, signal in signals.items():
+            res = self._evaluate(signal, holding_bars, stop_loss, take_profit)
+            metrics = _grid_metrics(res, span_years)
+            grid = res["grid"]
+            metrics.insert(0, "signal", signal_name)
+            metrics.insert(1, "holding_bars", [int(g[0]) for g in grid])
+            metrics.insert(2, "stop_loss", [None if np.isinf(g[1]) else float(g[1]) for g in grid])
+            metrics.insert(3, "take_profit", [None if np.isinf(g[2]) else float(g[2]) for g in grid])
+            frames.append(metrics)
+
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def simulate_trades(
+        self,
+        signal: np.ndarray,
+        holding_bars: int = 24,
+        stop_loss: Optional[float] = None,
+        take_profit: Optional[float] = None,
+    ) -> pd.DataFrame:
+        """
+        单组参数的逐笔交易明细
+
+        Returns:
+            每笔交易一行: 入场/离场时间与价格、收益、离场原因、仓位
+        """
+        res = self._evaluate(signal, [holding_bars], [stop_loss], [take_profit])
+        taken = res["taken"][0]
+        entries = res["entries"][taken]
+        exit_abs = entries + res["exit_pos"][0][taken] + 1
+
+        return pd.DataFrame({
+            "entry_time": self.times[entries],
+            "entry_price": self.close[entries],
+            "exit_time": self.times[exit_abs],
+            "exit_price": self.close[exit_abs],
+            "holding_bars": exit_abs - entries,
+            "return": res["returns"][0][taken],
+            "size": res["size"][0][taken],
+            "exit_reason": [_EXIT_REASONS[r] for r in res["reason"][0][taken]],
+        })
+
+    def _span_years(self) -> float:
+        if len(self.times) < 2:
+            return 0.0
+        return float((self.times[-1] - self.times[0]) / np.timedelta64(1, "D")) / 365
+
+
+def _kelly_fraction(returns: np.ndarray) -> np.ndarray:
+    """每行（组合）的凯利比例: p - (1 - p) / b，b 为平均盈利/平均亏损"""
+    wins = returns > 0
+    losses = returns < 0
+    n_win = wins.sum(axis=1)
+    n_loss = losses.sum(axis=1)
+    n = n_win + n_loss
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.where(n > 0, n_win / n, 0.0)
+        avg_win = np.where(n_win > 0, np.where(wins, returns, 0).sum(axis=1) / n_win, 0.0)
+        avg_loss = np.where(n_loss > 0, -np.where(losses, returns, 0).sum(axis=1) / n_loss, 0.0)
+        b = np.where(avg_loss > 0, avg_win / avg_loss, np.inf)
+        kelly = np.where(np.isinf(b), p, p - (1 - p) / b)
+    return np.where(n > 0, kelly, 0.0)
+
+
+def _grid_metrics(res: Dict[str, Any], span_years: float) -> pd.DataFrame:
+    """由 (组合数, 入场数) 的收益矩阵计算每个组合的指标"""
+    returns = res["returns"]
+    taken = res["taken"]
+    n_combo = returns.shape[0]
+
+    trades = taken.sum(axis=1)
+    filled = np.where(taken, returns, 0.0)
+    wins = taken & (returns > 0)
+    losses = taken & (returns < 0)
+
+    # 逐笔复利净值与回撤
+    with np.errstate(divide="ignore"):
+        log_eq = np.cumsum(np.log1p(filled), axis=1)
+    equity = np.exp(log_eq)
+    if equity.shape[1]:
+        peak = np.maximum.accumulate(np.maximum(equity, 1.0), axis=1)
+        max_dd = (equity / peak - 1).min(axis=1)
+        total = equity[:, -1] - 1
+    else:
+        max_dd = np.zeros(n_combo)
+        total = np.zeros(n_combo)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg = np.where(trades > 0, filled.sum(axis=1) / trades, np.nan)
+        var = np.where(
+            trades > 1,
+            (np.where(taken, (returns - avg[:, None]) ** 2, 0.0)).sum(axis=1) / (trades - 1),
+            np.nan,
+        )
+        std = np.sqrt(var)
+        trades_per_year = trades / span_years if span_years > 0 else np.nan
+        sharpe = np.where(std > 0, avg / std * np.sqrt(trades_per_year), np.nan)
+        gross_win = np.where(wins, returns, 0.0).sum(axis=1)
+        gross_loss = -np.where(losses, returns, 0.0).sum(axis=1)
+        profit_factor = np.where(gross_loss > 0, gross_win / gross_loss, np.nan)
+        win_rate = np.where(trades > 0, wins.sum(axis=1) / trades, np.nan)
+        avg_hold = np.where(
+            trades > 0, np.where(taken, res["exit_pos"] + 1, 0).sum(axis=1) / trades, np.nan
+        )
+
+    reason = res["reason"]
+    return pd.DataFrame({
+        "trades": trades,
+        "win_rate": win_rate,
+        "avg_return": avg,
+        "total_return": total,
+        "max_drawdown": max_dd,
+        "profit_factor": profit_factor,
+        "sharpe": sharpe,
+        "kelly_fraction": _kelly_fraction(np.where(taken, returns, np.nan)),
+        "avg_holding_bars": avg_hold,
+        "stop_loss_exits": (taken & (reason == EXIT_STOP_LOSS)).sum(axis=1),
+        "take_profit_exits": (taken & (reason == EXIT_TAKE_PROFIT)).sum(axis=1),
+    })
@@ -171,16 +171,17 @@ class QueryExperiencesTool(BaseTool):
             factor_styles = params.get("factor_styles")
             top_k = params.get("top_k", 5)
 
-            experiences = self.experience_service.query_experiences(
-                query=query,
+            hits = self.experience_service.search_experiences_ranked(
+                query,
+                limit=top_k,
                 tags=tags,
                 market_regime=market_regime,
                 factor_styles=factor_styles,
-                top_k=top_k,
             )
 
             exp_list = []
-            for exp in experiences:
+            for hit in hits:
+                exp = hit.entity
                 exp_list.append({
                     "id": exp.id,
                     "uuid": exp.uuid,
@@ -190,6 +191,8 @@ class QueryExperiencesTool(BaseTool):
                     "content": exp.content.to_dict() if hasattr(exp.content, 'to_dict') else exp.content,
                     "context": exp.context.to_dict() if hasattr(exp.context, 'to_dict') else exp.context,
                     "updated_at": str(exp.updated_at) if exp.updated_at else None,
+                    "score": round(hit.score, 4),
+                    "highlights": hit.highlights,
                 })
 
             return ToolResult(
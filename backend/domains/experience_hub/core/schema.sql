@@ -9,6 +9,7 @@
 --
 -- 依赖:
 -- - PostgreSQL 14+
+-- - pg_trgm 扩展、search_segment 函数（docker/compose/init.sql）
 -- ============================================
 
 -- ============================================
@@ -54,9 +55,27 @@ CREATE INDEX IF NOT EXISTS idx_experiences_updated_at ON experiences(updated_at)
 CREATE INDEX IF NOT EXISTS idx_experiences_context_gin ON experiences USING GIN (context);
 CREATE INDEX IF NOT EXISTS idx_experiences_content_gin ON experiences USING GIN (content);
 
--- 全文搜索索引
+-- 全文搜索（tsvector 生成列，写入时自动维护；search_segment 函数定义见 docker/compose/init.sql）
+ALTER TABLE experiences ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((title)::text, ''))), 'A') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((content->>'problem')::text, ''))), 'B') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((content->>'approach')::text, ''))), 'B') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((content->>'result')::text, ''))), 'B') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((content->>'lesson')::text, ''))), 'B') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((context->'tags')::text, ''))), 'C')
+) STORED;
+CREATE INDEX IF NOT EXISTS idx_experiences_search_vector ON experiences USING GIN (search_vector);
+
+-- 子串匹配索引
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 CREATE INDEX IF NOT EXISTS idx_experiences_title_trgm ON experiences USING GIN (title gin_trgm_ops);
 
+-- 经验向量（后台生成；维度须与 EMBEDDING_DIM 一致，默认 512）
+CREATE EXTENSION IF NOT EXISTS vector;
+ALTER TABLE experiences ADD COLUMN IF NOT EXISTS embedding vector(512);
+ALTER TABLE experiences ADD COLUMN IF NOT EXISTS embedding_model VARCHAR(100);
+CREATE INDEX IF NOT EXISTS idx_experiences_embedding ON experiences USING hnsw (embedding vector_cosine_ops);
+
 -- ============================================
 -- 经验关联表
 -- ============================================
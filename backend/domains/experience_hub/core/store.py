@@ -18,6 +18,13 @@ from domains.mcp_core.base.store import (
     reset_store_instance,
 )
 from domains.mcp_core.database.query_builder import QueryBuilder
+from domains.mcp_core.database.hybrid import VectorIndex, VectorIndexSpec, merge_hits
+from domains.mcp_core.database.search import (
+    SearchHit,
+    SearchIndexSpec,
+    TextSearchIndex,
+    highlight,
+)
 
 from .models import (
     Experience,
@@ -28,6 +35,32 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# 经验检索索引（标题 > PARL 内容 > 标签），直接取 JSONB 字段值，避免整列转文本
+EXPERIENCE_SEARCH_INDEX = TextSearchIndex(SearchIndexSpec(
+    table="experiences",
+    fields=[
+        ("title", "A"),
+        ("content->>'problem'", "B"),
+        ("content->>'approach'", "B"),
+        ("content->>'result'", "B"),
+        ("content->>'lesson'", "B"),
+        ("context->'tags'", "C"),
+    ],
+    title_column="title",
+))
+
+# 经验向量索引（标题 + PARL 内容，写入后后台生成 embedding）
+EXPERIENCE_VECTOR_INDEX = VectorIndex(VectorIndexSpec(
+    table="experiences",
+    text_sql=(
+        "concat_ws(E'\\n', title, content->>'problem', content->>'approach', "
+        "content->>'result', content->>'lesson')"
+    ),
+))
+
+# 触发重新向量化的字段
+EMBEDDING_FIELDS = {'title', 'content'}
+
 
 class ExperienceStore(BaseStore[Experience]):
     """
@@ -47,6 +80,12 @@ class ExperienceStore(BaseStore[Experience]):
 
     numeric_fields = {'id'}
 
+    # 显式列出模型列，不加载 search_vector / embedding 等派生列
+    select_sql = ', '.join(sorted(allowed_columns))
+
+    search_index = EXPERIENCE_SEARCH_INDEX
+    vector_index = EXPERIENCE_VECTOR_INDEX
+
     def _row_to_entity(self, row: Dict[str, Any]) -> Experience:
         """将数据库行转换为 Experience 对象"""
         content = row.get('content')
@@ -91,7 +130,7 @@ class ExperienceStore(BaseStore[Experience]):
         """获取单个经验（通过 ID）"""
         with self._cursor() as cursor:
             cursor.execute(
-                'SELECT * FROM experiences WHERE id = %s',
+                f'SELECT {self.select_sql} FROM experiences WHERE id = %s',
                 (experience_id,)
             )
             row = cursor.fetchone()
@@ -99,11 +138,22 @@ class ExperienceStore(BaseStore[Experience]):
                 return self._row_to_entity(dict(row))
         return None
 
+    def get_many(self, experience_ids: List[int]) -> List[Experience]:
+        """批量获取经验（单次查询，不存在的 ID 被忽略）"""
+        if not experience_ids:
+            return []
+        with self._cursor() as cursor:
+            cursor.execute(
+                f'SELECT {self.select_sql} FROM experiences WHERE id = ANY(%s)',
+                (list(experience_ids),)
+            )
+            return [self._row_to_entity(dict(row)) for row in cursor.fetchall()]
+
     def get_by_uuid(self, uuid: str) -> Optional[Experience]:
         """获取单个经验（通过 UUID）"""
         with self._cursor() as cursor:
             cursor.execute(
-                'SELECT * FROM experiences WHERE uuid = %s',
+                f'SELECT {self.select_sql} FROM experiences WHERE uuid = %s',
                 (uuid,)
             )
             row = cursor.fetchone()
@@ -115,7 +165,7 @@ class ExperienceStore(BaseStore[Experience]):
         """获取所有经验"""
         with self._cursor() as cursor:
             cursor.execute(
-                'SELECT * FROM experiences ORDER BY updated_at DESC LIMIT %s OFFSET %s',
+                f'SELECT {self.select_sql} FROM experiences ORDER BY updated_at DESC LIMIT %s OFFSET %s',
                 (limit, offset)
             )
             return [self._row_to_entity(dict(row)) for row in cursor.fetchall()]
@@ -149,9 +199,10 @@ class ExperienceStore(BaseStore[Experience]):
             logger.error(f"添加经验失败: {e}")
             return None
 
-        # 触发实时同步
+        # 触发实时同步与后台向量化
         if experience_id:
             self._trigger_sync(experience_id)
+            self.vector_index.enqueue([experience_id], self._cursor)
 
         return experience_id
 
@@ -191,9 +242,11 @@ class ExperienceStore(BaseStore[Experience]):
             )
             updated = cursor.rowcount > 0
 
-        # 触发实时同步
+        # 触发实时同步，内容变化时重新向量化
         if updated:
             self._trigger_sync(experience_id)
+            if EMBEDDING_FIELDS & safe_fields.keys():
+                self.vector_index.enqueue([experience_id], self._cursor)
 
         return updated
 
@@ -269,27 +322,15 @@ class ExperienceStore(BaseStore[Experience]):
             (经验列表, 总数)
         """
         builder = self._create_query_builder()
+        builder.select_columns(sorted(self.allowed_columns))
 
         if search:
-            builder.where_raw(
-                "(title ILIKE %s OR content::text ILIKE %s)",
-                [f'%{search}%', f'%{search}%']
-            )
+            self.search_index.apply(builder, search, self._cursor)
 
         if source_type:
             builder.where("source_type", source_type)
 
-        # 标签筛选（JSONB 查询）
-        if tags:
-            for tag in tags:
-                builder.where_raw("context->'tags' ? %s", [tag])
-
-        if market_regime:
-            builder.where_raw("context->>'market_regime' = %s", [market_regime])
-
-        if factor_styles:
-            for style in factor_styles:
-                builder.where_raw("context->'factor_styles' ? %s", [style])
+        self._apply_context_filters(builder, tags, market_regime, factor_styles)
 
         # 时间筛选
         if created_after:
@@ -318,16 +359,151 @@ class ExperienceStore(BaseStore[Experience]):
 
         return experiences, total
 
+    @staticmethod
+    def _apply_context_filters(
+        builder: QueryBuilder,
+        tags: Optional[List[str]],
+        market_regime: Optional[str],
+        factor_styles: Optional[List[str]],
+    ) -> None:
+        """添加上下文筛选条件（JSONB 查询）"""
+        if tags:
+            for tag in tags:
+                builder.where_raw("context->'tags' ? %s", [tag])
+
+        if market_regime:
+            builder.where_raw("context->>'market_regime' = %s", [market_regime])
+
+        if factor_styles:
+            for style in factor_styles:
+                builder.where_raw("context->'factor_styles' ? %s", [style])
+
     def search(self, keyword: str, limit: int = 20) -> List[Experience]:
-        """全文搜索经验"""
-        experiences, _ = self.query(search=keyword, limit=limit)
-        return experiences
+        """搜索经验（关键词 + 语义混合检索）"""
+        return [hit.entity for hit in self.search_hybrid(keyword, limit=limit)]
+
+    def _search_builder(
+        self,
+        tags: Optional[List[str]],
+        market_regime: Optional[str],
+        factor_styles: Optional[List[str]],
+    ) -> QueryBuilder:
+        """检索查询的基础构建器（列投影 + 上下文筛选）"""
+        builder = self._create_query_builder()
+        builder.select_columns(sorted(self.allowed_columns))
+        self._apply_context_filters(builder, tags, market_regime, factor_styles)
+        return builder
+
+    def _row_to_hit(self, row: Dict[str, Any], keyword: str, score_column: str) -> SearchHit:
+        """将检索结果行转换为命中结果（附带标题与 PARL 各字段高亮片段）"""
+        experience = self._row_to_entity(row)
+        highlights = {'title': highlight(experience.title, keyword)}
+        for name, text in experience.content.to_dict().items():
+            if text:
+                highlights[name] = highlight(text, keyword)
+        return SearchHit(
+            entity=experience,
+            score=float(row.get(score_column) or 0.0),
+            highlights=highlights,
+        )
+
+    def search_ranked(
+        self,
+        keyword: str,
+        limit: int = 20,
+        offset: int = 0,
+        tags: Optional[List[str]] = None,
+        market_regime: Optional[str] = None,
+        factor_styles: Optional[List[str]] = None,
+    ) -> List[SearchHit]:
+        """
+        全文搜索经验，按相关度排序并返回高亮片段
+
+        Args:
+            keyword: 搜索关键词
+            limit: 限制数量
+            offset: 偏移量
+            tags: 标签筛选
+            market_regime: 市场环境筛选
+            factor_styles: 因子风格筛选
+
+        Returns:
+            命中列表（highlights 包含 title 与 PARL 各字段片段）
+        """
+        if not keyword or not keyword.strip():
+            return []
+
+        builder = self._search_builder(tags, market_regime, factor_styles)
+        self.search_index.apply(builder, keyword, self._cursor, rank=True)
+        builder.order_by_expression("search_rank DESC", tiebreaker="id")
+        builder.limit(limit)
+        builder.offset(offset)
+
+        sql, params = builder.build()
+        with self._cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = [dict(row) for row in cursor.fetchall()]
+
+        return [self._row_to_hit(row, keyword, 'search_rank') for row in rows]
+
+    def search_semantic(
+        self,
+        query: str,
+        limit: int = 20,
+        tags: Optional[List[str]] = None,
+        market_regime: Optional[str] = None,
+        factor_styles: Optional[List[str]] = None,
+    ) -> List[SearchHit]:
+        """
+        语义搜索经验（向量近邻，HNSW 索引）
+
+        Returns:
+            命中列表（score 为余弦相似度）；向量不可用时返回空列表
+        """
+        if not query or not query.strip():
+            return []
+        builder = self._search_builder(tags, market_regime, factor_styles)
+        rows = self.vector_index.search(self._cursor, builder, query, limit)
+        return [self._row_to_hit(row, query, 'similarity') for row in rows]
+
+    def search_hybrid(
+        self,
+        keyword: str,
+        limit: int = 20,
+        tags: Optional[List[str]] = None,
+        market_regime: Optional[str] = None,
+        factor_styles: Optional[List[str]] = None,
+    ) -> List[SearchHit]:
+        """
+        混合搜索经验：全文检索与语义检索各取候选，过滤低相关候选后按倒数排名融合（RRF）
+
+        用于"之前是否尝试过类似方法"这类措辞不固定的查询。
+
+        Args:
+            keyword: 搜索关键词或自然语言问题
+            limit: 限制数量
+            tags: 标签筛选
+            market_regime: 市场环境筛选
+            factor_styles: 因子风格筛选
+
+        Returns:
+            命中列表（score 为 RRF 得分）
+        """
+        candidates = max(limit * 2, 20)
+        filters = dict(tags=tags, market_regime=market_regime, factor_styles=factor_styles)
+        text_hits = self.search_ranked(keyword, limit=candidates, **filters)
+        vector_hits = self.search_semantic(keyword, limit=candidates, **filters)
+        return merge_hits(text_hits, vector_hits, limit)
+
+    def backfill_embeddings(self, max_rows: int = 10000) -> int:
+        """补齐存量经验的向量（首次启用或切换模型后执行）"""
+        return self.vector_index.backfill(self._cursor, max_rows=max_rows)
 
     def get_by_source(self, source_type: str, source_ref: str) -> List[Experience]:
         """根据来源获取经验"""
         with self._cursor() as cursor:
             cursor.execute(
-                'SELECT * FROM experiences WHERE source_type = %s AND source_ref = %s ORDER BY updated_at DESC',
+                f'SELECT {self.select_sql} FROM experiences WHERE source_type = %s AND source_ref = %s ORDER BY updated_at DESC',
                 (source_type, source_ref)
             )
             return [self._row_to_entity(dict(row)) for row in cursor.fetchall()]
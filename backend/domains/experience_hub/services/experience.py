@@ -19,6 +19,8 @@ from ..core.models import (
 )
 from ..core.store import ExperienceStore, get_experience_store
 
+from domains.mcp_core.database.search import SearchHit
+
 logger = logging.getLogger(__name__)
 
 
@@ -149,15 +151,41 @@ class ExperienceService:
         factor_styles: Optional[List[str]] = None,
         top_k: int = 5,
     ) -> List[Experience]:
-        """语义检索经验（当前降级为关键词搜索）"""
-        experiences, _ = self.store.query(
-            search=query,
+        """语义检索经验（关键词 + 向量混合检索，按融合得分排序）"""
+        if not query or not query.strip():
+            experiences, _ = self.store.query(
+                tags=tags,
+                market_regime=market_regime,
+                factor_styles=factor_styles,
+                limit=top_k
+            )
+            return experiences
+
+        hits = self.search_experiences_ranked(
+            query,
+            limit=top_k,
+            tags=tags,
+            market_regime=market_regime,
+            factor_styles=factor_styles,
+        )
+        return [hit.entity for hit in hits]
+
+    def search_experiences_ranked(
+        self,
+        keyword: str,
+        limit: int = 20,
+        tags: Optional[List[str]] = None,
+        market_regime: Optional[str] = None,
+        factor_styles: Optional[List[str]] = None,
+    ) -> List[SearchHit]:
+        """检索经验（关键词 + 语义混合检索，按融合得分排序，附带高亮片段）"""
+        return self.store.search_hybrid(
+            keyword,
+            limit=limit,
             tags=tags,
             market_regime=market_regime,
             factor_styles=factor_styles,
-            limit=top_k
         )
-        return experiences
 
     def get_all_tags(self) -> List[str]:
         """获取所有标签"""
@@ -140,6 +140,7 @@ class FactorResourceProvider(BaseResourceProvider):
             order_desc=True,
             page=1,
             page_size=20,
+            columns=["style", "llm_score", "formula"],
         )
 
         result = []
@@ -164,6 +165,7 @@ class FactorResourceProvider(BaseResourceProvider):
             verify_filter="通过",
             page=1,
             page_size=100,
+            columns=["style", "llm_score", "verify_note"],
         )
 
         result = []
@@ -187,6 +189,7 @@ class FactorResourceProvider(BaseResourceProvider):
             verify_filter="废弃",
             page=1,
             page_size=100,
+            columns=["style", "llm_score", "verify_note"],
         )
 
         result = []
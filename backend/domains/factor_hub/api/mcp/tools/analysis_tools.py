@@ -11,6 +11,7 @@ import json
 
 from .base import BaseTool, ToolResult
 from domains.mcp_core.base.tool import ExecutionMode
+from domains.mcp_core.base.tool_cache import factor_cache_tag
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,11 @@ class GetFactorICTool(BaseTool):
     """获取因子IC - 快速获取因子IC统计"""
 
     category = "analysis"
+    cache_ttl = 60.0
+
+    def cache_tags_for(self, params: Dict[str, Any]) -> List[str]:
+        # 与 FactorStore 写入时失效的标签同一规则
+        return [factor_cache_tag(params.get('filename', ''))]
 
     @property
     def name(self) -> str:
@@ -123,6 +123,7 @@ class ListFactorsTool(BaseTool):
                 order_desc=order_desc,
                 page=page,
                 page_size=page_size,
+                columns=["filename"],
             )
 
             # 只返回因子名列表
@@ -364,7 +365,8 @@ class SearchByCodeTool(BaseTool):
             # 获取所有因子
             factors, _ = self.factor_service.list_factors(
                 page=1,
-                page_size=10000
+                page_size=10000,
+                columns=["style", "llm_score", "code_content"],
             )
 
             # 搜索匹配的因子
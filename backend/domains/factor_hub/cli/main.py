@@ -10,6 +10,7 @@ Factor Pipeline CLI - 统一的因子库管理入口
   verify        标记因子为已验证
   unverify      取消因子验证状态
   status        查看 pipeline 状态
+  dedup         重复因子报告（按代码指纹），可复用等价因子的字段与评估结果
   mcp           启动 MCP 服务（供 LLM 访问）
   export-md     导出 Markdown 视图
 """
@@ -97,6 +98,7 @@ def cmd_fill(args):
             filter_condition=filter_condition,
             concurrency=args.concurrency,
             delay=args.delay,
+            batch_size=args.batch_size,
         )
     else:
         filler.fill_fields(
@@ -105,6 +107,7 @@ def cmd_fill(args):
             filter_condition=filter_condition,
             concurrency=args.concurrency,
             delay=args.delay,
+            batch_size=args.batch_size,
         )
 
     print("\n填充完成")
@@ -223,6 +226,39 @@ def cmd_status(args):
     print("=" * 60)
 
 
+def cmd_dedup(args):
+    """执行 dedup 命令 - 重复因子报告与产物复用"""
+    from ..core.store import get_factor_store
+    from ..services.code_dedup import get_code_dedup_service
+
+    if args.backfill:
+        updated = get_factor_store().backfill_code_hashes(recompute=args.recompute)
+        print(f"已计算代码指纹: {updated} 个因子")
+
+    service = get_code_dedup_service()
+    report = service.report()
+
+    print("=" * 60)
+    print("              重复因子报告")
+    print("=" * 60)
+    print(f"  总因子数:      {report['total_factors']}")
+    print(f"  重复分组:      {report['cluster_count']}")
+    print(f"  冗余因子:      {report['redundant_factors']}")
+    print(f"  有效因子数:    {report['effective_factors']}")
+    print()
+    for cluster in report['clusters'][:args.limit]:
+        others = cluster['filenames'][1:]
+        print(f"  [{cluster['size']}] {cluster['primary']}  <=  {', '.join(others)}")
+    if len(report['clusters']) > args.limit:
+        print(f"  ... 还有 {len(report['clusters']) - args.limit} 组")
+
+    if args.apply or args.dry_run:
+        result = service.reuse_artifacts(dry_run=args.dry_run)
+        prefix = "[DRY RUN] 将复用" if args.dry_run else "已复用"
+        print()
+        print(f"{prefix}: {result['factors_updated']} 个因子, {result['fields_reused']} 个字段")
+
+
 def cmd_export_md(args):
     """导出 Markdown"""
     from ..core.store import get_factor_store
@@ -279,6 +315,7 @@ Commands:
   verify        标记因子为已验证
   unverify      取消因子验证状态
   status        查看 pipeline 状态
+  dedup         重复因子报告（按代码指纹），可复用等价因子的字段与评估结果
   mcp           启动 MCP 服务（供 LLM 访问）
   export-md     导出 Markdown 视图
 
@@ -305,8 +342,8 @@ Examples:
     p_ingest.add_argument('--factor-dir', help='因子目录')
     p_ingest.add_argument('--factors', help='因子列表文件')
     p_ingest.add_argument('--fields', help='要填充的字段（逗号分隔），默认全部')
-    p_ingest.add_argument('--concurrency', type=int, default=1, help='并发数')
-    p_ingest.add_argument('--delay', type=float, default=15.0, help='请求间隔秒数')
+    p_ingest.add_argument('--concurrency', type=int, default=0, help='并发数（0=按模型限流器自适应）')
+    p_ingest.add_argument('--delay', type=float, default=0.0, help='请求间隔秒数（限流由模型限流器负责）')
     p_ingest.add_argument('--dry-run', action='store_true', help='预览模式')
     p_ingest.set_defaults(func=cmd_ingest)
 
@@ -316,8 +353,9 @@ Examples:
     p_fill.add_argument('--mode', choices=['full', 'incremental'], default='incremental',
                         help='full=全量重新生成, incremental=只填充空值')
     p_fill.add_argument('--filter', help='筛选条件（如 style=动量）')
-    p_fill.add_argument('--concurrency', type=int, default=1, help='并发数')
-    p_fill.add_argument('--delay', type=float, default=15.0, help='请求间隔秒数')
+    p_fill.add_argument('--concurrency', type=int, default=0, help='并发数（0=按模型限流器自适应）')
+    p_fill.add_argument('--delay', type=float, default=0.0, help='请求间隔秒数（限流由模型限流器负责）')
+    p_fill.add_argument('--batch-size', type=int, default=1, help='单次请求填充的因子数（>1 启用批量模式）')
     p_fill.add_argument('--dry-run', action='store_true', help='预览模式')
     p_fill.set_defaults(func=cmd_fill)
 
@@ -325,9 +363,9 @@ Examples:
     p_review = subparsers.add_parser('review', help='反思审核（可配置审核范围）')
     p_review.add_argument('--fields', help='要审核的字段（逗号分隔）')
     p_review.add_argument('--filter', help='筛选条件（如 style=动量）')
-    p_review.add_argument('--concurrency', type=int, default=1, help='并发数')
+    p_review.add_argument('--concurrency', type=int, default=0, help='并发数（0=按模型限流器自适应）')
     p_review.add_argument('--output', default='output/review', help='输出目录')
-    p_review.add_argument('--delay', type=float, default=15.0, help='请求间隔秒数')
+    p_review.add_argument('--delay', type=float, default=0.0, help='请求间隔秒数（限流由模型限流器负责）')
     p_review.add_argument('--apply-revisions', action='store_true', help='自动应用修订')
     p_review.add_argument('--dry-run', action='store_true', help='预览模式')
     p_review.set_defaults(func=cmd_review)
@@ -348,6 +386,15 @@ Examples:
     p_status = subparsers.add_parser('status', help='查看 pipeline 状态')
     p_status.set_defaults(func=cmd_status)
 
+    # dedup
+    p_dedup = subparsers.add_parser('dedup', help='重复因子报告（按代码指纹）')
+    p_dedup.add_argument('--backfill', action='store_true', help='为缺少指纹的因子计算代码指纹')
+    p_dedup.add_argument('--recompute', action='store_true', help='与 --backfill 一起使用，重算全部指纹')
+    p_dedup.add_argument('--apply', action='store_true', help='将字段与评估结果复用到同组因子的空字段')
+    p_dedup.add_argument('--dry-run', action='store_true', help='预览复用结果，不写入')
+    p_dedup.add_argument('--limit', type=int, default=20, help='报告中显示的分组数')
+    p_dedup.set_defaults(func=cmd_dedup)
+
     # export-md
     p_export = subparsers.add_parser('export-md', help='导出 Markdown 视图')
     p_export.add_argument('--output', '-o', help='输出文件路径')
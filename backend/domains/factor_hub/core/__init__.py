@@ -7,6 +7,7 @@ Core 模块 - 数据模型和存储层
 from .models import Factor
 from .store import FactorStore, get_factor_store
 from .config import ConfigLoader, get_config_loader
+from .code_hash import compute_code_hash, normalize_code
 from domains.core.exceptions import FactorNotFoundError, FactorExistsError, ValidationError
 
 __all__ = [
@@ -15,6 +16,8 @@ __all__ = [
     'get_factor_store',
     'ConfigLoader',
     'get_config_loader',
+    'compute_code_hash',
+    'normalize_code',
     'FactorNotFoundError',
     'FactorExistsError',
     'ValidationError',
@@ -0,0 +1,74 @@
+"""
+因子代码指纹
+
+对因子代码做 AST 规范化后计算哈希：注释、文档字符串、空白与格式差异不影响结果，
+只有语义结构（语句、表达式、常量、标识符）相同的代码才得到相同指纹。
+用于识别仅文件名或排版不同的重复因子，复用其字段与评估结果。
+"""
+
+import ast
+import hashlib
+import re
+
+# 指纹算法版本，规范化规则变化时递增，避免新旧指纹误判相等
+CODE_HASH_VERSION = "v1"
+
+
+class _DocstringStripper(ast.NodeTransformer):
+    """移除模块、类、函数的文档字符串"""
+
+    def _strip(self, node):
+        self.generic_visit(node)
+        body = getattr(node, "body", None)
+        if (
+            body
+            and isinstance(body[0], ast.Expr)
+            and isinstance(body[0].value, ast.Constant)
+            and isinstance(body[0].value.value, str)
+        ):
+            node.body = body[1:] or [ast.Pass()]
+        return node
+
+    visit_Module = _strip
+    visit_ClassDef = _strip
+    visit_FunctionDef = _strip
+    visit_AsyncFunctionDef = _strip
+
+
+def _normalize_text(code: str) -> str:
+    """AST 解析失败时的退化规范化：去掉注释行和多余空白"""
+    lines = []
+    for line in code.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        lines.append(re.sub(r"\s+", " ", stripped))
+    return "\n".join(lines)
+
+
+def normalize_code(code: str) -> str:
+    """
+    返回代码的规范化形式
+
+    可解析的代码返回去掉文档字符串后的 AST dump（不含行列号），
+    语法错误的代码退化为去注释、压缩空白后的文本。
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return "text:" + _normalize_text(code)
+    tree = _DocstringStripper().visit(tree)
+    return "ast:" + ast.dump(tree, annotate_fields=False, include_attributes=False)
+
+
+def compute_code_hash(code: str) -> str:
+    """
+    计算因子代码指纹
+
+    Returns:
+        64 位十六进制 SHA-256；空代码返回空字符串
+    """
+    if not code or not code.strip():
+        return ""
+    payload = f"{CODE_HASH_VERSION}\n{normalize_code(code)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -42,6 +42,7 @@ class Factor:
         analysis: 因子详细分析
         code_path: 代码文件路径
         code_content: 完整代码内容
+        code_hash: 代码指纹（相同指纹的因子代码语义等价）
         llm_score: LLM 评分 (0-5)
         ic: IC 值
         rank_ic: RankIC 值
@@ -86,6 +87,8 @@ class Factor:
     exclude_reason: str = ""  # 排除原因
     # 参数分析结果 (JSON 字符串)
     param_analysis: str = ""
+    # 代码指纹（规范化 AST 的 SHA-256，见 code_hash.py）
+    code_hash: str = ""
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -122,6 +125,7 @@ class Factor:
             'excluded': self.excluded,
             'exclude_reason': self.exclude_reason,
             'param_analysis': self.param_analysis,
+            'code_hash': self.code_hash,
         }
 
     @classmethod
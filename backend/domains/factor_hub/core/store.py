@@ -20,13 +20,32 @@ from domains.mcp_core.base.store import (
     get_store_instance,
     reset_store_instance,
 )
+from domains.mcp_core.base.tool_cache import factor_cache_tag, invalidate_tool_cache
 from domains.mcp_core.database.query_builder import QueryBuilder
+from domains.mcp_core.database.search import SearchIndexSpec, TextSearchIndex
 
 from .models import Factor, FactorType
 from .config import get_config_loader
+from .code_hash import compute_code_hash
 
 logger = logging.getLogger(__name__)
 
+# 因子检索索引（文件名 > 刻画特征/公式 > 风格/标签 > 分析）
+# 文件名另建 trigram 索引，"contains:" 子串筛选同样可走索引
+FACTOR_SEARCH_INDEX = TextSearchIndex(SearchIndexSpec(
+    table="factors",
+    fields=[
+        ("filename", "A"),
+        ("description", "B"),
+        ("formula", "B"),
+        ("style", "C"),
+        ("tags", "C"),
+        ("analysis", "D"),
+    ],
+    title_column="filename",
+    trigram_columns=["filename", "style"],
+))
+
 
 class FactorStore(BaseStore[Factor]):
     """
@@ -45,9 +64,16 @@ class FactorStore(BaseStore[Factor]):
         'created_at', 'updated_at', 'backtest_sharpe', 'backtest_ic',
         'backtest_ir', 'turnover', 'decay', 'market_regime',
         'best_holding_period', 'tags', 'code_complexity',
-        'last_backtest_date', 'excluded', 'exclude_reason', 'param_analysis'
+        'last_backtest_date', 'excluded', 'exclude_reason', 'param_analysis',
+        'code_hash'
     }
 
+    # 大文本列（代码、LLM 分析），列表视图默认不加载
+    heavy_columns = {'code_content', 'analysis', 'param_analysis'}
+    list_columns = sorted(allowed_columns - heavy_columns)
+
+    search_index = FACTOR_SEARCH_INDEX
+
     numeric_fields = {
         'llm_score', 'ic', 'rank_ic', 'backtest_sharpe',
         'backtest_ic', 'backtest_ir', 'turnover', 'decay',
@@ -76,6 +102,39 @@ class FactorStore(BaseStore[Factor]):
 
     REVERSE_MAPPING = {v: k for k, v in COLUMN_MAPPING.items()}
 
+    # 迁移前的数据库没有 code_hash 列，_init_db 检测后在实例上关闭
+    has_code_hash = True
+
+    def __init__(self, database_url: Optional[str] = None):
+        super().__init__(database_url)
+        self._init_db()
+
+    def _init_db(self):
+        """
+        检测后续版本新增的列（只查询系统目录，不执行 DDL，失败不影响启动）
+
+        code_hash 列缺失时从本实例的列白名单中移除，查询投影和写入都不再引用该列，
+        代码指纹相关功能返回空结果。
+        """
+        try:
+            with self._cursor() as cursor:
+                cursor.execute(
+                    "SELECT EXISTS (SELECT 1 FROM information_schema.columns "
+                    "WHERE table_schema = current_schema() AND table_name = 'factors' "
+                    "AND column_name = 'code_hash') AS present"
+                )
+                present = cursor.fetchone()['present']
+        except Exception as e:
+            logger.warning(f"factor_schema_probe_failed: {e}")
+            return
+        if not present:
+            self.has_code_hash = False
+            self.allowed_columns = self.allowed_columns - {'code_hash'}
+            logger.warning(
+                "factor_code_hash_column_missing: 代码指纹去重不可用，"
+                "请执行 scripts/migrations/factor_code_hash.sql"
+            )
+
     def _row_to_entity(self, row: Dict[str, Any]) -> Factor:
         """将数据库行转换为 Factor 对象"""
         return self._row_to_factor(row)
@@ -120,6 +179,17 @@ class FactorStore(BaseStore[Factor]):
                 return self._row_to_factor(dict(row))
         return None
 
+    def get_many(self, filenames: List[str], include_excluded: bool = True) -> List[Factor]:
+        """批量获取因子（单次查询，不存在的文件名被忽略）"""
+        if not filenames:
+            return []
+        with self._cursor() as cursor:
+            sql = 'SELECT * FROM factors WHERE filename = ANY(%s)'
+            if not include_excluded:
+                sql += ' AND excluded = FALSE'
+            cursor.execute(sql, (list(filenames),))
+            return [self._row_to_factor(dict(row)) for row in cursor.fetchall()]
+
     def get_all(self, include_excluded: bool = False) -> List[Factor]:
         """获取所有因子"""
         with self._cursor() as cursor:
@@ -132,38 +202,50 @@ class FactorStore(BaseStore[Factor]):
             return [self._row_to_factor(dict(row)) for row in cursor.fetchall()]
 
     def add(self, factor: Factor) -> bool:
-        """添加因子"""
+        """添加因子（未提供代码内容时从 code_path 读取，并计算代码指纹）"""
         if not factor.uuid:
             factor.uuid = str(uuid_lib.uuid4())
+        if not factor.code_content and factor.code_path:
+            try:
+                factor.code_content = Path(factor.code_path).read_text(encoding='utf-8')
+            except OSError:
+                pass
+        if not factor.code_hash:
+            factor.code_hash = compute_code_hash(factor.code_content)
         factor.created_at = datetime.now()
         factor.updated_at = datetime.now()
 
+        values = {
+            'filename': factor.filename, 'factor_type': factor.factor_type,
+            'uuid': factor.uuid, 'style': factor.style, 'formula': factor.formula,
+            'input_data': factor.input_data, 'value_range': factor.value_range,
+            'description': factor.description, 'analysis': factor.analysis,
+            'code_path': factor.code_path, 'code_content': factor.code_content,
+            'llm_score': factor.llm_score, 'ic': factor.ic, 'rank_ic': factor.rank_ic,
+            'verification_status': factor.verification_status,
+            'verify_note': factor.verify_note,
+            'created_at': factor.created_at, 'updated_at': factor.updated_at,
+            'backtest_sharpe': factor.backtest_sharpe, 'backtest_ic': factor.backtest_ic,
+            'backtest_ir': factor.backtest_ir, 'turnover': factor.turnover,
+            'decay': factor.decay, 'market_regime': factor.market_regime,
+            'best_holding_period': factor.best_holding_period, 'tags': factor.tags,
+            'code_complexity': factor.code_complexity,
+            'last_backtest_date': factor.last_backtest_date,
+            'excluded': bool(factor.excluded), 'exclude_reason': factor.exclude_reason,
+            'param_analysis': factor.param_analysis, 'code_hash': factor.code_hash,
+        }
+        if not self.has_code_hash:
+            del values['code_hash']
+        columns = ', '.join(values)
+        placeholders = ', '.join(['%s'] * len(values))
+
         try:
             with self._cursor() as cursor:
-                cursor.execute('''
-                    INSERT INTO factors (
-                        filename, factor_type, uuid, style, formula, input_data, value_range,
-                        description, analysis, code_path, code_content, llm_score,
-                        ic, rank_ic, verification_status, verify_note, created_at, updated_at,
-                        backtest_sharpe, backtest_ic, backtest_ir, turnover, decay,
-                        market_regime, best_holding_period, tags, code_complexity,
-                        last_backtest_date, excluded, exclude_reason, param_analysis
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                    )
-                ''', (
-                    factor.filename, factor.factor_type, factor.uuid, factor.style,
-                    factor.formula, factor.input_data, factor.value_range, factor.description,
-                    factor.analysis, factor.code_path, factor.code_content,
-                    factor.llm_score, factor.ic, factor.rank_ic, factor.verification_status,
-                    factor.verify_note, factor.created_at, factor.updated_at,
-                    factor.backtest_sharpe, factor.backtest_ic, factor.backtest_ir,
-                    factor.turnover, factor.decay, factor.market_regime,
-                    factor.best_holding_period, factor.tags, factor.code_complexity,
-                    factor.last_backtest_date, bool(factor.excluded), factor.exclude_reason,
-                    factor.param_analysis
-                ))
+                cursor.execute(
+                    f'INSERT INTO factors ({columns}) VALUES ({placeholders})',
+                    tuple(values.values())
+                )
+            invalidate_tool_cache(factor_cache_tag(factor.filename))
             return True
         except psycopg2.IntegrityError:
             return False
@@ -181,6 +263,10 @@ class FactorStore(BaseStore[Factor]):
 
         safe_fields['updated_at'] = datetime.now()
 
+        # 代码变化时同步更新指纹
+        if self.has_code_hash and 'code_content' in safe_fields and 'code_hash' not in safe_fields:
+            safe_fields['code_hash'] = compute_code_hash(safe_fields['code_content'] or "")
+
         # 处理布尔字段
         if 'excluded' in safe_fields:
             safe_fields['excluded'] = bool(safe_fields['excluded'])
@@ -196,9 +282,10 @@ class FactorStore(BaseStore[Factor]):
             )
             updated = cursor.rowcount > 0
 
-        # 触发元数据实时同步
+        # 触发元数据实时同步，并使依赖该因子的工具缓存失效
         if updated:
             self._trigger_metadata_sync(filename)
+            invalidate_tool_cache(factor_cache_tag(filename))
 
         return updated
 
@@ -219,7 +306,11 @@ class FactorStore(BaseStore[Factor]):
         # 删除因子记录
         with self._cursor() as cursor:
             cursor.execute('DELETE FROM factors WHERE filename = %s', (filename,))
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+
+        if deleted:
+            invalidate_tool_cache(factor_cache_tag(filename))
+        return deleted
 
     def _delete_factor_edges(self, filename: str) -> None:
         """删除因子关联的所有边"""
@@ -250,6 +341,80 @@ class FactorStore(BaseStore[Factor]):
                 failed += 1
         return success, failed
 
+    # ==================== 代码指纹 ====================
+
+    def find_by_code_hash(self, code_hash: str, include_excluded: bool = False) -> List[Factor]:
+        """获取代码指纹相同的所有因子（按入库时间排序）"""
+        if not code_hash or not self.has_code_hash:
+            return []
+        with self._cursor() as cursor:
+            sql = 'SELECT * FROM factors WHERE code_hash = %s'
+            if not include_excluded:
+                sql += ' AND excluded = FALSE'
+            cursor.execute(sql + ' ORDER BY created_at, filename', (code_hash,))
+            return [self._row_to_factor(dict(row)) for row in cursor.fetchall()]
+
+    def get_duplicate_groups(self, include_excluded: bool = False) -> Dict[str, List[str]]:
+        """
+        获取重复因子分组
+
+        Returns:
+            {code_hash: [filename, ...]}，只包含两个及以上因子的分组，组内按入库时间排序
+        """
+        if not self.has_code_hash:
+            return {}
+        where = "code_hash <> ''"
+        if not include_excluded:
+            where += ' AND excluded = FALSE'
+        with self._cursor() as cursor:
+            cursor.execute(f'''
+                SELECT code_hash, array_agg(filename ORDER BY created_at, filename) AS filenames
+                FROM factors
+                WHERE {where}
+                GROUP BY code_hash
+                HAVING COUNT(*) > 1
+                ORDER BY COUNT(*) DESC, code_hash
+            ''')
+            return {row['code_hash']: list(row['filenames']) for row in cursor.fetchall()}
+
+    def backfill_code_hashes(self, recompute: bool = False) -> int:
+        """
+        为缺少指纹的因子计算代码指纹
+
+        Args:
+            recompute: 是否重新计算全部因子的指纹（规范化规则变化后使用）
+
+        Returns:
+            更新的因子数
+        """
+        if not self.has_code_hash:
+            return 0
+        with self._cursor() as cursor:
+            sql = 'SELECT filename, code_content, code_path FROM factors'
+            if not recompute:
+                sql += " WHERE code_hash IS NULL OR code_hash = ''"
+            cursor.execute(sql)
+            rows = cursor.fetchall()
+
+        updates = []
+        for row in rows:
+            code = row['code_content'] or ""
+            if not code and row['code_path']:
+                try:
+                    code = Path(row['code_path']).read_text(encoding='utf-8')
+                except OSError:
+                    code = ""
+            code_hash = compute_code_hash(code)
+            if code_hash:
+                updates.append((code_hash, row['filename']))
+
+        if updates:
+            with self._cursor() as cursor:
+                cursor.executemany(
+                    'UPDATE factors SET code_hash = %s WHERE filename = %s', updates
+                )
+        return len(updates)
+
     # ==================== 查询操作 ====================
 
     def query(
@@ -258,7 +423,9 @@ class FactorStore(BaseStore[Factor]):
         order_by: Optional[str] = None,
         limit: Optional[int] = None,
         offset: Optional[int] = None,
-        include_excluded: bool = False
+        include_excluded: bool = False,
+        columns: Optional[List[str]] = None,
+        search: Optional[str] = None,
     ) -> List[Factor]:
         """
         条件查询因子
@@ -273,8 +440,75 @@ class FactorStore(BaseStore[Factor]):
             limit: 限制数量
             offset: 偏移量
             include_excluded: 是否包含已排除的因子
+            columns: 列投影，None 表示全部列（未加载的字段保持默认值）
+            search: 全文检索关键词（文件名、刻画特征、公式、风格、标签、分析）
+        """
+        builder = self._build_query(
+            filter_condition, order_by, limit, offset, include_excluded, columns, search
+        )
+        sql, params = builder.build()
+
+        with self._cursor() as cursor:
+            cursor.execute(sql, params)
+            return [self._row_to_factor(dict(row)) for row in cursor.fetchall()]
+
+    def query_page(
+        self,
+        filter_condition: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+        include_excluded: bool = False,
+        columns: Optional[List[str]] = None,
+        search: Optional[str] = None,
+    ) -> Tuple[List[Factor], int]:
+        """
+        分页查询因子，总数通过 COUNT(*) OVER() 在同一条 SQL 中返回
+
+        参数同 query()。
+
+        Returns:
+            (当前页因子列表, 筛选后的总数)
         """
+        builder = self._build_query(
+            filter_condition, order_by, limit, offset, include_excluded, columns, search
+        ).with_total_count()
+        sql, params = builder.build()
+
+        with self._cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = [dict(row) for row in cursor.fetchall()]
+
+        if rows:
+            total = rows[0]['total_count']
+        elif offset:
+            # 超出末页时窗口函数无行可返回，单独统计总数
+            total = self._count_with(builder)
+        else:
+            total = 0
+        return [self._row_to_factor(row) for row in rows], total
+
+    def _build_query(
+        self,
+        filter_condition: Optional[Dict[str, Any]],
+        order_by: Optional[str],
+        limit: Optional[int],
+        offset: Optional[int],
+        include_excluded: bool,
+        columns: Optional[List[str]],
+        search: Optional[str] = None,
+    ) -> QueryBuilder:
+        """构建因子查询（排序附加 filename 作为次序键，保证分页稳定）"""
         builder = self._create_query_builder()
+        if columns and 'filename' not in columns:
+            columns = ['filename', *columns]  # 主键始终加载
+        if columns and not self.has_code_hash:
+            columns = [c for c in columns if c != 'code_hash']  # 类级 list_columns 含迁移列
+        # 未指定投影时显式列出模型列，不加载 search_vector 等派生列
+        builder.select_columns(columns or sorted(self.allowed_columns))
+
+        if search:
+            self.search_index.apply(builder, search, self._cursor)
 
         # 默认排除已排除的因子
         if not include_excluded:
@@ -287,7 +521,7 @@ class FactorStore(BaseStore[Factor]):
 
         # 排序
         if order_by:
-            builder.order_by(order_by)
+            builder.order_by(order_by, tiebreaker='filename')
 
         # 分页
         if limit is not None:
@@ -295,11 +529,14 @@ class FactorStore(BaseStore[Factor]):
         if offset is not None:
             builder.offset(offset)
 
-        sql, params = builder.build()
+        return builder
 
+    def _count_with(self, builder: QueryBuilder) -> int:
+        """按查询构建器的筛选条件统计数量"""
+        sql, params = builder.build_count()
         with self._cursor() as cursor:
             cursor.execute(sql, params)
-            return [self._row_to_factor(dict(row)) for row in cursor.fetchall()]
+            return cursor.fetchone()['count']
 
     def get_unscored(self) -> List[Factor]:
         """获取未评分的因子"""
@@ -321,7 +558,7 @@ class FactorStore(BaseStore[Factor]):
 
     def count(self, filter_condition: Optional[Dict[str, Any]] = None) -> int:
         """统计因子数量"""
-        return len(self.query(filter_condition))
+        return self._count_with(self._build_query(filter_condition, None, None, None, False, None))
 
     def get_styles(self) -> List[str]:
         """获取所有因子风格（去重）"""
@@ -28,6 +28,12 @@ from .factor_service import (
     get_factor_service,
     reset_factor_service,
 )
+from .code_dedup import (
+    CodeDedupService,
+    DuplicateCluster,
+    get_code_dedup_service,
+    reset_code_dedup_service,
+)
 
 __all__ = [
     'PromptEngine',
@@ -55,4 +61,9 @@ __all__ = [
     'FactorService',
     'get_factor_service',
     'reset_factor_service',
+    # 重复因子
+    'CodeDedupService',
+    'DuplicateCluster',
+    'get_code_dedup_service',
+    'reset_code_dedup_service',
 ]
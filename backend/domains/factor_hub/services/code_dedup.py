@@ -0,0 +1,198 @@
+"""
+重复因子识别与产物复用
+
+基于代码指纹（code_hash，见 core/code_hash.py）把语义等价的因子归为一组：
+- 生成重复分组报告（有效因子库规模）
+- 将组内主因子的 LLM 填充字段与评估结果复用到同组缺失这些字段的因子，
+  下游填充（incremental 模式）、审核、评估只需处理每组一次
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from ..core.models import Factor, VerificationStatus
+from ..core.store import FactorStore, get_factor_store
+
+logger = logging.getLogger(__name__)
+
+# 可在等价因子间复用的字段：LLM 填充字段 + 评估结果
+REUSABLE_FIELDS = (
+    'style', 'formula', 'input_data', 'value_range', 'tags',
+    'description', 'analysis', 'llm_score',
+    'ic', 'rank_ic', 'backtest_sharpe', 'backtest_ic', 'backtest_ir',
+    'turnover', 'decay', 'market_regime', 'best_holding_period',
+    'last_backtest_date', 'code_complexity', 'param_analysis',
+)
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+@dataclass
+class DuplicateCluster:
+    """
+    重复因子分组
+
+    Attributes:
+        code_hash: 代码指纹
+        filenames: 组内因子（按复用优先级排序，首个为主因子）
+        filled_fields: 组内至少一个因子已有值的可复用字段数
+    """
+    code_hash: str
+    filenames: List[str] = field(default_factory=list)
+    filled_fields: int = 0
+
+    @property
+    def primary(self) -> str:
+        return self.filenames[0] if self.filenames else ""
+
+    @property
+    def size(self) -> int:
+        return len(self.filenames)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'code_hash': self.code_hash,
+            'primary': self.primary,
+            'filenames': self.filenames,
+            'size': self.size,
+            'filled_fields': self.filled_fields,
+        }
+
+
+class CodeDedupService:
+    """重复因子服务"""
+
+    def __init__(self, store: Optional[FactorStore] = None):
+        self.store = store or get_factor_store()
+
+    @staticmethod
+    def _priority(factor: Factor) -> tuple:
+        """复用优先级：验证通过 > 字段更完整 > 更早入库（已按入库时间排序）"""
+        filled = sum(1 for name in REUSABLE_FIELDS if not _is_empty(getattr(factor, name, None)))
+        return (factor.verification_status == VerificationStatus.PASSED, filled)
+
+    def _load_clusters(self, include_excluded: bool = False) -> List[tuple]:
+        """加载重复分组，返回 [(DuplicateCluster, 按优先级排序的因子列表)]"""
+        groups = self.store.get_duplicate_groups(include_excluded=include_excluded)
+        if not groups:
+            return []
+        all_names = [name for names in groups.values() for name in names]
+        factors = {f.filename: f for f in self.store.get_many(all_names)}
+
+        result = []
+        for code_hash, names in groups.items():
+            members = [factors[name] for name in names if name in factors]
+            # sorted 稳定：优先级相同时保持入库顺序
+            members = sorted(members, key=self._priority, reverse=True)
+            filled = sum(
+                1 for name in REUSABLE_FIELDS
+                if any(not _is_empty(getattr(f, name, None)) for f in members)
+            )
+            cluster = DuplicateCluster(
+                code_hash=code_hash,
+                filenames=[f.filename for f in members],
+                filled_fields=filled,
+            )
+            result.append((cluster, members))
+        return result
+
+    def find_clusters(self, include_excluded: bool = False) -> List[DuplicateCluster]:
+        """获取重复因子分组（按组大小降序）"""
+        return [cluster for cluster, _ in self._load_clusters(include_excluded)]
+
+    def report(self, include_excluded: bool = False) -> Dict[str, Any]:
+        """
+        重复因子报告
+
+        Returns:
+            包含分组列表、重复因子数和去重后的有效因子库规模
+        """
+        clusters = self.find_clusters(include_excluded)
+        total = len(self.store.get_all(include_excluded=include_excluded))
+        redundant = sum(c.size - 1 for c in clusters)
+        return {
+            'total_factors': total,
+            'cluster_count': len(clusters),
+            'redundant_factors': redundant,
+            'effective_factors': total - redundant,
+            'clusters': [c.to_dict() for c in clusters],
+        }
+
+    def reuse_artifacts(
+        self,
+        filenames: Optional[List[str]] = None,
+        dry_run: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        在等价因子间复用字段与评估结果
+
+        可复用字段只取自组内主因子（优先级最高的因子），只填充其余因子的空字段，
+        不覆盖已有内容；主因子缺失的字段不从其他成员补齐，避免组内出现来源混杂的结果。
+
+        Args:
+            filenames: 只为这些因子补齐字段（None 表示所有重复因子）
+            dry_run: 只统计不写入
+
+        Returns:
+            {'clusters': 涉及分组数, 'factors_updated': 更新因子数,
+             'fields_reused': 复用字段总数, 'updates': {filename: [字段, ...]}}
+        """
+        targets = set(filenames) if filenames is not None else None
+        clusters = 0
+        updates: Dict[str, List[str]] = {}
+
+        for cluster, members in self._load_clusters():
+            if not members:
+                continue
+            primary = members[0]
+            touched = False
+            for factor in members[1:]:
+                if targets is not None and factor.filename not in targets:
+                    continue
+                fields = {
+                    name: getattr(primary, name, None)
+                    for name in REUSABLE_FIELDS
+                    if _is_empty(getattr(factor, name, None))
+                    and not _is_empty(getattr(primary, name, None))
+                }
+                if not fields:
+                    continue
+                if not dry_run:
+                    self.store.update(factor.filename, **fields)
+                updates[factor.filename] = sorted(fields)
+                touched = True
+            clusters += touched
+
+        fields_reused = sum(len(v) for v in updates.values())
+        if updates:
+            logger.info(
+                f"code_dedup_reuse: clusters={clusters}, factors={len(updates)}, "
+                f"fields={fields_reused}, dry_run={dry_run}"
+            )
+        return {
+            'clusters': clusters,
+            'factors_updated': len(updates),
+            'fields_reused': fields_reused,
+            'updates': updates,
+        }
+
+
+# 单例
+_code_dedup_service: Optional[CodeDedupService] = None
+
+
+def get_code_dedup_service() -> CodeDedupService:
+    """获取重复因子服务单例"""
+    global _code_dedup_service
+    if _code_dedup_service is None:
+        _code_dedup_service = CodeDedupService()
+    return _code_dedup_service
+
+
+def reset_code_dedup_service() -> None:
+    """重置服务单例（用于测试）"""
+    global _code_dedup_service
+    _code_dedup_service = None
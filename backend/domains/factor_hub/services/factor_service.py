@@ -60,12 +60,13 @@ class FactorService:
         order_desc: bool = False,
         page: int = 1,
         page_size: int = 20,
+        columns: Optional[List[str]] = None,
     ) -> Tuple[List[Factor], int]:
         """
         获取因子列表
 
         Args:
-            search: 搜索关键词
+            search: 搜索关键词（全文检索，文件名子串同样命中）
             style_filter: 风格筛选
             score_filter: 评分筛选
             verify_filter: 验证状态筛选
@@ -73,16 +74,13 @@ class FactorService:
             order_desc: 是否降序
             page: 页码
             page_size: 每页数量
+            columns: 列投影，None 表示全部列
 
         Returns:
             (因子列表, 总数)
         """
         filter_condition = {}
 
-        # 搜索条件
-        if search:
-            filter_condition['filename'] = f'contains:{search}'
-
         # 风格筛选
         if style_filter and style_filter != "全部":
             filter_condition['style'] = f'contains:{style_filter}'
@@ -90,6 +88,10 @@ class FactorService:
         # 评分筛选
         if score_filter == "4.5+":
             filter_condition['llm_score'] = '>=4.5'
+        elif score_filter == "4.0-4.5":
+            filter_condition['llm_score'] = ['>=4.0', '<4.5']
+        elif score_filter == "3.0-4.0":
+            filter_condition['llm_score'] = ['>=3.0', '<4.0']
         elif score_filter == "< 3.0":
             filter_condition['llm_score'] = '<3.0'
         elif score_filter == "未评分":
@@ -107,23 +109,15 @@ class FactorService:
         # 排序
         order = f"{order_by} DESC" if order_desc else order_by
 
-        # 查询
-        all_factors = self.store.query(filter_condition, order_by=order)
-
-        # 额外的范围筛选
-        if score_filter == "4.0-4.5":
-            all_factors = [f for f in all_factors if f.llm_score and 4.0 <= f.llm_score < 4.5]
-        elif score_filter == "3.0-4.0":
-            all_factors = [f for f in all_factors if f.llm_score and 3.0 <= f.llm_score < 4.0]
-
-        total = len(all_factors)
-
-        # 分页
-        start = (page - 1) * page_size
-        end = start + page_size
-        factors = all_factors[start:end]
-
-        return factors, total
+        # 查询（分页和总数在数据库端完成）
+        return self.store.query_page(
+            filter_condition,
+            order_by=order,
+            limit=page_size,
+            offset=(page - 1) * page_size,
+            columns=columns,
+            search=search or None,
+        )
 
     def query(
         self,
@@ -152,6 +146,7 @@ class FactorService:
         include_excluded: bool = False,
         page: Optional[int] = None,
         page_size: Optional[int] = None,
+        columns: Optional[List[str]] = None,
     ) -> Tuple[List[Factor], int]:
         """
         查询因子列表（支持分页和排除状态）
@@ -162,26 +157,28 @@ class FactorService:
             include_excluded: 是否包含已排除的因子
             page: 页码（从1开始），None 表示不分页
             page_size: 每页数量
+            columns: 列投影，None 表示全部列（列表视图可传 FactorStore.list_columns）
 
         Returns:
             (因子列表, 总数)
         """
-        all_factors = self.store.query(
+        if page is not None and page_size is not None:
+            return self.store.query_page(
+                filter_condition,
+                order_by=order_by,
+                limit=page_size,
+                offset=(page - 1) * page_size,
+                include_excluded=include_excluded,
+                columns=columns,
+            )
+
+        factors = self.store.query(
             filter_condition,
             order_by=order_by,
             include_excluded=include_excluded,
+            columns=columns,
         )
-        total = len(all_factors)
-
-        # 分页
-        if page is not None and page_size is not None:
-            start = (page - 1) * page_size
-            end = start + page_size
-            factors = all_factors[start:end]
-        else:
-            factors = all_factors
-
-        return factors, total
+        return factors, len(factors)
 
     def get_factor(self, filename: str) -> Optional[Factor]:
         """获取单个因子"""
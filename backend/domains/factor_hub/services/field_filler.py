@@ -5,20 +5,26 @@
 1. 可对任意字段进行 LLM 生成/填充
 2. 支持单字段、多字段批量生成
 3. 字段配置驱动（每个字段的 prompt 模板可配置）
+4. 批量模式：单次请求填充多个因子（按 token 预算切分，解析失败回退单条调用）
+5. 代码相同的重复因子只生成一次
 """
 
 import ast
 import asyncio
+import hashlib
+import json
 import logging
 import re
 import yaml
 from pathlib import Path
 from typing import Optional, List, Dict, Any, Tuple
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 
 from ..core.config import get_config_loader
 from ..core.store import get_factor_store, Factor
-from ...mcp_core.llm import get_llm_client, get_llm_settings
+from ..core.code_hash import compute_code_hash
+from ...mcp_core.llm import get_llm_client, get_llm_settings, get_rate_limiter
+from ...mcp_core.llm.limiter import estimate_tokens
 from ...mcp_core.logging import setup_task_logger
 
 
@@ -40,6 +46,23 @@ FIELD_DEPENDENCIES = {
 # 字段生成顺序（拓扑排序结果）
 FIELD_ORDER = ['style', 'formula', 'input_data', 'value_range', 'tags', 'description', 'analysis', 'llm_score']
 
+# 身份字段：不影响生成结果，不参与重复因子的去重键
+IDENTITY_VARS = {'filename', 'code_path', 'created_at', 'updated_at'}
+
+# 批量模式：单次请求中因子信息块的 prompt token 预算
+BATCH_PROMPT_TOKEN_BUDGET = 24000
+
+BATCH_INSTRUCTIONS = """
+
+<BatchMode>
+本次请求包含 {count} 个相互独立的因子，信息分别在 <Factor id="..."> 块中，
+上文中形如 <变量名> 的内容指代各因子块内的同名信息。
+请对每个因子分别独立完成上述任务，互不参考。
+只输出一个 JSON 对象，不要输出任何其他内容，格式：
+{{"results": [{{"id": 1, "value": "该因子的输出"}}, ...]}}
+每个因子一条，id 与因子块一致，value 为按上述要求对该因子的输出（字符串）。
+</BatchMode>"""
+
 
 logger = setup_task_logger("field_filler")
 
@@ -268,9 +291,263 @@ class FieldFiller:
         task = manager.get_task(task_id)
         return task is not None and task.status == TaskStatus.CANCELLED
 
+    def _factor_variables(self, factor: Factor) -> Dict[str, Any]:
+        """因子的 prompt 变量（含提取后的纯代码）"""
+        factor_dict = factor.to_dict()
+        if factor.code_path and Path(factor.code_path).exists():
+            factor_dict['code'] = extract_pure_code(factor.code_path) or ""
+        else:
+            factor_dict['code'] = factor.code_content or ""
+        return factor_dict
+
+    def _template_factor_vars(self, field: str) -> List[str]:
+        """字段模板中引用的因子级变量（不含用户变量）"""
+        config = self.field_configs[field]
+        template = config.system_prompt + "\n" + config.user_prompt
+        names = re.findall(r'\{(\w+)\}', template)
+        names += re.findall(r'\{%\s*if\s+(\w+)\s*%\}', template)
+        result = []
+        for name in names:
+            if name not in self.user_vars and name not in result:
+                result.append(name)
+        return result
+
+    def _dedup_key(self, field: str, factor_dict: Dict[str, Any]) -> str:
+        """
+        去重键：模板引用的因子变量（不含文件名等身份字段）的内容哈希
+
+        代码语义等价（代码指纹相同）且已有字段相同的因子（如复制后改名的因子）只生成一次。
+        """
+        payload = {
+            name: factor_dict.get(name)
+            for name in self._template_factor_vars(field)
+            if name not in IDENTITY_VARS
+        }
+        if 'code' in payload:
+            payload['code'] = compute_code_hash(payload['code'] or "") or payload['code']
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _group_duplicates(
+        self,
+        field: str,
+        factors: List[Factor],
+    ) -> List[Tuple[Dict[str, Any], List[Factor]]]:
+        """按去重键分组，返回 [(代表因子变量, 同组因子列表)]"""
+        groups: Dict[str, Tuple[Dict[str, Any], List[Factor]]] = {}
+        for factor in factors:
+            factor_dict = self._factor_variables(factor)
+            key = self._dedup_key(field, factor_dict)
+            if key in groups:
+                groups[key][1].append(factor)
+            else:
+                groups[key] = (factor_dict, [factor])
+        return list(groups.values())
+
+    def _plan_batches(
+        self,
+        field: str,
+        groups: List[Tuple[Dict[str, Any], List[Factor]]],
+        batch_size: int,
+    ) -> List[List[Tuple[Dict[str, Any], List[Factor]]]]:
+        """
+        按因子数上限、prompt token 预算和输出 token 上限切分批次
+
+        输出上限：单因子 max_tokens × 批内因子数不超过模型的 max_tokens。
+        """
+        field_config = self.field_configs[field]
+        model_key = field_config.model.name or None
+        per_output = self.llm_settings.resolve_config(
+            model_key, max_tokens=field_config.model.max_tokens,
+        )["max_tokens"]
+        model_cap = self.llm_settings.resolve_config(model_key)["max_tokens"]
+        limit = max(1, min(batch_size, model_cap // max(per_output, 1)))
+
+        factor_vars = self._template_factor_vars(field)
+        batches: List[List[Tuple[Dict[str, Any], List[Factor]]]] = []
+        current: List[Tuple[Dict[str, Any], List[Factor]]] = []
+        used = 0
+        for group in groups:
+            tokens = estimate_tokens([{"content": self._render_factor_block(0, group[0], factor_vars)}])
+            if current and (len(current) >= limit or used + tokens > BATCH_PROMPT_TOKEN_BUDGET):
+                batches.append(current)
+                current, used = [], 0
+            current.append(group)
+            used += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _render_factor_block(index: int, factor_dict: Dict[str, Any], factor_vars: List[str]) -> str:
+        """批量 prompt 中单个因子的信息块"""
+        lines = [f'<Factor id="{index}">']
+        for name in factor_vars:
+            value = factor_dict.get(name)
+            if value not in (None, ""):
+                lines.append(f"<{name}>\n{value}\n</{name}>")
+        lines.append("</Factor>")
+        return "\n".join(lines)
+
+    def _build_batch_prompt(
+        self,
+        field: str,
+        factor_dicts: List[Dict[str, Any]],
+    ) -> Tuple[str, str]:
+        """
+        构建多因子批量 prompt
+
+        字段模板只渲染一次，模板中的因子变量替换为对下方因子块的引用；
+        各因子信息放在 <Factor id="i"> 块中，要求以 JSON 返回逐因子结果。
+        """
+        config = self.field_configs[field]
+        factor_vars = self._template_factor_vars(field)
+
+        # 批内任一因子有值的变量保留其条件块，并替换为引用说明
+        placeholders = {
+            name: (f"<{name}>（见各因子块）" if any(d.get(name) for d in factor_dicts) else "")
+            for name in factor_vars
+        }
+        variables = {**self.user_vars, **placeholders}
+
+        system = self._render_prompt(config.system_prompt, variables) + BATCH_INSTRUCTIONS.format(
+            count=len(factor_dicts),
+        )
+        blocks = "\n\n".join(
+            self._render_factor_block(i, d, factor_vars)
+            for i, d in enumerate(factor_dicts, 1)
+        )
+        user = self._render_prompt(config.user_prompt, variables).strip() + "\n\n" + blocks
+        return system, user
+
+    def _parse_batch_response(self, content: str, field: str, count: int) -> Dict[int, str]:
+        """
+        解析批量响应，返回 {因子序号: 字段值}
+
+        只保留序号合法、值非空且符合字段输出格式的条目，其余由调用方回退单条调用。
+        """
+        text = content.strip()
+        start, end = text.find('{'), text.rfind('}')
+        if start < 0 or end <= start:
+            return {}
+        try:
+            data = json.loads(text[start:end + 1])
+        except json.JSONDecodeError:
+            return {}
+
+        items = data.get("results") if isinstance(data, dict) else None
+        if not isinstance(items, list):
+            return {}
+
+        config = self.field_configs.get(field)
+        parsed: Dict[int, str] = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            try:
+                index = int(item.get("id"))
+            except (TypeError, ValueError):
+                continue
+            value = item.get("value")
+            if not 1 <= index <= count or index in parsed or not isinstance(value, (str, int, float)):
+                continue
+            value = self._parse_response(str(value), field)
+            if not value:
+                continue
+            if config and config.output_format == 'number' and not re.fullmatch(r'\d+\.?\d*', value):
+                continue
+            parsed[index] = value
+        return parsed
+
+    async def _generate_value(
+        self,
+        field: str,
+        factor_dict: Dict[str, Any],
+    ) -> Tuple[bool, str, str]:
+        """单条调用生成字段值，返回 (success, value, error)"""
+        try:
+            system, user = self._build_prompt(field, factor_dict)
+            success, content, error = await self._call_llm(
+                system, user,
+                purpose=f"fill_{field}",
+                factor_name=factor_dict.get('filename', ''),
+                field_config=self.field_configs.get(field),
+            )
+            if not success:
+                return False, "", error
+            return True, self._parse_response(content, field), ""
+        except Exception as e:
+            return False, "", str(e)
+
+    async def _apply_value(
+        self,
+        factors: List[Factor],
+        field: str,
+        success: bool,
+        new_value: str,
+        error: str,
+        store,
+        task_id: Optional[str] = None,
+        progress_counter: Optional[Dict[str, int]] = None,
+        total_to_fill: int = 0,
+    ) -> List[FillResult]:
+        """将生成结果写入同组所有因子（保存到 store 并推送进度）"""
+        results = []
+        for factor in factors:
+            old_value = str(getattr(factor, field, ''))
+            if success:
+                if store and new_value:
+                    if field == 'llm_score':
+                        try:
+                            await asyncio.to_thread(
+                                store.update, factor.filename, llm_score=float(new_value)
+                            )
+                        except ValueError:
+                            pass
+                    else:
+                        await asyncio.to_thread(
+                            store.update, factor.filename, **{field: new_value}
+                        )
+                logger.info(f"  {factor.filename}: {field}={new_value[:50]}...")
+            else:
+                logger.error(f"  {factor.filename}: 失败 - {error}")
+
+            if task_id and progress_counter is not None:
+                await self._push_progress(
+                    task_id, progress_counter, total_to_fill,
+                    factor.filename, field, success,
+                    (new_value[:100] if new_value else "") if success else None,
+                    None if success else error,
+                )
+
+            results.append(FillResult(
+                filename=factor.filename,
+                field=field,
+                old_value=old_value,
+                new_value=new_value if success else "",
+                success=success,
+                error="" if success else error,
+            ))
+        return results
+
+    @staticmethod
+    def _cancelled_results(factors: List[Factor], field: str) -> List[FillResult]:
+        return [
+            FillResult(
+                filename=factor.filename,
+                field=field,
+                old_value=str(getattr(factor, field, '')),
+                new_value="",
+                success=False,
+                error="Task cancelled",
+            )
+            for factor in factors
+        ]
+
     async def _fill_single_factor(
         self,
-        factor: Factor,
+        factor_dict: Dict[str, Any],
+        factors: List[Factor],
         field: str,
         store,
         semaphore: asyncio.Semaphore,
@@ -279,19 +556,12 @@ class FieldFiller:
         task_id: Optional[str] = None,
         progress_counter: Optional[Dict[str, int]] = None,
         total_to_fill: int = 0,
-    ) -> FillResult:
-        """填充单个因子的单个字段"""
+    ) -> List[FillResult]:
+        """填充单个因子（及其重复因子）的单个字段"""
         async with semaphore:
             # Check if task is cancelled before processing
             if self._is_task_cancelled(task_id):
-                return FillResult(
-                    filename=factor.filename,
-                    field=field,
-                    old_value=str(getattr(factor, field, '')),
-                    new_value="",
-                    success=False,
-                    error="Task cancelled",
-                )
+                return self._cancelled_results(factors, field)
 
             # 非首个请求时，先等待延迟
             if not is_first and delay > 0:
@@ -299,103 +569,84 @@ class FieldFiller:
 
             # Check again after delay
             if self._is_task_cancelled(task_id):
-                return FillResult(
-                    filename=factor.filename,
-                    field=field,
-                    old_value=str(getattr(factor, field, '')),
-                    new_value="",
-                    success=False,
-                    error="Task cancelled",
-                )
+                return self._cancelled_results(factors, field)
 
-            factor_dict = factor.to_dict()
-            # 添加 code
-            if factor.code_path and Path(factor.code_path).exists():
-                factor_dict['code'] = extract_pure_code(factor.code_path) or ""
-            else:
-                factor_dict['code'] = factor.code_content or ""
+            success, new_value, error = await self._generate_value(field, factor_dict)
+            return await self._apply_value(
+                factors, field, success, new_value, error, store,
+                task_id, progress_counter, total_to_fill,
+            )
+
+    async def _fill_batch(
+        self,
+        batch: List[Tuple[Dict[str, Any], List[Factor]]],
+        field: str,
+        store,
+        semaphore: asyncio.Semaphore,
+        delay: float,
+        is_first: bool,
+        task_id: Optional[str] = None,
+        progress_counter: Optional[Dict[str, int]] = None,
+        total_to_fill: int = 0,
+    ) -> List[FillResult]:
+        """
+        一次请求填充多个因子的单个字段，解析失败的因子回退单条调用
+
+        批量请求与每个回退请求各自占用一个并发名额，回退调用不会突破并发上限。
+        """
+        all_factors = [f for _, group in batch for f in group]
+        async with semaphore:
+            if self._is_task_cancelled(task_id):
+                return self._cancelled_results(all_factors, field)
+
+            if not is_first and delay > 0:
+                await asyncio.sleep(delay)
 
+            if self._is_task_cancelled(task_id):
+                return self._cancelled_results(all_factors, field)
+
+            factor_dicts = [d for d, _ in batch]
+            parsed: Dict[int, str] = {}
             try:
-                system, user = self._build_prompt(field, factor_dict)
+                system, user = self._build_batch_prompt(field, factor_dicts)
                 field_config = self.field_configs.get(field)
+                per_factor_tokens = self.llm_settings.resolve_config(
+                    field_config.model.name or None, max_tokens=field_config.model.max_tokens,
+                )["max_tokens"]
                 success, content, error = await self._call_llm(
                     system, user,
-                    purpose=f"fill_{field}",
-                    factor_name=factor.filename,
-                    field_config=field_config,
+                    purpose=f"fill_{field}_batch",
+                    factor_name=",".join(d.get('filename', '') for d in factor_dicts),
+                    field_config=replace(field_config, model=replace(
+                        field_config.model, max_tokens=per_factor_tokens * len(batch),
+                    )),
                 )
-
                 if success:
-                    new_value = self._parse_response(content, field)
-                    result = FillResult(
-                        filename=factor.filename,
-                        field=field,
-                        old_value=str(getattr(factor, field, '')),
-                        new_value=new_value,
-                        success=True,
-                    )
-
-                    # 保存到 store
-                    if store and new_value:
-                        if field == 'llm_score':
-                            try:
-                                await asyncio.to_thread(
-                                    store.update, factor.filename, llm_score=float(new_value)
-                                )
-                            except ValueError:
-                                pass
-                        else:
-                            await asyncio.to_thread(
-                                store.update, factor.filename, **{field: new_value}
-                            )
-
-                    logger.info(f"  {factor.filename}: {field}={new_value[:50]}...")
-
-                    # 推送进度
-                    if task_id and progress_counter is not None:
-                        await self._push_progress(
-                            task_id, progress_counter, total_to_fill,
-                            factor.filename, field, True, new_value[:100] if new_value else "", None
-                        )
-
-                    return result
+                    parsed = self._parse_batch_response(content, field, len(batch))
                 else:
-                    logger.error(f"  {factor.filename}: 失败 - {error}")
-
-                    # 推送进度（失败）
-                    if task_id and progress_counter is not None:
-                        await self._push_progress(
-                            task_id, progress_counter, total_to_fill,
-                            factor.filename, field, False, None, error
-                        )
-
-                    return FillResult(
-                        filename=factor.filename,
-                        field=field,
-                        old_value=str(getattr(factor, field, '')),
-                        new_value="",
-                        success=False,
-                        error=error,
-                    )
-
+                    logger.warning(f"批量填充 {field} 失败，回退单条调用: {error}")
             except Exception as e:
-                logger.error(f"  {factor.filename}: 异常 - {e}")
+                logger.warning(f"批量填充 {field} 异常，回退单条调用: {e}")
 
-                # 推送进度（异常）
-                if task_id and progress_counter is not None:
-                    await self._push_progress(
-                        task_id, progress_counter, total_to_fill,
-                        factor.filename, field, False, None, str(e)
-                    )
+        if len(parsed) < len(batch):
+            logger.info(f"批量填充 {field}: {len(parsed)}/{len(batch)} 解析成功，其余回退单条调用")
 
-                return FillResult(
-                    filename=factor.filename,
-                    field=field,
-                    old_value="",
-                    new_value="",
-                    success=False,
-                    error=str(e),
-                )
+        async def fill_one(index: int) -> List[FillResult]:
+            factor_dict, group = batch[index - 1]
+            if index in parsed:
+                success, new_value, error = True, parsed[index], ""
+            else:
+                async with semaphore:
+                    if self._is_task_cancelled(task_id):
+                        return self._cancelled_results(group, field)
+                    success, new_value, error = await self._generate_value(field, factor_dict)
+            return await self._apply_value(
+                group, field, success, new_value, error, store,
+                task_id, progress_counter, total_to_fill,
+            )
+
+        results = await asyncio.gather(*(fill_one(i) for i in range(1, len(batch) + 1)))
+        return [r for group_results in results for r in group_results]
 
     async def _push_progress(
         self,
@@ -448,6 +699,7 @@ class FieldFiller:
         task_id: Optional[str] = None,
         progress_counter: Optional[Dict[str, int]] = None,
         total_to_fill: int = 0,
+        batch_size: int = 1,
     ) -> FieldFillResult:
         """
         异步填充单个字段
@@ -456,12 +708,15 @@ class FieldFiller:
             factors: 因子列表
             field: 要填充的字段
             mode: 模式 ('full'=全量, 'incremental'=只填充空值)
-            concurrency: 并发数（同时进行的 LLM 请求数）
-            delay: 每个请求之间的间隔（秒）
+            concurrency: 并发数（同时进行的 LLM 请求数，<=0 时由模型限流器自适应）
+            delay: 每个请求之间的间隔（秒，启用限流器时通常设为 0）
             save_to_store: 是否保存到 store
             task_id: 任务ID（用于 SSE 进度推送）
             progress_counter: 进度计数器（跨字段共享）
             total_to_fill: 总待填充数量
+            batch_size: 单次请求最多填充的因子数（>1 时启用批量模式）
+
+        代码与相关字段完全相同的因子只生成一次，结果写入所有重复因子。
 
         Returns:
             FieldFillResult 填充结果
@@ -484,27 +739,53 @@ class FieldFiller:
             logger.info(f"没有需要填充 {field} 的因子")
             return FieldFillResult(field=field)
 
+        if concurrency <= 0:
+            # 自适应：任务侧只设上限，实际并发由按模型共享的限流器控制
+            concurrency = get_rate_limiter().suggested_concurrency()
         logger.info(f"开始填充 {field}: {len(target_factors)} 个因子, 并发={concurrency}, 延迟={delay}s")
 
         semaphore = asyncio.Semaphore(concurrency)
 
+        groups = await asyncio.to_thread(self._group_duplicates, field, target_factors)
+        if len(groups) < len(target_factors):
+            logger.info(f"去重后 {len(groups)} 组（{len(target_factors) - len(groups)} 个因子复用相同结果）")
+
         # 并发执行所有因子的填充
-        tasks = [
-            self._fill_single_factor(
-                factor=factor,
-                field=field,
-                store=store,
-                semaphore=semaphore,
-                delay=delay,
-                is_first=(i == 0),
-                task_id=task_id,
-                progress_counter=progress_counter,
-                total_to_fill=total_to_fill,
-            )
-            for i, factor in enumerate(target_factors)
-        ]
+        if batch_size > 1:
+            batches = self._plan_batches(field, groups, batch_size)
+            logger.info(f"批量模式: {len(groups)} 组分为 {len(batches)} 个请求")
+            tasks = [
+                self._fill_batch(
+                    batch=batch,
+                    field=field,
+                    store=store,
+                    semaphore=semaphore,
+                    delay=delay,
+                    is_first=(i == 0),
+                    task_id=task_id,
+                    progress_counter=progress_counter,
+                    total_to_fill=total_to_fill,
+                )
+                for i, batch in enumerate(batches)
+            ]
+        else:
+            tasks = [
+                self._fill_single_factor(
+                    factor_dict=factor_dict,
+                    factors=group,
+                    field=field,
+                    store=store,
+                    semaphore=semaphore,
+                    delay=delay,
+                    is_first=(i == 0),
+                    task_id=task_id,
+                    progress_counter=progress_counter,
+                    total_to_fill=total_to_fill,
+                )
+                for i, (factor_dict, group) in enumerate(groups)
+            ]
 
-        results = await asyncio.gather(*tasks)
+        results = [r for task_results in await asyncio.gather(*tasks) for r in task_results]
 
         # 统计
         success_count = sum(1 for r in results if r.success)
@@ -513,7 +794,7 @@ class FieldFiller:
 
         return FieldFillResult(
             field=field,
-            results=list(results),
+            results=results,
             success_count=success_count,
             fail_count=fail_count,
         )
@@ -527,6 +808,7 @@ class FieldFiller:
         delay: float = 15.0,
         save_to_store: bool = True,
         task_id: Optional[str] = None,
+        batch_size: int = 1,
     ) -> Dict[str, FieldFillResult]:
         """
         异步填充多个字段（按依赖顺序）
@@ -539,6 +821,7 @@ class FieldFiller:
             delay: 请求间隔
             save_to_store: 是否保存
             task_id: 任务ID（用于 SSE 进度推送）
+            batch_size: 单次请求最多填充的因子数（>1 时启用批量模式）
 
         Returns:
             {field: FieldFillResult}
@@ -551,9 +834,9 @@ class FieldFiller:
 
         # 计算总待填充数量（用于进度计算）
         total_to_fill = 0
-        for field in sorted_fields:
+        for field_name in sorted_fields:
             for factor in factors:
-                current_value = getattr(factor, field, '')
+                current_value = getattr(factor, field_name, '')
                 if mode == 'full' or not (current_value and str(current_value).strip()):
                     total_to_fill += 1
 
@@ -561,9 +844,9 @@ class FieldFiller:
         progress_counter = {"completed": 0}
 
         results = {}
-        for field in sorted_fields:
+        for field_name in sorted_fields:
             logger.info(f"\n{'='*60}")
-            logger.info(f"开始填充字段: {field}")
+            logger.info(f"开始填充字段: {field_name}")
             logger.info(f"{'='*60}\n")
 
             # 重新加载因子（获取已更新的字段值），但只加载指定的因子
@@ -574,7 +857,7 @@ class FieldFiller:
 
             field_result = await self.fill_field_async(
                 factors=factors,
-                field=field,
+                field=field_name,
                 mode=mode,
                 concurrency=concurrency,
                 delay=delay,
@@ -582,8 +865,9 @@ class FieldFiller:
                 task_id=task_id,
                 progress_counter=progress_counter,
                 total_to_fill=total_to_fill,
+                batch_size=batch_size,
             )
-            results[field] = field_result
+            results[field_name] = field_result
 
         return results
 
@@ -595,6 +879,7 @@ class FieldFiller:
         concurrency: int = 1,
         delay: float = 15.0,
         dry_run: bool = False,
+        batch_size: int = 1,
     ) -> FieldFillResult:
         """
         填充单个字段（同步入口）
@@ -606,6 +891,7 @@ class FieldFiller:
             concurrency: 并发数
             delay: 请求间隔
             dry_run: 预览模式
+            batch_size: 单次请求最多填充的因子数（>1 时启用批量模式）
 
         Returns:
             FieldFillResult
@@ -636,6 +922,7 @@ class FieldFiller:
             concurrency=concurrency,
             delay=delay,
             save_to_store=True,
+            batch_size=batch_size,
         ))
 
     def fill_fields(
@@ -646,6 +933,7 @@ class FieldFiller:
         concurrency: int = 1,
         delay: float = 15.0,
         dry_run: bool = False,
+        batch_size: int = 1,
     ) -> Dict[str, FieldFillResult]:
         """
         填充多个字段（同步入口）
@@ -672,6 +960,7 @@ class FieldFiller:
             concurrency=concurrency,
             delay=delay,
             save_to_store=True,
+            batch_size=batch_size,
         ))
 
 
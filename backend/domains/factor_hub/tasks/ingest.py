@@ -4,7 +4,8 @@
 入库流程：
 1. 发现未入库的因子文件
 2. 创建因子记录（filename, code_path）
-3. 使用通用字段填充器填充所有元信息字段
+3. 复用代码等价的已有因子的字段与评估结果（按代码指纹）
+4. 使用通用字段填充器填充仍为空的元信息字段
 """
 
 import asyncio
@@ -16,6 +17,7 @@ from domains.mcp_core.logging import setup_task_logger
 from domains.mcp_core.paths import get_factors_dir
 from ..core.store import get_factor_store, Factor
 from ..services.field_filler import get_field_filler, FIELD_ORDER
+from ..services.code_dedup import get_code_dedup_service
 from .diff_catalog import discover_factors
 
 logger = setup_task_logger("ingest")
@@ -91,7 +93,17 @@ def run_ingest(
 
     logger.info(f"已添加 {added_count} 个因子记录")
 
-    # Step 3: 使用通用字段填充器填充所有字段
+    # Step 3: 复用代码等价因子的已有字段，剩余空字段再交给 LLM 填充
+    if added_count:
+        reuse = get_code_dedup_service().reuse_artifacts(
+            filenames=[f.name for f in pending_files],
+        )
+        if reuse['factors_updated']:
+            logger.info(
+                f"复用重复因子产物: {reuse['factors_updated']} 个因子, {reuse['fields_reused']} 个字段"
+            )
+
+    # Step 4: 使用通用字段填充器填充所有字段
     if added_count == 0:
         return {'added': 0, 'filled': {}}
 
@@ -110,16 +122,16 @@ def run_ingest(
     logger.info(f"\n开始填充字段: {', '.join(fields)}")
 
     # 获取刚添加的因子
-    new_factors = [store.get(f.name) for f in pending_files if store.get(f.name)]
+    new_factors = store.get_many([f.name for f in pending_files], include_excluded=False)
 
     # 填充所有字段
-    fill_results = filler.fill_fields(
+    fill_results = asyncio.run(filler.fill_fields_async(
         factors=new_factors,
         fields=fields,
         mode='incremental',
         concurrency=concurrency,
         delay=delay,
-    )
+    ))
 
     # 统计
     filled_stats = {}
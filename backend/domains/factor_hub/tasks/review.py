@@ -12,7 +12,7 @@ from pathlib import Path
 from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass, field
 
-from domains.mcp_core.llm import get_llm_client
+from domains.mcp_core.llm import get_llm_client, get_rate_limiter
 from domains.mcp_core.logging import setup_task_logger
 
 logger = setup_task_logger("review")
@@ -312,11 +312,11 @@ async def run_review_async(
 
     Args:
         factors: 待审核因子列表
-        concurrency: 并发数
+        concurrency: 并发数（<=0 时由模型限流器自适应）
         output_dir: 输出目录
         dry_run: 是否只预览
         apply_revisions: 是否自动应用修订到 store
-        delay: 请求间隔（秒），用于避免触发 API 限流
+        delay: 请求间隔（秒），启用限流器时通常设为 0
         review_fields: 要审核的字段列表
 
     Returns:
@@ -345,6 +345,8 @@ async def run_review_async(
         return ReviewSummary()
 
     total_factors = len(valid_factors)
+    if concurrency <= 0:
+        concurrency = get_rate_limiter().suggested_concurrency()
 
     if dry_run:
         logger.info(f"[DRY RUN] 共 {total_factors} 个因子待审核")
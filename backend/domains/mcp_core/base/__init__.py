@@ -13,6 +13,19 @@ from .tool import (
     get_tool_registry,
     register_tool,
 )
+from .cache import (
+    BoundedCache,
+    estimate_size,
+    get_cache_stats,
+)
+from .tool_cache import (
+    ToolCacheConfig,
+    ToolResultCache,
+    factor_cache_tag,
+    get_tool_cache,
+    reset_tool_cache,
+    invalidate_tool_cache,
+)
 from .resource import (
     BaseResourceProvider,
     ResourceDefinition,
@@ -41,6 +54,17 @@ __all__ = [
     "ToolRegistry",
     "get_tool_registry",
     "register_tool",
+    # Cache
+    "BoundedCache",
+    "estimate_size",
+    "get_cache_stats",
+    # Tool cache
+    "ToolCacheConfig",
+    "ToolResultCache",
+    "factor_cache_tag",
+    "get_tool_cache",
+    "reset_tool_cache",
+    "invalidate_tool_cache",
     # Resource
     "BaseResourceProvider",
     "ResourceDefinition",
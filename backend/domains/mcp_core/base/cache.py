@@ -0,0 +1,307 @@
+"""
+有界 LRU 缓存
+
+MCP 服务器内各类进程内缓存（资源、工具结果、分页结果、查询向量等）的统一实现:
+- 同时按条目数和估算字节数限制容量，超限时淘汰最久未使用的条目
+- 条目级 TTL；后台线程定期清扫过期条目，长期运行时内存不随历史键增长
+- 命中、未命中、淘汰、过期计数，供 /metrics 输出（get_cache_stats）
+
+字节数为估算值（sys.getsizeof 递归求和，大容器按抽样推算），用于容量控制而非精确计量。
+"""
+
+import logging
+import itertools
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# 后台清扫间隔（秒）
+SWEEP_INTERVAL = float(os.getenv("CACHE_SWEEP_INTERVAL", "60"))
+
+# 估算大容器时抽样的元素个数
+_SIZE_SAMPLE = 64
+_SIZE_MAX_DEPTH = 6
+
+
+def estimate_size(obj: Any, _depth: int = 0) -> int:
+    """
+    估算对象占用的字节数
+
+    容器递归求和，元素超过 _SIZE_SAMPLE 个时按抽样均值推算；
+    numpy 数组取 nbytes，pandas 对象取 memory_usage。
+    """
+    size = sys.getsizeof(obj, 64)
+    if _depth >= _SIZE_MAX_DEPTH or isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+        return size
+
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return size + nbytes
+    memory_usage = getattr(obj, "memory_usage", None)
+    if callable(memory_usage) and type(obj).__module__.startswith("pandas"):
+        try:
+            usage = memory_usage(deep=True)
+            return size + int(usage.sum() if hasattr(usage, "sum") else usage)
+        except Exception:
+            return size
+
+    if isinstance(obj, dict):
+        items = list(itertools.islice(obj.items(), _SIZE_SAMPLE))
+        sampled = sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in items)
+        return size + (sampled * len(obj) // len(items) if items else 0)
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        items = list(itertools.islice(obj, _SIZE_SAMPLE))
+        sampled = sum(estimate_size(item, _depth + 1) for item in items)
+        return size + (sampled * len(obj) // len(items) if items else 0)
+
+    # 普通对象 / dataclass 按实例属性估算
+    attrs = getattr(obj, "__dict__", None)
+    if attrs is not None:
+        return size + estimate_size(attrs, _depth + 1)
+    slots = getattr(type(obj), "__slots__", ())
+    if slots:
+        return size + sum(estimate_size(getattr(obj, s, None), _depth + 1) for s in slots)
+    return size
+
+
+@dataclass
+class CacheStats:
+    """缓存计数"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    rejected: int = 0  # 单条超过字节上限、未写入
+
+
+class _Entry:
+    __slots__ = ("value", "size", "ttl", "expires_at")
+
+    def __init__(self, value: Any, size: int, ttl: Optional[float], expires_at: float):
+        self.value = value
+        self.size = size
+        self.ttl = ttl
+        self.expires_at = expires_at
+
+
+class BoundedCache:
+    """
+    有界 LRU 缓存（线程安全）
+
+    使用方式:
+        cache = BoundedCache("resource:factor", max_entries=512, max_bytes=64 << 20, default_ttl=60)
+        cache.set(uri, content)
+        content = cache.get(uri)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        default_ttl: Optional[float] = None,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ):
+        """
+        Args:
+            name: 缓存名称（指标标签，同名缓存的指标合并）
+            max_entries: 条目数上限
+            max_bytes: 估算字节数上限，None 表示不按字节限制
+            default_ttl: 默认有效期（秒），None 或 <= 0 表示不过期
+            sizeof: 字节数估算函数
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+        _register(self)
+
+    def get(self, key: Hashable, default: Any = None, refresh_ttl: bool = False) -> Any:
+        """
+        读取缓存
+
+        Args:
+            key: 键
+            default: 未命中时的返回值
+            refresh_ttl: 命中时是否按条目 TTL 重新计算过期时间（滑动过期）
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return default
+            if entry.expires_at <= now:
+                self._remove(key, entry)
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            if refresh_ttl and entry.ttl:
+                entry.expires_at = now + entry.ttl
+            self.stats.hits += 1
+            return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        """
+        写入缓存
+
+        Args:
+            key: 键
+            value: 值
+            ttl: 有效期（秒），None 使用 default_ttl
+
+        Returns:
+            是否写入（单条超过字节上限时不写入）
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        ttl = ttl if ttl and ttl > 0 else None
+        size = self._sizeof(value)
+        expires_at = time.monotonic() + ttl if ttl else float("inf")
+
+        with self._lock:
+            old = self._entries.get(key)
+            if old is not None:
+                self._remove(key, old)
+            if self.max_bytes is not None and size > self.max_bytes:
+                self.stats.rejected += 1
+                return False
+            self._entries[key] = _Entry(value, size, ttl, expires_at)
+            self._bytes += size
+            self._evict()
+        if ttl:
+            _ensure_sweeper()
+        return True
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._remove(key, entry)
+            return entry.value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def purge_expired(self) -> int:
+        """清除所有过期条目，返回清除数量"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, e in self._entries.items() if e.expires_at <= now]
+            for key in expired:
+                self._remove(key, self._entries[key])
+            self.stats.expirations += len(expired)
+        return len(expired)
+
+    def _remove(self, key: Hashable, entry: _Entry) -> None:
+        del self._entries[key]
+        self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.stats.evictions += 1
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry.expires_at > time.monotonic()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats
+        lookups = stats.hits + stats.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": stats.hits,
+            "misses": stats.misses,
+            "hit_rate": round(stats.hits / lookups, 4) if lookups else 0.0,
+            "evictions": stats.evictions,
+            "expirations": stats.expirations,
+            "rejected": stats.rejected,
+        }
+
+
+# ==================== 注册与后台清扫 ====================
+
+_caches: "weakref.WeakSet[BoundedCache]" = weakref.WeakSet()
+_registry_lock = threading.Lock()
+_sweeper: Optional[threading.Thread] = None
+
+
+def _register(cache: BoundedCache) -> None:
+    with _registry_lock:
+        _caches.add(cache)
+
+
+def _sweep_loop() -> None:
+    while True:
+        time.sleep(SWEEP_INTERVAL)
+        with _registry_lock:
+            caches = list(_caches)
+        for cache in caches:
+            try:
+                cache.purge_expired()
+            except Exception as e:
+                logger.debug(f"cache_sweep_failed: {cache.name}, {e}")
+
+
+def _ensure_sweeper() -> None:
+    global _sweeper
+    if _sweeper is not None:
+        return
+    with _registry_lock:
+        if _sweeper is None:
+            _sweeper = threading.Thread(target=_sweep_loop, name="cache-sweeper", daemon=True)
+            _sweeper.start()
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    所有有界缓存的统计（同名缓存合并计数）
+
+    Returns:
+        {缓存名称: 统计字典}
+    """
+    with _registry_lock:
+        caches = list(_caches)
+    merged: Dict[str, Dict[str, Any]] = {}
+    for cache in caches:
+        stats = cache.get_stats()
+        current = merged.get(cache.name)
+        if current is None:
+            merged[cache.name] = {**stats, "instances": 1}
+            continue
+        for key in ("entries", "bytes", "hits", "misses", "evictions", "expirations", "rejected"):
+            current[key] += stats[key]
+        current["instances"] += 1
+        lookups = current["hits"] + current["misses"]
+        current["hit_rate"] = round(current["hits"] / lookups, 4) if lookups else 0.0
+    return dict(sorted(merged.items()))
@@ -4,7 +4,7 @@ MCP Resource 基类和资源提供者
 提供可扩展的资源定义框架，支持:
 - 静态资源注册
 - 动态资源 (URI 模板)
-- 资源缓存
+- 资源缓存（有界 LRU，见 cache.py）
 """
 
 from abc import ABC, abstractmethod
@@ -12,9 +12,11 @@ from typing import Any, Dict, List, Optional, Callable, Awaitable
 from dataclasses import dataclass, field
 import logging
 import json
-import time
+import os
 import re
 
+from .cache import BoundedCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -76,12 +78,19 @@ class ResourceContent:
         )
 
 
-@dataclass
-class CacheEntry:
-    """缓存条目"""
-    content: ResourceContent
-    timestamp: float
-    ttl: int
+# 资源缓存容量（每个资源提供者）
+RESOURCE_CACHE_MAX_ENTRIES = int(os.getenv("RESOURCE_CACHE_MAX_ENTRIES", "512"))
+RESOURCE_CACHE_MAX_BYTES = int(os.getenv("RESOURCE_CACHE_MAX_MB", "64")) * 1024 * 1024
+
+
+def _content_size(content: ResourceContent) -> int:
+    """资源内容的字节数（文本按 UTF-8 计）"""
+    size = len(content.uri) + 64
+    if content.text is not None:
+        size += len(content.text.encode("utf-8"))
+    if content.blob is not None:
+        size += len(content.blob)
+    return size
 
 
 class BaseResourceProvider(ABC):
@@ -121,17 +130,30 @@ class BaseResourceProvider(ABC):
                 return None
     """
 
-    def __init__(self, default_cache_ttl: int = 0):
+    def __init__(
+        self,
+        default_cache_ttl: int = 0,
+        max_cache_entries: Optional[int] = None,
+        max_cache_bytes: Optional[int] = None,
+    ):
         """
         初始化资源提供者
 
         Args:
             default_cache_ttl: 默认缓存 TTL（秒），0 表示不缓存
+            max_cache_entries: 缓存条目上限，默认 RESOURCE_CACHE_MAX_ENTRIES
+            max_cache_bytes: 缓存字节上限，默认 RESOURCE_CACHE_MAX_MB
         """
         self._static_resources: Dict[str, ResourceDefinition] = {}
         self._static_handlers: Dict[str, Callable[[], Awaitable[ResourceContent]]] = {}
+        self._static_cache_ttls: Dict[str, int] = {}
         self._dynamic_patterns: List[Dict[str, Any]] = []
-        self._cache: Dict[str, CacheEntry] = {}
+        self._cache = BoundedCache(
+            name=f"resource:{type(self).__name__}",
+            max_entries=max_cache_entries or RESOURCE_CACHE_MAX_ENTRIES,
+            max_bytes=max_cache_bytes or RESOURCE_CACHE_MAX_BYTES,
+            sizeof=_content_size,
+        )
         self._default_cache_ttl = default_cache_ttl
 
     def register_static(
@@ -161,6 +183,8 @@ class BaseResourceProvider(ABC):
             mime_type=mime_type,
         )
         self._static_handlers[uri] = handler
+        if cache_ttl is not None:
+            self._static_cache_ttls[uri] = cache_ttl
         logger.debug(f"注册静态资源: {uri}")
 
     def register_dynamic(
@@ -230,7 +254,7 @@ class BaseResourceProvider(ABC):
         if uri in self._static_handlers:
             try:
                 content = await self._static_handlers[uri]()
-                self._set_cache(uri, content)
+                self._set_cache(uri, content, self._static_cache_ttls.get(uri))
                 return content
             except Exception as e:
                 logger.error(f"读取静态资源失败 {uri}: {e}")
@@ -254,24 +278,14 @@ class BaseResourceProvider(ABC):
         return None
 
     def _get_from_cache(self, uri: str) -> Optional[ResourceContent]:
-        """从缓存获取"""
-        if uri in self._cache:
-            entry = self._cache[uri]
-            if time.time() - entry.timestamp < entry.ttl:
-                return entry.content
-            else:
-                del self._cache[uri]
-        return None
+        """从缓存获取（过期条目在读取或后台清扫时移除）"""
+        return self._cache.get(uri)
 
     def _set_cache(self, uri: str, content: ResourceContent, ttl: Optional[int] = None) -> None:
-        """设置缓存"""
+        """设置缓存（超出条目数或字节上限时淘汰最久未用的资源）"""
         ttl = ttl if ttl is not None else self._default_cache_ttl
         if ttl > 0:
-            self._cache[uri] = CacheEntry(
-                content=content,
-                timestamp=time.time(),
-                ttl=ttl,
-            )
+            self._cache.set(uri, content, ttl=ttl)
 
     def clear_cache(self, uri: Optional[str] = None) -> None:
         """清除缓存"""
@@ -280,6 +294,10 @@ class BaseResourceProvider(ABC):
         else:
             self._cache.clear()
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """资源缓存统计"""
+        return self._cache.get_stats()
+
 
 class SimpleResourceProvider(BaseResourceProvider):
     """
@@ -2,7 +2,7 @@
 存储层基类
 
 提供 PostgreSQL 存储层的通用功能：
-- 连接管理
+- 连接管理（共享连接池）
 - 游标上下文管理器
 - 单例模式支持
 - SQL 安全验证
@@ -16,9 +16,10 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional, Set, TypeVar, Generic
 from contextlib import contextmanager
 
-import psycopg2
 from psycopg2.extras import RealDictCursor
 
+from ..database.pool import get_connection_pool
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
@@ -36,8 +37,9 @@ class ThreadSafeConnectionMixin:
     """
     线程安全的数据库连接管理 Mixin
 
-    使用 threading.local() 让每个线程拥有独立的数据库连接，
-    避免 asyncio.to_thread() 多线程环境下的连接竞争和死锁。
+    从按数据库 URL 共享的有界连接池借用连接（见 database/pool.py），
+    asyncio.to_thread() / run_sync 产生的大量线程不会各自持有连接。
+    同一线程内嵌套的 _cursor() 复用同一连接，保持原有的事务语义。
 
     使用方法：
         class MyStore(ThreadSafeConnectionMixin):
@@ -49,34 +51,40 @@ class ThreadSafeConnectionMixin:
     def _init_connection(self, database_url: Optional[str] = None):
         """初始化连接管理"""
         self.database_url = database_url or get_database_url()
+        self._pool = get_connection_pool(self.database_url)
         self._local = threading.local()
 
-    def _get_connection(self) -> psycopg2.extensions.connection:
-        """获取当前线程的数据库连接"""
-        if not hasattr(self._local, 'conn') or self._local.conn is None or self._local.conn.closed:
-            self._local.conn = psycopg2.connect(self.database_url)
-            self._local.conn.autocommit = False
-        return self._local.conn
+    @contextmanager
+    def _connection(self):
+        """借用当前线程的连接（嵌套调用复用，最外层退出时归还连接池）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+
+        with self._pool.connection() as conn:
+            self._local.conn = conn
+            try:
+                yield conn
+            finally:
+                self._local.conn = None
 
     @contextmanager
     def _cursor(self):
         """获取游标的上下文管理器"""
-        conn = self._get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        try:
-            yield cursor
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
-        finally:
-            cursor.close()
+        with self._connection() as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            try:
+                yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
 
     def close(self):
-        """关闭当前线程的数据库连接"""
-        if hasattr(self._local, 'conn') and self._local.conn and not self._local.conn.closed:
-            self._local.conn.close()
-            self._local.conn = None
+        """兼容旧接口：连接由共享连接池管理，进程退出时通过 close_all_pools() 统一关闭"""
 
 
 class BaseStore(ThreadSafeConnectionMixin, ABC, Generic[T]):
@@ -277,6 +285,25 @@ class BaseStore(ThreadSafeConnectionMixin, ABC, Generic[T]):
             cursor.execute(sql, params or [])
             return cursor.fetchone()['count']
 
+    def distinct_values(self, column: str) -> Set[Any]:
+        """
+        获取某列的全部取值（单次查询）
+
+        Args:
+            column: 列名（须在白名单内）
+
+        Returns:
+            去重后的取值集合（不含 NULL）
+        """
+        if column not in self.allowed_columns:
+            raise ValueError(f"Invalid column: {column}")
+
+        with self._cursor() as cursor:
+            cursor.execute(
+                f'SELECT DISTINCT {column} AS value FROM {self.table_name} WHERE {column} IS NOT NULL'
+            )
+            return {row['value'] for row in cursor.fetchall()}
+
     # ==================== 安全验证 ====================
 
     def _validate_order_by(self, order_by: str) -> Optional[str]:
@@ -7,16 +7,21 @@ MCP Tool 基类和工具注册器
 - 工具分类管理
 - 参数验证
 - 执行模式调度（Fast/Compute/Heavy）
+- 执行耗时、错误、超时计入进程内直方图（见 observability/metrics.py）
+- 只读工具的单飞合并与结果缓存（见 tool_cache.py）
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Dict, List, Optional, Type, Union
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Type, Union
 from dataclasses import dataclass, field
 from enum import Enum
 import asyncio
 import logging
 import inspect
 import functools
+import time
+
+from ..observability.metrics import get_metrics_registry
 
 logger = logging.getLogger(__name__)
 
@@ -133,6 +138,17 @@ class BaseTool(ABC):
     # 所需权限范围，子类可覆盖
     required_scopes: List[str] = []
 
+    # 结果缓存有效期（秒），None 表示不缓存；仅用于只读工具
+    cache_ttl: Optional[float] = None
+
+    # 缓存依赖标签，可引用参数，如 "market_data"；标签失效时缓存随之失效。
+    # 因子标签需与 FactorStore 的失效一致，覆盖 cache_tags_for 并使用 factor_cache_tag() 生成
+    cache_tags: tuple = ()
+
+    # 大型表格结果是否分页返回（首页 + 结果句柄，见 server/serialization.py）；
+    # 只对行数可能很大、客户端能按页读取的工具开启
+    page_results: bool = False
+
     def __init__(self, **services):
         """
         初始化工具
@@ -267,6 +283,24 @@ class BaseTool(ABC):
 
         return None
 
+    def cache_tags_for(self, params: Dict[str, Any]) -> List[str]:
+        """
+        根据参数展开缓存依赖标签
+
+        Args:
+            params: 已校验的工具参数
+
+        Returns:
+            标签列表，引用了缺失参数的标签原样保留
+        """
+        tags = []
+        for tag in self.cache_tags:
+            try:
+                tags.append(tag.format(**params))
+            except (KeyError, IndexError):
+                tags.append(tag)
+        return tags
+
 
 class ToolRegistry:
     """
@@ -381,6 +415,9 @@ class ToolRegistry:
         - FAST: 直接 async 执行，默认 60s 超时
         - COMPUTE: 由专用执行器管理（如 BacktestRunner），默认 300s 超时
 
+        声明了 cache_ttl 的工具经结果缓存执行：相同参数的并发调用合并为一次，
+        成功结果在有效期内直接复用（命中缓存的调用同样计入指标）。
+
         Args:
             name: 工具名称
             params: 工具参数
@@ -411,17 +448,35 @@ class ToolRegistry:
         else:
             timeout = DEFAULT_TOOL_TIMEOUT
 
-        try:
+        def run() -> Awaitable[ToolResult]:
             # 带超时的执行
-            result = await asyncio.wait_for(
-                tool.execute(**params),
-                timeout=timeout
+            return asyncio.wait_for(tool.execute(**params), timeout=timeout)
+
+        metrics = get_metrics_registry()
+        start = time.perf_counter()
+        try:
+            cache = None
+            if tool.cache_ttl:
+                from .tool_cache import get_tool_cache
+                cache = get_tool_cache()
+            if cache is not None and cache.config.enabled:
+                result = await cache.get_or_execute(
+                    name, params, tool.cache_ttl, tool.cache_tags_for(params), run
+                )
+            else:
+                result = await run()
+            metrics.record_call(
+                "tool", name, (time.perf_counter() - start) * 1000, success=result.success
             )
             return result
         except asyncio.TimeoutError:
+            metrics.record_call(
+                "tool", name, (time.perf_counter() - start) * 1000, success=False, timeout=True
+            )
             logger.error(f"工具 {name} 执行超时（{timeout}秒）")
             return ToolResult.fail(f"执行超时: 工具 {name} 超过 {timeout} 秒未响应")
         except Exception as e:
+            metrics.record_call("tool", name, (time.perf_counter() - start) * 1000, success=False)
             logger.exception(f"工具 {name} 执行失败")
             return ToolResult.fail(f"执行失败: {str(e)}")
 
@@ -0,0 +1,356 @@
+"""
+只读工具结果缓存
+
+为声明了 cache_ttl 的只读工具提供:
+- 单飞合并: 相同参数的并发调用只执行一次，其余调用等待同一结果
+- 结果缓存: 有界 LRU（按条目数和估算字节数淘汰）+ TTL，只缓存成功结果
+- 标签失效: 工具声明依赖标签（如 "market_data"、"factor:Momentum_5d"），
+  数据或因子变化时调用 invalidate(tag) 递增标签版本，旧缓存键自然失效
+
+配置 TOOL_CACHE_BACKEND=redis 时，结果与标签版本写入 Redis，多个 Hub 进程共享；
+未配置 TOOL_CACHE_BACKEND 但设置了 REDIS_URL 时默认使用 redis——标签常由其他 Hub 失效
+（如 factor_hub 修改因子后失效 data_hub 排名工具依赖的 "factor:xxx"），只有共享版本才能跨进程生效。
+redis 包未安装或连接失败时退回内存模式（此时失效只作用于当前进程，跨 Hub 的结果最长滞后一个 TTL）。
+
+因子标签统一由 factor_cache_tag() 生成（因子文件名，不含 .py 后缀），FactorStore 失效与
+各 Hub 工具声明的标签使用同一规则。共享层结果使用与工具响应相同的编码（server/serialization.dumps），
+命中共享层与重新执行返回的结果一致。写路径上的 Redis 失效在后台线程中执行，不阻塞调用方。
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from .cache import BoundedCache
+from .tool import ToolResult
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ToolCacheConfig:
+    """工具结果缓存配置"""
+    enabled: bool = True
+    max_entries: int = 2048
+    max_bytes: int = 256 * 1024 * 1024
+    backend: str = "memory"  # memory | redis
+    redis_url: str = "redis://localhost:6379"
+    key_prefix: str = "toolcache"
+
+    @classmethod
+    def from_env(cls) -> "ToolCacheConfig":
+        return cls(
+            enabled=os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true",
+            max_entries=int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "2048")),
+            max_bytes=int(os.getenv("TOOL_CACHE_MAX_MB", "256")) * 1024 * 1024,
+            backend=os.getenv(
+                "TOOL_CACHE_BACKEND", "redis" if os.getenv("REDIS_URL") else "memory"
+            ).lower(),
+            redis_url=os.getenv("REDIS_URL", "redis://localhost:6379"),
+        )
+
+
+def factor_cache_tag(name: str) -> str:
+    """因子依赖标签（因子文件名即引擎因子名，去掉 .py 后缀）"""
+    name = (name or "").strip()
+    if name.endswith(".py"):
+        name = name[:-3]
+    return f"factor:{name}"
+
+
+def make_tool_cache_key(tool_name: str, params: Dict[str, Any], versions: Dict[str, int]) -> str:
+    """
+    生成缓存键
+
+    参数按键排序序列化，标签版本参与哈希，因此标签失效后旧键不再命中。
+    """
+    payload = json.dumps(
+        {"tool": tool_name, "params": params, "versions": versions},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ToolResultCache:
+    """
+    工具结果缓存
+
+    内存层始终启用（LRU + TTL）；Redis 层可选，用于跨进程共享结果与标签版本。
+    """
+
+    def __init__(self, config: Optional[ToolCacheConfig] = None, redis_client: Any = None):
+        """
+        Args:
+            config: 缓存配置，默认从环境变量读取
+            redis_client: 已创建的 redis.asyncio 客户端（测试时可传入 fakeredis）
+        """
+        self.config = config or ToolCacheConfig.from_env()
+        self._entries = BoundedCache(
+            name="tool_results",
+            max_entries=self.config.max_entries,
+            max_bytes=self.config.max_bytes,
+        )
+        self._versions: Dict[str, int] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._redis = redis_client
+        self._redis_checked = redis_client is not None
+        self._sync_redis = None  # invalidate 使用的同步客户端（懒加载，复用连接池）
+        self._sync_redis_checked = False
+        self._invalidator: Optional[ThreadPoolExecutor] = None  # 后台递增共享标签版本（单线程保序）
+        self._pending_invalidation: Optional[Future] = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    # ==================== Redis ====================
+
+    async def _get_redis(self):
+        """懒加载 Redis 客户端，不可用时返回 None"""
+        if self._redis_checked:
+            return self._redis
+        self._redis_checked = True
+        if self.config.backend != "redis":
+            return None
+        try:
+            import redis.asyncio as redis
+            client = redis.from_url(self.config.redis_url, decode_responses=True)
+            await client.ping()
+            self._redis = client
+            logger.info(f"工具结果缓存已连接 Redis: {self.config.redis_url}")
+        except ImportError:
+            logger.warning("redis 包未安装，工具结果缓存使用内存模式")
+        except Exception as e:
+            logger.warning(f"Redis 连接失败，工具结果缓存使用内存模式: {e}")
+        return self._redis
+
+    def _get_sync_redis(self):
+        """懒加载 invalidate 使用的同步 Redis 客户端（只创建一次），redis 包未安装时返回 None"""
+        if self._sync_redis_checked:
+            return self._sync_redis
+        with self._lock:
+            if not self._sync_redis_checked:
+                try:
+                    import redis
+                    self._sync_redis = redis.Redis.from_url(self.config.redis_url, socket_timeout=1.0)
+                except ImportError:
+                    logger.warning("redis 包未安装，工具缓存失效只作用于当前进程")
+                except Exception as e:
+                    logger.warning(f"tool_cache_redis_client_failed: {e}")
+                self._sync_redis_checked = True
+        return self._sync_redis
+
+    def _version_key(self, tag: str) -> str:
+        return f"{self.config.key_prefix}:tag:{tag}"
+
+    def _result_key(self, key: str) -> str:
+        return f"{self.config.key_prefix}:result:{key}"
+
+    async def _tag_versions(self, tags: Iterable[str]) -> Dict[str, int]:
+        tags = sorted(set(tags))
+        if not tags:
+            return {}
+        redis = await self._get_redis()
+        if redis is not None:
+            try:
+                values = await redis.mget([self._version_key(t) for t in tags])
+                return {t: int(v or 0) for t, v in zip(tags, values)}
+            except Exception as e:
+                logger.debug(f"tool_cache_redis_versions_failed: {e}")
+        with self._lock:
+            return {t: self._versions.get(t, 0) for t in tags}
+
+    # ==================== 内存层 ====================
+
+    def _get_local(self, key: str) -> Optional[ToolResult]:
+        return self._entries.get(key)
+
+    def _set_local(self, key: str, result: ToolResult, ttl: float) -> None:
+        self._entries.set(key, result, ttl=ttl)
+
+    async def _get_shared(self, key: str) -> Optional[ToolResult]:
+        redis = await self._get_redis()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.get(self._result_key(key))
+        except Exception as e:
+            logger.debug(f"tool_cache_redis_get_failed: {e}")
+            return None
+        if raw is None:
+            return None
+        return ToolResult.ok(json.loads(raw))
+
+    async def _set_shared(self, key: str, result: ToolResult, ttl: float) -> None:
+        redis = await self._get_redis()
+        if redis is None:
+            return
+        from ..server.serialization import dumps
+
+        try:
+            # 与工具响应同一编码：时间戳、Decimal、numpy/pandas 类型与 NaN 的输出和直接执行一致
+            payload = dumps(result.data)
+            await redis.setex(self._result_key(key), max(1, int(ttl)), payload)
+        except Exception as e:
+            logger.debug(f"tool_cache_redis_set_failed: {e}")
+
+    # ==================== 对外接口 ====================
+
+    async def get_or_execute(
+        self,
+        tool_name: str,
+        params: Dict[str, Any],
+        ttl: float,
+        tags: Iterable[str],
+        executor: Callable[[], Awaitable[ToolResult]],
+    ) -> ToolResult:
+        """
+        读缓存，未命中时执行（并发相同调用合并为一次执行）
+
+        Args:
+            tool_name: 工具名称
+            params: 已校验的工具参数
+            ttl: 缓存有效期（秒）
+            tags: 依赖标签
+            executor: 实际执行工具的协程工厂
+
+        Returns:
+            工具结果；失败结果不缓存
+        """
+        versions = await self._tag_versions(tags)
+        key = make_tool_cache_key(tool_name, params, versions)
+
+        result = self._get_local(key)
+        if result is None:
+            result = await self._get_shared(key)
+            if result is not None:
+                self._set_local(key, result, ttl)
+        if result is not None:
+            self.hits += 1
+            return result
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # shield: 某个等待方被取消时不影响共享执行
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        task = asyncio.ensure_future(self._run(key, ttl, executor))
+        self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _run(
+        self,
+        key: str,
+        ttl: float,
+        executor: Callable[[], Awaitable[ToolResult]],
+    ) -> ToolResult:
+        try:
+            result = await executor()
+            if result.success:
+                self._set_local(key, result, ttl)
+                await self._set_shared(key, result, ttl)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def invalidate(self, *tags: str) -> None:
+        """
+        使依赖指定标签的缓存失效（同步，可在任意线程调用，不阻塞）
+
+        本进程的标签版本立即递增；Redis 模式下共享标签版本在后台线程中递增，
+        其他进程的下一次查询即不再命中旧结果。
+        """
+        if not tags:
+            return
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+            if self.config.backend != "redis":
+                return
+            if self._invalidator is None:
+                self._invalidator = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="tool-cache-invalidate"
+                )
+            self._pending_invalidation = self._invalidator.submit(self._publish_invalidation, tags)
+
+    def _publish_invalidation(self, tags: tuple) -> None:
+        """递增共享标签版本（后台线程，失败只记录日志）"""
+        client = self._get_sync_redis()
+        if client is None:
+            return
+        try:
+            with client.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.incr(self._version_key(tag))
+                pipe.execute()
+        except Exception as e:
+            logger.debug(f"tool_cache_redis_invalidate_failed: {tags}, {e}")
+
+    def flush_invalidations(self, timeout: Optional[float] = None) -> None:
+        """等待已提交的共享失效写入完成（用于测试和进程退出前）"""
+        pending = self._pending_invalidation
+        if pending is not None:
+            pending.result(timeout=timeout)
+
+    @property
+    def evictions(self) -> int:
+        return self._entries.stats.evictions
+
+    def clear(self) -> None:
+        """清空内存层"""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "enabled": self.config.enabled,
+            "backend": "redis" if self._redis is not None else "memory",
+            "entries": len(self._entries),
+            "bytes": self._entries.nbytes,
+            "max_entries": self.config.max_entries,
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
+
+
+# 单例
+_tool_cache: Optional[ToolResultCache] = None
+_tool_cache_lock = threading.Lock()
+
+
+def get_tool_cache() -> ToolResultCache:
+    """获取工具结果缓存单例"""
+    global _tool_cache
+    if _tool_cache is None:
+        with _tool_cache_lock:
+            if _tool_cache is None:
+                _tool_cache = ToolResultCache()
+    return _tool_cache
+
+
+def reset_tool_cache() -> None:
+    """重置工具结果缓存（用于测试）"""
+    global _tool_cache
+    _tool_cache = None
+
+
+def invalidate_tool_cache(*tags: str) -> None:
+    """按标签失效工具结果缓存（失败只记录日志，不影响调用方）"""
+    try:
+        get_tool_cache().invalidate(*tags)
+    except Exception as e:
+        logger.debug(f"tool_cache_invalidate_skipped: {tags}, {e}")
@@ -1,7 +1,7 @@
 """
 数据库抽象层
 
-提供 PostgreSQL 数据库连接、会话管理和查询构建。
+提供 PostgreSQL 数据库连接、共享连接池、会话管理、查询构建、全文检索和混合检索。
 """
 
 from .connection import (
@@ -11,6 +11,15 @@ from .connection import (
     get_async_engine,
     get_sync_engine,
 )
+from .pool import (
+    PoolConfig,
+    PoolTimeoutError,
+    ConnectionPool,
+    AsyncConnectionPool,
+    get_connection_pool,
+    get_pool_stats,
+    close_all_pools,
+)
 from .session import (
     get_session,
     get_async_session,
@@ -21,6 +30,22 @@ from .query_builder import (
     QueryBuilder,
     create_query_builder,
 )
+from .search import (
+    SearchIndexSpec,
+    SearchHit,
+    TextSearchIndex,
+    segment_text,
+    highlight,
+)
+from .hybrid import (
+    VectorIndexSpec,
+    VectorIndex,
+    EmbeddingIndexer,
+    reciprocal_rank_fusion,
+    merge_hits,
+    get_embedding_indexer,
+    reset_embedding_indexer,
+)
 
 __all__ = [
     "DatabaseConfig",
@@ -28,10 +53,29 @@ __all__ = [
     "create_engine_from_config",
     "get_async_engine",
     "get_sync_engine",
+    "PoolConfig",
+    "PoolTimeoutError",
+    "ConnectionPool",
+    "AsyncConnectionPool",
+    "get_connection_pool",
+    "get_pool_stats",
+    "close_all_pools",
     "get_session",
     "get_async_session",
     "SessionDep",
     "AsyncSessionDep",
     "QueryBuilder",
     "create_query_builder",
+    "SearchIndexSpec",
+    "SearchHit",
+    "TextSearchIndex",
+    "segment_text",
+    "highlight",
+    "VectorIndexSpec",
+    "VectorIndex",
+    "EmbeddingIndexer",
+    "reciprocal_rank_fusion",
+    "merge_hits",
+    "get_embedding_indexer",
+    "reset_embedding_indexer",
 ]
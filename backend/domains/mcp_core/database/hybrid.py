@@ -0,0 +1,465 @@
+"""
+向量检索与混合检索
+
+在全文检索（search.py）的基础上为文本型实体补充语义召回:
+- VectorIndex: embedding vector(N) 列 + HNSW 索引（pgvector），运行时只检测列是否存在
+  （DDL 见 docker/compose/init.sql，已有数据库执行 scripts/migrations/vector_indexes.sql）
+- EmbeddingIndexer: 写入后台批量向量化，同一实体的多次写入合并为一次
+- reciprocal_rank_fusion / merge_hits: 文本相关度排名与向量相似度排名按 RRF 融合；
+  融合前按 HYBRID_MIN_SIMILARITY / HYBRID_MIN_TEXT_RANK 丢弃低相关候选
+  （近邻检索总会返回最近的 N 条，无关查询不应因此得到结果）
+
+embedding_model 列记录生成向量所用的模型，切换模型后旧向量不参与检索，
+可通过 VectorIndex.backfill() 重新生成。
+
+使用示例:
+    NOTE_VECTOR_INDEX = VectorIndex(VectorIndexSpec(
+        table="notes",
+        text_sql="coalesce(title, '') || E'\\n' || coalesce(content, '')",
+    ))
+
+    # 写入后
+    NOTE_VECTOR_INDEX.enqueue([note_id], store._cursor)
+
+    # 检索
+    rows = NOTE_VECTOR_INDEX.search(store._cursor, builder, "动量失效", limit=30)
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from .query_builder import QueryBuilder
+from .search import CursorFactory, SearchHit
+
+logger = logging.getLogger(__name__)
+
+# RRF 平滑常数（排名靠后的结果贡献迅速衰减）
+RRF_K = 60
+
+# 融合前的相关度下限：向量候选的余弦相似度、文本候选的 ts_rank
+HYBRID_MIN_SIMILARITY = float(os.getenv("HYBRID_MIN_SIMILARITY", "0.3"))
+HYBRID_MIN_TEXT_RANK = float(os.getenv("HYBRID_MIN_TEXT_RANK", "0"))
+
+# pgvector HNSW 默认 ef_search，召回数超过该值时需调大
+HNSW_DEFAULT_EF_SEARCH = 40
+
+
+def _vector_literal(vector: Sequence[float]) -> str:
+    """转换为 pgvector 文本格式"""
+    return "[" + ",".join(f"{x:.7g}" for x in vector) + "]"
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Hashable]],
+    k: int = RRF_K,
+    weights: Optional[Sequence[float]] = None,
+) -> List[Tuple[Hashable, float]]:
+    """
+    倒数排名融合（RRF）
+
+    score(d) = Σ weight_i / (k + rank_i(d))，rank 从 1 开始。
+    只依赖排名、不依赖各路得分的量纲，适合融合 ts_rank 与余弦相似度。
+
+    Args:
+        rankings: 多路排序结果（每路为按相关度降序的键列表）
+        k: 平滑常数
+        weights: 各路权重，默认均为 1
+
+    Returns:
+        (键, 融合得分) 列表，按得分降序；得分相同时按首次出现顺序
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[Hashable, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, key in enumerate(dict.fromkeys(ranking), start=1):
+            scores[key] = scores.get(key, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def merge_hits(
+    text_hits: List[SearchHit],
+    vector_hits: List[SearchHit],
+    limit: int,
+    key: Callable[[Any], Hashable] = lambda entity: entity.id,
+    k: int = RRF_K,
+    min_similarity: Optional[float] = None,
+    min_text_rank: Optional[float] = None,
+) -> List[SearchHit]:
+    """
+    按 RRF 融合文本检索与向量检索的命中结果
+
+    RRF 只看排名，融合前先按各路得分的下限过滤候选；
+    同一实体优先保留文本命中的高亮片段。
+
+    Args:
+        min_similarity: 向量候选的最低余弦相似度，默认 HYBRID_MIN_SIMILARITY
+        min_text_rank: 文本候选的最低 ts_rank，默认 HYBRID_MIN_TEXT_RANK
+
+    Returns:
+        融合后的命中列表（score 为 RRF 得分）
+    """
+    min_similarity = HYBRID_MIN_SIMILARITY if min_similarity is None else min_similarity
+    min_text_rank = HYBRID_MIN_TEXT_RANK if min_text_rank is None else min_text_rank
+    text_hits = [h for h in text_hits if h.score >= min_text_rank]
+    vector_hits = [h for h in vector_hits if h.score >= min_similarity]
+
+    by_key: Dict[Hashable, SearchHit] = {}
+    for hit in vector_hits:
+        by_key[key(hit.entity)] = hit
+    for hit in text_hits:
+        by_key[key(hit.entity)] = hit
+
+    fused = reciprocal_rank_fusion(
+        [[key(h.entity) for h in text_hits], [key(h.entity) for h in vector_hits]], k=k
+    )
+    return [
+        SearchHit(entity=by_key[item].entity, score=score, highlights=by_key[item].highlights)
+        for item, score in fused[:limit]
+    ]
+
+
+@dataclass
+class VectorIndexSpec:
+    """
+    表的向量索引定义
+
+    Attributes:
+        table: 表名
+        text_sql: 生成向量化文本的 SQL 表达式
+        id_column: 主键列
+    """
+    table: str
+    text_sql: str
+    id_column: str = "id"
+
+
+# 向量列检测：embedding 列类型（含维度）与 embedding_model 列是否存在
+_PROBE_SQL = """
+SELECT
+    (SELECT format_type(atttypid, atttypmod) FROM pg_attribute
+     WHERE attrelid = to_regclass(%s) AND attname = 'embedding' AND NOT attisdropped) AS embedding_type,
+    EXISTS (SELECT 1 FROM pg_attribute
+            WHERE attrelid = to_regclass(%s) AND attname = 'embedding_model' AND NOT attisdropped) AS has_model
+"""
+
+
+class VectorIndex:
+    """
+    表级向量索引：检测表结构、写入向量、构建近邻查询
+
+    同一进程内只检测一次；向量列不存在或维度与 embedder 不一致时 available 为 False，
+    调用方应退回纯文本检索。
+    """
+
+    def __init__(self, spec: VectorIndexSpec):
+        self.spec = spec
+        self._lock = threading.Lock()
+        self._ensured = False
+        self._cursor_factory: Optional[CursorFactory] = None
+        self.available = False
+
+    def bind(self, cursor_factory: CursorFactory) -> None:
+        """绑定游标工厂（后台线程写入时使用）"""
+        self._cursor_factory = cursor_factory
+
+    def ensure(self, dimensions: int, cursor_factory: Optional[CursorFactory] = None) -> bool:
+        """检测向量列是否存在且维度一致（每个进程只检测一次，不执行 DDL）"""
+        if self._ensured:
+            return self.available
+        cursor_factory = cursor_factory or self._cursor_factory
+        if cursor_factory is None:
+            return False
+        with self._lock:
+            if not self._ensured:
+                self.available = self._probe(cursor_factory, dimensions)
+                self._ensured = True
+        return self.available
+
+    def _probe(self, cursor_factory: CursorFactory, dimensions: int) -> bool:
+        table = self.spec.table
+        try:
+            with cursor_factory() as cursor:
+                cursor.execute(_PROBE_SQL, (table, table))
+                row = cursor.fetchone()
+        except Exception as e:
+            logger.warning(f"vector_index_probe_failed: table={table}, {e}")
+            return False
+
+        expected = f"vector({int(dimensions)})"
+        if row["embedding_type"] == expected and row["has_model"]:
+            return True
+        logger.warning(
+            f"vector_index_unavailable: table={table}, embedding={row['embedding_type']}, "
+            f"expected={expected}, 请执行 scripts/migrations/vector_indexes.sql"
+        )
+        return False
+
+    def reset(self) -> None:
+        """重置检测状态（用于测试或迁移后重新检测）"""
+        with self._lock:
+            self._ensured = False
+            self.available = False
+
+    def enqueue(self, ids: Sequence[Any], cursor_factory: Optional[CursorFactory] = None) -> None:
+        """提交后台向量化（不阻塞写入路径）"""
+        if cursor_factory is not None:
+            self.bind(cursor_factory)
+        ids = [i for i in ids if i is not None]
+        if ids:
+            get_embedding_indexer().enqueue(self, ids)
+
+    # ==================== 读写 ====================
+
+    def fetch_texts(self, ids: Sequence[Any]) -> List[Tuple[Any, str]]:
+        """读取待向量化文本"""
+        spec = self.spec
+        with self._cursor_factory() as cursor:
+            cursor.execute(
+                f"SELECT {spec.id_column} AS id, {spec.text_sql} AS text "
+                f"FROM {spec.table} WHERE {spec.id_column} = ANY(%s)",
+                (list(ids),),
+            )
+            return [(row["id"], row["text"] or "") for row in cursor.fetchall()]
+
+    def write(self, vectors: Sequence[Tuple[Any, Sequence[float]]], model_name: str) -> int:
+        """批量写入向量（单条 UPDATE ... FROM VALUES）"""
+        if not vectors:
+            return 0
+        from psycopg2.extras import execute_values
+
+        spec = self.spec
+        with self._cursor_factory() as cursor:
+            execute_values(
+                cursor,
+                f"UPDATE {spec.table} AS t SET embedding = v.embedding::vector, "
+                f"embedding_model = v.model FROM (VALUES %s) AS v(id, embedding, model) "
+                f"WHERE t.{spec.id_column} = v.id",
+                [(item_id, _vector_literal(vector), model_name) for item_id, vector in vectors],
+                page_size=len(vectors),
+            )
+            return cursor.rowcount
+
+    def pending_ids(self, model_name: str, limit: int = 500) -> List[Any]:
+        """缺少向量或向量由其他模型生成的记录"""
+        spec = self.spec
+        with self._cursor_factory() as cursor:
+            cursor.execute(
+                f"SELECT {spec.id_column} AS id FROM {spec.table} "
+                f"WHERE embedding IS NULL OR embedding_model IS DISTINCT FROM %s "
+                f"ORDER BY {spec.id_column} LIMIT %s",
+                (model_name, limit),
+            )
+            return [row["id"] for row in cursor.fetchall()]
+
+    def backfill(self, cursor_factory: CursorFactory, batch_size: int = 100, max_rows: int = 10000) -> int:
+        """
+        同步补齐存量向量（首次启用或切换模型后执行）
+
+        Returns:
+            写入的向量数
+        """
+        from domains.mcp_core.llm.embedding import get_embedder
+
+        self.bind(cursor_factory)
+        embedder = get_embedder()
+        if not self.ensure(embedder.dimensions):
+            return 0
+
+        written = 0
+        while written < max_rows:
+            ids = self.pending_ids(embedder.model_name, limit=batch_size)
+            if not ids:
+                break
+            rows = self.fetch_texts(ids)
+            vectors = embedder.embed([text for _, text in rows])
+            count = self.write(list(zip([i for i, _ in rows], vectors)), embedder.model_name)
+            written += count
+            if not count or len(ids) < batch_size:
+                break
+        logger.info(f"vector_backfill_done: table={self.spec.table}, rows={written}")
+        return written
+
+    def search(
+        self,
+        cursor_factory: CursorFactory,
+        builder: QueryBuilder,
+        query_text: str,
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        近邻检索：在 builder 已有筛选条件上按余弦距离排序（走 HNSW 索引）
+
+        结果行附带 similarity 列（1 - 余弦距离）。向量不可用或查询向量化失败时返回空列表。
+        """
+        from domains.mcp_core.llm.embedding import get_embedder
+
+        self.bind(cursor_factory)
+        try:
+            embedder = get_embedder()
+            if not self.ensure(embedder.dimensions):
+                return []
+            literal = _vector_literal(embedder.embed_query(query_text))
+        except Exception as e:
+            logger.warning(f"vector_search_skipped: table={self.spec.table}, {e}")
+            return []
+
+        builder.where_raw("embedding IS NOT NULL AND embedding_model = %s", [embedder.model_name])
+        builder.add_select("1 - (embedding <=> %s::vector) AS similarity", [literal])
+        builder.order_by_expression("embedding <=> %s::vector", params=[literal])
+        builder.limit(limit)
+        sql, params = builder.build()
+
+        try:
+            with cursor_factory() as cursor:
+                if limit > HNSW_DEFAULT_EF_SEARCH:
+                    cursor.execute("SET LOCAL hnsw.ef_search = %s", (int(limit),))
+                cursor.execute(sql, params)
+                return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.warning(f"vector_search_failed: table={self.spec.table}, {e}")
+            return []
+
+
+class EmbeddingIndexer:
+    """
+    后台向量化队列
+
+    写入路径只提交 ID；后台线程在 flush_interval 内攒批（同一 ID 去重），
+    按表批量读取文本、批量请求向量、单条 SQL 批量写回。
+    失败的批次只记录日志，由 VectorIndex.backfill() 兜底补齐。
+    """
+
+    def __init__(
+        self,
+        embedder_factory: Optional[Callable[[], Any]] = None,
+        batch_size: int = 64,
+        flush_interval: float = 0.2,
+    ):
+        if embedder_factory is None:
+            from domains.mcp_core.llm.embedding import get_embedder
+            embedder_factory = get_embedder
+        self._embedder_factory = embedder_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Tuple[Any, Any]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = {"enqueued": 0, "indexed": 0, "failed": 0, "batches": 0}
+
+    def enqueue(self, index: Any, ids: Sequence[Any]) -> None:
+        """提交待向量化的记录"""
+        self._ensure_thread()
+        for item_id in ids:
+            self._queue.put((index, item_id))
+        with self._stats_lock:
+            self._stats["enqueued"] += len(ids)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """等待队列处理完毕（用于测试和优雅退出）"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """停止后台线程（未处理的记录由 backfill 兜底）"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        return {**self._stats, "pending": self._queue.unfinished_tasks}
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="embedding-indexer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            items = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(items) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            batches: Dict[Any, List[Any]] = {}
+            for index, item_id in items:
+                batches.setdefault(index, [])
+                if item_id not in batches[index]:
+                    batches[index].append(item_id)
+
+            try:
+                for index, ids in batches.items():
+                    self._index_batch(index, ids)
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    def _index_batch(self, index: Any, ids: List[Any]) -> None:
+        try:
+            embedder = self._embedder_factory()
+            if not index.ensure(embedder.dimensions):
+                return
+            rows = index.fetch_texts(ids)
+            if not rows:
+                return
+            vectors = embedder.embed([text for _, text in rows])
+            index.write(list(zip([item_id for item_id, _ in rows], vectors)), embedder.model_name)
+            with self._stats_lock:
+                self._stats["indexed"] += len(rows)
+                self._stats["batches"] += 1
+        except Exception as e:
+            with self._stats_lock:
+                self._stats["failed"] += len(ids)
+            logger.warning(f"embedding_index_failed: ids={ids[:10]}, {e}")
+
+
+# 全局后台向量化队列
+_indexer: Optional[EmbeddingIndexer] = None
+_indexer_lock = threading.Lock()
+
+
+def get_embedding_indexer() -> EmbeddingIndexer:
+    """获取全局后台向量化队列"""
+    global _indexer
+    if _indexer is None:
+        with _indexer_lock:
+            if _indexer is None:
+                _indexer = EmbeddingIndexer()
+    return _indexer
+
+
+def reset_embedding_indexer() -> None:
+    """停止并重置后台向量化队列（用于测试）"""
+    global _indexer
+    with _indexer_lock:
+        if _indexer is not None:
+            _indexer.stop()
+        _indexer = None
@@ -0,0 +1,440 @@
+"""
+共享数据库连接池
+
+为所有存储层提供有界、可复用的 PostgreSQL 连接:
+- ConnectionPool: psycopg2 同步连接池，供 BaseStore 等在 asyncio.to_thread / run_sync 中使用
+- AsyncConnectionPool: asyncpg 异步连接池封装，供异步存储（如 LogStore）使用
+
+特性:
+- 有界: 连接数达到上限后等待归还，超时抛出 PoolTimeoutError，而不是无限新建连接
+- 健康检查: 空闲超过阈值的连接在借出前执行 SELECT 1，失效连接自动丢弃重建
+- 连接回收: 超过最大存活时间的连接归还时关闭
+- 语句超时: 新连接设置 statement_timeout，避免慢查询长期占用连接
+- 指标: 记录借出次数、等待次数、等待耗时、超时次数，见 get_pool_stats()
+
+同一数据库 URL 的所有存储共享一个连接池。
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+import psycopg2
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(RuntimeError):
+    """等待连接超时"""
+
+
+@dataclass
+class PoolConfig:
+    """连接池配置"""
+    max_size: int = 20  # 最大连接数
+    min_size: int = 1  # 最小保留空闲连接数（asyncpg）
+    acquire_timeout: float = 10.0  # 等待可用连接的超时（秒）
+    statement_timeout_ms: int = 60000  # 语句超时（毫秒），0 表示不限制
+    connect_timeout: int = 5  # 建立连接超时（秒）
+    health_check_interval: float = 30.0  # 空闲超过该时长的连接借出前做健康检查（秒）
+    max_lifetime: float = 3600.0  # 连接最大存活时间（秒）
+
+    @classmethod
+    def from_env(cls) -> "PoolConfig":
+        """从环境变量读取配置"""
+        config = cls()
+        if os.getenv("DB_POOL_MAX_SIZE"):
+            config.max_size = int(os.environ["DB_POOL_MAX_SIZE"])
+        if os.getenv("DB_POOL_MIN_SIZE"):
+            config.min_size = int(os.environ["DB_POOL_MIN_SIZE"])
+        if os.getenv("DB_POOL_ACQUIRE_TIMEOUT"):
+            config.acquire_timeout = float(os.environ["DB_POOL_ACQUIRE_TIMEOUT"])
+        if os.getenv("DB_STATEMENT_TIMEOUT_MS"):
+            config.statement_timeout_ms = int(os.environ["DB_STATEMENT_TIMEOUT_MS"])
+        return config
+
+
+@dataclass
+class PoolStats:
+    """连接池指标"""
+    acquisitions: int = 0  # 借出次数
+    waits: int = 0  # 需要等待的借出次数
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+    timeouts: int = 0  # 等待超时次数
+    created: int = 0  # 新建连接数
+    discarded: int = 0  # 因失效/过期丢弃的连接数
+
+    def record_wait(self, wait_ms: float) -> None:
+        self.acquisitions += 1
+        if wait_ms >= 1.0:
+            self.waits += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "acquisitions": self.acquisitions,
+            "waits": self.waits,
+            "avg_wait_ms": round(self.total_wait_ms / self.acquisitions, 3) if self.acquisitions else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 3),
+            "timeouts": self.timeouts,
+            "created": self.created,
+            "discarded": self.discarded,
+        }
+
+
+def _mask_url(url: str) -> str:
+    """隐藏 URL 中的认证信息"""
+    return url.split("@")[-1] if "@" in url else url
+
+
+class ConnectionPool:
+    """
+    psycopg2 有界连接池（线程安全）
+
+    Usage:
+        pool = get_connection_pool(database_url)
+        with pool.connection() as conn:
+            ...
+    """
+
+    def __init__(self, database_url: str, config: Optional[PoolConfig] = None):
+        self.database_url = database_url
+        self.config = config or PoolConfig.from_env()
+        self.stats = PoolStats()
+
+        self._cond = threading.Condition()
+        # 空闲连接: (conn, 创建时间, 最近归还时间)
+        self._idle: Deque[Tuple[Any, float, float]] = deque()
+        self._created_at: Dict[int, float] = {}
+        self._in_use = 0
+        self._closed = False
+
+    # ==================== 借出/归还 ====================
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        借出连接
+
+        Args:
+            timeout: 等待超时（秒），默认使用配置
+
+        Raises:
+            PoolTimeoutError: 超时仍无可用连接
+        """
+        timeout = self.config.acquire_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("连接池已关闭")
+                if self._idle:
+                    conn, created_at, last_used = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._total() < self.config.max_size:
+                    conn = None
+                    self._in_use += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats.timeouts += 1
+                    raise PoolTimeoutError(
+                        f"等待数据库连接超时 ({timeout}s)，连接池已满: max_size={self.config.max_size}"
+                    )
+                self._cond.wait(remaining)
+
+        # 建连和健康检查在锁外进行
+        try:
+            if conn is not None and not self._is_usable(conn, created_at, last_used):
+                self._close_quietly(conn)
+                conn = None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        wait_ms = (time.monotonic() - start) * 1000
+        with self._cond:
+            self.stats.record_wait(wait_ms)
+        return conn
+
+    def release(self, conn, discard: bool = False) -> None:
+        """
+        归还连接
+
+        Args:
+            conn: 连接
+            discard: 是否丢弃（连接异常时）
+        """
+        created_at = self._created_at.get(id(conn), 0.0)
+        expired = time.monotonic() - created_at > self.config.max_lifetime
+        if not discard and not conn.closed:
+            try:
+                # 归还前确保没有未结束的事务
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        if discard or expired or conn.closed:
+            self._close_quietly(conn)
+            conn = None
+
+        with self._cond:
+            self._in_use -= 1
+            if conn is not None and not self._closed:
+                self._idle.append((conn, created_at, time.monotonic()))
+            elif conn is not None:
+                self._close_quietly(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """借出连接的上下文管理器（连接级错误时丢弃连接）"""
+        conn = self.acquire(timeout)
+        discard = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            discard = True
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    # ==================== 状态 ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """连接池状态与指标"""
+        with self._cond:
+            return {
+                "database": _mask_url(self.database_url),
+                "max_size": self.config.max_size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                **self.stats.to_dict(),
+            }
+
+    def close(self) -> None:
+        """关闭所有空闲连接，借出中的连接归还时关闭"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            self._close_quietly(conn)
+
+    # ==================== 内部实现 ====================
+
+    def _total(self) -> int:
+        return self._in_use + len(self._idle)
+
+    def _connect(self):
+        options = None
+        if self.config.statement_timeout_ms:
+            options = f"-c statement_timeout={self.config.statement_timeout_ms}"
+        conn = psycopg2.connect(
+            self.database_url,
+            connect_timeout=self.config.connect_timeout,
+            options=options,
+        )
+        conn.autocommit = False
+        self._created_at[id(conn)] = time.monotonic()
+        with self._cond:
+            self.stats.created += 1
+        return conn
+
+    def _is_usable(self, conn, created_at: float, last_used: float) -> bool:
+        """检查空闲连接是否可用"""
+        if conn.closed:
+            return False
+        now = time.monotonic()
+        if now - created_at > self.config.max_lifetime:
+            return False
+        if now - last_used < self.config.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _close_quietly(self, conn) -> None:
+        self._created_at.pop(id(conn), None)
+        with self._cond:
+            self.stats.discarded += 1
+        try:
+            if not conn.closed:
+                conn.close()
+        except Exception:
+            pass
+
+
+class _TimedAcquire:
+    """asyncpg 借出上下文（兼容 async with 与 await 两种用法），记录等待耗时"""
+
+    def __init__(self, pool: "AsyncConnectionPool", timeout: Optional[float]):
+        self._pool = pool
+        self._timeout = timeout
+        self._conn = None
+
+    async def _acquire(self):
+        start = time.monotonic()
+        try:
+            conn = await self._pool.raw.acquire(timeout=self._timeout)
+        except asyncio.TimeoutError:
+            self._pool.stats.timeouts += 1
+            raise
+        self._pool.stats.record_wait((time.monotonic() - start) * 1000)
+        return conn
+
+    def __await__(self):
+        return self._acquire().__await__()
+
+    async def __aenter__(self):
+        self._conn = await self._acquire()
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._pool.release(self._conn)
+
+
+class AsyncConnectionPool:
+    """
+    asyncpg 连接池封装
+
+    在 asyncpg.Pool 之上统一语句超时配置并记录等待指标。
+
+    Usage:
+        pool = await AsyncConnectionPool.create(database_url)
+        async with pool.acquire() as conn:
+            await conn.fetch(...)
+    """
+
+    def __init__(self, raw_pool, database_url: str, config: PoolConfig):
+        self.raw = raw_pool
+        self.database_url = database_url
+        self.config = config
+        self.stats = PoolStats()
+
+    @classmethod
+    async def create(
+        cls,
+        database_url: str,
+        config: Optional[PoolConfig] = None,
+        **kwargs: Any,
+    ) -> "AsyncConnectionPool":
+        """
+        创建连接池
+
+        Args:
+            database_url: PostgreSQL 连接 URL
+            config: 连接池配置
+            **kwargs: 透传给 asyncpg.create_pool 的参数（如 command_timeout）
+        """
+        import asyncpg
+
+        config = config or PoolConfig.from_env()
+        server_settings = dict(kwargs.pop("server_settings", None) or {})
+        if config.statement_timeout_ms:
+            server_settings.setdefault("statement_timeout", str(config.statement_timeout_ms))
+
+        kwargs.setdefault("min_size", config.min_size)
+        kwargs.setdefault("max_size", config.max_size)
+        kwargs.setdefault("timeout", config.connect_timeout)
+        kwargs.setdefault("max_inactive_connection_lifetime", config.max_lifetime)
+
+        raw_pool = await asyncpg.create_pool(
+            database_url, server_settings=server_settings, **kwargs
+        )
+        pool = cls(raw_pool, database_url, config)
+        _register_async_pool(pool)
+        return pool
+
+    def acquire(self, timeout: Optional[float] = None) -> _TimedAcquire:
+        """借出连接，默认使用配置的等待超时"""
+        return _TimedAcquire(self, self.config.acquire_timeout if timeout is None else timeout)
+
+    async def release(self, conn) -> None:
+        await self.raw.release(conn)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "database": _mask_url(self.database_url),
+            "max_size": self.raw.get_max_size(),
+            "size": self.raw.get_size(),
+            "idle": self.raw.get_idle_size(),
+            **self.stats.to_dict(),
+        }
+
+    async def close(self) -> None:
+        await self.raw.close()
+        _unregister_async_pool(self)
+
+
+# ==================== 全局注册 ====================
+
+_pools: Dict[str, ConnectionPool] = {}
+_async_pools: list = []
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(database_url: str) -> ConnectionPool:
+    """获取指定数据库 URL 的共享同步连接池"""
+    pool = _pools.get(database_url)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(database_url)
+            if pool is None:
+                pool = ConnectionPool(database_url)
+                _pools[database_url] = pool
+                logger.info(
+                    f"创建数据库连接池: {_mask_url(database_url)}, max_size={pool.config.max_size}"
+                )
+    return pool
+
+
+def _register_async_pool(pool: AsyncConnectionPool) -> None:
+    with _pools_lock:
+        _async_pools.append(pool)
+
+
+def _unregister_async_pool(pool: AsyncConnectionPool) -> None:
+    with _pools_lock:
+        if pool in _async_pools:
+            _async_pools.remove(pool)
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """所有连接池的指标"""
+    with _pools_lock:
+        sync_pools = list(_pools.values())
+        async_pools = list(_async_pools)
+    return {
+        "sync": [pool.get_stats() for pool in sync_pools],
+        "async": [pool.get_stats() for pool in async_pools],
+    }
+
+
+def close_all_pools() -> None:
+    """关闭所有同步连接池（进程退出时调用）"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -3,7 +3,8 @@ SQL 查询构建器
 
 提供安全、可组合的 SQL 查询构建功能：
 - WHERE 条件构建（支持比较、空值、包含等）
-- 分页处理
+- 分页处理（可附带 COUNT(*) OVER() 总数）
+- 列投影（可附加计算列，如检索相关度）
 - 排序验证
 - 参数安全
 """
@@ -43,22 +44,74 @@ class QueryBuilder:
 
     # 内部状态
     _select: str = "*"
+    _extra_selects: List[str] = field(default_factory=list)
+    _select_params: List[Any] = field(default_factory=list)
     _where_clauses: List[str] = field(default_factory=list)
     _params: List[Any] = field(default_factory=list)
     _order_by: Optional[str] = None
+    _order_params: List[Any] = field(default_factory=list)
     _limit: Optional[int] = None
     _offset: Optional[int] = None
+    _with_total: bool = False
 
     def __post_init__(self):
         # 确保使用新列表，避免共享状态
+        self._extra_selects = []
+        self._select_params = []
         self._where_clauses = []
         self._params = []
+        self._order_params = []
 
     def select(self, columns: str = "*") -> 'QueryBuilder':
         """设置 SELECT 列"""
         self._select = columns
         return self
 
+    def select_columns(self, columns: Optional[List[str]]) -> 'QueryBuilder':
+        """
+        设置列投影（仅保留白名单内的列，空列表或 None 表示全部列）
+
+        Args:
+            columns: 列名列表
+
+        Returns:
+            self
+        """
+        if not columns:
+            self._select = "*"
+            return self
+        safe = [c for c in dict.fromkeys(columns) if c in self.allowed_columns]
+        invalid = set(columns) - set(safe)
+        if invalid:
+            logger.warning(f"Invalid select columns ignored: {sorted(invalid)}")
+        self._select = ', '.join(safe) if safe else "*"
+        return self
+
+    def add_select(self, expression: str, params: List[Any] = None) -> 'QueryBuilder':
+        """
+        追加计算列（谨慎使用，表达式需由调用方保证安全）
+
+        Args:
+            expression: SQL 表达式，如 "ts_rank(...) AS search_rank"
+            params: 表达式参数
+
+        Returns:
+            self
+        """
+        self._extra_selects.append(expression)
+        if params:
+            self._select_params.extend(params)
+        return self
+
+    def with_total_count(self, enabled: bool = True) -> 'QueryBuilder':
+        """
+        在结果行中附带分页前的总行数（total_count 列，COUNT(*) OVER()）
+
+        避免分页查询再单独执行一次 COUNT。
+        """
+        self._with_total = enabled
+        return self
+
     def where(self, field_name: str, value: Any) -> 'QueryBuilder':
         """
         添加 WHERE 条件
@@ -109,12 +162,13 @@ class QueryBuilder:
             self._params.extend(params)
         return self
 
-    def order_by(self, order: str) -> 'QueryBuilder':
+    def order_by(self, order: str, tiebreaker: Optional[str] = None) -> 'QueryBuilder':
         """
         设置排序
 
         Args:
             order: 排序表达式，如 "llm_score DESC"
+            tiebreaker: 次要排序列（升序），保证分页结果稳定
 
         Returns:
             self
@@ -135,6 +189,33 @@ class QueryBuilder:
             return self
 
         self._order_by = f'{column} {direction}'
+        self._order_params = []
+        if tiebreaker and tiebreaker != column and tiebreaker in self.allowed_columns:
+            self._order_by += f', {tiebreaker} ASC'
+        return self
+
+    def order_by_expression(
+        self,
+        expression: str,
+        tiebreaker: Optional[str] = None,
+        params: List[Any] = None,
+    ) -> 'QueryBuilder':
+        """
+        按原始表达式排序（谨慎使用，如 add_select 追加的别名 "search_rank DESC"，
+        或 "embedding <=> %s::vector" 这类需要直接出现在 ORDER BY 中才能走索引的表达式）
+
+        Args:
+            expression: 排序表达式
+            tiebreaker: 次要排序列（升序）
+            params: 表达式参数
+
+        Returns:
+            self
+        """
+        self._order_by = expression
+        self._order_params = list(params or [])
+        if tiebreaker and tiebreaker in self.allowed_columns:
+            self._order_by += f', {tiebreaker} ASC'
         return self
 
     def paginate(self, page: int = 1, page_size: int = 20) -> 'QueryBuilder':
@@ -169,7 +250,10 @@ class QueryBuilder:
         Returns:
             (sql, params) 元组
         """
-        sql = f'SELECT {self._select} FROM {self.table}'
+        select = ', '.join([self._select, *self._extra_selects])
+        if self._with_total:
+            select += ', COUNT(*) OVER() AS total_count'
+        sql = f'SELECT {select} FROM {self.table}'
 
         if self._where_clauses:
             sql += ' WHERE ' + ' AND '.join(self._where_clauses)
@@ -177,7 +261,9 @@ class QueryBuilder:
         if self._order_by:
             sql += f' ORDER BY {self._order_by}'
 
-        params = list(self._params)
+        params = self._select_params + self._params
+        if self._order_by:
+            params += self._order_params
 
         if self._limit is not None:
             sql += ' LIMIT %s'
@@ -206,11 +292,15 @@ class QueryBuilder:
     def reset(self) -> 'QueryBuilder':
         """重置构建器状态"""
         self._select = "*"
+        self._extra_selects = []
+        self._select_params = []
         self._where_clauses = []
         self._params = []
         self._order_by = None
+        self._order_params = []
         self._limit = None
         self._offset = None
+        self._with_total = False
         return self
 
     def _parse_condition(
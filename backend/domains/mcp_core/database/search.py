@@ -0,0 +1,274 @@
+"""
+全文检索子系统
+
+为笔记、经验、因子等文本型实体提供可走索引的关键词检索：
+- tsvector 生成列 + GIN 索引：中文按单字/二元组切分（search_segment 函数），
+  英文按单词切分，写入时由数据库自动维护，无需各写入路径额外处理
+- pg_trgm GIN 索引：支撑标题/文件名的子串匹配（ILIKE '%kw%'）与相似度排序
+- 相关度排序（ts_rank + similarity）与命中片段高亮
+
+生成列、索引与 search_segment 函数由 docker/compose/init.sql 创建（已有数据库执行
+scripts/migrations/search_indexes.sql），运行时只在首次检索时检查是否存在；
+缺失时降级为原有的 ILIKE 扫描，不影响查询结果的正确性。
+
+使用示例:
+    NOTE_SEARCH = TextSearchIndex(SearchIndexSpec(
+        table="notes",
+        fields=[("title", "A"), ("content", "B")],
+        title_column="title",
+    ))
+
+    builder = store._create_query_builder()
+    NOTE_SEARCH.apply(builder, keyword, store._cursor, rank=True)
+"""
+
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Tuple
+
+from .query_builder import QueryBuilder
+
+logger = logging.getLogger(__name__)
+
+# tsvector 生成列名
+SEARCH_VECTOR_COLUMN = "search_vector"
+
+# 中文/英文切分规则（与数据库端 search_segment 函数保持一致）
+_CJK_CLASS = "㐀-鿿"
+_TOKEN_RE = re.compile(f"([{_CJK_CLASS}]+|[a-z0-9]+)")
+
+# 检测查询失败后的重试间隔（秒），期间按 ILIKE 降级
+_PROBE_RETRY_SECONDS = 30.0
+
+
+def segment_text(text: str, for_query: bool = False) -> List[str]:
+    """
+    切分文本（search_segment 的 Python 实现，用于高亮）
+
+    Args:
+        text: 原始文本
+        for_query: 查询模式（中文只输出二元组）
+
+    Returns:
+        词元列表
+    """
+    tokens: List[str] = []
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        if token[0].isascii() or len(token) == 1:
+            tokens.append(token)
+            continue
+        if not for_query:
+            tokens.extend(token)
+        tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+    return tokens
+
+
+def highlight(
+    text: str,
+    keyword: str,
+    max_length: int = 120,
+    pre_tag: str = "<mark>",
+    post_tag: str = "</mark>",
+) -> str:
+    """
+    生成命中片段：截取首个命中位置附近的文本并标记所有命中词
+
+    Args:
+        text: 原始文本
+        keyword: 搜索关键词
+        max_length: 片段最大长度（不含标记）
+        pre_tag: 命中词前缀标记
+        post_tag: 命中词后缀标记
+
+    Returns:
+        高亮片段，无命中时返回文本开头
+    """
+    if not text:
+        return ""
+
+    # 完整关键词优先，其次是切分后的词元（长词优先，避免短词截断长词）
+    terms = [t for t in keyword.split() if t]
+    terms += segment_text(keyword, for_query=True)
+    terms = sorted(set(t.lower() for t in terms), key=len, reverse=True)
+    if not terms:
+        return text[:max_length]
+
+    pattern = re.compile("|".join(re.escape(t) for t in terms), re.IGNORECASE)
+    first = pattern.search(text)
+    if first is None:
+        return text[:max_length]
+
+    start = max(0, first.start() - max_length // 4)
+    end = min(len(text), start + max_length)
+    start = max(0, min(start, end - max_length))
+    snippet = pattern.sub(lambda m: f"{pre_tag}{m.group(0)}{post_tag}", text[start:end])
+    prefix = "..." if start > 0 else ""
+    suffix = "..." if end < len(text) else ""
+    return f"{prefix}{snippet}{suffix}"
+
+
+@dataclass
+class SearchIndexSpec:
+    """
+    表的检索索引定义
+
+    Attributes:
+        table: 表名
+        fields: (SQL 文本表达式, 权重 A-D) 列表，按权重拼接为 tsvector
+        title_column: 标题列，用于 trigram 子串匹配与相似度加权
+        trigram_columns: 建有 trigram GIN 索引的列（默认仅标题列，DDL 见 init.sql）
+    """
+    table: str
+    fields: List[Tuple[str, str]]
+    title_column: str
+    trigram_columns: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        if not self.trigram_columns:
+            self.trigram_columns = [self.title_column]
+
+
+@dataclass
+class SearchHit:
+    """
+    检索命中结果
+
+    Attributes:
+        entity: 实体对象
+        score: 相关度得分
+        highlights: 字段名 -> 高亮片段
+    """
+    entity: Any
+    score: float = 0.0
+    highlights: Dict[str, str] = field(default_factory=dict)
+
+
+CursorFactory = Callable[[], ContextManager[Any]]
+
+# 检索结构检测：生成列是否存在、pg_trgm 扩展是否安装
+_PROBE_SQL = """
+SELECT
+    EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = %s AND column_name = %s
+    ) AS fulltext,
+    EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') AS trigram
+"""
+
+
+class TextSearchIndex:
+    """
+    表级检索索引：检测索引结构是否就绪并向查询构建器追加检索条件
+
+    同一进程内每张表只检测一次；生成列不存在时记录告警并降级为 ILIKE。
+    检测查询失败（如数据库暂不可用）不记为已检测，降级后间隔 _PROBE_RETRY_SECONDS 重试。
+    """
+
+    def __init__(self, spec: SearchIndexSpec):
+        self.spec = spec
+        self._lock = threading.Lock()
+        self._ensured = False
+        self._retry_at = 0.0  # 检测失败后下次重试的时刻（monotonic）
+        self.fulltext_available = False
+        self.trigram_available = False
+
+    def ensure(self, cursor_factory: CursorFactory) -> None:
+        """检测检索索引结构是否存在（每个进程成功检测一次，不执行 DDL）"""
+        if self._ensured or time.monotonic() < self._retry_at:
+            return
+        with self._lock:
+            if self._ensured or time.monotonic() < self._retry_at:
+                return
+            try:
+                with cursor_factory() as cursor:
+                    cursor.execute(_PROBE_SQL, (self.spec.table, SEARCH_VECTOR_COLUMN))
+                    row = cursor.fetchone()
+                self.fulltext_available = bool(row["fulltext"])
+                self.trigram_available = bool(row["trigram"])
+            except Exception as e:
+                self._retry_at = time.monotonic() + _PROBE_RETRY_SECONDS
+                logger.warning(
+                    f"search_index_probe_failed: table={self.spec.table}, "
+                    f"{_PROBE_RETRY_SECONDS:.0f}s 后重试, {e}"
+                )
+                return
+            if not self.fulltext_available:
+                logger.warning(
+                    f"search_index_unavailable: table={self.spec.table}, "
+                    f"请执行 scripts/migrations/search_indexes.sql"
+                )
+            self._ensured = True
+
+    def reset(self) -> None:
+        """重置检测状态（用于测试或迁移后重新检测）"""
+        with self._lock:
+            self._ensured = False
+            self._retry_at = 0.0
+            self.fulltext_available = False
+            self.trigram_available = False
+
+    def apply(
+        self,
+        builder: QueryBuilder,
+        keyword: str,
+        cursor_factory: Optional[CursorFactory] = None,
+        rank: bool = False,
+    ) -> QueryBuilder:
+        """
+        向查询构建器追加检索条件
+
+        Args:
+            builder: 查询构建器
+            keyword: 搜索关键词
+            cursor_factory: 游标工厂，提供时先检测索引结构
+            rank: 是否按相关度排序（附带 search_rank 列）
+
+        Returns:
+            builder
+        """
+        keyword = (keyword or "").strip()
+        if not keyword:
+            return builder
+        if cursor_factory is not None:
+            self.ensure(cursor_factory)
+
+        clause, params = self.condition(keyword)
+        builder.where_raw(clause, params)
+        if rank:
+            rank_sql, rank_params = self.rank_expression(keyword)
+            builder.add_select(f"{rank_sql} AS search_rank", rank_params)
+            builder.order_by_expression("search_rank DESC")
+        return builder
+
+    def condition(self, keyword: str) -> Tuple[str, List[Any]]:
+        """生成 WHERE 条件：tsvector 匹配 OR 标题子串匹配"""
+        title = self.spec.title_column
+        like = f"%{keyword}%"
+
+        if not self.fulltext_available:
+            # 降级：与改造前一致的 ILIKE 扫描
+            clauses = [f"({expr})::text ILIKE %s" for expr, _ in self.spec.fields]
+            return "(" + " OR ".join(clauses) + ")", [like] * len(clauses)
+
+        # 英文词片段（如 "mom" 之于 "momentum"）无法命中分词结果，由标题子串匹配补足；
+        # 关键词不少于 3 个字符时该分支可走 trigram 索引
+        clause = (
+            f"({SEARCH_VECTOR_COLUMN} @@ plainto_tsquery('simple', search_segment(%s, TRUE))"
+            f" OR {title} ILIKE %s)"
+        )
+        return clause, [keyword, like]
+
+    def rank_expression(self, keyword: str) -> Tuple[str, List[Any]]:
+        """生成相关度表达式"""
+        if not self.fulltext_available:
+            return f"CASE WHEN {self.spec.title_column} ILIKE %s THEN 1.0 ELSE 0.0 END", [f"%{keyword}%"]
+
+        expr = f"ts_rank({SEARCH_VECTOR_COLUMN}, plainto_tsquery('simple', search_segment(%s, TRUE)))"
+        params: List[Any] = [keyword]
+        if self.trigram_available:
+            expr = f"({expr} + similarity({self.spec.title_column}, %s))"
+            params.append(keyword)
+        return expr, params
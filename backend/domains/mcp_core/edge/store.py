@@ -221,8 +221,8 @@ class EdgeStore(ThreadSafeConnectionMixin):
             # 触发每种关系类型的同步
             for relation in affected_relations:
                 try:
-                    from domains.mcp_core.sync.trigger import SyncTrigger
-                    trigger = SyncTrigger.get_instance()
+                    from domains.mcp_core.sync.trigger import get_sync_trigger
+                    trigger = get_sync_trigger()
                     # 构建临时 edge 触发同步
                     temp_edge = KnowledgeEdge(
                         source_type=entity_type,
@@ -397,52 +397,53 @@ class EdgeStore(ThreadSafeConnectionMixin):
             max_depth: 最大追溯深度
 
         Returns:
-            链路列表，每项包含 depth, edge
+            链路列表，每项包含 depth, edge（按深度排序）
+        """
+        if max_depth < 1:
+            return []
+
+        if direction == "backward":
+            # 向上追溯：当前实体是 source，找 target
+            from_cols, to_cols = ("source_type", "source_id"), ("target_type", "target_id")
+        else:
+            # 向下追溯：当前实体是 target，找 source
+            from_cols, to_cols = ("target_type", "target_id"), ("source_type", "source_id")
+
+        # 单条递归 CTE 完成整条链路：
+        # - reached 逐层展开可达实体，UNION 按 (实体, 深度) 去重，环路由深度上限截断
+        # - 每个实体取最小深度后，一次连接取回其全部边
+        # 每层连接都走 (type, id) 复合索引
+        sql = f"""
+            WITH RECURSIVE reached(etype, eid, depth) AS (
+                SELECT %s::varchar, %s::varchar, 0
+                UNION
+                SELECT e.{to_cols[0]}, e.{to_cols[1]}, r.depth + 1
+                FROM reached r
+                JOIN knowledge_edges e
+                  ON e.{from_cols[0]} = r.etype AND e.{from_cols[1]} = r.eid
+                WHERE r.depth < %s - 1
+            ),
+            nodes AS (
+                SELECT etype, eid, MIN(depth) AS depth
+                FROM reached
+                GROUP BY etype, eid
+            )
+            SELECT e.*, n.depth + 1 AS lineage_depth
+            FROM nodes n
+            JOIN knowledge_edges e
+              ON e.{from_cols[0]} = n.etype AND e.{from_cols[1]} = n.eid
+            ORDER BY lineage_depth, e.id
         """
-        visited = set()
-        result = []
-
-        def _trace(etype: str, eid: str, depth: int):
-            if depth > max_depth:
-                return
-            key = f"{etype}:{eid}"
-            if key in visited:
-                return
-            visited.add(key)
-
-            with self._cursor() as cursor:
-                if direction == "backward":
-                    # 向上追溯：当前实体是 source，找 target
-                    cursor.execute(
-                        """
-                        SELECT * FROM knowledge_edges
-                        WHERE source_type = %s AND source_id = %s
-                        """,
-                        (etype, eid),
-                    )
-                else:
-                    # 向下追溯：当前实体是 target，找 source
-                    cursor.execute(
-                        """
-                        SELECT * FROM knowledge_edges
-                        WHERE target_type = %s AND target_id = %s
-                        """,
-                        (etype, eid),
-                    )
-
-                for row in cursor.fetchall():
-                    edge = KnowledgeEdge.from_dict(dict(row))
-                    result.append({"depth": depth, "edge": edge.to_dict()})
-
-                    # 继续追溯
-                    if direction == "backward":
-                        _trace(edge.target_type.value, edge.target_id, depth + 1)
-                    else:
-                        _trace(edge.source_type.value, edge.source_id, depth + 1)
 
         entity_type_value = entity_type.value if isinstance(entity_type, EdgeEntityType) else entity_type
-        _trace(entity_type_value, entity_id, 1)
-        return result
+        with self._cursor() as cursor:
+            cursor.execute(sql, (entity_type_value, entity_id, max_depth))
+            result = []
+            for row in cursor.fetchall():
+                row = dict(row)
+                depth = row.pop("lineage_depth")
+                result.append({"depth": depth, "edge": KnowledgeEdge.from_dict(row).to_dict()})
+            return result
 
     # ==================== 标签管理 ====================
 
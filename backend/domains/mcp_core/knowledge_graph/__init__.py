@@ -6,6 +6,7 @@
 - 实体/关系抽取: EntityExtractor, RelationExtractor, KnowledgeExtractor
 - 图谱存储: KnowledgeGraphStore
 - 图谱查询: KnowledgeGraphQuery
+- 内存邻接快照: GraphSnapshot（度数/邻居/中心性等聚合查询）
 
 使用示例:
     from domains.mcp_core.knowledge_graph import (
@@ -24,8 +25,7 @@
 
     # 2. 存储到图谱
     store = get_kg_store()
-    for triple in triples:
-        store.save_triple(triple)
+    store.save_triples_batch(triples)
 
     # 3. 查询图谱
     query = get_kg_query()
@@ -59,6 +59,15 @@ from .store import (
     get_kg_store,
 )
 
+# 内存快照
+from .snapshot import (
+    GraphSnapshot,
+    GraphSnapshotConfig,
+    GraphSnapshotManager,
+    get_graph_snapshot_manager,
+    reset_graph_snapshot_manager,
+)
+
 # 查询
 from .query import (
     KnowledgeGraphQuery,
@@ -83,6 +92,12 @@ __all__ = [
     # 存储
     "KnowledgeGraphStore",
     "get_kg_store",
+    # 内存快照
+    "GraphSnapshot",
+    "GraphSnapshotConfig",
+    "GraphSnapshotManager",
+    "get_graph_snapshot_manager",
+    "reset_graph_snapshot_manager",
     # 查询
     "KnowledgeGraphQuery",
     "get_kg_query",
@@ -6,12 +6,12 @@
 - get_entity_context: 获取实体上下文（邻居）
 - find_path: 查找两个实体间的路径
 - semantic_search: 语义搜索实体
+- 度数/共同邻居/中心性/关系模式等聚合查询（启用内存快照时不访问 SQL）
 
 继承 KnowledgeGraphStore 的存储能力，增加图遍历查询。
 """
 
 import logging
-from collections import deque
 from typing import Any, Dict, List, Optional, Set, Tuple
 
 from ..base.store import get_store_instance
@@ -23,6 +23,7 @@ from .models import (
     Relation,
     RelationType,
 )
+from .snapshot import GraphSnapshot, GraphSnapshotManager, get_graph_snapshot_manager
 from .store import KnowledgeGraphStore, get_kg_store
 
 logger = logging.getLogger(__name__)
@@ -50,14 +51,33 @@ class KnowledgeGraphQuery:
         results = query.semantic_search("动量因子", limit=10)
     """
 
-    def __init__(self, store: Optional[KnowledgeGraphStore] = None):
+    def __init__(
+        self,
+        store: Optional[KnowledgeGraphStore] = None,
+        snapshot_manager: Optional[GraphSnapshotManager] = None,
+    ):
         """
         初始化查询器
 
         Args:
             store: 图谱存储实例，None 则使用全局单例
+            snapshot_manager: 内存邻接快照，None 且使用全局存储时使用全局快照
+                （KG_SNAPSHOT_ENABLED 未开启时聚合查询走 SQL）
         """
+        if snapshot_manager is None and store is None:
+            snapshot_manager = get_graph_snapshot_manager()
         self.store = store or get_kg_store()
+        self.snapshot_manager = snapshot_manager
+
+    def _snapshot(self) -> Optional[GraphSnapshot]:
+        """获取内存快照，未启用或构建失败时返回 None（回退到 SQL）"""
+        if self.snapshot_manager is None or not self.snapshot_manager.enabled:
+            return None
+        try:
+            return self.snapshot_manager.get()
+        except Exception as e:
+            logger.warning(f"kg_snapshot_unavailable: {e}")
+            return None
 
     # ==================== 图遍历查询 ====================
 
@@ -73,7 +93,8 @@ class KnowledgeGraphQuery:
         """
         获取与指定实体相关的实体
 
-        通过 BFS 遍历图谱，获取指定深度内的所有相关实体。
+        按层 BFS 遍历图谱：每层一次查询展开全部前沿的邻接边，
+        再一次查询批量加载新发现的实体。
 
         Args:
             entity_id: 起始实体 ID
@@ -91,50 +112,35 @@ class KnowledgeGraphQuery:
 
         visited: Set[int] = {entity_id}
         result: List[Entity] = []
-        queue: deque[Tuple[int, int]] = deque([(entity_id, 0)])  # (entity_id, current_depth)
-
-        while queue and len(result) < limit:
-            current_id, current_depth = queue.popleft()
-
-            if current_depth >= depth:
-                continue
-
-            # 获取当前实体的关系
-            relations = self.store.get_relations_by_entity(
-                entity_id=current_id,
-                direction=direction,
-                relation_types=relation_types,
-            )
-
-            for relation in relations:
-                # 确定邻居实体 ID
-                neighbor_id = (
-                    relation.target_id
-                    if relation.source_id == current_id
-                    else relation.source_id
-                )
-
-                if neighbor_id in visited:
-                    continue
-
-                visited.add(neighbor_id)
-
-                # 获取邻居实体
-                neighbor = self.store.get_entity_by_id(neighbor_id)
+        frontier = [entity_id]
+
+        for _ in range(depth):
+            if not frontier:
+                break
+
+            new_ids: List[int] = []
+            for _, _, neighbor_id in self.store.expand_frontier(frontier, direction, relation_types):
+                if neighbor_id not in visited:
+                    visited.add(neighbor_id)
+                    new_ids.append(neighbor_id)
+
+            entities = self.store.get_entities_by_ids(new_ids)
+            frontier = []
+            for neighbor_id in new_ids:
+                neighbor = entities.get(neighbor_id)
                 if not neighbor:
                     continue
 
-                # 类型过滤
+                # 类型过滤（被过滤的实体不再继续遍历）
                 if entity_types and neighbor.entity_type not in entity_types:
                     continue
 
                 result.append(neighbor)
+                if len(result) >= limit:
+                    return result
+                frontier.append(neighbor_id)
 
-                # 继续遍历
-                if current_depth + 1 < depth:
-                    queue.append((neighbor_id, current_depth + 1))
-
-        return result[:limit]
+        return result
 
     def get_entity_context(
         self,
@@ -155,27 +161,32 @@ class KnowledgeGraphQuery:
         if not entity:
             return None
 
-        # 获取入边（指向此实体的关系）
+        # 入边（指向此实体的关系）与出边（从此实体出发的关系）
         incoming_relations = self.store.get_relations_by_entity(
             entity_id=entity_id,
             direction="incoming",
         )
-        incoming: List[Tuple[Relation, Entity]] = []
-        for relation in incoming_relations:
-            source = self.store.get_entity_by_id(relation.source_id)
-            if source:
-                incoming.append((relation, source))
-
-        # 获取出边（从此实体出发的关系）
         outgoing_relations = self.store.get_relations_by_entity(
             entity_id=entity_id,
             direction="outgoing",
         )
-        outgoing: List[Tuple[Relation, Entity]] = []
-        for relation in outgoing_relations:
-            target = self.store.get_entity_by_id(relation.target_id)
-            if target:
-                outgoing.append((relation, target))
+
+        # 一次性加载所有邻居
+        neighbors = self.store.get_entities_by_ids(
+            [r.source_id for r in incoming_relations]
+            + [r.target_id for r in outgoing_relations]
+        )
+
+        incoming: List[Tuple[Relation, Entity]] = [
+            (relation, neighbors[relation.source_id])
+            for relation in incoming_relations
+            if relation.source_id in neighbors
+        ]
+        outgoing: List[Tuple[Relation, Entity]] = [
+            (relation, neighbors[relation.target_id])
+            for relation in outgoing_relations
+            if relation.target_id in neighbors
+        ]
 
         return EntityWithNeighbors(
             entity=entity,
@@ -193,7 +204,9 @@ class KnowledgeGraphQuery:
         """
         查找两个实体之间的最短路径
 
-        使用 BFS 查找最短路径。
+        双向按层 BFS：每轮从较小的一侧前沿扩展一整层（一次查询），
+        两侧相遇即得到最短路径；最后批量加载路径上的实体和关系。
+        查询次数不超过 max_depth + 2，与图的规模无关。
 
         Args:
             source_id: 起始实体 ID
@@ -210,59 +223,41 @@ class KnowledgeGraphQuery:
                 return GraphPath(entities=[entity], relations=[])
             return None
 
-        # BFS 查找路径
-        visited: Set[int] = {source_id}
-        # 队列元素: (current_id, path_entities, path_relations)
-        queue: deque[Tuple[int, List[Entity], List[Relation]]] = deque()
-
-        source_entity = self.store.get_entity_by_id(source_id)
-        if not source_entity:
-            return None
-
-        queue.append((source_id, [source_entity], []))
-
-        while queue:
-            current_id, path_entities, path_relations = queue.popleft()
-
-            if len(path_relations) >= max_depth:
-                continue
-
-            # 获取当前实体的所有关系
-            relations = self.store.get_relations_by_entity(
-                entity_id=current_id,
-                direction="both",
-                relation_types=relation_types,
-            )
-
-            for relation in relations:
-                # 确定邻居实体 ID
-                neighbor_id = (
-                    relation.target_id
-                    if relation.source_id == current_id
-                    else relation.source_id
+        # 实体 ID -> (前驱实体 ID, 关系 ID)，起点为 None
+        parents_from_source: Dict[int, Optional[Tuple[int, int]]] = {source_id: None}
+        parents_from_target: Dict[int, Optional[Tuple[int, int]]] = {target_id: None}
+        source_frontier = [source_id]
+        target_frontier = [target_id]
+        depth = 0
+
+        while source_frontier and target_frontier and depth < max_depth:
+            # 从较小的一侧扩展，控制每层的数据量
+            if len(source_frontier) <= len(target_frontier):
+                source_frontier, meeting = self._expand_level(
+                    source_frontier, parents_from_source, parents_from_target, relation_types
                 )
-
-                if neighbor_id in visited:
-                    continue
-
-                visited.add(neighbor_id)
-
-                neighbor = self.store.get_entity_by_id(neighbor_id)
-                if not neighbor:
-                    continue
-
-                new_entities = path_entities + [neighbor]
-                new_relations = path_relations + [relation]
-
-                # 找到目标
-                if neighbor_id == target_id:
-                    return GraphPath(
-                        entities=new_entities,
-                        relations=new_relations,
-                    )
-
-                # 继续搜索
-                queue.append((neighbor_id, new_entities, new_relations))
+            else:
+                target_frontier, meeting = self._expand_level(
+                    target_frontier, parents_from_target, parents_from_source, relation_types
+                )
+            depth += 1
+
+            if meeting is not None:
+                # source -> meeting 段（逆序回溯）与 meeting -> target 段
+                node_ids = [meeting]
+                relation_ids: List[int] = []
+                step = parents_from_source[meeting]
+                while step is not None:
+                    node_ids.insert(0, step[0])
+                    relation_ids.insert(0, step[1])
+                    step = parents_from_source[step[0]]
+                step = parents_from_target[meeting]
+                while step is not None:
+                    node_ids.append(step[0])
+                    relation_ids.append(step[1])
+                    step = parents_from_target[step[0]]
+                paths = self._hydrate_paths([(node_ids, relation_ids)])
+                return paths[0] if paths else None
 
         return None
 
@@ -277,7 +272,9 @@ class KnowledgeGraphQuery:
         """
         查找两个实体之间的所有路径
 
-        使用 DFS 查找所有路径（限制最大深度和路径数量）。
+        先从目标按层 BFS（每层一次查询）得到到目标的距离与候选子图，
+        再在内存中按路径长度从短到长枚举简单路径，剪掉无法在剩余步数内
+        到达目标的分支；最后批量加载路径上的实体和关系。
 
         Args:
             source_id: 起始实体 ID
@@ -287,65 +284,121 @@ class KnowledgeGraphQuery:
             relation_types: 限制的关系类型
 
         Returns:
-            路径列表
+            路径列表（短路径在前）
         """
-        paths: List[GraphPath] = []
-        source_entity = self.store.get_entity_by_id(source_id)
-        if not source_entity:
-            return paths
-
-        def dfs(
-            current_id: int,
-            visited: Set[int],
-            path_entities: List[Entity],
-            path_relations: List[Relation],
-        ):
-            if len(paths) >= max_paths:
-                return
+        if max_paths <= 0:
+            return []
+        if source_id == target_id:
+            path = self.find_path(source_id, target_id)
+            return [path] if path else []
+
+        # 到目标的距离，以及距离 < max_depth 的实体的全部邻接边：
+        # 任意长度不超过 max_depth 的路径上的边都在其中
+        distance: Dict[int, int] = {target_id: 0}
+        adjacency: Dict[int, List[Tuple[int, int]]] = {}
+        seen_edges: Set[Tuple[int, int]] = set()
+        frontier = [target_id]
+
+        for level in range(1, max_depth + 1):
+            if not frontier:
+                break
+            next_frontier: List[int] = []
+            for relation_id, from_id, to_id in self.store.expand_frontier(frontier, "both", relation_types):
+                for node, neighbor in ((from_id, to_id), (to_id, from_id)):
+                    if (node, relation_id) not in seen_edges:
+                        seen_edges.add((node, relation_id))
+                        adjacency.setdefault(node, []).append((neighbor, relation_id))
+                if to_id not in distance:
+                    distance[to_id] = level
+                    next_frontier.append(to_id)
+            frontier = next_frontier
+
+        if source_id not in distance:
+            return []
 
-            if current_id == target_id:
-                paths.append(GraphPath(
-                    entities=list(path_entities),
-                    relations=list(path_relations),
-                ))
-                return
+        found: List[Tuple[List[int], List[int]]] = []
 
-            if len(path_relations) >= max_depth:
+        def dfs(current_id: int, length: int, node_ids: List[int], relation_ids: List[int]):
+            if len(found) >= max_paths:
                 return
+            if current_id == target_id:
+                if len(relation_ids) == length:
+                    found.append((list(node_ids), list(relation_ids)))
+                return
+            for neighbor_id, relation_id in adjacency.get(current_id, []):
+                if neighbor_id in node_ids:
+                    continue
+                # 剪枝：剩余步数不足以到达目标
+                if len(relation_ids) + 1 + distance.get(neighbor_id, max_depth + 1) > length:
+                    continue
+                node_ids.append(neighbor_id)
+                relation_ids.append(relation_id)
+                dfs(neighbor_id, length, node_ids, relation_ids)
+                node_ids.pop()
+                relation_ids.pop()
 
-            relations = self.store.get_relations_by_entity(
-                entity_id=current_id,
-                direction="both",
-                relation_types=relation_types,
-            )
+        # 逐个长度枚举，保证短路径优先
+        for length in range(distance[source_id], max_depth + 1):
+            dfs(source_id, length, [source_id], [])
+            if len(found) >= max_paths:
+                break
 
-            for relation in relations:
-                neighbor_id = (
-                    relation.target_id
-                    if relation.source_id == current_id
-                    else relation.source_id
-                )
+        return self._hydrate_paths(found[:max_paths])
 
-                if neighbor_id in visited:
-                    continue
+    def _expand_level(
+        self,
+        frontier: List[int],
+        parents: Dict[int, Optional[Tuple[int, int]]],
+        other_parents: Dict[int, Optional[Tuple[int, int]]],
+        relation_types: Optional[List[RelationType]],
+    ) -> Tuple[List[int], Optional[int]]:
+        """
+        双向 BFS 的单侧扩展一层
 
-                neighbor = self.store.get_entity_by_id(neighbor_id)
-                if not neighbor:
-                    continue
+        Returns:
+            (新前沿, 与另一侧相遇的实体 ID 或 None)
+        """
+        next_frontier: List[int] = []
+        meeting: Optional[int] = None
+        for relation_id, from_id, to_id in self.store.expand_frontier(frontier, "both", relation_types):
+            if to_id in parents:
+                continue
+            parents[to_id] = (from_id, relation_id)
+            next_frontier.append(to_id)
+            if meeting is None and to_id in other_parents:
+                meeting = to_id
+        return next_frontier, meeting
 
-                visited.add(neighbor_id)
-                path_entities.append(neighbor)
-                path_relations.append(relation)
+    def _hydrate_paths(
+        self,
+        raw_paths: List[Tuple[List[int], List[int]]],
+    ) -> List[GraphPath]:
+        """
+        批量加载路径上的实体与关系（各一次查询）
 
-                dfs(neighbor_id, visited, path_entities, path_relations)
+        Args:
+            raw_paths: (实体 ID 列表, 关系 ID 列表) 列表
 
-                path_entities.pop()
-                path_relations.pop()
-                visited.remove(neighbor_id)
+        Returns:
+            路径列表，含已删除实体/关系的路径被丢弃
+        """
+        if not raw_paths:
+            return []
 
-        visited = {source_id}
-        dfs(source_id, visited, [source_entity], [])
+        entities = self.store.get_entities_by_ids(
+            [entity_id for node_ids, _ in raw_paths for entity_id in node_ids]
+        )
+        relations = self.store.get_relations_by_ids(
+            [relation_id for _, relation_ids in raw_paths for relation_id in relation_ids]
+        )
 
+        paths: List[GraphPath] = []
+        for node_ids, relation_ids in raw_paths:
+            if all(i in entities for i in node_ids) and all(i in relations for i in relation_ids):
+                paths.append(GraphPath(
+                    entities=[entities[i] for i in node_ids],
+                    relations=[relations[i] for i in relation_ids],
+                ))
         return paths
 
     # ==================== 语义搜索 ====================
@@ -452,6 +505,10 @@ class KnowledgeGraphQuery:
         Returns:
             度数
         """
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return snapshot.degree(entity_id, direction)
+
         relations = self.store.get_relations_by_entity(
             entity_id=entity_id,
             direction=direction,
@@ -473,6 +530,11 @@ class KnowledgeGraphQuery:
         Returns:
             共同邻居实体列表
         """
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            common_ids = snapshot.common_neighbors(entity_id_1, entity_id_2).tolist()
+            return list(self.store.get_entities_by_ids(common_ids).values())
+
         neighbors_1 = set()
         neighbors_2 = set()
 
@@ -494,15 +556,9 @@ class KnowledgeGraphQuery:
             )
             neighbors_2.add(neighbor_id)
 
-        # 找交集
+        # 找交集，批量加载
         common_ids = neighbors_1 & neighbors_2
-        common_entities = []
-        for entity_id in common_ids:
-            entity = self.store.get_entity_by_id(entity_id)
-            if entity:
-                common_entities.append(entity)
-
-        return common_entities
+        return list(self.store.get_entities_by_ids(list(common_ids)).values())
 
     def get_entities_by_relation_pattern(
         self,
@@ -525,6 +581,19 @@ class KnowledgeGraphQuery:
         Returns:
             (源实体, 关系, 目标实体) 三元组列表
         """
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            relation_ids = snapshot.match_pattern(source_type, relation_type, target_type, limit)
+            relations = self.store.get_relations_by_ids(relation_ids)
+            entities = self.store.get_entities_by_ids(
+                [i for r in relations.values() for i in (r.source_id, r.target_id)]
+            )
+            return [
+                (entities[r.source_id], r, entities[r.target_id])
+                for r in (relations.get(i) for i in relation_ids)
+                if r is not None and r.source_id in entities and r.target_id in entities
+            ]
+
         with self.store._cursor() as cursor:
             sql = """
                 SELECT r.*,
@@ -601,6 +670,14 @@ class KnowledgeGraphQuery:
         Returns:
             统计信息字典
         """
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return {
+                "total_entities": snapshot.entity_count,
+                "total_relations": snapshot.relation_count,
+                **snapshot.type_counts(),
+            }
+
         entity_count = self.store.count_entities()
         relation_count = self.store.count_relations()
 
@@ -640,6 +717,12 @@ class KnowledgeGraphQuery:
         Returns:
             (实体, 度数) 元组列表
         """
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            top = snapshot.top_degree(entity_type, limit)
+            entities = self.store.get_entities_by_ids([entity_id for entity_id, _ in top])
+            return [(entities[i], degree) for i, degree in top if i in entities]
+
         with self.store._cursor() as cursor:
             sql = """
                 SELECT e.*,
@@ -666,6 +749,31 @@ class KnowledgeGraphQuery:
 
             return results
 
+    def get_central_entities(
+        self,
+        entity_type: Optional[EntityType] = None,
+        limit: int = 10,
+    ) -> List[Tuple[Entity, float]]:
+        """
+        获取中心性（PageRank）最高的实体
+
+        启用快照时直接使用快照（结果按快照缓存），否则临时加载一次图结构计算。
+
+        Args:
+            entity_type: 限制的实体类型
+            limit: 最大返回数量
+
+        Returns:
+            (实体, PageRank 得分) 元组列表
+        """
+        snapshot = self._snapshot()
+        if snapshot is None:
+            snapshot = GraphSnapshot.from_rows(*self.store.load_graph_rows())
+
+        top = snapshot.pagerank_top(entity_type, limit)
+        entities = self.store.get_entities_by_ids([entity_id for entity_id, _ in top])
+        return [(entities[i], score) for i, score in top if i in entities]
+
 
 # ==================== 单例访问 ====================
 
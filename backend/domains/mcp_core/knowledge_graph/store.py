@@ -15,7 +15,7 @@ import json
 import logging
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from ..base.store import ThreadSafeConnectionMixin, get_store_instance
 
@@ -29,6 +29,28 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# 图遍历覆盖索引：前沿扩展按 source_id / target_id 查邻接边时可走 index-only scan
+# （DDL 见 scripts/migrations/knowledge_graph_indexes.sql，运行时只检测是否存在）
+TRAVERSAL_INDEXES = (
+    "idx_kg_relations_source_traversal",
+    "idx_kg_relations_target_traversal",
+)
+
+# 批量写入的冲突键唯一索引：与 create_entity / create_relation 的查重条件一致
+# （DDL 见 scripts/migrations/knowledge_graph_indexes.sql，运行时只检测是否存在）
+UPSERT_INDEXES = (
+    "uq_kg_entities_type_name",
+    "uq_kg_relations_edge",
+)
+
+# 批量写入单页行数
+BULK_PAGE_SIZE = 500
+
+
+def _enum_value(value: Any) -> Any:
+    """枚举取值（兼容已是字符串的情况）"""
+    return value.value if isinstance(value, (EntityType, RelationType)) else value
+
 
 class KnowledgeGraphStore(ThreadSafeConnectionMixin):
     """
@@ -69,6 +91,11 @@ class KnowledgeGraphStore(ThreadSafeConnectionMixin):
         "created_at",
     }
 
+    # 遍历索引是否已检测（进程级）
+    _traversal_indexes_checked: bool = False
+    # 批量写入唯一索引是否可用（进程级，None 表示未检测）
+    _upsert_available: Optional[bool] = None
+
     def __init__(self, database_url: Optional[str] = None):
         """
         初始化存储
@@ -77,6 +104,7 @@ class KnowledgeGraphStore(ThreadSafeConnectionMixin):
             database_url: PostgreSQL 连接 URL
         """
         self._init_connection(database_url)
+        self._change_listeners: List[Callable[[str], None]] = []
 
     def __enter__(self):
         return self
@@ -84,6 +112,85 @@ class KnowledgeGraphStore(ThreadSafeConnectionMixin):
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
+    # ==================== 变更通知 ====================
+
+    def add_change_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        注册图结构变更监听器（如内存邻接快照）
+
+        Args:
+            listener: 回调，参数为变更类型（insert / update / delete），在事务提交后调用
+        """
+        if listener not in self._change_listeners:
+            self._change_listeners.append(listener)
+
+    def remove_change_listener(self, listener: Callable[[str], None]) -> None:
+        """移除变更监听器"""
+        if listener in self._change_listeners:
+            self._change_listeners.remove(listener)
+
+    def _notify_change(self, kind: str) -> None:
+        """通知监听器（监听器异常不影响写入）"""
+        for listener in list(self._change_listeners):
+            try:
+                listener(kind)
+            except Exception as e:
+                logger.warning(f"kg_change_listener_error: {e}")
+
+    def get_graph_watermark(self) -> Tuple[int, int, int, int]:
+        """
+        获取图结构水位（用于感知其他进程的变更）
+
+        Returns:
+            (实体最大 ID, 实体数, 关系最大 ID, 关系数)
+        """
+        with self._cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT
+                    (SELECT COALESCE(MAX(id), 0) FROM kg_entities) AS entity_max_id,
+                    (SELECT COUNT(*) FROM kg_entities) AS entity_count,
+                    (SELECT COALESCE(MAX(id), 0) FROM kg_relations) AS relation_max_id,
+                    (SELECT COUNT(*) FROM kg_relations) AS relation_count
+                """
+            )
+            row = cursor.fetchone()
+            return (
+                row["entity_max_id"], row["entity_count"],
+                row["relation_max_id"], row["relation_count"],
+            )
+
+    def load_graph_rows(
+        self,
+        after_entity_id: int = 0,
+        after_relation_id: int = 0,
+    ) -> Tuple[List[Tuple[int, str]], List[Tuple[int, str, int, int]]]:
+        """
+        加载图结构（只含 ID 与类型，不含属性）
+
+        Args:
+            after_entity_id: 只加载 ID 大于该值的实体（增量加载）
+            after_relation_id: 只加载 ID 大于该值的关系（增量加载）
+
+        Returns:
+            ([(实体 ID, 实体类型)], [(关系 ID, 关系类型, 源实体 ID, 目标实体 ID)])
+        """
+        with self._cursor() as cursor:
+            cursor.execute(
+                "SELECT id, entity_type FROM kg_entities WHERE id > %s",
+                (after_entity_id,)
+            )
+            entities = [(row["id"], row["entity_type"]) for row in cursor.fetchall()]
+            cursor.execute(
+                "SELECT id, relation_type, source_id, target_id FROM kg_relations WHERE id > %s",
+                (after_relation_id,)
+            )
+            relations = [
+                (row["id"], row["relation_type"], row["source_id"], row["target_id"])
+                for row in cursor.fetchall()
+            ]
+        return entities, relations
+
     # ==================== 实体操作 ====================
 
     def create_entity(self, entity: Entity) -> Entity:
@@ -137,21 +244,88 @@ class KnowledgeGraphStore(ThreadSafeConnectionMixin):
             )
             entity.id = cursor.fetchone()["id"]
 
+        self._notify_change("insert")
         return entity
 
     def create_entities_batch(self, entities: List[Entity]) -> List[Entity]:
         """
         批量创建实体
 
+        单条语句完成：INSERT ... ON CONFLICT (entity_type, name) DO NOTHING 写入新实体，
+        同一语句再查出已存在的同名同类型实体（不改写、不加行锁），与 create_entity 语义一致。
+
         Args:
             entities: 实体列表
 
         Returns:
-            创建后的实体列表
+            创建后的实体列表（与输入一一对应，输入对象的 id 会被回填）
         """
+        if not entities:
+            return []
+        if not self._ensure_upsert_indexes():
+            return [self.create_entity(entity) for entity in entities]
+
+        from psycopg2.extras import execute_values
+
+        now = datetime.now()
+        values: Dict[Tuple[str, str], Tuple[Any, ...]] = {}
+        for entity in entities:
+            key = (_enum_value(entity.entity_type), entity.name)
+            if key not in values:
+                values[key] = (
+                    entity.uuid or str(uuid.uuid4()),
+                    key[0],
+                    entity.name,
+                    json.dumps(entity.properties) if entity.properties else "{}",
+                    entity.source_type,
+                    entity.source_ref,
+                    now,
+                    now,
+                )
+
+        names = sorted(self.entity_columns - {"embedding"})
+        columns = ", ".join(names)
+        with self._cursor() as cursor:
+            # 主查询看到的是语句开始时的快照：inserted 只含新行，JOIN 只含已存在的行
+            rows = execute_values(
+                cursor,
+                f"""
+                WITH input (uuid, entity_type, name, properties, source_type, source_ref, created_at, updated_at)
+                AS (VALUES %s),
+                inserted AS (
+                    INSERT INTO kg_entities
+                    (uuid, entity_type, name, properties, source_type, source_ref, created_at, updated_at)
+                    SELECT uuid, entity_type, name, properties::jsonb, source_type, source_ref,
+                           created_at, updated_at
+                    FROM input
+                    ON CONFLICT (entity_type, name) DO NOTHING
+                    RETURNING {columns}
+                )
+                SELECT {columns} FROM inserted
+                UNION ALL
+                SELECT {", ".join(f"e.{name}" for name in names)}
+                FROM kg_entities e
+                JOIN input i ON e.entity_type = i.entity_type AND e.name = i.name
+                """,
+                list(values.values()),
+                page_size=BULK_PAGE_SIZE,
+                fetch=True,
+            )
+            stored = {
+                (row["entity_type"], row["name"]): self._row_to_entity(dict(row))
+                for row in rows
+            }
+
+        self._notify_change("insert")
+
         results = []
         for entity in entities:
-            created = self.create_entity(entity)
+            key = (_enum_value(entity.entity_type), entity.name)
+            if key not in stored:
+                # 并发写入者在语句快照之后插入了同一实体：逐条查回
+                stored[key] = self.create_entity(entity)
+            created = stored[key]
+            entity.id = created.id
             results.append(created)
         return results
 
@@ -175,6 +349,36 @@ class KnowledgeGraphStore(ThreadSafeConnectionMixin):
                 return self._row_to_entity(dict(row))
         return None
 
+    def get_entities_by_ids(
+        self,
+        entity_ids: List[int],
+        include_embedding: bool = False,
+    ) -> Dict[int, Entity]:
+        """
+        批量获取实体（单次查询）
+
+        Args:
+            entity_ids: 实体 ID 列表
+            include_embedding: 是否加载向量列（图遍历时通常不需要）
+
+        Returns:
+            实体 ID -> 实体对象，不存在的 ID 不出现在结果中
+        """
+        ids = list(dict.fromkeys(entity_ids))
+        if not ids:
+            return {}
+
+        columns = self.entity_columns if include_embedding else self.entity_columns - {"embedding"}
+        with self._cursor() as cursor:
+            cursor.execute(
+                f"SELECT {', '.join(sorted(columns))} FROM kg_entities WHERE id = ANY(%s)",
+                (ids,)
+            )
+            return {
+                row["id"]: self._row_to_entity(dict(row))
+                for row in cursor.fetchall()
+            }
+
     def get_entity_by_uuid(self, entity_uuid: str) -> Optional[Entity]:
         """
         通过 UUID 获取实体
@@ -328,7 +532,11 @@ class KnowledgeGraphStore(ThreadSafeConnectionMixin):
                     entity.id,
                 )
             )
-            return cursor.rowcount > 0
+            updated = cursor.rowcount > 0
+
+        if updated:
+            self._notify_change("update")
+        return updated
 
     def update_entity_embedding(
         self,
@@ -385,7 +593,11 @@ class KnowledgeGraphStore(ThreadSafeConnectionMixin):
                 "DELETE FROM kg_entities WHERE id = %s",
                 (entity_id,)
             )
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+
+        if deleted:
+            self._notify_change("delete")
+        return deleted
 
     def count_entities(
         self,
@@ -467,23 +679,93 @@ class KnowledgeGraphStore(ThreadSafeConnectionMixin):
             )
             relation.id = cursor.fetchone()["id"]
 
+        self._notify_change("insert")
         return relation
 
     def create_relations_batch(self, relations: List[Relation]) -> List[Relation]:
         """
         批量创建关系
 
+        单条语句完成：INSERT ... ON CONFLICT (source_id, target_id, relation_type) DO NOTHING
+        写入新关系，同一语句再查出已存在的关系（不改写、不加行锁），仅回填 id，与 create_relation 语义一致。
+        未提供 source_uuid / target_uuid 时在同一语句中按实体 ID 补齐。
+
         Args:
             relations: 关系列表
 
         Returns:
             创建后的关系列表
         """
-        results = []
+        if not relations:
+            return []
+        if not self._ensure_upsert_indexes():
+            return [self.create_relation(relation) for relation in relations]
+
+        from psycopg2.extras import execute_values
+
+        now = datetime.now()
+        values: Dict[Tuple[int, int, str], Tuple[Any, ...]] = {}
         for relation in relations:
-            created = self.create_relation(relation)
-            results.append(created)
-        return results
+            relation.created_at = relation.created_at or now
+            key = (relation.source_id, relation.target_id, _enum_value(relation.relation_type))
+            if key not in values:
+                values[key] = (
+                    key[2],
+                    relation.source_id,
+                    relation.target_id,
+                    relation.source_uuid,
+                    relation.target_uuid,
+                    json.dumps(relation.properties) if relation.properties else "{}",
+                    relation.weight,
+                    relation.created_at,
+                )
+
+        with self._cursor() as cursor:
+            rows = execute_values(
+                cursor,
+                """
+                WITH input (relation_type, source_id, target_id, source_uuid, target_uuid, properties, weight, created_at)
+                AS (VALUES %s),
+                inserted AS (
+                    INSERT INTO kg_relations
+                    (relation_type, source_id, target_id, source_uuid, target_uuid, properties, weight, created_at)
+                    SELECT i.relation_type, i.source_id, i.target_id,
+                           COALESCE(i.source_uuid, s.uuid), COALESCE(i.target_uuid, t.uuid),
+                           i.properties::jsonb, i.weight, i.created_at
+                    FROM input i
+                    LEFT JOIN kg_entities s ON s.id = i.source_id
+                    LEFT JOIN kg_entities t ON t.id = i.target_id
+                    ON CONFLICT (source_id, target_id, relation_type) DO NOTHING
+                    RETURNING id, source_id, target_id, relation_type, source_uuid, target_uuid
+                )
+                SELECT id, source_id, target_id, relation_type, source_uuid, target_uuid FROM inserted
+                UNION ALL
+                SELECT r.id, r.source_id, r.target_id, r.relation_type, r.source_uuid, r.target_uuid
+                FROM kg_relations r
+                JOIN input i ON r.source_id = i.source_id AND r.target_id = i.target_id
+                    AND r.relation_type = i.relation_type
+                """,
+                list(values.values()),
+                page_size=BULK_PAGE_SIZE,
+                fetch=True,
+            )
+            stored = {
+                (row["source_id"], row["target_id"], row["relation_type"]): row
+                for row in rows
+            }
+
+        self._notify_change("insert")
+
+        for relation in relations:
+            row = stored.get((relation.source_id, relation.target_id, _enum_value(relation.relation_type)))
+            if row is None:
+                # 并发写入者在语句快照之后插入了同一关系：逐条查回
+                self.create_relation(relation)
+                continue
+            relation.id = row["id"]
+            relation.source_uuid = relation.source_uuid or row["source_uuid"]
+            relation.target_uuid = relation.target_uuid or row["target_uuid"]
+        return relations
 
     def get_relation_by_id(self, relation_id: int) -> Optional[Relation]:
         """
@@ -576,6 +858,132 @@ class KnowledgeGraphStore(ThreadSafeConnectionMixin):
             )
             return [self._row_to_relation(dict(row)) for row in cursor.fetchall()]
 
+    def get_relations_by_ids(self, relation_ids: List[int]) -> Dict[int, Relation]:
+        """
+        批量获取关系（单次查询）
+
+        Args:
+            relation_ids: 关系 ID 列表
+
+        Returns:
+            关系 ID -> 关系对象
+        """
+        ids = list(dict.fromkeys(relation_ids))
+        if not ids:
+            return {}
+
+        with self._cursor() as cursor:
+            cursor.execute(
+                "SELECT * FROM kg_relations WHERE id = ANY(%s)",
+                (ids,)
+            )
+            return {
+                row["id"]: self._row_to_relation(dict(row))
+                for row in cursor.fetchall()
+            }
+
+    def expand_frontier(
+        self,
+        entity_ids: List[int],
+        direction: str = "both",
+        relation_types: Optional[List[RelationType]] = None,
+    ) -> List[Tuple[int, int, int]]:
+        """
+        批量展开一层邻居（图遍历的单层前沿扩展）
+
+        一次查询取回前沿上所有实体的邻接边，只返回 ID，不加载属性；
+        source_id / target_id 两个方向分别走各自的索引。
+
+        Args:
+            entity_ids: 前沿实体 ID 列表
+            direction: 方向（outgoing: 出边, incoming: 入边, both: 双向）
+            relation_types: 限制的关系类型
+
+        Returns:
+            (关系 ID, 前沿实体 ID, 邻居实体 ID) 列表，按关系 ID 倒序（新关系在前）
+        """
+        ids = list(dict.fromkeys(entity_ids))
+        if not ids:
+            return []
+
+        self._ensure_traversal_indexes()
+
+        type_filter = ""
+        type_params: List[Any] = []
+        if relation_types:
+            type_filter = " AND relation_type = ANY(%s)"
+            type_params = [[t.value for t in relation_types]]
+
+        parts = []
+        params: List[Any] = []
+        if direction in ("outgoing", "both"):
+            parts.append(
+                "SELECT id, source_id AS from_id, target_id AS to_id "
+                f"FROM kg_relations WHERE source_id = ANY(%s){type_filter}"
+            )
+            params += [ids] + type_params
+        if direction in ("incoming", "both"):
+            parts.append(
+                "SELECT id, target_id AS from_id, source_id AS to_id "
+                f"FROM kg_relations WHERE target_id = ANY(%s){type_filter}"
+            )
+            params += [ids] + type_params
+
+        with self._cursor() as cursor:
+            cursor.execute(" UNION ALL ".join(parts) + " ORDER BY id DESC", params)
+            return [
+                (row["id"], row["from_id"], row["to_id"])
+                for row in cursor.fetchall()
+            ]
+
+    def _ensure_upsert_indexes(self) -> bool:
+        """
+        检测批量写入所需的唯一索引（每个进程只检测一次，不执行 DDL）
+
+        索引不存在（未执行迁移，或已有重复数据导致无法创建）时返回 False，批量写入回退为逐条写入。
+        """
+        if KnowledgeGraphStore._upsert_available is None:
+            try:
+                missing = self._missing_indexes(UPSERT_INDEXES)
+            except Exception as e:
+                logger.warning(f"kg_upsert_index_probe_failed, falling back to row-by-row writes: {e}")
+                missing = list(UPSERT_INDEXES)
+            else:
+                if missing:
+                    logger.warning(
+                        f"kg_upsert_index_missing: {missing}, falling back to row-by-row writes, "
+                        f"请执行 scripts/migrations/knowledge_graph_indexes.sql"
+                    )
+            KnowledgeGraphStore._upsert_available = not missing
+        return KnowledgeGraphStore._upsert_available
+
+    def _missing_indexes(self, names: Tuple[str, ...]) -> List[str]:
+        """返回不存在的索引名（只查询系统目录，不执行 DDL）"""
+        with self._cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname FROM pg_indexes "
+                "WHERE schemaname = current_schema() AND indexname = ANY(%s)",
+                (list(names),),
+            )
+            existing = {row["indexname"] for row in cursor.fetchall()}
+        return [name for name in names if name not in existing]
+
+    def _ensure_traversal_indexes(self) -> None:
+        """检测图遍历所需的覆盖索引（每个进程只检测一次，缺失仅告警）"""
+        if KnowledgeGraphStore._traversal_indexes_checked:
+            return
+        KnowledgeGraphStore._traversal_indexes_checked = True
+        try:
+            missing = self._missing_indexes(TRAVERSAL_INDEXES)
+        except Exception as e:
+            logger.warning(f"kg_traversal_index_probe_failed: {e}")
+            return
+        if missing:
+            logger.warning(
+                f"kg_traversal_index_missing: {missing}, "
+                f"请执行 scripts/migrations/knowledge_graph_indexes.sql"
+            )
+
     def update_relation(self, relation: Relation) -> bool:
         """
         更新关系
@@ -606,7 +1014,11 @@ class KnowledgeGraphStore(ThreadSafeConnectionMixin):
                     relation.id,
                 )
             )
-            return cursor.rowcount > 0
+            updated = cursor.rowcount > 0
+
+        if updated:
+            self._notify_change("update")
+        return updated
 
     def delete_relation(self, relation_id: int) -> bool:
         """
@@ -623,7 +1035,11 @@ class KnowledgeGraphStore(ThreadSafeConnectionMixin):
                 "DELETE FROM kg_relations WHERE id = %s",
                 (relation_id,)
             )
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+
+        if deleted:
+            self._notify_change("delete")
+        return deleted
 
     def count_relations(
         self,
@@ -703,17 +1119,51 @@ class KnowledgeGraphStore(ThreadSafeConnectionMixin):
         """
         批量保存三元组
 
+        一次批量写入解析全部主语/宾语实体，再一次批量写入全部关系，
+        往返次数与三元组数量无关。
+
         Args:
             triples: 三元组列表
 
         Returns:
             (主语实体, 宾语实体, 关系) 列表
         """
-        results = []
-        for triple in triples:
-            result = self.save_triple(triple)
-            results.append(result)
-        return results
+        if not triples:
+            return []
+
+        entities = self.create_entities_batch([
+            Entity(entity_type=entity_type, name=name, source_type="llm_extracted")
+            for triple in triples
+            for entity_type, name in (
+                (triple.subject_type, triple.subject),
+                (triple.object_type, triple.object),
+            )
+        ])
+        # 与输入顺序对应：每个三元组占两个位置（主语、宾语）
+        pairs = [(entities[2 * i], entities[2 * i + 1]) for i in range(len(triples))]
+        if any(subject.id is None or obj.id is None for subject, obj in pairs):
+            raise ValueError("无法创建关系: 实体 ID 无效")
+
+        relations = self.create_relations_batch([
+            Relation(
+                relation_type=triple.predicate,
+                source_id=subject.id,
+                target_id=obj.id,
+                source_uuid=subject.uuid,
+                target_uuid=obj.uuid,
+                properties={
+                    "confidence": triple.confidence,
+                    "context": triple.context,
+                },
+                weight=triple.confidence,
+            )
+            for triple, (subject, obj) in zip(triples, pairs)
+        ])
+
+        return [
+            (subject, obj, relation)
+            for (subject, obj), relation in zip(pairs, relations)
+        ]
 
     # ==================== 辅助方法 ====================
 
@@ -5,6 +5,9 @@ LLM 基础设施层
 - 配置驱动的模型管理
 - 自动日志记录（与 observability 集成）
 - 简洁的调用接口
+- 文本向量化（OpenAI 兼容接口 / 本地确定性向量）
+- 可选的响应缓存（LLM_CACHE_ENABLED=true 启用）
+- 按模型共享的自适应限流（RPM/TPM 令牌桶 + AIMD 并发窗口）
 
 这是一个纯技术基础设施模块，不包含业务逻辑。
 业务相关的 Prompt 模板和结果解析应在各业务域中实现。
@@ -34,11 +37,37 @@ from .config import (
     get_llm_settings,
     reload_llm_settings,
 )
+from .cache import (
+    CachedResponse,
+    LLMCacheConfig,
+    LLMResponseCache,
+    MemoryLLMCache,
+    SQLiteLLMCache,
+    create_llm_cache,
+    get_llm_cache,
+    reset_llm_cache,
+)
+from .limiter import (
+    LLMRateLimiter,
+    ModelRateLimiter,
+    RateLimitConfig,
+    get_rate_limiter,
+    reset_rate_limiter,
+)
 from .client import (
     LLMClient,
     get_llm_client,
     reset_llm_client,
 )
+from .embedding import (
+    EmbeddingConfig,
+    Embedder,
+    HashingEmbedder,
+    OpenAIEmbedder,
+    create_embedder,
+    get_embedder,
+    reset_embedder,
+)
 
 __all__ = [
     # Config
@@ -46,8 +75,31 @@ __all__ = [
     "ModelConfig",
     "get_llm_settings",
     "reload_llm_settings",
+    # Cache
+    "CachedResponse",
+    "LLMCacheConfig",
+    "LLMResponseCache",
+    "MemoryLLMCache",
+    "SQLiteLLMCache",
+    "create_llm_cache",
+    "get_llm_cache",
+    "reset_llm_cache",
+    # Rate limit
+    "LLMRateLimiter",
+    "ModelRateLimiter",
+    "RateLimitConfig",
+    "get_rate_limiter",
+    "reset_rate_limiter",
     # Client
     "LLMClient",
     "get_llm_client",
     "reset_llm_client",
+    # Embedding
+    "EmbeddingConfig",
+    "Embedder",
+    "HashingEmbedder",
+    "OpenAIEmbedder",
+    "create_embedder",
+    "get_embedder",
+    "reset_embedder",
 ]
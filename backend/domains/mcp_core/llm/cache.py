@@ -0,0 +1,328 @@
+"""
+LLM 响应缓存
+
+按请求内容寻址：键为 (模型, 端点, 温度, max_tokens, extra_body, 消息) 的 SHA-256，
+相同请求（如重跑填充/审核流水线时的相同因子代码 + 相同模板）直接返回缓存结果。
+
+后端:
+- sqlite: 本地文件，跨进程、跨重启复用（默认）
+- memory: 进程内 LRU，用于测试和短生命周期脚本
+
+缓存默认关闭，通过环境变量启用:
+- LLM_CACHE_ENABLED: 是否启用（默认 false）
+- LLM_CACHE_BACKEND: sqlite / memory
+- LLM_CACHE_PATH: sqlite 文件路径（默认 private/cache/llm_cache.sqlite3）
+- LLM_CACHE_TTL: 过期时间（秒，默认 7 天，0 表示不过期）
+- LLM_CACHE_MAX_ENTRIES: 最大条目数，超出时淘汰最久未访问的条目
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LLMCacheConfig:
+    """LLM 响应缓存配置"""
+    enabled: bool = False
+    backend: str = "sqlite"
+    path: Optional[Path] = None
+    ttl: float = 7 * 24 * 3600  # 秒，0 表示不过期
+    max_entries: int = 50000
+
+    @classmethod
+    def from_env(cls) -> "LLMCacheConfig":
+        """从环境变量加载配置"""
+        config = cls()
+        config.enabled = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+        config.backend = os.getenv("LLM_CACHE_BACKEND", config.backend).lower()
+        if os.getenv("LLM_CACHE_PATH"):
+            config.path = Path(os.environ["LLM_CACHE_PATH"])
+        if os.getenv("LLM_CACHE_TTL"):
+            config.ttl = float(os.environ["LLM_CACHE_TTL"])
+        if os.getenv("LLM_CACHE_MAX_ENTRIES"):
+            config.max_entries = int(os.environ["LLM_CACHE_MAX_ENTRIES"])
+        return config
+
+
+@dataclass
+class CachedResponse:
+    """缓存的 LLM 响应"""
+    chunks: List[str]  # 流式调用时为各增量片段，普通调用时为单个完整内容
+    finish_reason: str = ""
+    usage: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def content(self) -> str:
+        return "".join(self.chunks)
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"chunks": self.chunks, "finish_reason": self.finish_reason, "usage": self.usage},
+            ensure_ascii=False,
+        )
+
+    @classmethod
+    def from_json(cls, payload: str) -> "CachedResponse":
+        data = json.loads(payload)
+        return cls(
+            chunks=data.get("chunks", []),
+            finish_reason=data.get("finish_reason", ""),
+            usage=data.get("usage", {}),
+        )
+
+
+def make_cache_key(config: Dict[str, Any], messages: List[Dict[str, str]]) -> str:
+    """
+    计算请求的缓存键
+
+    Args:
+        config: LLMSettings.resolve_config() 的结果
+        messages: 消息列表
+    """
+    payload = {
+        "model": config.get("model"),
+        "provider": config.get("provider"),
+        "api_url": config.get("api_url"),
+        "temperature": config.get("temperature"),
+        "max_tokens": config.get("max_tokens"),
+        "extra_body": config.get("extra_body"),
+        "messages": [
+            {"role": m.get("role", "user"), "content": m.get("content", "")}
+            for m in messages
+        ],
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache(ABC):
+    """响应缓存基类"""
+
+    def __init__(self, config: LLMCacheConfig):
+        self.config = config
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """读取缓存；后端出错（如 SQLite "database is locked"）时按未命中处理"""
+        try:
+            entry = self._get(key)
+        except Exception as e:
+            logger.warning(f"llm_cache_get_error: {e}")
+            entry = None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        try:
+            self._set(key, entry)
+        except Exception as e:
+            logger.warning(f"llm_cache_set_error: {e}")
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[CachedResponse]:
+        """读取条目，不存在或已过期返回 None"""
+
+    @abstractmethod
+    def _set(self, key: str, entry: CachedResponse) -> None:
+        """写入条目"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """清空缓存"""
+
+    @abstractmethod
+    def size(self) -> int:
+        """当前条目数"""
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": self.config.backend,
+            "entries": self.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def _expired(self, created_at: float) -> bool:
+        return self.config.ttl > 0 and time.time() - created_at > self.config.ttl
+
+
+class MemoryLLMCache(LLMResponseCache):
+    """进程内 LRU 缓存"""
+
+    def __init__(self, config: LLMCacheConfig):
+        super().__init__(config)
+        self._entries: "OrderedDict[str, tuple[float, CachedResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if self._expired(item[0]):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return item[1]
+
+    def _set(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.config.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteLLMCache(LLMResponseCache):
+    """
+    本地 SQLite 缓存
+
+    每个线程独立连接；WAL 模式允许多进程并发读写。
+    超出容量时按最近访问时间淘汰，淘汰按批进行以摊薄开销。
+    """
+
+    # 每写入多少条检查一次容量
+    EVICT_EVERY = 100
+
+    def __init__(self, config: LLMCacheConfig):
+        super().__init__(config)
+        if config.path is None:
+            from domains.mcp_core.paths import get_data_dir
+            config.path = get_data_dir() / "cache" / "llm_cache.sqlite3"
+        self.path = config.path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._writes = 0
+        with self._conn() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache(accessed_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key: str) -> Optional[CachedResponse]:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if self._expired(row[1]):
+            with conn:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            return None
+        with conn:
+            conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return CachedResponse.from_json(row[0])
+
+    def _set(self, key: str, entry: CachedResponse) -> None:
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, entry.to_json(), now, now),
+            )
+        self._writes += 1
+        if self._writes % self.EVICT_EVERY == 0:
+            self._evict()
+
+    def _evict(self) -> None:
+        """删除过期条目，并淘汰超出容量的最久未访问条目"""
+        conn = self._conn()
+        with conn:
+            if self.config.ttl > 0:
+                conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.config.ttl,))
+            conn.execute(
+                """
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.config.max_entries,),
+            )
+
+    def clear(self) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def size(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+def create_llm_cache(config: Optional[LLMCacheConfig] = None) -> Optional[LLMResponseCache]:
+    """按配置创建响应缓存，未启用时返回 None"""
+    config = config or LLMCacheConfig.from_env()
+    if not config.enabled:
+        return None
+    if config.backend == "memory":
+        return MemoryLLMCache(config)
+    if config.backend == "sqlite":
+        return SQLiteLLMCache(config)
+    raise ValueError(f"不支持的 LLM 缓存后端: {config.backend}")
+
+
+# 全局缓存实例
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_loaded = False
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """获取全局响应缓存（未启用时返回 None）"""
+    global _llm_cache, _llm_cache_loaded
+    if not _llm_cache_loaded:
+        try:
+            _llm_cache = create_llm_cache()
+        except Exception as e:
+            logger.warning(f"llm_cache_init_error: {e}")
+            _llm_cache = None
+        _llm_cache_loaded = True
+    return _llm_cache
+
+
+def reset_llm_cache() -> None:
+    """重置全局响应缓存（用于配置变更后）"""
+    global _llm_cache, _llm_cache_loaded
+    _llm_cache = None
+    _llm_cache_loaded = False
@@ -5,6 +5,8 @@ LLM 客户端
 这是一个纯技术封装，不包含业务逻辑。
 """
 
+import asyncio
+import logging
 import time
 from typing import Any, AsyncIterator, Dict, List, Optional
 
@@ -17,12 +19,25 @@ from langchain_core.messages import (
     HumanMessage,
     SystemMessage,
     AIMessage,
+    AIMessageChunk,
 )
 
+from .cache import CachedResponse, LLMResponseCache, get_llm_cache, make_cache_key
 from .compatible import ChatOpenAICompatible
 from .config import get_llm_settings, LLMSettings
+from .limiter import (
+    LLMRateLimiter,
+    ModelRateLimiter,
+    estimate_tokens,
+    get_rate_limiter,
+    is_rate_limit_error,
+    is_transient_error,
+    retry_after_seconds,
+)
 from ..observability.llm_logger import get_llm_logger
 
+logger = logging.getLogger(__name__)
+
 try:
     from curl_cffi.requests import AsyncSession as CurlAsyncSession
     from curl_cffi import requests as curl_requests
@@ -86,12 +101,17 @@ class LLMClient:
     - 配置驱动的模型选择
     - 自动日志记录
     - 运行时参数覆盖
+    - 可选的响应缓存（相同请求直接返回缓存结果，见 cache.py）
+    - 按模型共享的自适应限流与 429 退避重试（见 limiter.py）
+    - 合并同时进行的相同异步请求（只向供应商发起一次调用）
     """
 
     def __init__(
         self,
         settings: Optional[LLMSettings] = None,
         model_key: Optional[str] = None,
+        cache: Optional[LLMResponseCache] = None,
+        rate_limiter: Optional[LLMRateLimiter] = None,
     ):
         """
         初始化 LLM 客户端
@@ -99,10 +119,16 @@ class LLMClient:
         Args:
             settings: LLM 配置，None 则使用全局配置
             model_key: 默认模型 key
+            cache: 响应缓存，None 则使用全局缓存（未启用时不缓存）
+            rate_limiter: 限流器，None 则使用全局限流器
         """
         self.settings = settings or get_llm_settings()
         self.default_model_key = model_key or self.settings.default_model
         self._models: Dict[str, BaseChatModel] = {}
+        self.cache = cache if cache is not None else get_llm_cache()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter()
+        # 进行中的异步请求: (事件循环 id, 请求键) -> 供应商调用任务
+        self._inflight: Dict[tuple, asyncio.Task] = {}
 
     @staticmethod
     def _build_transport_clients(http_transport: str) -> Dict[str, Any]:
@@ -161,6 +187,9 @@ class LLMClient:
             timeout=self.settings.timeout,
             extra_body=extra,
         )
+        if self.rate_limiter.config.enabled:
+            # 429 与瞬时错误由限流器统一退避重试，避免 SDK 在限流期间盲目重试
+            kwargs["max_retries"] = 0
 
         kwargs.update(
             self._build_transport_clients(config.get("http_transport", "default"))
@@ -199,6 +228,7 @@ class LLMClient:
         max_tokens: Optional[int] = None,
         caller: str = "",
         purpose: str = "",
+        use_cache: bool = True,
     ) -> str:
         """
         异步调用 LLM
@@ -210,14 +240,61 @@ class LLMClient:
             max_tokens: 最大 token 数
             caller: 调用方标识 (用于日志)
             purpose: 调用目的 (用于日志)
+            use_cache: 是否使用响应缓存（缓存启用时生效）
 
         Returns:
             LLM 响应内容 (str)
         """
+        config = self.settings.resolve_config(model_key, temperature, max_tokens)
+        cache_key = self._cache_key(config, messages, use_cache)
+        if cache_key:
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                logger.debug(f"llm_cache_hit: {caller or '-'} {purpose or '-'}")
+                return cached.content
+
+        if not use_cache or not self.rate_limiter.config.coalesce:
+            return await self._ainvoke_provider(
+                config, messages, model_key, temperature, max_tokens, caller, purpose, cache_key,
+            )
+
+        # 合并进行中的相同请求：供应商调用在独立任务中执行，所有调用方（含首个）shield 等待，
+        # 任一调用方被取消都不会中断共享调用或影响其他调用方
+        inflight_key = (id(asyncio.get_running_loop()), cache_key or make_cache_key(config, messages))
+        task = self._inflight.get(inflight_key)
+        if task is not None:
+            logger.debug(f"llm_request_coalesced: {caller or '-'} {purpose or '-'}")
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(self._ainvoke_provider(
+            config, messages, model_key, temperature, max_tokens, caller, purpose, cache_key,
+        ))
+        self._inflight[inflight_key] = task
+        task.add_done_callback(lambda done: self._finish_inflight(inflight_key, done))
+        return await asyncio.shield(task)
+
+    def _finish_inflight(self, inflight_key: tuple, task: asyncio.Task) -> None:
+        """共享调用结束：移除登记，并读取异常（所有调用方都已取消时避免未读取异常的警告）"""
+        if self._inflight.get(inflight_key) is task:
+            del self._inflight[inflight_key]
+        if not task.cancelled():
+            task.exception()
+
+    async def _ainvoke_provider(
+        self,
+        config: Dict[str, Any],
+        messages: List[Dict[str, str]],
+        model_key: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        caller: str,
+        purpose: str,
+        cache_key: Optional[str],
+    ) -> str:
+        """向供应商发起异步调用（经限流器），记录日志并写入缓存"""
         model = self.get_model(model_key, temperature, max_tokens)
         lc_messages = self._convert_messages(messages)
 
-        config = self.settings.resolve_config(model_key, temperature, max_tokens)
         system_prompt, user_prompt = self._extract_prompts(messages)
 
         llm_logger = get_llm_logger()
@@ -236,7 +313,9 @@ class LLMClient:
         start_time = time.time()
 
         try:
-            response = await model.ainvoke(lc_messages)
+            response = await self._arun_limited(
+                config, messages, lambda: model.ainvoke(lc_messages),
+            )
             duration_ms = (time.time() - start_time) * 1000
             prompt_tokens, completion_tokens, total_tokens = self._extract_token_usage(response)
 
@@ -253,6 +332,11 @@ class LLMClient:
                 success=True,
             )
 
+            if cache_key:
+                await asyncio.to_thread(self._cache_response, cache_key, [response.content], response, (
+                    prompt_tokens, completion_tokens, total_tokens,
+                ))
+
             return response.content
 
         except Exception as e:
@@ -274,6 +358,7 @@ class LLMClient:
         max_tokens: Optional[int] = None,
         caller: str = "",
         purpose: str = "",
+        use_cache: bool = True,
     ) -> AsyncIterator[BaseMessageChunk]:
         """
         异步流式调用 LLM
@@ -285,14 +370,24 @@ class LLMClient:
             max_tokens: 最大 token 数
             caller: 调用方标识 (用于日志)
             purpose: 调用目的 (用于日志)
+            use_cache: 是否使用响应缓存（命中时按原分片回放）
 
         Yields:
             LLM 响应的增量 chunk
         """
+        config = self.settings.resolve_config(model_key, temperature, max_tokens)
+        cache_key = self._cache_key(config, messages, use_cache)
+        if cache_key:
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                logger.debug(f"llm_cache_hit: {caller or '-'} {purpose or '-'}")
+                for piece in cached.chunks:
+                    yield AIMessageChunk(content=piece)
+                return
+
         model = self.get_model(model_key, temperature, max_tokens)
         lc_messages = self._convert_messages(messages)
 
-        config = self.settings.resolve_config(model_key, temperature, max_tokens)
         system_prompt, user_prompt = self._extract_prompts(messages)
 
         llm_logger = get_llm_logger()
@@ -308,14 +403,24 @@ class LLMClient:
             provider=config.get("provider", "openai"),
         )
 
+        limiter = self._limiter_for(config)
+        estimated = estimate_tokens(messages)
+        if limiter is not None:
+            # 流式调用多为交互对话：遵守冷却和 RPM/TPM，但不占用并发窗口，
+            # 避免整个流期间与批量调用争抢名额
+            await limiter.acquire(estimated, slot=False)
+
         start_time = time.time()
         full_content = ""
+        pieces: List[str] = []
         usage_metadata = None
+        failure: Optional[BaseException] = None
 
         try:
             async for chunk in model.astream(lc_messages):
                 if hasattr(chunk, "content") and chunk.content:
                     full_content += chunk.content
+                    pieces.append(chunk.content)
                 if hasattr(chunk, "usage_metadata") and chunk.usage_metadata:
                     usage_metadata = chunk.usage_metadata
                 yield chunk
@@ -339,17 +444,41 @@ class LLMClient:
                 success=True,
             )
 
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            llm_logger.log_response(
-                call_id=call_id,
-                success=False,
-                error_message=str(e),
-                error_type=type(e).__name__,
-                duration_ms=duration_ms,
-            )
+            if cache_key:
+                await asyncio.to_thread(self._cache_response, cache_key, pieces, None, (
+                    prompt_tokens, completion_tokens, total_tokens,
+                ), "stop")
+
+        except BaseException as e:
+            failure = e
+            if isinstance(e, Exception):
+                duration_ms = (time.time() - start_time) * 1000
+                llm_logger.log_response(
+                    call_id=call_id,
+                    success=False,
+                    error_message=str(e),
+                    error_type=type(e).__name__,
+                    duration_ms=duration_ms,
+                )
             raise
 
+        finally:
+            if limiter is not None:
+                if failure is None:
+                    limiter.release(
+                        estimated_tokens=estimated,
+                        used_tokens=usage_metadata.get("total_tokens", 0) if usage_metadata else 0,
+                        slot=False,
+                    )
+                else:
+                    limiter.release(
+                        estimated_tokens=estimated,
+                        rate_limited=is_rate_limit_error(failure),
+                        retry_after=retry_after_seconds(failure),
+                        error=True,
+                        slot=False,
+                    )
+
     def invoke(
         self,
         messages: List[Dict[str, str]],
@@ -358,16 +487,24 @@ class LLMClient:
         max_tokens: Optional[int] = None,
         caller: str = "",
         purpose: str = "",
+        use_cache: bool = True,
     ) -> str:
         """
         同步调用 LLM
 
         参数与 ainvoke 相同。
         """
+        config = self.settings.resolve_config(model_key, temperature, max_tokens)
+        cache_key = self._cache_key(config, messages, use_cache)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"llm_cache_hit: {caller or '-'} {purpose or '-'}")
+                return cached.content
+
         model = self.get_model(model_key, temperature, max_tokens)
         lc_messages = self._convert_messages(messages)
 
-        config = self.settings.resolve_config(model_key, temperature, max_tokens)
         system_prompt, user_prompt = self._extract_prompts(messages)
 
         llm_logger = get_llm_logger()
@@ -386,7 +523,7 @@ class LLMClient:
         start_time = time.time()
 
         try:
-            response = model.invoke(lc_messages)
+            response = self._run_limited(config, messages, lambda: model.invoke(lc_messages))
             duration_ms = (time.time() - start_time) * 1000
             prompt_tokens, completion_tokens, total_tokens = self._extract_token_usage(response)
 
@@ -403,6 +540,11 @@ class LLMClient:
                 success=True,
             )
 
+            if cache_key:
+                self._cache_response(cache_key, [response.content], response, (
+                    prompt_tokens, completion_tokens, total_tokens,
+                ))
+
             return response.content
 
         except Exception as e:
@@ -416,6 +558,131 @@ class LLMClient:
             )
             raise
 
+    def _limiter_for(self, config: Dict[str, Any]) -> Optional[ModelRateLimiter]:
+        return self.rate_limiter.get(config)
+
+    async def _arun_limited(self, config: Dict[str, Any], messages: List[Dict[str, str]], call) -> Any:
+        """
+        在限流器控制下执行异步调用
+
+        429 触发全模型并发减半与冷却后重试；瞬时错误（连接/超时/5xx）退避后重试。
+        """
+        limiter = self._limiter_for(config)
+        if limiter is None:
+            return await call()
+
+        estimated = estimate_tokens(messages)
+        attempt = 0
+        while True:
+            await limiter.acquire(estimated)
+            start = time.monotonic()
+            try:
+                response = await call()
+            except BaseException as e:
+                backoff = self._release_failure(limiter, e, estimated, attempt)
+                if backoff is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(backoff)
+                continue
+            limiter.release(
+                latency=time.monotonic() - start,
+                estimated_tokens=estimated,
+                used_tokens=self._extract_token_usage(response)[2],
+            )
+            return response
+
+    def _run_limited(self, config: Dict[str, Any], messages: List[Dict[str, str]], call) -> Any:
+        """在限流器控制下执行同步调用（重试策略同 _arun_limited）"""
+        limiter = self._limiter_for(config)
+        if limiter is None:
+            return call()
+
+        estimated = estimate_tokens(messages)
+        attempt = 0
+        while True:
+            limiter.acquire_sync(estimated)
+            start = time.monotonic()
+            try:
+                response = call()
+            except BaseException as e:
+                backoff = self._release_failure(limiter, e, estimated, attempt)
+                if backoff is None:
+                    raise
+                attempt += 1
+                time.sleep(backoff)
+                continue
+            limiter.release(
+                latency=time.monotonic() - start,
+                estimated_tokens=estimated,
+                used_tokens=self._extract_token_usage(response)[2],
+            )
+            return response
+
+    @staticmethod
+    def _release_failure(
+        limiter: ModelRateLimiter,
+        error: BaseException,
+        estimated: int,
+        attempt: int,
+    ) -> Optional[float]:
+        """
+        释放失败请求的名额
+
+        Returns:
+            重试前需额外等待的秒数；不应重试时返回 None
+        """
+        can_retry = isinstance(error, Exception) and attempt < limiter.config.max_retries
+        if is_rate_limit_error(error):
+            # 等待由限流器的全模型冷却负责
+            limiter.release(
+                estimated_tokens=estimated,
+                rate_limited=True,
+                retry_after=retry_after_seconds(error),
+                attempt=attempt,
+            )
+            return 0.0 if can_retry else None
+        limiter.release(estimated_tokens=estimated, error=True)
+        if can_retry and is_transient_error(error):
+            logger.warning(f"llm_transient_error_retry: {type(error).__name__}, attempt {attempt + 1}")
+            return min(limiter.config.backoff_max, limiter.config.backoff_base * (2 ** attempt))
+        return None
+
+    def _cache_key(
+        self,
+        config: Dict[str, Any],
+        messages: List[Dict[str, str]],
+        use_cache: bool,
+    ) -> Optional[str]:
+        """计算缓存键，未启用缓存时返回 None"""
+        if not use_cache or self.cache is None:
+            return None
+        return make_cache_key(config, messages)
+
+    def _cache_response(
+        self,
+        cache_key: str,
+        pieces: List[Any],
+        response: Any,
+        usage: tuple[int, int, int],
+        finish_reason: Optional[str] = None,
+    ) -> None:
+        """写入响应缓存（只缓存非空文本响应，失败不影响调用方）"""
+        if not pieces or not all(isinstance(p, str) for p in pieces) or not "".join(pieces):
+            return
+        if finish_reason is None:
+            finish_reason = getattr(response, "response_metadata", {}).get("finish_reason", "")
+        prompt_tokens, completion_tokens, total_tokens = usage
+        self.cache.set(cache_key, CachedResponse(
+            chunks=list(pieces),
+            finish_reason=finish_reason or "",
+            usage={
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "total_tokens": total_tokens,
+            },
+        ))
+
     def _convert_messages(
         self,
         messages: List[Dict[str, str]],
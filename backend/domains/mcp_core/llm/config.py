@@ -31,6 +31,9 @@ class ModelConfig(BaseModel):
     api_key_env: str | None = None  # 从环境变量读取模型专属 API 密钥
     extra_body: Dict[str, Any] | None = None  # 额外请求体参数
     http_transport: Literal["default", "curl_cffi"] = "default"
+    requests_per_minute: float | None = None  # 供应商 RPM 限额（覆盖 LLM_RPM）
+    tokens_per_minute: float | None = None  # 供应商 TPM 限额（覆盖 LLM_TPM）
+    max_concurrency: int | None = None  # 自适应并发上限（覆盖 LLM_MAX_CONCURRENCY）
 
 
 class LLMSettings(BaseSettings):
@@ -145,6 +148,9 @@ class LLMSettings(BaseSettings):
             "api_key": api_key,
             "extra_body": base.extra_body,
             "http_transport": base.http_transport,
+            "requests_per_minute": base.requests_per_minute,
+            "tokens_per_minute": base.tokens_per_minute,
+            "max_concurrency": base.max_concurrency,
         }
 
 
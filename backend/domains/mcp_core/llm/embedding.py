@@ -0,0 +1,221 @@
+"""
+文本向量化
+
+提供统一的 Embedder 接口:
+- OpenAIEmbedder: 调用 OpenAI 兼容的 /embeddings 接口（批量请求）
+- HashingEmbedder: 本地确定性向量（特征哈希），无需网络，用于离线环境和测试
+
+环境变量:
+- EMBEDDING_PROVIDER: openai / local（默认：配置了 API 密钥时为 openai，否则 local）
+- EMBEDDING_MODEL: 模型名（默认 RAG_EMBEDDING_MODEL 或 text-embedding-3-small）
+- EMBEDDING_DIM: 向量维度（默认 RAG_EMBEDDING_DIM 或 512）
+- EMBEDDING_BATCH_SIZE: 单次请求的文本数
+- EMBEDDING_API_URL / EMBEDDING_API_KEY: 覆盖 LLM_API_URL / OPENAI_API_KEY / LLM_API_KEY
+
+Example:
+    from domains.mcp_core.llm import get_embedder
+
+    embedder = get_embedder()
+    vectors = embedder.embed(["动量因子在震荡市失效", "反转因子"])
+    query_vector = embedder.embed_query("动量失效")
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from ..base.cache import BoundedCache
+
+logger = logging.getLogger(__name__)
+
+
+def _env(*names: str, default: str = "") -> str:
+    """按顺序读取第一个非空环境变量"""
+    for name in names:
+        value = os.getenv(name, "").strip()
+        if value:
+            return value
+    return default
+
+
+@dataclass
+class EmbeddingConfig:
+    """向量化配置"""
+    provider: str = "local"
+    model: str = "text-embedding-3-small"
+    dimensions: int = 512
+    batch_size: int = 32
+    api_url: str = "https://api.openai.com/v1"
+    api_key: str = field(default="", repr=False)
+    timeout: float = 30.0
+    query_cache_size: int = 256
+
+    @classmethod
+    def from_env(cls) -> "EmbeddingConfig":
+        """从环境变量加载配置"""
+        api_key = _env("EMBEDDING_API_KEY", "OPENAI_API_KEY", "LLM_API_KEY")
+        provider = _env("EMBEDDING_PROVIDER", default="openai" if api_key else "local").lower()
+        return cls(
+            provider=provider,
+            model=_env("EMBEDDING_MODEL", "RAG_EMBEDDING_MODEL", default=cls.model),
+            dimensions=int(_env("EMBEDDING_DIM", "RAG_EMBEDDING_DIM", default=str(cls.dimensions))),
+            batch_size=int(_env("EMBEDDING_BATCH_SIZE", default=str(cls.batch_size))),
+            api_url=_env("EMBEDDING_API_URL", "LLM_API_URL", default=cls.api_url).rstrip("/"),
+            api_key=api_key,
+            timeout=float(_env("EMBEDDING_TIMEOUT", default=str(cls.timeout))),
+        )
+
+
+class Embedder(ABC):
+    """
+    向量化器基类
+
+    子类实现 _embed_batch；embed 负责分批，embed_query 带 LRU 缓存
+    （智能体反复检索相同问题时不重复请求）。
+    """
+
+    def __init__(self, config: EmbeddingConfig):
+        self.config = config
+        self._query_cache = BoundedCache(
+            name="embedding_queries",
+            max_entries=max(1, config.query_cache_size),
+        )
+
+    @property
+    def dimensions(self) -> int:
+        return self.config.dimensions
+
+    @property
+    def model_name(self) -> str:
+        """写入 embedding_model 列的模型标识（切换模型后旧向量自动失效）"""
+        return f"{self.config.provider}:{self.config.model}:{self.config.dimensions}"
+
+    @abstractmethod
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """向量化一批文本（不超过 batch_size 条）"""
+        pass
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """批量向量化（按 batch_size 分批请求）"""
+        vectors: List[List[float]] = []
+        size = max(1, self.config.batch_size)
+        for start in range(0, len(texts), size):
+            vectors.extend(self._embed_batch([t or " " for t in texts[start:start + size]]))
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        """向量化查询文本（LRU 缓存）"""
+        cached = self._query_cache.get(text)
+        if cached is not None:
+            return cached
+
+        vector = self.embed([text])[0]
+        self._query_cache.set(text, vector)
+        return vector
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """异步批量向量化（在线程中执行，不阻塞事件循环）"""
+        return await asyncio.to_thread(self.embed, texts)
+
+
+class HashingEmbedder(Embedder):
+    """
+    本地确定性向量化（特征哈希）
+
+    将文本切分为英文单词与中文单字/二元组，按哈希映射到固定维度并带符号累加，
+    最后做 L2 归一化。相同文本在任何机器上得到相同向量，词汇重叠越多余弦相似度越高。
+    """
+
+    @property
+    def model_name(self) -> str:
+        return f"local:hashing:{self.config.dimensions}"
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed_one(text) for text in texts]
+
+    def _embed_one(self, text: str) -> List[float]:
+        from domains.mcp_core.database.search import segment_text
+
+        dims = self.config.dimensions
+        vector = [0.0] * dims
+        for token in segment_text(text):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            sign = 1.0 if value & 1 else -1.0
+            # 二元组/单词比单字更有区分度
+            weight = 1.0 if len(token) > 1 else 0.5
+            vector[(value >> 1) % dims] += sign * weight
+
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm == 0:
+            return vector
+        return [v / norm for v in vector]
+
+
+class OpenAIEmbedder(Embedder):
+    """OpenAI 兼容接口向量化"""
+
+    def __init__(self, config: EmbeddingConfig):
+        super().__init__(config)
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def _get_client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import httpx
+
+                    self._client = httpx.Client(
+                        base_url=self.config.api_url,
+                        headers={"Authorization": f"Bearer {self.config.api_key}"},
+                        timeout=self.config.timeout,
+                    )
+        return self._client
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        response = self._get_client().post(
+            "/embeddings",
+            json={
+                "model": self.config.model,
+                "input": texts,
+                "dimensions": self.config.dimensions,
+            },
+        )
+        response.raise_for_status()
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        return [item["embedding"] for item in data]
+
+
+def create_embedder(config: Optional[EmbeddingConfig] = None) -> Embedder:
+    """按配置创建向量化器"""
+    config = config or EmbeddingConfig.from_env()
+    if config.provider == "openai":
+        return OpenAIEmbedder(config)
+    if config.provider != "local":
+        logger.warning(f"unknown_embedding_provider: {config.provider}, falling back to local")
+    return HashingEmbedder(config)
+
+
+# 全局向量化器实例
+_embedder: Optional[Embedder] = None
+
+
+def get_embedder() -> Embedder:
+    """获取全局向量化器"""
+    global _embedder
+    if _embedder is None:
+        _embedder = create_embedder()
+    return _embedder
+
+
+def reset_embedder() -> None:
+    """重置向量化器（用于配置变更后或测试）"""
+    global _embedder
+    _embedder = None
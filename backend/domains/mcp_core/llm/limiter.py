@@ -0,0 +1,355 @@
+"""
+LLM 自适应限流
+
+按模型共享的限流器，替代调用方各自的固定 Semaphore + 固定延迟:
+- 令牌桶：限制每分钟请求数（RPM）与每分钟 token 数（TPM），
+  请求前按 prompt 长度预估占用，响应后按实际用量校正
+- AIMD 并发窗口：成功时加性增长（每轮满窗口成功 +1），
+  遇到 429 减半并全模型冷却（优先使用 Retry-After），延迟超标时小幅收缩
+- 429 由限流器统一退避重试，不再由 SDK 盲目重试
+- 流式调用（交互对话）只遵守冷却与 RPM/TPM，不占用并发窗口，不会排在批量调用之后
+
+限流器不依赖具体事件循环（线程锁 + 轮询等待），
+可同时服务多个 asyncio.run() 和同步调用。
+
+环境变量（模型级配置见 llm_models.yaml 的 requests_per_minute / tokens_per_minute / max_concurrency）:
+- LLM_RATE_LIMIT_ENABLED: 是否启用（默认 true）
+- LLM_RPM / LLM_TPM: 默认每分钟请求数 / token 数（0 表示不限）
+- LLM_INITIAL_CONCURRENCY / LLM_MAX_CONCURRENCY: 并发窗口初值 / 上限
+- LLM_LATENCY_TARGET: 单次请求延迟目标（秒，0 表示不按延迟调节）
+- LLM_RATE_LIMIT_MAX_RETRIES: 429 最大重试次数
+- LLM_COALESCE: 是否合并同时进行的相同请求（默认 true）
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 并发窗口已满时的轮询间隔（秒）
+_POLL_INTERVAL = 0.05
+
+
+@dataclass
+class RateLimitConfig:
+    """限流配置（模型级配置可覆盖 RPM/TPM/并发上限）"""
+    enabled: bool = True
+    requests_per_minute: float = 0  # 0 表示不限
+    tokens_per_minute: float = 0  # 0 表示不限
+    initial_concurrency: int = 4
+    min_concurrency: int = 1
+    max_concurrency: int = 32
+    latency_target: float = 0.0  # 秒，0 表示不按延迟调节
+    max_retries: int = 4
+    backoff_base: float = 2.0  # 无 Retry-After 时的退避底数（秒）
+    backoff_max: float = 60.0
+    coalesce: bool = True
+
+    @classmethod
+    def from_env(cls) -> "RateLimitConfig":
+        """从环境变量加载配置"""
+        config = cls()
+        config.enabled = os.getenv("LLM_RATE_LIMIT_ENABLED", "true").lower() == "true"
+        config.coalesce = os.getenv("LLM_COALESCE", "true").lower() == "true"
+        if os.getenv("LLM_RPM"):
+            config.requests_per_minute = float(os.environ["LLM_RPM"])
+        if os.getenv("LLM_TPM"):
+            config.tokens_per_minute = float(os.environ["LLM_TPM"])
+        if os.getenv("LLM_INITIAL_CONCURRENCY"):
+            config.initial_concurrency = int(os.environ["LLM_INITIAL_CONCURRENCY"])
+        if os.getenv("LLM_MAX_CONCURRENCY"):
+            config.max_concurrency = int(os.environ["LLM_MAX_CONCURRENCY"])
+        if os.getenv("LLM_LATENCY_TARGET"):
+            config.latency_target = float(os.environ["LLM_LATENCY_TARGET"])
+        if os.getenv("LLM_RATE_LIMIT_MAX_RETRIES"):
+            config.max_retries = int(os.environ["LLM_RATE_LIMIT_MAX_RETRIES"])
+        return config
+
+
+class TokenBucket:
+    """
+    每分钟容量的令牌桶（调用方持锁）
+
+    允许透支：实际用量超过预估时扣成负数，后续请求等待回补。
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """取走 amount 前需要等待的秒数"""
+        self._refill(now)
+        need = min(amount, self.capacity)
+        if self.level >= need:
+            return 0.0
+        return (need - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+    def give(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """粗略估算 prompt token 数（中英混合按 3 字符/token）"""
+    return sum(len(m.get("content", "") or "") for m in messages) // 3 + 4 * len(messages)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """是否为限流错误（HTTP 429）"""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    return type(error).__name__ == "RateLimitError"
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """是否为可重试的瞬时错误（连接失败、超时、5xx）"""
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int) and status >= 500:
+        return True
+    return type(error).__name__ in (
+        "APIConnectionError", "APITimeoutError", "InternalServerError",
+        "ConnectError", "ReadTimeout", "TimeoutException", "TimeoutError",
+    )
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """从限流错误中读取 Retry-After（秒）"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class ModelRateLimiter:
+    """单个模型（端点）的限流器"""
+
+    def __init__(
+        self,
+        name: str,
+        config: RateLimitConfig,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_concurrency: Optional[int] = None,
+    ):
+        self.name = name
+        self.config = config
+        self.max_concurrency = max_concurrency or config.max_concurrency
+        self.limit = float(min(config.initial_concurrency, self.max_concurrency))
+        self.inflight = 0
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._cooldown_until = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "rate_limited": 0, "errors": 0, "waited_seconds": 0.0}
+        self._latency_ewma: Optional[float] = None
+
+    def _try_acquire(self, tokens: int, slot: bool = True) -> float:
+        """
+        尝试占用一个并发名额和令牌，返回需要等待的秒数（0 表示已占用）
+
+        slot=False 时只等待冷却和令牌，不占用并发窗口（用于流式调用）。
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._cooldown_until:
+                return self._cooldown_until - now
+            if slot and self.inflight >= max(1, int(self.limit)):
+                return _POLL_INTERVAL
+            wait = 0.0
+            if self._requests is not None:
+                wait = max(wait, self._requests.wait_time(1, now))
+            if self._tokens is not None and tokens:
+                wait = max(wait, self._tokens.wait_time(tokens, now))
+            if wait > 0:
+                return wait
+            if self._requests is not None:
+                self._requests.take(1)
+            if self._tokens is not None and tokens:
+                self._tokens.take(tokens)
+            if slot:
+                self.inflight += 1
+            self._stats["requests"] += 1
+            return 0.0
+
+    async def acquire(self, tokens: int = 0, slot: bool = True) -> None:
+        """等待可用名额（异步，slot=False 时不占用并发窗口）"""
+        start = time.monotonic()
+        while True:
+            wait = self._try_acquire(tokens, slot)
+            if wait <= 0:
+                break
+            await asyncio.sleep(min(wait, 1.0))
+        self._record_wait(time.monotonic() - start)
+
+    def acquire_sync(self, tokens: int = 0) -> None:
+        """等待可用名额（同步）"""
+        start = time.monotonic()
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                break
+            time.sleep(min(wait, 1.0))
+        self._record_wait(time.monotonic() - start)
+
+    def _record_wait(self, waited: float) -> None:
+        if waited > 0:
+            with self._lock:
+                self._stats["waited_seconds"] += waited
+
+    def release(
+        self,
+        latency: Optional[float] = None,
+        estimated_tokens: int = 0,
+        used_tokens: int = 0,
+        rate_limited: bool = False,
+        retry_after: Optional[float] = None,
+        error: bool = False,
+        attempt: int = 0,
+        slot: bool = True,
+    ) -> None:
+        """
+        释放名额并按结果调整并发窗口
+
+        Args:
+            latency: 请求耗时（秒）
+            estimated_tokens: 占用时的预估 token 数
+            used_tokens: 实际 token 数（0 表示未知，不校正）
+            rate_limited: 是否被限流（429）
+            retry_after: 服务端建议的等待秒数
+            error: 是否失败
+            attempt: 当前重试次数（用于退避）
+            slot: 是否占用了并发名额（与 acquire 一致）
+        """
+        with self._lock:
+            if slot:
+                self.inflight = max(0, self.inflight - 1)
+            now = time.monotonic()
+
+            if self._tokens is not None and used_tokens:
+                delta = used_tokens - estimated_tokens
+                if delta > 0:
+                    self._tokens.take(delta)
+                else:
+                    self._tokens.give(-delta)
+
+            if rate_limited:
+                # 乘性减少 + 全模型冷却
+                self.limit = max(float(self.config.min_concurrency), self.limit / 2)
+                backoff = retry_after
+                if backoff is None:
+                    backoff = min(self.config.backoff_max, self.config.backoff_base * (2 ** attempt))
+                self._cooldown_until = max(self._cooldown_until, now + backoff)
+                self._stats["rate_limited"] += 1
+                logger.warning(
+                    f"llm_rate_limited: {self.name}, concurrency -> {int(self.limit)}, cooldown {backoff:.1f}s"
+                )
+                return
+
+            if error:
+                self._stats["errors"] += 1
+                return
+
+            if not slot:
+                # 未占用并发名额的请求（流式）不参与窗口调节
+                return
+
+            if latency is not None:
+                self._latency_ewma = (
+                    latency if self._latency_ewma is None
+                    else 0.8 * self._latency_ewma + 0.2 * latency
+                )
+            if self.config.latency_target and latency is not None and latency > self.config.latency_target:
+                self.limit = max(float(self.config.min_concurrency), self.limit * 0.9)
+            else:
+                # 加性增长：每个满窗口的成功请求使窗口 +1
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / max(self.limit, 1.0))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "concurrency_limit": int(self.limit),
+                "inflight": self.inflight,
+                "latency_ewma": self._latency_ewma,
+            }
+
+
+class LLMRateLimiter:
+    """按模型（模型名 + 端点）管理限流器"""
+
+    def __init__(self, config: Optional[RateLimitConfig] = None):
+        self.config = config or RateLimitConfig.from_env()
+        self._limiters: Dict[Tuple[str, str], ModelRateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_config: Dict[str, Any]) -> Optional[ModelRateLimiter]:
+        """
+        获取模型的限流器
+
+        Args:
+            model_config: LLMSettings.resolve_config() 的结果
+        """
+        if not self.config.enabled:
+            return None
+        key = (str(model_config.get("model")), str(model_config.get("api_url") or ""))
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.get(key)
+                if limiter is None:
+                    limiter = ModelRateLimiter(
+                        name=key[0],
+                        config=self.config,
+                        requests_per_minute=model_config.get("requests_per_minute") or self.config.requests_per_minute,
+                        tokens_per_minute=model_config.get("tokens_per_minute") or self.config.tokens_per_minute,
+                        max_concurrency=model_config.get("max_concurrency"),
+                    )
+                    self._limiters[key] = limiter
+        return limiter
+
+    def suggested_concurrency(self) -> int:
+        """调用方自适应模式下的任务并发上限"""
+        return self.config.max_concurrency
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: limiter.get_stats() for (name, _), limiter in self._limiters.items()}
+
+
+# 全局限流器
+_rate_limiter: Optional[LLMRateLimiter] = None
+
+
+def get_rate_limiter() -> LLMRateLimiter:
+    """获取全局限流器"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = LLMRateLimiter()
+    return _rate_limiter
+
+
+def reset_rate_limiter() -> None:
+    """重置全局限流器（用于配置变更后）"""
+    global _rate_limiter
+    _rate_limiter = None
@@ -4,6 +4,7 @@
 基于 structlog 提供统一的日志配置，支持:
 - 控制台输出
 - 异步写入 PostgreSQL
+- 按天分区、保留期清理与分钟级预聚合
 """
 
 from .config import (
@@ -18,7 +19,8 @@ from .config import (
     clear_request_context,
     setup_task_logger,
 )
-from .store import LogStore, LogEntry, LogTopic, LogQueryResult
+from .store import LogStore, LogEntry, LogTopic, LogQueryResult, IngestStats
+from .partitions import LogPartitionManager, LogMaintenanceConfig
 
 __all__ = [
     # 配置
@@ -36,6 +38,10 @@ __all__ = [
     "LogEntry",
     "LogTopic",
     "LogQueryResult",
+    "IngestStats",
+    # 分区与预聚合
+    "LogPartitionManager",
+    "LogMaintenanceConfig",
     "get_log_store",
     "init_log_store",
     "shutdown_log_store",
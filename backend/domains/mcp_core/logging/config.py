@@ -182,12 +182,9 @@ class PostgreSQLHandler(logging.Handler):
                 data=log_data["data"],
             )
 
-            # 尝试在事件循环中执行
+            # 投递到事件循环线程追加缓冲区，不创建协程也不等待数据库
             if _event_loop and _event_loop.is_running():
-                asyncio.run_coroutine_threadsafe(
-                    _log_store.write(entry),
-                    _event_loop
-                )
+                _event_loop.call_soon_threadsafe(_log_store.write_nowait, entry)
             else:
                 # 如果没有运行的事件循环，缓存日志
                 self._pending_logs.append(log_data)
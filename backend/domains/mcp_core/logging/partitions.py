@@ -0,0 +1,468 @@
+"""
+日志表分区与预聚合维护
+
+logs 表按天做 PostgreSQL 原生范围分区（UTC 日界，分区名 logs_pYYYYMMDD），
+另有 logs_default 兜底分区接收没有对应日分区的数据:
+- 预建未来若干天的分区；补建分区时把默认分区中落在该日的数据迁入
+- 保留期: 超过最长保留天数的日分区整表 DROP，主题级更短的保留期按行删除
+- 预聚合: 按分钟把日志汇总到 log_rollups（计数、错误数、耗时分位数、token 合计），
+  统计接口和字段取值接口读取预聚合表，只对未聚合的最近几分钟扫描原始日志
+
+旧版非分区 logs 表在首次启动时自动迁移（保留期内的数据复制到新表）。
+
+多个实例共享同一数据库时，迁移与每轮维护都在 pg_try_advisory_lock 下执行，
+未取得锁的实例跳过本轮（见 LogPartitionManager.exclusive）。
+"""
+
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from .config import get_logger
+
+logger = get_logger(__name__)
+
+PARTITION_PREFIX = "logs_p"
+DEFAULT_PARTITION = "logs_default"
+DEFAULT_RETENTION_DAYS = 30
+MAINTENANCE_TIMEOUT = 600  # 迁移/聚合等重语句的超时（秒），高于连接默认的 command_timeout
+MAINTENANCE_LOCK_ID = 7_301_426_501  # 日志表维护的咨询锁键（所有实例一致）
+
+# 预聚合表中可直接取值的字段（get_field_values 走预聚合）
+ROLLUP_FIELDS = ("level", "service", "tool_name", "model", "status")
+
+# 分区父表（init.sql 中的定义与此一致）
+LOGS_TABLE_SQL = """
+CREATE SEQUENCE IF NOT EXISTS logs_id_seq;
+CREATE TABLE IF NOT EXISTS logs (
+    id BIGINT NOT NULL DEFAULT nextval('logs_id_seq'),
+    timestamp TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    topic_id INTEGER NOT NULL REFERENCES log_topics(id) ON DELETE CASCADE,
+    level VARCHAR(10) NOT NULL DEFAULT 'info',
+    service VARCHAR(100) NOT NULL,
+    logger VARCHAR(200) DEFAULT '',
+    trace_id VARCHAR(64) DEFAULT '',
+    message TEXT NOT NULL,
+    data JSONB DEFAULT '{}',
+    raw_line TEXT DEFAULT '',
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+ALTER SEQUENCE logs_id_seq OWNED BY logs.id;
+"""
+
+# 默认分区、索引与预聚合表（均幂等）
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS logs_default PARTITION OF logs DEFAULT;
+
+CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs(timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_logs_topic_timestamp ON logs(topic_id, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_logs_service_timestamp ON logs(service, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_logs_level_timestamp ON logs(level, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_logs_trace_id ON logs(trace_id) WHERE trace_id != '';
+CREATE INDEX IF NOT EXISTS idx_logs_data ON logs USING GIN(data jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS idx_logs_message_search ON logs USING GIN(to_tsvector('simple', message));
+CREATE INDEX IF NOT EXISTS idx_logs_tool_name ON logs((data->>'tool_name'), timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_logs_model ON logs((data->>'model'), timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_logs_status ON logs((data->>'status'), timestamp DESC);
+
+CREATE TABLE IF NOT EXISTS log_rollups (
+    bucket TIMESTAMPTZ NOT NULL,
+    topic_id INTEGER NOT NULL,
+    level VARCHAR(10) NOT NULL,
+    service VARCHAR(100) NOT NULL,
+    tool_name VARCHAR(200) NOT NULL DEFAULT '',
+    model VARCHAR(200) NOT NULL DEFAULT '',
+    status VARCHAR(20) NOT NULL DEFAULT '',
+    count BIGINT NOT NULL DEFAULT 0,
+    error_count BIGINT NOT NULL DEFAULT 0,
+    first_at TIMESTAMPTZ,
+    last_at TIMESTAMPTZ,
+    duration_count BIGINT NOT NULL DEFAULT 0,
+    duration_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    duration_p50 DOUBLE PRECISION,
+    duration_p95 DOUBLE PRECISION,
+    duration_p99 DOUBLE PRECISION,
+    duration_max DOUBLE PRECISION,
+    input_tokens BIGINT NOT NULL DEFAULT 0,
+    output_tokens BIGINT NOT NULL DEFAULT 0,
+    total_tokens BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, topic_id, level, service, tool_name, model, status)
+);
+CREATE INDEX IF NOT EXISTS idx_log_rollups_topic_bucket ON log_rollups(topic_id, bucket);
+
+CREATE TABLE IF NOT EXISTS log_rollup_state (
+    id INTEGER PRIMARY KEY DEFAULT 1,
+    start_at TIMESTAMPTZ NOT NULL,
+    watermark TIMESTAMPTZ NOT NULL
+);
+"""
+
+# 按分钟汇总 [$1, $2) 内的原始日志
+ROLLUP_INSERT_SQL = """
+INSERT INTO log_rollups (
+    bucket, topic_id, level, service, tool_name, model, status,
+    count, error_count, first_at, last_at,
+    duration_count, duration_sum, duration_p50, duration_p95, duration_p99, duration_max,
+    input_tokens, output_tokens, total_tokens
+)
+SELECT
+    date_trunc('minute', timestamp), topic_id, level, service, tool_name, model, status,
+    COUNT(*),
+    COUNT(*) FILTER (WHERE level IN ('error', 'critical') OR status IN ('error', 'failed')),
+    MIN(timestamp), MAX(timestamp),
+    COUNT(duration), COALESCE(SUM(duration), 0),
+    percentile_cont(0.5) WITHIN GROUP (ORDER BY duration),
+    percentile_cont(0.95) WITHIN GROUP (ORDER BY duration),
+    percentile_cont(0.99) WITHIN GROUP (ORDER BY duration),
+    MAX(duration),
+    COALESCE(SUM(input_tokens), 0), COALESCE(SUM(output_tokens), 0), COALESCE(SUM(total_tokens), 0)
+FROM (
+    SELECT
+        timestamp, topic_id, level, service,
+        LEFT(COALESCE(data->>'tool_name', ''), 200) AS tool_name,
+        LEFT(COALESCE(data->>'model', ''), 200) AS model,
+        LEFT(COALESCE(data->>'status', ''), 20) AS status,
+        CASE WHEN jsonb_typeof(data->'duration_ms') = 'number'
+             THEN (data->>'duration_ms')::float8 END AS duration,
+        CASE WHEN jsonb_typeof(data->'input_tokens') = 'number'
+             THEN (data->>'input_tokens')::numeric::bigint END AS input_tokens,
+        CASE WHEN jsonb_typeof(data->'output_tokens') = 'number'
+             THEN (data->>'output_tokens')::numeric::bigint END AS output_tokens,
+        CASE WHEN jsonb_typeof(data->'total_tokens') = 'number'
+             THEN (data->>'total_tokens')::numeric::bigint END AS total_tokens
+    FROM logs
+    WHERE timestamp >= $1 AND timestamp < $2
+) s
+GROUP BY 1, 2, 3, 4, 5, 6, 7
+"""
+
+
+@dataclass
+class LogMaintenanceConfig:
+    """日志表维护配置"""
+    enabled: bool = True
+    interval: float = 60.0  # 维护周期（秒），每轮建分区 + 预聚合
+    retention_interval: float = 3600.0  # 保留期清理周期（秒）
+    partitions_ahead: int = 3  # 预建未来分区天数
+    rollup_lag_minutes: int = 2  # 每轮重算最近几分钟，容纳延迟写入的日志
+    rollup_chunk_hours: int = 6  # 追赶历史时每轮最多聚合的小时数
+    field_values_days: int = 7  # 非预聚合字段取值只扫描最近几天
+
+    @classmethod
+    def from_env(cls) -> "LogMaintenanceConfig":
+        """从环境变量读取配置"""
+        config = cls()
+        config.enabled = os.getenv("LOG_MAINTENANCE_ENABLED", "true").lower() == "true"
+        if os.getenv("LOG_MAINTENANCE_INTERVAL"):
+            config.interval = float(os.environ["LOG_MAINTENANCE_INTERVAL"])
+        if os.getenv("LOG_PARTITIONS_AHEAD"):
+            config.partitions_ahead = int(os.environ["LOG_PARTITIONS_AHEAD"])
+        if os.getenv("LOG_FIELD_VALUES_DAYS"):
+            config.field_values_days = int(os.environ["LOG_FIELD_VALUES_DAYS"])
+        return config
+
+
+def partition_name(day: date) -> str:
+    """日分区表名"""
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def partition_day(name: str) -> Optional[date]:
+    """从分区表名解析日期，非日分区返回 None"""
+    if not name.startswith(PARTITION_PREFIX):
+        return None
+    try:
+        return datetime.strptime(name[len(PARTITION_PREFIX):], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def day_bounds(day: date) -> tuple[datetime, datetime]:
+    """日分区的 UTC 时间范围 [start, end)"""
+    start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+def floor_minute(ts: datetime) -> datetime:
+    """向下取整到分钟（naive 时间视为 UTC）"""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.replace(second=0, microsecond=0)
+
+
+def ceil_minute(ts: datetime) -> datetime:
+    """向上取整到分钟（naive 时间视为 UTC）"""
+    floored = floor_minute(ts)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return floored if floored == ts else floored + timedelta(minutes=1)
+
+
+def rollup_window(
+    start_time: Optional[datetime],
+    end_time: Optional[datetime],
+    coverage: Optional[tuple[datetime, datetime]],
+) -> Optional[tuple[datetime, datetime]]:
+    """
+    计算查询区间中可由预聚合表回答的整分钟区间 [lo, hi)
+
+    其余部分（区间首尾不足一分钟的片段、尚未聚合的最近几分钟）需查询原始日志。
+    """
+    if coverage is None:
+        return None
+    start_at, watermark = coverage
+    lo = max(ceil_minute(start_time), start_at) if start_time else start_at
+    hi = min(floor_minute(end_time), watermark) if end_time else watermark
+    if hi <= lo:
+        return None
+    return lo, hi
+
+
+class LogPartitionManager:
+    """日志分区、保留期与预聚合维护"""
+
+    def __init__(self, config: Optional[LogMaintenanceConfig] = None):
+        self.config = config or LogMaintenanceConfig.from_env()
+
+    @asynccontextmanager
+    async def exclusive(self, conn):
+        """
+        尝试获取维护咨询锁（会话级，不等待）
+
+        Yields:
+            是否取得锁；未取得说明其他实例正在维护，调用方应跳过本轮
+        """
+        acquired = bool(await conn.fetchval("SELECT pg_try_advisory_lock($1)", MAINTENANCE_LOCK_ID))
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                try:
+                    await conn.execute("SELECT pg_advisory_unlock($1)", MAINTENANCE_LOCK_ID)
+                except Exception as e:
+                    # 连接断开时会话锁随之释放
+                    logger.warning("log_maintenance_unlock_failed", error=str(e))
+
+    # ========================================
+    # 表结构
+    # ========================================
+
+    async def ensure_schema(self, conn) -> None:
+        """确保分区表、索引与预聚合表存在，必要时迁移旧版非分区表"""
+        kind = await conn.fetchval(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass('logs')"
+        )
+        if kind == "r":
+            await self._migrate_legacy(conn)
+        else:
+            if kind is None:
+                await conn.execute(LOGS_TABLE_SQL)
+            await conn.execute(SCHEMA_SQL)
+        await self.ensure_partitions(conn)
+
+    async def _migrate_legacy(self, conn) -> None:
+        """把旧版非分区 logs 表迁移为分区表（只复制保留期内的数据）"""
+        retention = await self._max_retention_days(conn)
+        today = datetime.now(timezone.utc).date()
+        cutoff = today - timedelta(days=retention)
+
+        async with conn.transaction():
+            await conn.execute("SET LOCAL statement_timeout = 0")
+            await conn.execute("ALTER TABLE logs RENAME TO logs_legacy")
+            # 旧表索引与主键名会和新表冲突；序列保留以延续 id
+            indexes = await conn.fetch(
+                """
+                SELECT indexname FROM pg_indexes
+                WHERE tablename = 'logs_legacy' AND indexname <> 'logs_pkey'
+                """
+            )
+            for row in indexes:
+                await conn.execute(f'DROP INDEX IF EXISTS "{row["indexname"]}"')
+            await conn.execute(
+                "ALTER TABLE logs_legacy RENAME CONSTRAINT logs_pkey TO logs_legacy_pkey"
+            )
+            await conn.execute("ALTER SEQUENCE IF EXISTS logs_id_seq OWNED BY NONE")
+
+            await conn.execute(LOGS_TABLE_SQL)
+            await conn.execute(SCHEMA_SQL)
+            await self.ensure_partitions(conn, start=cutoff)
+
+            copied = await conn.execute(
+                """
+                INSERT INTO logs (id, timestamp, topic_id, level, service, logger,
+                                  trace_id, message, data, raw_line)
+                SELECT id, timestamp, topic_id, level, service, logger,
+                       trace_id, message, data, raw_line
+                FROM logs_legacy
+                WHERE timestamp >= $1
+                """,
+                day_bounds(cutoff)[0],
+                timeout=MAINTENANCE_TIMEOUT,
+            )
+            await conn.execute("DROP TABLE logs_legacy")
+            await conn.execute(
+                "SELECT setval('logs_id_seq', GREATEST((SELECT MAX(id) FROM logs), 1))"
+            )
+        logger.info("log_table_migrated", copied=copied, retention_days=retention)
+
+    # ========================================
+    # 分区
+    # ========================================
+
+    async def list_partitions(self, conn) -> dict[str, Optional[date]]:
+        """列出 logs 的所有分区 {表名: 日期}（默认分区日期为 None）"""
+        rows = await conn.fetch(
+            """
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'logs'::regclass
+            """
+        )
+        return {row["relname"]: partition_day(row["relname"]) for row in rows}
+
+    async def ensure_partitions(self, conn, start: Optional[date] = None) -> list[str]:
+        """
+        确保 [start, 今天 + partitions_ahead] 的日分区存在
+
+        Args:
+            start: 起始日期，默认今天
+
+        Returns:
+            新建的分区名列表
+        """
+        today = datetime.now(timezone.utc).date()
+        start = start or today
+        existing = await self.list_partitions(conn)
+        created = []
+        day = start
+        while day <= today + timedelta(days=self.config.partitions_ahead):
+            name = partition_name(day)
+            if name not in existing:
+                await self._create_partition(conn, day)
+                created.append(name)
+            day += timedelta(days=1)
+        if created:
+            logger.info("log_partitions_created", partitions=created)
+        return created
+
+    async def _create_partition(self, conn, day: date) -> None:
+        """新建日分区，并迁入默认分区中已落在该日的数据"""
+        name = partition_name(day)
+        lo, hi = day_bounds(day)
+        async with conn.transaction():
+            await conn.execute(f"CREATE TABLE {name} (LIKE logs INCLUDING DEFAULTS)")
+            await conn.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {DEFAULT_PARTITION}
+                    WHERE timestamp >= $1 AND timestamp < $2
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+                """,
+                lo, hi,
+                timeout=MAINTENANCE_TIMEOUT,
+            )
+            await conn.execute(
+                f"ALTER TABLE logs ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{lo.isoformat()}') TO ('{hi.isoformat()}')"
+            )
+
+    # ========================================
+    # 保留期
+    # ========================================
+
+    async def _max_retention_days(self, conn) -> int:
+        value = await conn.fetchval("SELECT MAX(retention_days) FROM log_topics")
+        return int(value or DEFAULT_RETENTION_DAYS)
+
+    async def apply_retention(self, conn) -> dict:
+        """
+        清理过期日志
+
+        超过最长保留天数的日分区整表删除；保留期更短的主题按行删除，
+        预聚合数据按同样的保留期删除。
+        """
+        retention = await self._max_retention_days(conn)
+        cutoff_day = datetime.now(timezone.utc).date() - timedelta(days=retention)
+
+        dropped = []
+        for name, day in (await self.list_partitions(conn)).items():
+            if day is not None and day < cutoff_day:
+                await conn.execute(f"DROP TABLE IF EXISTS {name}")
+                dropped.append(name)
+
+        # 逐主题删除，时间条件为常量参数，只触及过期日期所在分区
+        now = datetime.now(timezone.utc)
+        deleted = 0
+        topics = await conn.fetch("SELECT id, retention_days FROM log_topics")
+        for topic in topics:
+            cutoff = now - timedelta(days=topic["retention_days"] or DEFAULT_RETENTION_DAYS)
+            status = await conn.execute(
+                "DELETE FROM logs WHERE topic_id = $1 AND timestamp < $2",
+                topic["id"], cutoff,
+                timeout=MAINTENANCE_TIMEOUT,
+            )
+            deleted += int(status.split()[-1]) if status else 0
+            await conn.execute(
+                "DELETE FROM log_rollups WHERE topic_id = $1 AND bucket < $2",
+                topic["id"], cutoff,
+            )
+        if dropped or deleted:
+            logger.info("log_retention_applied", dropped_partitions=dropped, deleted=deleted)
+        return {"dropped_partitions": dropped, "deleted": deleted}
+
+    # ========================================
+    # 预聚合
+    # ========================================
+
+    async def get_coverage(self, conn) -> Optional[tuple[datetime, datetime]]:
+        """预聚合覆盖的时间区间 [start_at, watermark)，尚未聚合返回 None"""
+        row = await conn.fetchrow("SELECT start_at, watermark FROM log_rollup_state WHERE id = 1")
+        if row is None or row["watermark"] <= row["start_at"]:
+            return None
+        return row["start_at"], row["watermark"]
+
+    async def rollup(self, conn, now: Optional[datetime] = None) -> int:
+        """
+        增量预聚合
+
+        每轮重算 watermark 前 rollup_lag_minutes 分钟（容纳延迟写入），
+        并向前推进至多 rollup_chunk_hours 小时，只聚合已结束的分钟。
+
+        Returns:
+            写入的预聚合行数
+        """
+        end = floor_minute(now or datetime.now(timezone.utc))
+        row = await conn.fetchrow("SELECT start_at, watermark FROM log_rollup_state WHERE id = 1")
+        if row is None:
+            earliest = await conn.fetchval("SELECT MIN(timestamp) FROM logs")
+            start_at = floor_minute(earliest) if earliest else end
+            await conn.execute(
+                "INSERT INTO log_rollup_state (id, start_at, watermark) VALUES (1, $1, $1) "
+                "ON CONFLICT (id) DO NOTHING",
+                start_at,
+            )
+            watermark = start_at
+        else:
+            start_at, watermark = row["start_at"], row["watermark"]
+
+        lo = max(start_at, watermark - timedelta(minutes=self.config.rollup_lag_minutes))
+        hi = min(end, watermark + timedelta(hours=self.config.rollup_chunk_hours))
+        if hi <= lo:
+            return 0
+
+        async with conn.transaction():
+            await conn.execute(
+                "DELETE FROM log_rollups WHERE bucket >= $1 AND bucket < $2", lo, hi
+            )
+            status = await conn.execute(ROLLUP_INSERT_SQL, lo, hi, timeout=MAINTENANCE_TIMEOUT)
+            await conn.execute(
+                "UPDATE log_rollup_state SET watermark = GREATEST(watermark, $1) WHERE id = 1",
+                hi,
+            )
+        inserted = int(status.split()[-1]) if status else 0
+        logger.debug("log_rollup_done", start=lo.isoformat(), end=hi.isoformat(), rows=inserted)
+        return inserted
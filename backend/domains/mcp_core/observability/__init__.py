@@ -1,7 +1,7 @@
 """
 可观测性模块
 
-提供结构化日志、LLM/MCP 调用追踪功能。
+提供结构化日志、LLM/MCP 调用追踪、进程内延迟直方图与采样分析功能。
 
 使用示例:
 
@@ -91,6 +91,19 @@ from .mcp_logger import (
     get_mcp_logger,
     configure_mcp_logger,
 )
+from .metrics import (
+    LatencyHistogram,
+    MetricsRegistry,
+    get_metrics_registry,
+    reset_metrics_registry,
+    render_prometheus,
+)
+from .profiler import (
+    SamplingProfiler,
+    ProfileResult,
+    ProfilerBusyError,
+    get_profiler,
+)
 
 __all__ = [
     # Logging
@@ -143,4 +156,15 @@ __all__ = [
     "MCPRequestContext",
     "get_mcp_logger",
     "configure_mcp_logger",
+    # Metrics
+    "LatencyHistogram",
+    "MetricsRegistry",
+    "get_metrics_registry",
+    "reset_metrics_registry",
+    "render_prometheus",
+    # Profiler
+    "SamplingProfiler",
+    "ProfileResult",
+    "ProfilerBusyError",
+    "get_profiler",
 ]
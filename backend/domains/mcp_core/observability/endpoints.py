@@ -0,0 +1,100 @@
+"""
+指标与采样分析 HTTP 端点
+
+Starlette 处理函数，FastAPI 主应用和各 MCP 服务器共用:
+- GET /metrics                Prometheus 文本格式；?format=json 返回 JSON（含最慢工具、缓存统计）
+- GET /debug/profile          按需采样；参数 seconds、interval、format=json|folded、idle=true
+
+访问控制: 只接受本机（回环地址）请求；设置 MCP_API_KEY 时，远程请求携带
+Authorization: Bearer <key> 或 X-API-Key: <key> 也可访问。
+采样分析默认关闭，通过 PROFILER_ENABLED=true 开启。
+"""
+
+import hmac
+import ipaddress
+import os
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+
+from ..base.cache import get_cache_stats
+from ..base.tool_cache import get_tool_cache
+from .metrics import get_metrics_registry, render_cache_prometheus, render_prometheus
+from .profiler import MAX_PROFILE_SECONDS, ProfilerBusyError, get_profiler
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def is_authorized(request: Request) -> bool:
+    """本机请求，或携带与 MCP_API_KEY 一致的密钥"""
+    if request.client is not None and _is_loopback(request.client.host):
+        return True
+    api_key = os.getenv("MCP_API_KEY")
+    if not api_key:
+        return False
+    auth = request.headers.get("authorization", "")
+    provided = auth[7:] if auth.lower().startswith("bearer ") else request.headers.get("x-api-key", "")
+    return bool(provided) and hmac.compare_digest(provided.encode(), api_key.encode())
+
+
+def _forbidden() -> Response:
+    return JSONResponse({"error": "forbidden"}, status_code=403)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """调用指标"""
+    if not is_authorized(request):
+        return _forbidden()
+    registry = get_metrics_registry()
+    if request.query_params.get("format") == "json":
+        return JSONResponse({
+            "started_at": registry.started_at,
+            "metrics": registry.snapshot(),
+            "slowest_tools": registry.slowest("tool"),
+            "tool_cache": get_tool_cache().get_stats(),
+            "caches": get_cache_stats(),
+        })
+    return PlainTextResponse(
+        render_prometheus(registry) + render_cache_prometheus(get_cache_stats()),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+async def profile_endpoint(request: Request) -> Response:
+    """采样分析当前进程"""
+    if not is_authorized(request):
+        return _forbidden()
+    if os.getenv("PROFILER_ENABLED", "false").lower() != "true":
+        return JSONResponse({"error": "profiler disabled"}, status_code=403)
+
+    params = request.query_params
+    try:
+        seconds = float(params.get("seconds", "5"))
+        interval = float(params.get("interval", "0.01"))
+    except ValueError:
+        return JSONResponse({"error": "seconds and interval must be numbers"}, status_code=400)
+    if not 0 < seconds <= MAX_PROFILE_SECONDS or interval <= 0:
+        return JSONResponse(
+            {"error": f"seconds must be in (0, {MAX_PROFILE_SECONDS:g}], interval > 0"},
+            status_code=400,
+        )
+
+    try:
+        result = await get_profiler().sample_async(
+            duration=seconds,
+            interval=interval,
+            include_idle=params.get("idle", "false").lower() == "true",
+        )
+    except ProfilerBusyError as e:
+        return JSONResponse({"error": str(e)}, status_code=409)
+
+    if params.get("format") == "folded":
+        return PlainTextResponse(result.folded())
+    return JSONResponse(result.to_dict())
@@ -0,0 +1,267 @@
+"""
+进程内延迟直方图
+
+为工具调用、HTTP 路由等记录延迟分布和载荷大小，供 /metrics 端点输出:
+- LatencyHistogram: HDR 风格的对数分桶直方图，记录 O(1)、内存有界，
+  分位数相对误差不超过 precision（默认 1%）
+- MetricsRegistry: 按 (类别, 名称) 聚合调用次数、错误数、超时数、延迟与载荷分布
+- render_prometheus: 输出 Prometheus 文本格式（summary + counter）
+
+全部指标只在进程内存中累计，进程重启后清零。
+"""
+
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 默认分位数
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """
+    对数分桶直方图
+
+    值 v 落入桶 floor(log(v) / log(1 + precision))，桶内取几何中点作为代表值，
+    因此分位数的相对误差不超过 precision；小于 min_value 的值归入 0 号桶。
+    """
+
+    def __init__(self, precision: float = 0.01, min_value: float = 0.001):
+        self.precision = precision
+        self.min_value = min_value
+        self._log_base = math.log1p(precision)
+        self._buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        return int(math.log(value / self.min_value) / self._log_base) + 1
+
+    def _value(self, index: int) -> float:
+        if index == 0:
+            return self.min_value
+        lower = self.min_value * math.exp((index - 1) * self._log_base)
+        return lower * math.sqrt(1 + self.precision)
+
+    def record(self, value: float) -> None:
+        """记录一个观测值（负值按 0 处理）"""
+        value = max(value, 0.0)
+        index = self._index(value)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """分位数（0 <= q <= 1），无数据返回 None"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                # 代表值限制在真实的最小/最大值之间
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def summary(self, quantiles: Iterable[float] = DEFAULT_QUANTILES) -> Dict[str, Any]:
+        """汇总统计"""
+        result: Dict[str, Any] = {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "mean": round(self.mean, 3) if self.count else None,
+            "min": round(self.min, 3) if self.count else None,
+            "max": round(self.max, 3) if self.count else None,
+        }
+        for q in quantiles:
+            value = self.quantile(q)
+            result[f"p{q * 100:g}"] = round(value, 3) if value is not None else None
+        return result
+
+
+@dataclass
+class CallMetrics:
+    """单个工具/路由的调用指标"""
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    latency_ms: LatencyHistogram = field(default_factory=LatencyHistogram)
+    payload_bytes: LatencyHistogram = field(
+        default_factory=lambda: LatencyHistogram(precision=0.05, min_value=1.0)
+    )
+    last_called_at: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "error_rate": round(self.errors / self.calls, 4) if self.calls else 0.0,
+            "latency_ms": self.latency_ms.summary(),
+            "payload_bytes": self.payload_bytes.summary(),
+            "last_called_at": self.last_called_at or None,
+        }
+
+
+class MetricsRegistry:
+    """
+    调用指标注册表
+
+    按 (kind, name) 聚合，kind 如 "tool"、"http"。线程安全，
+    记录路径只做字典查找和计数，不阻塞调用方。
+    """
+
+    def __init__(self):
+        self._metrics: Dict[Tuple[str, str], CallMetrics] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def _get(self, kind: str, name: str) -> CallMetrics:
+        key = (kind, name)
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            metrics = self._metrics.setdefault(key, CallMetrics())
+        return metrics
+
+    def record_call(
+        self,
+        kind: str,
+        name: str,
+        duration_ms: float,
+        success: bool = True,
+        timeout: bool = False,
+    ) -> None:
+        """记录一次调用"""
+        with self._lock:
+            metrics = self._get(kind, name)
+            metrics.calls += 1
+            if not success:
+                metrics.errors += 1
+            if timeout:
+                metrics.timeouts += 1
+            metrics.latency_ms.record(duration_ms)
+            metrics.last_called_at = time.time()
+
+    def record_payload(self, kind: str, name: str, nbytes: int) -> None:
+        """记录一次响应载荷大小（字节）"""
+        with self._lock:
+            self._get(kind, name).payload_bytes.record(float(nbytes))
+
+    def snapshot(self, kind: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        获取指标快照
+
+        Returns:
+            {kind: {name: 指标字典}}
+        """
+        with self._lock:
+            result: Dict[str, Dict[str, Any]] = {}
+            for (metric_kind, name), metrics in sorted(self._metrics.items()):
+                if kind is not None and metric_kind != kind:
+                    continue
+                result.setdefault(metric_kind, {})[name] = metrics.to_dict()
+            return result
+
+    def slowest(self, kind: str = "tool", quantile: float = 0.95, limit: int = 10) -> List[Dict[str, Any]]:
+        """按分位数延迟排序的最慢调用"""
+        with self._lock:
+            rows = [
+                {"name": name, "calls": m.calls, f"p{quantile * 100:g}_ms": m.latency_ms.quantile(quantile)}
+                for (metric_kind, name), m in self._metrics.items()
+                if metric_kind == kind and m.calls
+            ]
+        key = f"p{quantile * 100:g}_ms"
+        rows.sort(key=lambda row: row[key] or 0.0, reverse=True)
+        return rows[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+            self.started_at = time.time()
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_prometheus(registry: "MetricsRegistry", prefix: str = "quant") -> str:
+    """输出 Prometheus 文本格式"""
+    lines: List[str] = []
+    snapshot = registry.snapshot()
+    for kind, items in snapshot.items():
+        base = f"{prefix}_{kind}"
+        lines.append(f"# TYPE {base}_calls_total counter")
+        lines.append(f"# TYPE {base}_errors_total counter")
+        lines.append(f"# TYPE {base}_timeouts_total counter")
+        lines.append(f"# TYPE {base}_latency_ms summary")
+        lines.append(f"# TYPE {base}_payload_bytes summary")
+        for name, data in items.items():
+            label = f'name="{_escape_label(name)}"'
+            lines.append(f"{base}_calls_total{{{label}}} {data['calls']}")
+            lines.append(f"{base}_errors_total{{{label}}} {data['errors']}")
+            lines.append(f"{base}_timeouts_total{{{label}}} {data['timeouts']}")
+            for metric in ("latency_ms", "payload_bytes"):
+                summary = data[metric]
+                for q in DEFAULT_QUANTILES:
+                    value = summary.get(f"p{q * 100:g}")
+                    if value is not None:
+                        lines.append(f'{base}_{metric}{{{label},quantile="{q:g}"}} {value}')
+                lines.append(f"{base}_{metric}_sum{{{label}}} {summary['sum']}")
+                lines.append(f"{base}_{metric}_count{{{label}}} {summary['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def render_cache_prometheus(cache_stats: Dict[str, Dict[str, Any]], prefix: str = "quant") -> str:
+    """输出有界缓存统计的 Prometheus 文本（见 base/cache.get_cache_stats）"""
+    if not cache_stats:
+        return ""
+    base = f"{prefix}_cache"
+    series = (
+        ("entries", "gauge"),
+        ("bytes", "gauge"),
+        ("hits", "counter"),
+        ("misses", "counter"),
+        ("evictions", "counter"),
+        ("expirations", "counter"),
+        ("rejected", "counter"),
+    )
+    lines: List[str] = []
+    for metric, metric_type in series:
+        suffix = "_total" if metric_type == "counter" else ""
+        lines.append(f"# TYPE {base}_{metric}{suffix} {metric_type}")
+        for name, stats in cache_stats.items():
+            lines.append(f'{base}_{metric}{suffix}{{name="{_escape_label(name)}"}} {stats[metric]}')
+    return "\n".join(lines) + "\n"
+
+
+# 单例
+_metrics_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """获取调用指标注册表单例"""
+    global _metrics_registry
+    if _metrics_registry is None:
+        with _registry_lock:
+            if _metrics_registry is None:
+                _metrics_registry = MetricsRegistry()
+    return _metrics_registry
+
+
+def reset_metrics_registry() -> None:
+    """重置指标注册表（用于测试）"""
+    global _metrics_registry
+    _metrics_registry = None
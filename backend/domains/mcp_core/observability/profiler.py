@@ -0,0 +1,182 @@
+"""
+按需采样分析器
+
+在后台线程中周期性读取 sys._current_frames()，把各线程的调用栈折叠计数，
+生成火焰图数据，无需在生产环境挂调试器:
+- folded: "线程;模块:函数:行;..." + 样本数，兼容 flamegraph.pl / speedscope
+- tree: {name, value, children} 嵌套结构，兼容 d3-flame-graph
+
+采样只读取栈帧，不注入解释器钩子，对被采样代码的开销与采样频率成正比。
+同一进程同一时刻只允许一个采样会话。
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+MAX_PROFILE_SECONDS = 60.0
+MIN_INTERVAL = 0.001
+
+
+class ProfilerBusyError(RuntimeError):
+    """已有采样会话在运行"""
+
+
+@dataclass
+class ProfileResult:
+    """采样结果"""
+    duration: float
+    interval: float
+    samples: int
+    stacks: Counter = field(default_factory=Counter)
+
+    def folded(self) -> str:
+        """折叠栈文本（每行: 栈 样本数），按样本数降序"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def tree(self) -> Dict[str, Any]:
+        """火焰图树"""
+        root: Dict[str, Any] = {"name": "all", "value": 0, "children": {}}
+        for stack, count in self.stacks.items():
+            root["value"] += count
+            node = root
+            for frame in stack.split(";"):
+                child = node["children"].get(frame)
+                if child is None:
+                    child = node["children"][frame] = {"name": frame, "value": 0, "children": {}}
+                child["value"] += count
+                node = child
+
+        def finalize(node: Dict[str, Any]) -> Dict[str, Any]:
+            children = sorted(node["children"].values(), key=lambda c: c["value"], reverse=True)
+            return {"name": node["name"], "value": node["value"], "children": [finalize(c) for c in children]}
+
+        return finalize(root)
+
+    def top_functions(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """按自身样本数（栈顶）排序的热点函数"""
+        self_counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            self_counts[stack.rsplit(";", 1)[-1]] += count
+        return [
+            {"frame": frame, "samples": count, "ratio": round(count / self.samples, 4) if self.samples else 0.0}
+            for frame, count in self_counts.most_common(limit)
+        ]
+
+    def to_dict(self, include_tree: bool = True) -> Dict[str, Any]:
+        result = {
+            "duration": round(self.duration, 3),
+            "interval": self.interval,
+            "samples": self.samples,
+            "top": self.top_functions(),
+        }
+        if include_tree:
+            result["tree"] = self.tree()
+        return result
+
+
+def _format_frame(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    # 只保留最后两级路径，火焰图更易读
+    short = os.sep.join(filename.rsplit(os.sep, 2)[-2:])
+    return f"{short}:{code.co_name}:{frame.f_lineno}"
+
+
+class SamplingProfiler:
+    """调用栈采样分析器"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def sample(
+        self,
+        duration: float = 5.0,
+        interval: float = 0.01,
+        include_idle: bool = False,
+    ) -> ProfileResult:
+        """
+        同步采样（阻塞当前线程 duration 秒）
+
+        Args:
+            duration: 采样时长（秒），上限 MAX_PROFILE_SECONDS
+            interval: 采样间隔（秒）
+            include_idle: 是否保留空闲线程（栈顶为等待/轮询函数）的样本
+
+        Raises:
+            ProfilerBusyError: 已有采样会话在运行
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("profiler is already running")
+        try:
+            duration = min(max(duration, interval), MAX_PROFILE_SECONDS)
+            interval = max(interval, MIN_INTERVAL)
+            names = {t.ident: t.name for t in threading.enumerate()}
+            own = threading.get_ident()
+            stacks: Counter = Counter()
+            samples = 0
+
+            start = time.monotonic()
+            deadline = start + duration
+            while time.monotonic() < deadline:
+                for ident, frame in sys._current_frames().items():
+                    if ident == own:
+                        continue
+                    frames = []
+                    while frame is not None:
+                        frames.append(_format_frame(frame))
+                        frame = frame.f_back
+                    if not frames:
+                        continue
+                    if not include_idle and _is_idle(frames[0]):
+                        continue
+                    thread = names.get(ident) or str(ident)
+                    frames.append(f"thread:{thread}")
+                    stacks[";".join(reversed(frames))] += 1
+                    samples += 1
+                time.sleep(interval)
+
+            return ProfileResult(
+                duration=time.monotonic() - start,
+                interval=interval,
+                samples=samples,
+                stacks=stacks,
+            )
+        finally:
+            self._lock.release()
+
+    async def sample_async(self, duration: float = 5.0, interval: float = 0.01, include_idle: bool = False) -> ProfileResult:
+        """在线程中采样，不阻塞事件循环（事件循环线程本身也会被采样）"""
+        if self.busy:
+            raise ProfilerBusyError("profiler is already running")
+        return await asyncio.to_thread(self.sample, duration, interval, include_idle)
+
+
+# 栈顶为这些函数时视为空闲线程（等待 I/O、锁或事件循环轮询）
+_IDLE_FUNCTIONS = {"select", "poll", "epoll", "wait", "_wait_for_tstate_lock", "accept", "sleep", "_worker", "get"}
+
+
+def _is_idle(top_frame: str) -> bool:
+    parts = top_frame.rsplit(":", 2)
+    return len(parts) == 3 and parts[1] in _IDLE_FUNCTIONS
+
+
+# 单例
+_profiler: Optional[SamplingProfiler] = None
+
+
+def get_profiler() -> SamplingProfiler:
+    """获取采样分析器单例"""
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler()
+    return _profiler
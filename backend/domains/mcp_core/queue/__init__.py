@@ -1,7 +1,7 @@
 """
 任务队列模块
 
-基于 Redis 实现轻量级任务状态追踪。
+基于 Redis 实现轻量级任务队列（独立 worker 消费），并提供进程内统一作业调度器。
 """
 
 from .task_queue import (
@@ -10,10 +10,40 @@ from .task_queue import (
     TaskResult,
     get_task_queue,
 )
+from .worker import (
+    TaskWorker,
+    WorkerConfig,
+    task_handler,
+    run_worker,
+)
+from .scheduler import (
+    JobPriority,
+    JobScheduler,
+    SchedulerConfig,
+    get_scheduler,
+    reset_scheduler,
+    scheduling_context,
+    get_current_client_id,
+    get_current_priority,
+)
 
 __all__ = [
     "TaskQueue",
     "TaskStatus",
     "TaskResult",
     "get_task_queue",
+    # Worker
+    "TaskWorker",
+    "WorkerConfig",
+    "task_handler",
+    "run_worker",
+    # 作业调度
+    "JobPriority",
+    "JobScheduler",
+    "SchedulerConfig",
+    "get_scheduler",
+    "reset_scheduler",
+    "scheduling_context",
+    "get_current_client_id",
+    "get_current_priority",
 ]
@@ -0,0 +1,530 @@
+"""
+统一作业调度器
+
+为回测、分析、LLM 批量填充等长任务提供统一的准入控制，替代各执行器
+各自维护的独立线程池和并发上限。
+
+调度策略:
+- 优先级类别: interactive（前端交互）> agent（智能体调用）> batch（批量/参数遍历）
+- 同一优先级内按客户端轮转（公平份额），单个客户端的并发数受配额限制
+- 为 interactive 预留槽位（全局和各分组上限内均预留），批量任务占满时交互任务仍可立即启动
+- CPU 感知: 系统负载超过阈值时暂停准入新的 batch 任务（至少保留一个在运行）
+- 分组并发上限: 各执行器（backtest、stock_analysis 等）保留原有的并行上限
+
+同步函数通过 submit() 在调度器线程中执行，返回 concurrent.futures.Future；
+协程任务通过 run_async() 在调用方事件循环中执行，调度器只负责准入。
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JobPriority(IntEnum):
+    """作业优先级类别（数值越小越优先）"""
+    INTERACTIVE = 0
+    AGENT = 1
+    BATCH = 2
+
+    @classmethod
+    def parse(cls, value: Any) -> "JobPriority":
+        """从字符串/整数解析优先级"""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, str):
+            return cls[value.upper()]
+        return cls(int(value))
+
+
+# 当前请求的客户端标识与优先级（由 REST / MCP 入口设置，执行器提交时读取）
+_current_client_id: ContextVar[str] = ContextVar("scheduler_client_id", default="default")
+_current_priority: ContextVar[JobPriority] = ContextVar(
+    "scheduler_priority", default=JobPriority.INTERACTIVE
+)
+
+
+def get_current_client_id() -> str:
+    """获取当前上下文的客户端标识"""
+    return _current_client_id.get()
+
+
+def get_current_priority() -> JobPriority:
+    """获取当前上下文的默认优先级"""
+    return _current_priority.get()
+
+
+@contextmanager
+def scheduling_context(
+    client_id: Optional[str] = None,
+    priority: Optional[JobPriority] = None,
+) -> Iterator[None]:
+    """
+    设置当前上下文的调度身份
+
+    Usage:
+        with scheduling_context(client_id=session_id, priority=JobPriority.AGENT):
+            await tool.execute(...)
+    """
+    tokens = []
+    if client_id:
+        tokens.append((_current_client_id, _current_client_id.set(client_id)))
+    if priority is not None:
+        tokens.append((_current_priority, _current_priority.set(JobPriority.parse(priority))))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+@dataclass
+class SchedulerConfig:
+    """调度器配置"""
+    max_slots: int = field(default_factory=lambda: os.cpu_count() or 2)  # CPU 槽位数
+    reserved_interactive_slots: int = 1  # 为 interactive 预留的槽位（全局及每个分组，分组上限为 1 时不预留）
+    client_quota: Dict[JobPriority, int] = field(default_factory=lambda: {
+        JobPriority.INTERACTIVE: 0,  # 0 表示不限制
+        JobPriority.AGENT: 2,
+        JobPriority.BATCH: 2,
+    })
+    cpu_load_threshold: float = 0.9  # 1 分钟负载 / CPU 核心数 超过该值时暂停准入 batch
+    admission_recheck_interval: float = 1.0  # 因负载被阻塞时的重试间隔（秒）
+
+    @classmethod
+    def from_env(cls) -> "SchedulerConfig":
+        """从环境变量读取配置"""
+        config = cls()
+        if os.getenv("SCHEDULER_MAX_SLOTS"):
+            config.max_slots = int(os.environ["SCHEDULER_MAX_SLOTS"])
+        if os.getenv("SCHEDULER_RESERVED_INTERACTIVE"):
+            config.reserved_interactive_slots = int(os.environ["SCHEDULER_RESERVED_INTERACTIVE"])
+        if os.getenv("SCHEDULER_AGENT_QUOTA"):
+            config.client_quota[JobPriority.AGENT] = int(os.environ["SCHEDULER_AGENT_QUOTA"])
+        if os.getenv("SCHEDULER_BATCH_QUOTA"):
+            config.client_quota[JobPriority.BATCH] = int(os.environ["SCHEDULER_BATCH_QUOTA"])
+        if os.getenv("SCHEDULER_CPU_LOAD_THRESHOLD"):
+            config.cpu_load_threshold = float(os.environ["SCHEDULER_CPU_LOAD_THRESHOLD"])
+        return config
+
+
+@dataclass
+class _Job:
+    """调度器内部的作业记录"""
+    job_id: str
+    seq: int
+    priority: JobPriority
+    client_id: str
+    group: str
+    name: str
+    cpu_bound: bool
+    on_admit: Callable[[], None]
+    is_cancelled: Callable[[], bool]
+    submitted_at: datetime = field(default_factory=datetime.now)
+
+
+class JobScheduler:
+    """
+    统一作业调度器
+
+    Usage:
+        scheduler = get_scheduler()
+        future = scheduler.submit(run_backtest, request, group="backtest",
+                                  priority=JobPriority.BATCH, client_id="agent-1")
+        scheduler.get_position(future.job_id)
+
+        result = await scheduler.run_async(lambda: filler.fill_fields_async(...),
+                                           group="llm_fill", cpu_bound=False)
+    """
+
+    def __init__(self, config: Optional[SchedulerConfig] = None):
+        self.config = config or SchedulerConfig.from_env()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, self.config.max_slots),
+            thread_name_prefix="job-scheduler",
+        )
+        self._lock = threading.RLock()
+        self._seq = itertools.count()
+
+        # 排队: 优先级 -> 客户端 -> 作业队列（OrderedDict 维护轮转顺序）
+        self._queues: Dict[JobPriority, "OrderedDict[str, Deque[_Job]]"] = {
+            p: OrderedDict() for p in JobPriority
+        }
+        self._queued: Dict[str, _Job] = {}
+        self._running: Dict[str, _Job] = {}
+
+        self._group_limits: Dict[str, int] = {}
+        self._recheck_timer: Optional[threading.Timer] = None
+        self._shutdown = False
+
+    # ==================== 配置 ====================
+
+    def set_group_limit(self, group: str, limit: Optional[int]) -> None:
+        """设置分组并发上限（None 或 0 表示不限制）"""
+        with self._lock:
+            if limit:
+                self._group_limits[group] = limit
+            else:
+                self._group_limits.pop(group, None)
+        self._dispatch()
+
+    # ==================== 提交 ====================
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        group: str = "default",
+        priority: Optional[JobPriority] = None,
+        client_id: Optional[str] = None,
+        name: str = "",
+        **kwargs: Any,
+    ) -> Future:
+        """
+        提交同步函数，准入后在调度器线程池中执行
+
+        Args:
+            fn: 要执行的函数
+            group: 作业分组（用于分组并发上限）
+            priority: 优先级，默认取当前上下文
+            client_id: 客户端标识，默认取当前上下文
+            name: 作业名称（用于展示）
+
+        Returns:
+            Future，附带 job_id 属性；排队期间可 cancel()
+        """
+        future: Future = Future()
+        job_id = str(uuid.uuid4())
+        future.job_id = job_id  # type: ignore[attr-defined]
+
+        def on_admit():
+            self._executor.submit(self._run_sync, job_id, future, fn, args, kwargs)
+
+        self._enqueue(_Job(
+            job_id=job_id,
+            seq=next(self._seq),
+            priority=JobPriority.parse(priority if priority is not None else get_current_priority()),
+            client_id=client_id or get_current_client_id(),
+            group=group,
+            name=name or getattr(fn, "__name__", "job"),
+            cpu_bound=True,
+            on_admit=on_admit,
+            is_cancelled=future.cancelled,
+        ))
+        # 排队期间取消时立即移出队列
+        future.add_done_callback(lambda f: f.cancelled() and self._finish(job_id))
+        return future
+
+    async def run_async(
+        self,
+        coro_factory: Callable[[], Awaitable[Any]],
+        group: str = "default",
+        priority: Optional[JobPriority] = None,
+        client_id: Optional[str] = None,
+        name: str = "",
+        cpu_bound: bool = False,
+        on_queued: Optional[Callable[[int], Any]] = None,
+    ) -> Any:
+        """
+        等待准入后在当前事件循环中执行协程
+
+        Args:
+            coro_factory: 返回协程的可调用对象（准入后才调用）
+            group: 作业分组
+            priority: 优先级，默认取当前上下文
+            client_id: 客户端标识，默认取当前上下文
+            name: 作业名称
+            cpu_bound: 是否占用 CPU 槽位（I/O 型任务如 LLM 调用应为 False）
+            on_queued: 未能立即准入时的回调，参数为排队位置
+
+        Returns:
+            协程返回值
+        """
+        loop = asyncio.get_running_loop()
+        admitted: asyncio.Future = loop.create_future()
+        job_id = str(uuid.uuid4())
+
+        def on_admit():
+            loop.call_soon_threadsafe(
+                lambda: admitted.done() or admitted.set_result(None)
+            )
+
+        self._enqueue(_Job(
+            job_id=job_id,
+            seq=next(self._seq),
+            priority=JobPriority.parse(priority if priority is not None else get_current_priority()),
+            client_id=client_id or get_current_client_id(),
+            group=group,
+            name=name or getattr(coro_factory, "__name__", "job"),
+            cpu_bound=cpu_bound,
+            on_admit=on_admit,
+            is_cancelled=admitted.cancelled,
+        ))
+
+        try:
+            if not admitted.done() and on_queued is not None:
+                position = self.get_position(job_id)
+                if position is not None:
+                    result = on_queued(position)
+                    if asyncio.iscoroutine(result):
+                        await result
+            await admitted
+            return await coro_factory()
+        finally:
+            self._finish(job_id)
+
+    # ==================== 查询 ====================
+
+    def get_position(self, job_id: str) -> Optional[int]:
+        """
+        获取排队位置（0 表示下一个准入）
+
+        按优先级和提交顺序估算；运行中或不存在的作业返回 None。
+        """
+        with self._lock:
+            job = self._queued.get(job_id)
+            if job is None:
+                return None
+            return sum(
+                1 for other in self._queued.values()
+                if not other.is_cancelled()
+                and (other.priority, other.seq) < (job.priority, job.seq)
+            )
+
+    def is_running(self, job_id: str) -> bool:
+        """作业是否已准入运行"""
+        with self._lock:
+            return job_id in self._running
+
+    def get_stats(self) -> Dict[str, Any]:
+        """调度器状态统计"""
+        with self._lock:
+            running_by_priority = {p.name.lower(): 0 for p in JobPriority}
+            queued_by_priority = {p.name.lower(): 0 for p in JobPriority}
+            by_group: Dict[str, Dict[str, int]] = {}
+            by_client: Dict[str, Dict[str, int]] = {}
+
+            for state, jobs, counter in (
+                ("running", self._running.values(), running_by_priority),
+                ("queued", self._queued.values(), queued_by_priority),
+            ):
+                for job in jobs:
+                    counter[job.priority.name.lower()] += 1
+                    by_group.setdefault(job.group, {"running": 0, "queued": 0})[state] += 1
+                    by_client.setdefault(job.client_id, {"running": 0, "queued": 0})[state] += 1
+
+            return {
+                "max_slots": self.config.max_slots,
+                "cpu_slots_in_use": sum(1 for j in self._running.values() if j.cpu_bound),
+                "cpu_load": self._cpu_load(),
+                "running": running_by_priority,
+                "queued": queued_by_priority,
+                "groups": by_group,
+                "group_limits": dict(self._group_limits),
+                "clients": by_client,
+            }
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """列出排队和运行中的作业"""
+        with self._lock:
+            jobs = []
+            for state, pool in (("running", self._running), ("queued", self._queued)):
+                for job in pool.values():
+                    jobs.append({
+                        "job_id": job.job_id,
+                        "name": job.name,
+                        "state": state,
+                        "priority": job.priority.name.lower(),
+                        "client_id": job.client_id,
+                        "group": job.group,
+                        "submitted_at": job.submitted_at.isoformat(),
+                    })
+            return jobs
+
+    # ==================== 内部实现 ====================
+
+    def _enqueue(self, job: _Job) -> None:
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("调度器已关闭")
+            self._queues[job.priority].setdefault(job.client_id, deque()).append(job)
+            self._queued[job.job_id] = job
+        self._dispatch()
+
+    def _run_sync(self, job_id: str, future: Future, fn, args, kwargs) -> None:
+        try:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+        finally:
+            self._finish(job_id)
+
+    def _finish(self, job_id: str) -> None:
+        with self._lock:
+            self._running.pop(job_id, None)
+            job = self._queued.pop(job_id, None)
+            if job is not None:
+                # 排队中被取消（如协程等待被取消）
+                queue = self._queues[job.priority].get(job.client_id)
+                if queue is not None and job in queue:
+                    queue.remove(job)
+        self._dispatch()
+
+    def _cpu_load(self) -> Optional[float]:
+        """1 分钟平均负载 / CPU 核心数；平台不支持时返回 None"""
+        try:
+            return os.getloadavg()[0] / (os.cpu_count() or 1)
+        except (AttributeError, OSError):
+            return None
+
+    def _can_admit(self, job: _Job, cpu_overloaded: bool) -> bool:
+        """检查槽位、预留、分组上限、客户端配额和 CPU 负载"""
+        running = self._running.values()
+
+        if job.cpu_bound:
+            cpu_in_use = sum(1 for j in running if j.cpu_bound)
+            if cpu_in_use >= self.config.max_slots:
+                return False
+            if job.priority != JobPriority.INTERACTIVE:
+                non_interactive = sum(
+                    1 for j in running if j.cpu_bound and j.priority != JobPriority.INTERACTIVE
+                )
+                reserved = min(self.config.reserved_interactive_slots, self.config.max_slots - 1)
+                if non_interactive >= self.config.max_slots - reserved:
+                    return False
+
+        group_limit = self._group_limits.get(job.group)
+        if group_limit:
+            in_group = [j for j in running if j.group == job.group]
+            if len(in_group) >= group_limit:
+                return False
+            # 分组内同样为 interactive 预留槽位，避免批量作业占满分组上限
+            if job.priority != JobPriority.INTERACTIVE:
+                reserved = min(self.config.reserved_interactive_slots, group_limit - 1)
+                if sum(1 for j in in_group if j.priority != JobPriority.INTERACTIVE) >= group_limit - reserved:
+                    return False
+
+        quota = self.config.client_quota.get(job.priority, 0)
+        if quota and sum(
+            1 for j in running if j.client_id == job.client_id and j.priority == job.priority
+        ) >= quota:
+            return False
+
+        if job.priority == JobPriority.BATCH and job.cpu_bound and cpu_overloaded:
+            if any(j.priority == JobPriority.BATCH and j.cpu_bound for j in running):
+                return False
+
+        return True
+
+    def _pick_next(self, cpu_overloaded: bool) -> Optional[_Job]:
+        """按优先级、客户端轮转选出下一个可准入的作业"""
+        for priority in JobPriority:
+            clients = self._queues[priority]
+            for client_id in list(clients.keys()):
+                queue = clients[client_id]
+                # 丢弃已取消的作业
+                while queue and queue[0].is_cancelled():
+                    self._queued.pop(queue.popleft().job_id, None)
+                if not queue:
+                    del clients[client_id]
+                    continue
+                # 同一客户端内按分组查找第一个可准入的作业
+                for job in queue:
+                    if self._can_admit(job, cpu_overloaded):
+                        queue.remove(job)
+                        if queue:
+                            clients.move_to_end(client_id)  # 轮转到队尾
+                        else:
+                            del clients[client_id]
+                        return job
+        return None
+
+    def _dispatch(self) -> None:
+        """准入所有当前可运行的作业"""
+        admitted: List[_Job] = []
+        blocked_by_load = False
+        with self._lock:
+            load = self._cpu_load()
+            cpu_overloaded = load is not None and load > self.config.cpu_load_threshold
+            while True:
+                job = self._pick_next(cpu_overloaded)
+                if job is None:
+                    break
+                self._queued.pop(job.job_id, None)
+                self._running[job.job_id] = job
+                admitted.append(job)
+
+            if cpu_overloaded and any(
+                j.priority == JobPriority.BATCH for j in self._queued.values()
+            ):
+                blocked_by_load = True
+
+        for job in admitted:
+            logger.debug(
+                f"作业准入: {job.name} ({job.job_id}) priority={job.priority.name} "
+                f"client={job.client_id} group={job.group}"
+            )
+            job.on_admit()
+
+        if blocked_by_load:
+            self._schedule_recheck()
+
+    def _schedule_recheck(self) -> None:
+        """负载过高时定时重试准入"""
+        with self._lock:
+            if self._shutdown or (self._recheck_timer and self._recheck_timer.is_alive()):
+                return
+            timer = threading.Timer(self.config.admission_recheck_interval, self._dispatch)
+            timer.daemon = True
+            self._recheck_timer = timer
+        timer.start()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭调度器"""
+        with self._lock:
+            self._shutdown = True
+            if self._recheck_timer:
+                self._recheck_timer.cancel()
+        self._executor.shutdown(wait=wait)
+        logger.info("JobScheduler 已关闭")
+
+
+# 全局调度器
+_scheduler: Optional[JobScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> JobScheduler:
+    """获取全局调度器（单例，线程安全）"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = JobScheduler()
+    return _scheduler
+
+
+def reset_scheduler() -> None:
+    """重置全局调度器（用于测试）"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            _scheduler.shutdown(wait=False)
+        _scheduler = None
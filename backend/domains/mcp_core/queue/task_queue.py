@@ -4,8 +4,8 @@
 基于 Redis 的轻量级任务队列，支持:
 - 异步任务提交
 - 任务状态查询
-- 任务结果获取
-- 优先级队列
+- 任务结果获取（pub/sub 完成通知）
+- 优先级队列（由 worker 进程 LMOVE 领取）
 """
 
 import asyncio
@@ -16,7 +16,9 @@ import uuid
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, Optional, Callable, Awaitable
+from typing import Any, Dict, Iterable, List, Optional, Callable, Awaitable, Tuple
+
+from .scheduler import JobPriority, get_current_client_id, get_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -58,15 +60,81 @@ class TaskResult:
         }
 
 
+# Redis 键
+TASK_TTL = 86400 * 7  # 任务数据保留 7 天
+QUEUE_HIGH = "task:queue:high"
+QUEUE_DEFAULT = "task:queue:default"
+QUEUES = (QUEUE_HIGH, QUEUE_DEFAULT)  # 按优先级从高到低
+PROCESSING_KEY = "task:processing"  # ZSET: task_id -> 可见性超时截止时间戳
+
+# 二级索引（ZSET: task_id -> 创建时间戳），随元数据在同一事务中维护
+INDEX_ALL = "task:index:all"
+INDEX_TYPES = "task:index:types"  # SET: 已出现的任务类型
+
+TERMINAL_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
+
+
+def meta_key(task_id: str) -> str:
+    return f"task:{task_id}:meta"
+
+
+def result_key(task_id: str) -> str:
+    return f"task:{task_id}:result"
+
+
+def done_channel(task_id: str) -> str:
+    """任务结束通知频道"""
+    return f"task:{task_id}:done"
+
+
+def queue_for_priority(priority: int) -> str:
+    return QUEUE_HIGH if priority > 0 else QUEUE_DEFAULT
+
+
+def job_priority_for(priority: int) -> JobPriority:
+    """任务优先级对应的调度优先级（内存模式与 worker 共用：高优先级为 interactive，普通为 batch）"""
+    return JobPriority.INTERACTIVE if priority > 0 else JobPriority.BATCH
+
+
+def index_key(status: Optional[str] = None, task_type: Optional[str] = None) -> str:
+    """按状态/类型过滤的索引键"""
+    if status and task_type:
+        return f"task:index:type:{task_type}:status:{status}"
+    if status:
+        return f"task:index:status:{status}"
+    if task_type:
+        return f"task:index:type:{task_type}"
+    return INDEX_ALL
+
+
+def _created_score(meta: Dict[str, Any]) -> float:
+    return datetime.fromisoformat(meta["created_at"]).timestamp()
+
+
+def _result_from_meta(meta: Dict[str, Any]) -> "TaskResult":
+    return TaskResult(
+        task_id=meta["task_id"],
+        status=TaskStatus(meta["status"]),
+        task_type=meta.get("task_type"),
+        error=meta.get("error"),
+        created_at=datetime.fromisoformat(meta["created_at"]) if meta.get("created_at") else None,
+        started_at=datetime.fromisoformat(meta["started_at"]) if meta.get("started_at") else None,
+        completed_at=datetime.fromisoformat(meta["completed_at"]) if meta.get("completed_at") else None,
+    )
+
+
 class TaskQueue:
     """
     轻量级任务队列
 
     使用 Redis 存储任务状态，支持:
     - 任务提交和状态追踪
-    - 异步结果获取
+    - 异步结果获取（pub/sub 通知，无需轮询）
     - 任务取消
 
+    Redis 模式下任务由独立 worker 进程消费（见 worker.py），可跨机器水平扩展；
+    Redis 不可用时退化为内存模式，在当前进程内执行。
+
     使用示例:
         queue = TaskQueue()
         await queue.connect()
@@ -74,23 +142,26 @@ class TaskQueue:
         # 提交任务
         task_id = await queue.submit("backtest", {"strategy": "Rsi"})
 
-        # 查询状态
-        result = await queue.get_result(task_id)
+        # 等待结果
+        result = await queue.get_result(task_id, wait=True)
     """
 
-    def __init__(self, redis_url: Optional[str] = None):
+    def __init__(self, redis_url: Optional[str] = None, redis_client: Any = None):
         """
         初始化任务队列
 
         Args:
             redis_url: Redis 连接 URL，默认从环境变量获取
+            redis_client: 已创建的 redis.asyncio 客户端（测试时可传入 fakeredis）
         """
         self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379")
-        self._redis = None
+        self._redis = redis_client
         self._handlers: Dict[str, Callable[..., Awaitable]] = {}
 
     async def connect(self):
         """连接 Redis"""
+        if self._redis is not None:
+            return
         try:
             import redis.asyncio as redis
             self._redis = redis.from_url(self.redis_url, decode_responses=True)
@@ -108,10 +179,22 @@ class TaskQueue:
         if self._redis:
             await self._redis.close()
 
+    @property
+    def redis(self):
+        """Redis 客户端（内存模式下为 None）"""
+        return self._redis
+
+    @property
+    def handlers(self) -> Dict[str, Callable[..., Awaitable]]:
+        """已注册的任务处理器"""
+        return self._handlers
+
     def register(self, task_type: str):
         """
         注册任务处理器
 
+        Redis 模式下处理器在 worker 进程中执行，需在 worker 启动时导入注册模块。
+
         使用装饰器:
             @queue.register("backtest")
             async def handle_backtest(params):
@@ -149,27 +232,33 @@ class TaskQueue:
             "status": TaskStatus.PENDING.value,
             "priority": priority,
             "created_at": now.isoformat(),
+            "attempts": 0,
+            "client_id": get_current_client_id(),  # worker 端按提交方做公平调度
         }
 
         if self._redis:
-            # Redis 模式
-            await self._redis.set(
-                f"task:{task_id}:meta",
-                json.dumps(meta, ensure_ascii=False),
-                ex=86400 * 7  # 7 天过期
-            )
-            # 加入队列
-            queue_name = "task:queue:high" if priority > 0 else "task:queue:default"
-            await self._redis.lpush(queue_name, task_id)
+            # Redis 模式：写入元数据后入队，由 worker 消费
+            async with self._redis.pipeline(transaction=True) as pipe:
+                self._queue_meta_write(pipe, meta)
+                pipe.lpush(queue_for_priority(priority), task_id)
+                await pipe.execute()
         else:
-            # 内存模式：直接执行
+            # 内存模式：经调度器准入后执行，优先级映射与 worker 一致
             if task_type in self._handlers:
-                asyncio.create_task(self._execute_task(task_id, task_type, params))
+                asyncio.create_task(self._execute_task(
+                    task_id, task_type, params, priority=job_priority_for(priority),
+                ))
 
         logger.info(f"任务已提交: {task_type} ({task_id})")
         return task_id
 
-    async def _execute_task(self, task_id: str, task_type: str, params: Dict):
+    async def _execute_task(
+        self,
+        task_id: str,
+        task_type: str,
+        params: Dict,
+        priority: Optional[JobPriority] = None,
+    ):
         """执行任务（内存模式）"""
         handler = self._handlers.get(task_type)
         if not handler:
@@ -177,7 +266,12 @@ class TaskQueue:
             return
 
         try:
-            result = await handler(params)
+            result = await get_scheduler().run_async(
+                lambda: handler(params),
+                group="task_queue",
+                priority=priority,
+                name=f"{task_type}:{task_id}",
+            )
             await self._update_task_status(
                 task_id, TaskStatus.COMPLETED, result=result
             )
@@ -187,36 +281,135 @@ class TaskQueue:
                 task_id, TaskStatus.FAILED, error=str(e)
             )
 
+    async def get_meta(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """读取任务元数据"""
+        if not self._redis:
+            return None
+        meta_str = await self._redis.get(meta_key(task_id))
+        return json.loads(meta_str) if meta_str else None
+
+    async def save_meta(self, meta: Dict[str, Any]) -> None:
+        """写回任务元数据（同一事务内更新状态索引）"""
+        async with self._redis.pipeline(transaction=True) as pipe:
+            self._queue_meta_write(pipe, meta)
+            await pipe.execute()
+
+    async def transition(
+        self,
+        task_id: str,
+        apply: Callable[[Dict[str, Any]], bool],
+        queue_extra: Optional[Callable[[Any, Dict[str, Any]], None]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        比较并设置任务元数据（WATCH/MULTI）
+
+        状态变更都经由此方法：apply 在最新元数据上检查当前状态并原地修改，
+        返回 False 表示状态不符、放弃写入。读取与提交之间元数据被其他客户端修改时
+        事务失败并重新读取，不会用过期的元数据覆盖对方刚写入的状态。
+
+        Args:
+            task_id: 任务 ID
+            apply: 检查并修改元数据
+            queue_extra: 在同一事务中追加的命令（如出入队），参数为 pipeline 和修改后的元数据
+
+        Returns:
+            写入后的元数据；任务不存在或 apply 放弃时返回 None
+        """
+        from redis.exceptions import WatchError
+
+        key = meta_key(task_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    meta_str = await pipe.get(key)
+                    if not meta_str:
+                        return None
+                    meta = json.loads(meta_str)
+                    if not apply(meta):
+                        return None
+                    pipe.multi()
+                    self._queue_meta_write(pipe, meta)
+                    if queue_extra:
+                        queue_extra(pipe, meta)
+                    await pipe.execute()
+                    return meta
+                except WatchError:
+                    continue
+
+    @staticmethod
+    def _queue_meta_write(pipe, meta: Dict[str, Any]) -> None:
+        """在 pipeline 中写入元数据并维护二级索引"""
+        pipe.set(meta_key(meta["task_id"]), json.dumps(meta, ensure_ascii=False), ex=TASK_TTL)
+        TaskQueue._queue_index_write(pipe, meta)
+
+    @staticmethod
+    def _queue_index_write(pipe, meta: Dict[str, Any]) -> None:
+        """在 pipeline 中维护二级索引（状态变化时从其他状态索引中移除）"""
+        task_id = meta["task_id"]
+        task_type = meta.get("task_type") or ""
+        status = meta["status"]
+        score = _created_score(meta)
+
+        pipe.zadd(INDEX_ALL, {task_id: score})
+        pipe.zadd(index_key(task_type=task_type), {task_id: score})
+        pipe.sadd(INDEX_TYPES, task_type)
+        for s in TaskStatus:
+            if s.value == status:
+                pipe.zadd(index_key(status=s.value), {task_id: score})
+                pipe.zadd(index_key(status=s.value, task_type=task_type), {task_id: score})
+            else:
+                pipe.zrem(index_key(status=s.value), task_id)
+                pipe.zrem(index_key(status=s.value, task_type=task_type), task_id)
+
     async def _update_task_status(
         self,
         task_id: str,
         status: TaskStatus,
         result: Any = None,
         error: str = None,
-    ):
-        """更新任务状态"""
+        expected: Optional[Iterable[TaskStatus]] = None,
+        worker_id: Optional[str] = None,
+    ) -> bool:
+        """
+        更新任务状态，进入终态时发布完成通知
+
+        Args:
+            expected: 允许的当前状态，默认为任意非终态
+            worker_id: 指定时只有元数据中的执行者为该 worker 才写入
+
+        Returns:
+            是否写入（当前状态不符时不写入，也不保存结果）
+        """
         if not self._redis:
-            return
+            return False
 
-        meta_key = f"task:{task_id}:meta"
-        meta_str = await self._redis.get(meta_key)
+        allowed = {s.value for s in (expected or set(TaskStatus) - set(TERMINAL_STATUSES))}
 
-        if meta_str:
-            meta = json.loads(meta_str)
+        def apply(meta: Dict[str, Any]) -> bool:
+            if meta["status"] not in allowed:
+                return False
+            if worker_id is not None and meta.get("worker_id") != worker_id:
+                return False
             meta["status"] = status.value
-            meta["completed_at"] = datetime.now().isoformat()
+            if status == TaskStatus.RUNNING:
+                meta["started_at"] = datetime.now().isoformat()
+            else:
+                meta["completed_at"] = datetime.now().isoformat()
+            if error:
+                meta["error"] = error
+            return True
 
+        def queue_result(pipe, meta: Dict[str, Any]) -> None:
             if result is not None:
-                await self._redis.set(
-                    f"task:{task_id}:result",
-                    json.dumps(result, ensure_ascii=False),
-                    ex=86400 * 7
-                )
+                pipe.set(result_key(task_id), json.dumps(result, ensure_ascii=False), ex=TASK_TTL)
 
-            if error:
-                meta["error"] = error
+        if await self.transition(task_id, apply, queue_result) is None:
+            return False
 
-            await self._redis.set(meta_key, json.dumps(meta, ensure_ascii=False), ex=86400 * 7)
+        if status in TERMINAL_STATUSES:
+            await self._redis.publish(done_channel(task_id), status.value)
+        return True
 
     async def get_result(
         self,
@@ -229,7 +422,7 @@ class TaskQueue:
 
         Args:
             task_id: 任务 ID
-            wait: 是否等待完成
+            wait: 是否等待完成（订阅完成通知，任务结束时立即返回）
             timeout: 等待超时时间（秒）
 
         Returns:
@@ -238,30 +431,16 @@ class TaskQueue:
         if not self._redis:
             return TaskResult(task_id=task_id, status=TaskStatus.PENDING)
 
-        meta_key = f"task:{task_id}:meta"
-        result_key = f"task:{task_id}:result"
-
         if wait:
-            # 轮询等待
-            start = asyncio.get_event_loop().time()
-            while asyncio.get_event_loop().time() - start < timeout:
-                meta_str = await self._redis.get(meta_key)
-                if meta_str:
-                    meta = json.loads(meta_str)
-                    status = TaskStatus(meta["status"])
-                    if status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED):
-                        break
-                await asyncio.sleep(0.5)
+            await self._wait_for_completion(task_id, timeout)
 
-        meta_str = await self._redis.get(meta_key)
-        if not meta_str:
+        meta = await self.get_meta(task_id)
+        if not meta:
             return TaskResult(task_id=task_id, status=TaskStatus.PENDING)
 
-        meta = json.loads(meta_str)
-
         # 获取结果
         result = None
-        result_str = await self._redis.get(result_key)
+        result_str = await self._redis.get(result_key(task_id))
         if result_str:
             result = json.loads(result_str)
 
@@ -284,32 +463,60 @@ class TaskQueue:
             runtime_seconds=runtime,
         )
 
+    async def _wait_for_completion(self, task_id: str, timeout: float) -> None:
+        """订阅完成频道等待任务结束（先订阅再检查状态，避免错过通知）"""
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(done_channel(task_id))
+        try:
+            meta = await self.get_meta(task_id)
+            if meta is None or TaskStatus(meta["status"]) in TERMINAL_STATUSES:
+                return
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=remaining
+                )
+                if message is not None and message.get("type") == "message":
+                    return
+        finally:
+            await pubsub.unsubscribe(done_channel(task_id))
+            await pubsub.aclose()
+
     async def cancel(self, task_id: str) -> bool:
-        """取消任务"""
+        """
+        取消任务
+
+        排队中的任务直接置为已取消并移出队列；运行中的任务标记取消请求，由 worker 在心跳时中止。
+        状态判断与写入在同一事务中完成，worker 已领取并开始执行的任务按运行中处理。
+        """
         if not self._redis:
             return False
 
-        meta_key = f"task:{task_id}:meta"
-        meta_str = await self._redis.get(meta_key)
-
-        if not meta_str:
+        def apply(meta: Dict[str, Any]) -> bool:
+            if meta["status"] == TaskStatus.PENDING.value:
+                meta["status"] = TaskStatus.CANCELLED.value
+                meta["completed_at"] = datetime.now().isoformat()
+                return True
+            if meta["status"] == TaskStatus.RUNNING.value:
+                meta["cancel_requested"] = True
+                return True
             return False
 
-        meta = json.loads(meta_str)
-        current_status = TaskStatus(meta["status"])
-
-        if current_status == TaskStatus.PENDING:
-            meta["status"] = TaskStatus.CANCELLED.value
-            meta["completed_at"] = datetime.now().isoformat()
-            await self._redis.set(meta_key, json.dumps(meta))
-            return True
-        elif current_status == TaskStatus.RUNNING:
-            # 运行中的任务只能标记取消请求
-            meta["cancel_requested"] = True
-            await self._redis.set(meta_key, json.dumps(meta))
-            return True
+        def dequeue(pipe, meta: Dict[str, Any]) -> None:
+            if meta["status"] == TaskStatus.CANCELLED.value:
+                pipe.lrem(queue_for_priority(meta.get("priority", 0)), 0, task_id)
 
-        return False
+        meta = await self.transition(task_id, apply, dequeue)
+        if meta is None:
+            return False
+        if meta["status"] == TaskStatus.CANCELLED.value:
+            await self._redis.publish(done_channel(task_id), TaskStatus.CANCELLED.value)
+        return True
 
     async def list_tasks(
         self,
@@ -318,7 +525,7 @@ class TaskQueue:
         limit: int = 50,
     ) -> list[TaskResult]:
         """
-        列出任务
+        列出任务（按创建时间倒序）
 
         Args:
             status: 按状态过滤
@@ -328,44 +535,115 @@ class TaskQueue:
         Returns:
             TaskResult 列表
         """
+        results, _ = await self.list_tasks_page(status=status, task_type=task_type, limit=limit)
+        return results
+
+    async def list_tasks_page(
+        self,
+        status: Optional[TaskStatus] = None,
+        task_type: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[TaskResult], Optional[str]]:
+        """
+        游标分页列出任务（按创建时间倒序）
+
+        从二级索引按范围读取 ID，再一次 MGET 取元数据，耗时与保留任务总数无关。
+
+        Args:
+            status: 按状态过滤
+            task_type: 按类型过滤
+            limit: 每页数量
+            cursor: 上一页返回的游标
+
+        Returns:
+            (任务列表, 下一页游标)，没有更多数据时游标为 None
+        """
         if not self._redis:
-            return []
+            return [], None
 
-        # 扫描所有任务
-        results = []
-        cursor = 0
+        key = index_key(status=status.value if status else None, task_type=task_type)
+        await self._prune_index(key)
+
+        # 游标格式 "score|skip": 从 score（含）开始，跳过同分已返回的 skip 项
+        if cursor:
+            max_score, skip_str = cursor.rsplit("|", 1)
+            skip = int(skip_str)
+        else:
+            max_score, skip = "+inf", 0
+
+        results: List[TaskResult] = []
+        next_cursor: Optional[str] = None
         while len(results) < limit:
-            cursor, keys = await self._redis.scan(
-                cursor, match="task:*:meta", count=100
+            batch = await self._redis.zrevrangebyscore(
+                key, max_score, "-inf", start=skip, num=limit - len(results), withscores=True
             )
-            for key in keys:
-                if len(results) >= limit:
-                    break
+            if not batch:
+                next_cursor = None
+                break
 
-                meta_str = await self._redis.get(key)
-                if not meta_str:
-                    continue
+            metas = await self._redis.mget([meta_key(task_id) for task_id, _ in batch])
+            # 元数据已过期的索引残留直接跳过，由 _prune_index 按保留期清理
+            results.extend(
+                _result_from_meta(json.loads(meta_str)) for meta_str in metas if meta_str
+            )
 
-                meta = json.loads(meta_str)
+            last_score = batch[-1][1]
+            same = sum(1 for _, score in batch if score == last_score)
+            if max_score != "+inf" and float(max_score) == last_score:
+                skip += same
+            else:
+                skip = same
+            max_score = repr(last_score)
+            next_cursor = f"{max_score}|{skip}"
 
-                # 过滤
-                if status and meta["status"] != status.value:
-                    continue
-                if task_type and meta.get("task_type") != task_type:
-                    continue
+        return results, next_cursor
 
-                results.append(TaskResult(
-                    task_id=meta["task_id"],
-                    status=TaskStatus(meta["status"]),
-                    task_type=meta.get("task_type"),
-                    error=meta.get("error"),
-                    created_at=datetime.fromisoformat(meta["created_at"]) if meta.get("created_at") else None,
-                ))
+    async def count_tasks(
+        self,
+        status: Optional[TaskStatus] = None,
+        task_type: Optional[str] = None,
+    ) -> int:
+        """统计任务数（ZCARD，O(1)）"""
+        if not self._redis:
+            return 0
+        key = index_key(status=status.value if status else None, task_type=task_type)
+        await self._prune_index(key)
+        return await self._redis.zcard(key)
+
+    async def _prune_index(self, key: str) -> None:
+        """移除超过保留期的索引项（元数据已随 TTL 过期）"""
+        cutoff = datetime.now().timestamp() - TASK_TTL
+        await self._redis.zremrangebyscore(key, "-inf", cutoff)
+
+    async def rebuild_indexes(self) -> int:
+        """
+        从现有元数据重建二级索引（升级后一次性执行）
 
+        Returns:
+            索引的任务数
+        """
+        if not self._redis:
+            return 0
+
+        count = 0
+        cursor = 0
+        while True:
+            cursor, keys = await self._redis.scan(cursor, match="task:*:meta", count=500)
+            if keys:
+                metas = await self._redis.mget(keys)
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    for meta_str in metas:
+                        if meta_str:
+                            meta = json.loads(meta_str)
+                            # 仅维护索引，不重写元数据（保留原 TTL）
+                            self._queue_index_write(pipe, meta)
+                            count += 1
+                    await pipe.execute()
             if cursor == 0:
                 break
-
-        return results
+        logger.info(f"任务索引重建完成: {count} 个任务")
+        return count
 
 
 # 全局任务队列
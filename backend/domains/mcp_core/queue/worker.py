@@ -0,0 +1,404 @@
+"""
+任务队列 Worker
+
+独立进程消费 Redis 任务队列，可在多台机器上水平扩展:
+- LMOVE 按优先级（high > default）把任务原子地移入本 worker 的 claimed 列表，
+  队列为空时按 poll_interval 轮询
+- 开始执行前登记到 processing 有序集合（score 为可见性超时截止时间）后移出 claimed 列表，
+  运行期间定期心跳续期；任一时刻任务至少存在于队列、claimed 列表、processing 之一
+- worker 崩溃导致心跳中断时，其他 worker 的回收循环会将超时任务、以及失联 worker
+  claimed 列表中尚未登记的任务重新入队（超过重试次数则标记失败）
+- 任务结束后通过 pub/sub 通知等待方（见 TaskQueue.get_result）
+
+处理器需为协程函数；CPU 密集的处理器应通过调度器或线程池执行计算，
+避免阻塞事件循环导致心跳中断。
+
+启动方式:
+    python -m domains.mcp_core.queue.worker --import domains.xxx.tasks --concurrency 4
+"""
+
+import asyncio
+import importlib
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+
+from .scheduler import get_scheduler
+from .task_queue import (
+    PROCESSING_KEY,
+    QUEUES,
+    TERMINAL_STATUSES,
+    TaskQueue,
+    TaskStatus,
+    job_priority_for,
+    queue_for_priority,
+)
+
+logger = logging.getLogger(__name__)
+
+# 模块级处理器注册表（worker 进程通过 --import 导入注册模块）
+_registered_handlers: Dict[str, Callable[..., Awaitable]] = {}
+
+
+def task_handler(task_type: str):
+    """
+    注册任务处理器（模块级）
+
+    使用装饰器:
+        @task_handler("backtest")
+        async def handle_backtest(params):
+            ...
+    """
+    def decorator(func: Callable[..., Awaitable]):
+        _registered_handlers[task_type] = func
+        return func
+    return decorator
+
+
+def worker_key(worker_id: str) -> str:
+    return f"task:worker:{worker_id}"
+
+
+def claimed_key(worker_id: str) -> str:
+    """worker 已领取、尚未登记到 processing 的任务列表"""
+    return f"task:worker:{worker_id}:claimed"
+
+
+@dataclass
+class WorkerConfig:
+    """Worker 配置"""
+    concurrency: int = 2  # 并发消费数
+    visibility_timeout: float = 60.0  # 心跳中断多久后任务被视为丢失（秒）
+    heartbeat_interval: float = 10.0  # 心跳间隔（秒）
+    reap_interval: float = 15.0  # 超时任务回收间隔（秒）
+    max_attempts: int = 3  # 最大执行次数（含首次）
+    poll_interval: float = 0.2  # 队列为空时的轮询间隔（秒）
+
+    @classmethod
+    def from_env(cls) -> "WorkerConfig":
+        """从环境变量读取配置"""
+        config = cls()
+        if os.getenv("TASK_WORKER_CONCURRENCY"):
+            config.concurrency = int(os.environ["TASK_WORKER_CONCURRENCY"])
+        if os.getenv("TASK_VISIBILITY_TIMEOUT"):
+            config.visibility_timeout = float(os.environ["TASK_VISIBILITY_TIMEOUT"])
+        if os.getenv("TASK_MAX_ATTEMPTS"):
+            config.max_attempts = int(os.environ["TASK_MAX_ATTEMPTS"])
+        return config
+
+
+class TaskWorker:
+    """
+    任务队列 Worker
+
+    使用示例:
+        queue = TaskQueue()
+        await queue.connect()
+        worker = TaskWorker(queue)
+        await worker.run()
+    """
+
+    def __init__(self, queue: TaskQueue, config: Optional[WorkerConfig] = None):
+        if queue.redis is None:
+            raise RuntimeError("TaskWorker 需要 Redis 模式的 TaskQueue")
+        self.queue = queue
+        self.config = config or WorkerConfig.from_env()
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._redis = queue.redis
+        self._claimed_key = claimed_key(self.worker_id)
+        self._stopping = False
+        self._current: Dict[str, asyncio.Task] = {}
+        self._cancel_requested: set = set()
+
+    def get_handler(self, task_type: str) -> Optional[Callable[..., Awaitable]]:
+        """查找处理器（优先使用 TaskQueue 实例上注册的处理器）"""
+        return self.queue.handlers.get(task_type) or _registered_handlers.get(task_type)
+
+    # ==================== 主循环 ====================
+
+    async def run(self) -> None:
+        """启动消费，直到 stop() 被调用"""
+        self._stopping = False
+        logger.info(
+            f"TaskWorker 启动: {self.worker_id}, 并发={self.config.concurrency}, "
+            f"处理器={sorted(set(self.queue.handlers) | set(_registered_handlers))}"
+        )
+        # 先登记心跳，避免领取后、首次心跳前被其他 worker 当作失联回收
+        await self._beat()
+        maintenance = asyncio.create_task(self._maintenance_loop())
+        try:
+            await asyncio.gather(*[
+                self._consume_loop() for _ in range(self.config.concurrency)
+            ])
+        finally:
+            maintenance.cancel()
+            await self._redis.delete(worker_key(self.worker_id))
+            logger.info(f"TaskWorker 已停止: {self.worker_id}")
+
+    def stop(self) -> None:
+        """请求停止（当前任务执行完后退出）"""
+        self._stopping = True
+
+    async def _claim(self) -> Optional[str]:
+        """按优先级领取一个任务（原子地从队列移入本 worker 的 claimed 列表）"""
+        for queue_name in QUEUES:
+            task_id = await self._redis.lmove(queue_name, self._claimed_key, "RIGHT", "LEFT")
+            if task_id is not None:
+                return task_id
+        return None
+
+    async def _consume_loop(self) -> None:
+        while not self._stopping:
+            task_id = await self._claim()
+            if task_id is None:
+                await asyncio.sleep(self.config.poll_interval)
+                continue
+            try:
+                await self.process(task_id)
+            except Exception:
+                logger.exception(f"任务处理异常: {task_id}")
+
+    async def _maintenance_loop(self) -> None:
+        """worker 心跳与超时任务回收"""
+        last_reap = 0.0
+        while True:
+            try:
+                await self._beat()
+                if time.time() - last_reap >= self.config.reap_interval:
+                    await self.recover_expired()
+                    last_reap = time.time()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"worker 维护循环异常: {e}")
+            await asyncio.sleep(self.config.heartbeat_interval)
+
+    async def _beat(self) -> None:
+        await self._redis.set(
+            worker_key(self.worker_id),
+            json.dumps({
+                "worker_id": self.worker_id,
+                "tasks": list(self._current),
+                "heartbeat_at": datetime.now().isoformat(),
+            }),
+            ex=int(self.config.visibility_timeout),
+        )
+
+    # ==================== 任务执行 ====================
+
+    async def process(self, task_id: str) -> Optional[TaskStatus]:
+        """
+        执行一个已领取的任务
+
+        Returns:
+            任务最终状态；任务已取消/不存在时返回 None
+        """
+        meta = await self.queue.get_meta(task_id)
+        if meta is None or TaskStatus(meta["status"]) != TaskStatus.PENDING:
+            # 排队期间被取消或已过期
+            await self._release_claim(task_id)
+            return None
+
+        handler = self.get_handler(meta["task_type"])
+        if handler is None:
+            failed = await self.queue._update_task_status(
+                task_id, TaskStatus.FAILED, error=f"未找到任务处理器: {meta['task_type']}",
+                expected=[TaskStatus.PENDING],
+            )
+            await self._release_claim(task_id)
+            return TaskStatus.FAILED if failed else None
+
+        # 登记可见性超时后再移出 claimed 列表，两步之间崩溃也不会丢失任务
+        await self._redis.zadd(PROCESSING_KEY, {task_id: self._deadline()})
+        await self._release_claim(task_id)
+
+        def start(current: Dict) -> bool:
+            # 与 cancel 竞争：只有仍在排队状态时才开始执行
+            if current["status"] != TaskStatus.PENDING.value:
+                return False
+            current["status"] = TaskStatus.RUNNING.value
+            current["started_at"] = datetime.now().isoformat()
+            current["worker_id"] = self.worker_id
+            current["attempts"] = current.get("attempts", 0) + 1
+            return True
+
+        meta = await self.queue.transition(task_id, start)
+        if meta is None:
+            await self._redis.zrem(PROCESSING_KEY, task_id)
+            return None
+
+        priority = job_priority_for(meta.get("priority", 0))
+        run = asyncio.create_task(get_scheduler().run_async(
+            lambda: handler(meta.get("params") or {}),
+            group="task_queue",
+            priority=priority,
+            client_id=meta.get("client_id") or self.worker_id,
+            name=f"{meta['task_type']}:{task_id}",
+        ))
+        self._current[task_id] = run
+        heartbeat = asyncio.create_task(self._heartbeat(task_id, run))
+
+        try:
+            result = await run
+            status, error = TaskStatus.COMPLETED, None
+        except asyncio.CancelledError:
+            if task_id not in self._cancel_requested:
+                # worker 被中止: 保留 processing 登记，由其他 worker 超时回收
+                raise
+            result, status, error = None, TaskStatus.CANCELLED, "任务已取消"
+        except Exception as e:
+            logger.exception(f"任务执行失败: {task_id}")
+            result, status, error = None, TaskStatus.FAILED, str(e)
+        finally:
+            heartbeat.cancel()
+            self._current.pop(task_id, None)
+            self._cancel_requested.discard(task_id)
+
+        await self._redis.zrem(PROCESSING_KEY, task_id)
+        # 只有本 worker 的执行仍有效时才写入终态（超时后被回收重跑的任务不覆盖）
+        written = await self.queue._update_task_status(
+            task_id, status, result=result, error=error,
+            expected=[TaskStatus.RUNNING], worker_id=self.worker_id,
+        )
+        if not written:
+            logger.warning(f"任务状态已被其他执行者更新，丢弃本次结果: {task_id}")
+            return None
+        logger.info(f"任务结束: {task_id} -> {status.value}")
+        return status
+
+    async def _heartbeat(self, task_id: str, run: asyncio.Task) -> None:
+        """续期可见性超时，并响应运行中取消请求"""
+        while not run.done():
+            await asyncio.sleep(self.config.heartbeat_interval)
+            await self._redis.zadd(PROCESSING_KEY, {task_id: self._deadline()}, xx=True)
+            meta = await self.queue.get_meta(task_id)
+            if meta and meta.get("cancel_requested"):
+                logger.info(f"收到取消请求: {task_id}")
+                self._cancel_requested.add(task_id)
+                run.cancel()
+                return
+
+    async def _release_claim(self, task_id: str) -> None:
+        await self._redis.lrem(self._claimed_key, 1, task_id)
+
+    def _deadline(self) -> float:
+        return time.time() + self.config.visibility_timeout
+
+    # ==================== 故障恢复 ====================
+
+    async def recover_expired(self) -> int:
+        """
+        回收可见性超时的任务（执行它的 worker 已失联）
+
+        Returns:
+            回收的任务数
+        """
+        recovered = await self.recover_orphaned_claims()
+        expired = await self._redis.zrangebyscore(PROCESSING_KEY, 0, time.time())
+        for task_id in expired:
+            # ZREM 成功者负责回收，避免多个 worker 重复入队
+            if not await self._redis.zrem(PROCESSING_KEY, task_id):
+                continue
+            meta = await self.queue.get_meta(task_id)
+            if meta is None or TaskStatus(meta["status"]) in TERMINAL_STATUSES:
+                continue
+
+            recovered += 1
+            lost_worker = meta.get("worker_id")
+            if meta.get("attempts", 0) >= self.config.max_attempts:
+                logger.warning(f"任务超过最大重试次数: {task_id} (worker={lost_worker})")
+                await self.queue._update_task_status(
+                    task_id, TaskStatus.FAILED,
+                    error=f"worker 失联且已达到最大执行次数 {self.config.max_attempts}",
+                )
+                continue
+
+            def requeue(current: Dict) -> bool:
+                if TaskStatus(current["status"]) in TERMINAL_STATUSES:
+                    return False
+                current["status"] = TaskStatus.PENDING.value
+                current.pop("started_at", None)
+                current.pop("worker_id", None)
+                return True
+
+            # 状态写回与入队在同一事务中完成；RPUSH 到队尾（领取端），让回收任务优先被领取
+            if await self.queue.transition(
+                task_id, requeue,
+                lambda pipe, current: pipe.rpush(queue_for_priority(current.get("priority", 0)), task_id),
+            ) is not None:
+                logger.warning(f"任务重新入队: {task_id} (worker={lost_worker})")
+        return recovered
+
+    async def recover_orphaned_claims(self) -> int:
+        """
+        回收失联 worker 已领取但尚未登记到 processing 的任务
+
+        worker 心跳键过期即视为失联；其 claimed 列表中的任务按原优先级放回队尾（领取端）。
+        已登记到 processing 的任务只从 claimed 列表移除，交由可见性超时回收。
+
+        Returns:
+            重新入队的任务数
+        """
+        prefix, suffix = worker_key(""), ":claimed"
+        recovered = 0
+        async for key in self._redis.scan_iter(match=claimed_key("*")):
+            owner = key[len(prefix):-len(suffix)]
+            if owner == self.worker_id or await self._redis.exists(worker_key(owner)):
+                continue
+            for task_id in await self._redis.lrange(key, 0, -1):
+                # LREM 成功者负责回收，避免多个 worker 重复入队
+                if not await self._redis.lrem(key, 1, task_id):
+                    continue
+                if await self._redis.zscore(PROCESSING_KEY, task_id) is not None:
+                    continue
+                meta = await self.queue.get_meta(task_id)
+                if meta is None or TaskStatus(meta["status"]) != TaskStatus.PENDING:
+                    continue
+                logger.warning(f"失联 worker 的已领取任务重新入队: {task_id} (worker={owner})")
+                await self._redis.rpush(queue_for_priority(meta.get("priority", 0)), task_id)
+                recovered += 1
+        return recovered
+
+
+async def run_worker(
+    imports: Optional[list] = None,
+    config: Optional[WorkerConfig] = None,
+    redis_url: Optional[str] = None,
+) -> None:
+    """导入处理器模块并运行 worker"""
+    for module in imports or []:
+        importlib.import_module(module)
+
+    queue = TaskQueue(redis_url=redis_url)
+    await queue.connect()
+    if queue.redis is None:
+        raise RuntimeError("无法连接 Redis，worker 无法启动")
+
+    worker = TaskWorker(queue, config)
+    try:
+        await worker.run()
+    finally:
+        await queue.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="任务队列 worker")
+    parser.add_argument("--import", dest="imports", action="append", default=[],
+                        help="注册处理器的模块（可多次指定）")
+    parser.add_argument("--concurrency", "-c", type=int, help="并发消费数")
+    parser.add_argument("--redis-url", help="Redis 连接 URL")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    worker_config = WorkerConfig.from_env()
+    if args.concurrency:
+        worker_config.concurrency = args.concurrency
+    asyncio.run(run_worker(args.imports, worker_config, args.redis_url))
@@ -14,6 +14,17 @@ from .server import (
     BaseMCPServer,
     create_mcp_app,
 )
+from .serialization import (
+    CompactJSONResponse,
+    FetchResultPageTool,
+    ResultPageStore,
+    SerializationConfig,
+    dumps,
+    dumps_text,
+    encode_tool_result,
+    get_result_page_store,
+    paginate_result,
+)
 
 __all__ = [
     "JSONRPCRequest",
@@ -22,4 +33,13 @@ __all__ = [
     "MCP_PROTOCOL_VERSION",
     "BaseMCPServer",
     "create_mcp_app",
+    "CompactJSONResponse",
+    "FetchResultPageTool",
+    "ResultPageStore",
+    "SerializationConfig",
+    "dumps",
+    "dumps_text",
+    "encode_tool_result",
+    "get_result_page_store",
+    "paginate_result",
 ]
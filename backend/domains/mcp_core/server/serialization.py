@@ -0,0 +1,353 @@
+"""
+工具结果序列化
+
+MCP 工具结果与 JSON-RPC 响应的统一编码层:
+- 使用 orjson 紧凑编码（无缩进），原生支持 numpy 数组、datetime、dataclass；
+  pandas DataFrame/Series/Timestamp、numpy 标量、Decimal、set 等通过 default 钩子转换
+- NaN / Inf 统一输出为 null（标准库 json 会输出非法的 NaN）
+- 声明 page_results = True 的工具，大型表格结果（行数超过 MCP_RESULT_PAGE_ROWS 的列表）
+  只返回首页，其余行存入 ResultPageStore，客户端凭 result handle 调用 fetch_result_page 分页读取；
+  其他工具的结果原样完整返回
+
+结果句柄只在生成它的服务进程内有效（ResultPageStore 是进程内缓存，不跨副本共享、不跨重启保留）。
+同一服务部署多个副本时，fetch_result_page 必须路由到同一进程（会话粘滞），否则返回句柄不存在。
+句柄由结果内容决定，相同结果（如工具结果缓存命中）复用同一句柄，不重复占用存储。
+
+orjson 未安装时退回标准库 json，行为一致但编码较慢。
+"""
+
+import datetime
+import decimal
+import enum
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+from ..base.cache import BoundedCache
+from ..base.tool import BaseTool, ToolResult
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SerializationConfig:
+    """序列化与分页配置"""
+    page_rows: int = 500  # 列表行数超过该值时分页，0 表示不分页
+    page_ttl: float = 600.0  # 结果句柄有效期（秒）
+    max_handles: int = 256  # 同时保留的结果句柄上限
+    max_bytes: int = 256 * 1024 * 1024  # 分页结果估算字节上限
+    gzip_min_size: int = 1024  # 响应体超过该字节数时 gzip 压缩，0 表示关闭
+
+    @classmethod
+    def from_env(cls) -> "SerializationConfig":
+        return cls(
+            page_rows=int(os.getenv("MCP_RESULT_PAGE_ROWS", "500")),
+            page_ttl=float(os.getenv("MCP_RESULT_PAGE_TTL", "600")),
+            max_handles=int(os.getenv("MCP_RESULT_MAX_HANDLES", "256")),
+            max_bytes=int(os.getenv("MCP_RESULT_MAX_MB", "256")) * 1024 * 1024,
+            gzip_min_size=int(os.getenv("MCP_GZIP_MIN_SIZE", "1024")),
+        )
+
+
+# ==================== 编码 ====================
+
+
+def _finite(value: float) -> Optional[float]:
+    return value if math.isfinite(value) else None
+
+
+def _default(obj: Any) -> Any:
+    """orjson / json 的 default 钩子：转换 pandas、numpy 标量等非原生类型"""
+    # pandas（延迟判断，避免无 pandas 环境报错）
+    module = type(obj).__module__
+    if module.startswith("pandas"):
+        if hasattr(obj, "to_dict") and hasattr(obj, "columns"):
+            return obj.to_dict(orient="records")
+        if hasattr(obj, "to_list"):
+            return obj.to_list()
+        if str(obj) in ("NaT", "<NA>"):
+            return None
+        if hasattr(obj, "isoformat"):
+            return obj.isoformat()
+    if module == "numpy":
+        if hasattr(obj, "tolist"):
+            value = obj.tolist()
+            return _finite(value) if isinstance(value, float) else value
+    if isinstance(obj, decimal.Decimal):
+        return _finite(float(obj))
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    return str(obj)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        """紧凑编码为 UTF-8 JSON 字节"""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+else:
+    class _Encoder(json.JSONEncoder):
+        def iterencode(self, o, _one_shot=False):
+            return super().iterencode(_sanitize(o), _one_shot)
+
+    def _sanitize(obj: Any) -> Any:
+        if isinstance(obj, float):
+            return _finite(obj)
+        if isinstance(obj, dict):
+            return {k if isinstance(k, str) else str(k): _sanitize(v) for k, v in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [_sanitize(v) for v in obj]
+        return obj
+
+    def dumps(obj: Any) -> bytes:
+        """紧凑编码为 UTF-8 JSON 字节"""
+        return json.dumps(
+            obj, cls=_Encoder, default=_default, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+
+
+def dumps_text(obj: Any) -> str:
+    """紧凑编码为 JSON 字符串"""
+    return dumps(obj).decode("utf-8")
+
+
+class CompactJSONResponse(JSONResponse):
+    """使用 dumps 编码的 JSON 响应（紧凑、支持 numpy/pandas）"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# ==================== 分页 ====================
+
+
+@dataclass
+class _PageEntry:
+    tool_name: str
+    field: Optional[str]
+    rows: List[Any]
+
+
+class ResultPageStore:
+    """
+    大结果分页存储
+
+    按句柄保存被截断的完整行列表，按句柄数和估算字节数有界，滑动 TTL。
+    只在当前进程内有效：句柄不能在其他进程（其他副本）或重启后读取。
+    """
+
+    def __init__(self, config: Optional[SerializationConfig] = None):
+        self.config = config or SerializationConfig.from_env()
+        self._entries = BoundedCache(
+            name="result_pages",
+            max_entries=self.config.max_handles,
+            max_bytes=self.config.max_bytes,
+            default_ttl=self.config.page_ttl,
+        )
+
+    @staticmethod
+    def make_handle(tool_name: str, field: Optional[str], rows: List[Any]) -> str:
+        """按结果内容生成句柄（相同结果得到相同句柄）"""
+        digest = hashlib.sha256(f"{tool_name}\0{field or ''}\0".encode("utf-8"))
+        digest.update(dumps(rows))
+        return digest.hexdigest()[:32]
+
+    def put(self, tool_name: str, field: Optional[str], rows: List[Any]) -> Optional[str]:
+        """
+        保存完整行列表，返回句柄
+
+        相同内容已保存时复用原句柄（顺延有效期），不重复存储；
+        结果超过字节上限无法保存时返回 None。
+        """
+        handle = self.make_handle(tool_name, field, rows)
+        if self._entries.get(handle, refresh_ttl=True) is not None:
+            return handle
+        if not self._entries.set(handle, _PageEntry(tool_name, field, rows)):
+            logger.warning(f"result_page_rejected: tool={tool_name}, rows={len(rows)}")
+            return None
+        return handle
+
+    def get_page(self, handle: str, offset: int, limit: int) -> Optional[Dict[str, Any]]:
+        """读取一页，句柄不存在或已过期返回 None（读取时顺延有效期）"""
+        entry = self._entries.get(handle, refresh_ttl=True)
+        if entry is None:
+            return None
+        offset = max(offset, 0)
+        rows = entry.rows[offset:offset + limit]
+        return {
+            "tool": entry.tool_name,
+            "field": entry.field,
+            "rows": rows,
+            "page": _page_info(handle, offset, len(rows), len(entry.rows)),
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _page_info(handle: Optional[str], offset: int, count: int, total: int) -> Dict[str, Any]:
+    next_offset = offset + count
+    return {
+        "handle": handle,
+        "offset": offset,
+        "count": count,
+        "total": total,
+        "next_offset": next_offset if next_offset < total else None,
+    }
+
+
+def _tabular(rows: Any) -> Optional[List[Any]]:
+    """把 DataFrame / 列表统一为行列表，非表格返回 None"""
+    if isinstance(rows, list):
+        return rows
+    if type(rows).__module__.startswith("pandas") and hasattr(rows, "columns"):
+        return rows.to_dict(orient="records")
+    return None
+
+
+def _find_largest_table(data: Any) -> Tuple[Optional[str], Optional[List[Any]]]:
+    """找出结果中最大的表格：顶层列表，或字典中行数最多的列表字段"""
+    rows = _tabular(data)
+    if rows is not None:
+        return None, rows
+    if not isinstance(data, dict):
+        return None, None
+    best_field, best_rows = None, None
+    for key, value in data.items():
+        rows = _tabular(value)
+        if rows is not None and (best_rows is None or len(rows) > len(best_rows)):
+            best_field, best_rows = key, rows
+    return best_field, best_rows
+
+
+def paginate_result(tool_name: str, data: Any, store: Optional[ResultPageStore] = None) -> Any:
+    """
+    截断大型表格结果
+
+    行数不超过 page_rows 时原样返回；否则表格只保留首页，
+    并在结果中附加 _page（句柄、偏移、总行数、下一页偏移）。
+    调用方负责只对声明 page_results 的工具调用。
+    """
+    if store is None:
+        store = get_result_page_store()
+    page_rows = store.config.page_rows
+    if page_rows <= 0:
+        return data
+    field, rows = _find_largest_table(data)
+    if rows is None or len(rows) <= page_rows:
+        return data
+
+    handle = store.put(tool_name, field, rows)
+    page = _page_info(handle, 0, page_rows, len(rows))
+    if handle is None:
+        # 无法保存剩余行时只返回首页，并告知客户端结果已截断
+        page["next_offset"] = None
+        page["truncated"] = True
+    if field is None:
+        return {"rows": rows[:page_rows], "_page": page}
+    result = dict(data)
+    result[field] = rows[:page_rows]
+    result["_page"] = {**page, "field": field}
+    return result
+
+
+def encode_tool_result(tool_name: str, data: Any, paginate: bool = False) -> str:
+    """
+    编码工具成功结果
+
+    Args:
+        tool_name: 工具名称
+        data: 结果数据
+        paginate: 是否分页大表格（工具的 page_results）
+    """
+    if paginate:
+        data = paginate_result(tool_name, data)
+    return dumps_text(data)
+
+
+# 单例
+_page_store: Optional[ResultPageStore] = None
+_page_store_lock = threading.Lock()
+
+
+def get_result_page_store() -> ResultPageStore:
+    """获取结果分页存储单例"""
+    global _page_store
+    if _page_store is None:
+        with _page_store_lock:
+            if _page_store is None:
+                _page_store = ResultPageStore()
+    return _page_store
+
+
+def reset_result_page_store() -> None:
+    """重置结果分页存储（用于测试）"""
+    global _page_store
+    _page_store = None
+
+
+class FetchResultPageTool(BaseTool):
+    """读取被分页的大型工具结果（各 MCP 服务器内置）"""
+
+    category = "system"
+
+    @property
+    def name(self) -> str:
+        return "fetch_result_page"
+
+    @property
+    def description(self) -> str:
+        return (
+            "读取大型工具结果的后续分页。工具结果包含 _page 字段时，"
+            "用其中的 handle 和 next_offset 调用本工具获取后续行，直到 next_offset 为 null。"
+            "句柄只在返回它的服务进程内有效，过期或服务重启后需重新调用原工具。"
+        )
+
+    @property
+    def input_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "handle": {
+                    "type": "string",
+                    "description": "结果句柄（_page.handle）",
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "起始行偏移（_page.next_offset）",
+                    "default": 0,
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "返回行数，默认与首页相同",
+                },
+            },
+            "required": ["handle"],
+        }
+
+    async def execute(self, handle: str, offset: int = 0, limit: Optional[int] = None) -> ToolResult:
+        store = get_result_page_store()
+        # 单页不超过分页阈值，避免分页结果再次被分页
+        page_rows = max(store.config.page_rows, 1)
+        limit = min(limit, page_rows) if limit and limit > 0 else page_rows
+        page = store.get_page(handle, offset, limit)
+        if page is None:
+            return ToolResult.fail(f"结果句柄不存在或已过期: {handle}")
+        return ToolResult.ok(page)
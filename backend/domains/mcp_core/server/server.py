@@ -16,6 +16,7 @@ from datetime import datetime
 from fastapi import FastAPI, Request, HTTPException, Response
 from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import uvicorn
 
 from .protocol import (
@@ -35,6 +36,16 @@ from ..middleware.error_handler import (
     ToolExecutionError,
 )
 from ..config import MCPConfig
+from ..observability.endpoints import metrics_endpoint, profile_endpoint
+from ..observability.metrics import get_metrics_registry
+from .serialization import (
+    CompactJSONResponse,
+    FetchResultPageTool,
+    SerializationConfig,
+    dumps,
+    dumps_text,
+    encode_tool_result,
+)
 
 # 延迟导入可观测性模块（避免循环导入）
 _logger = None
@@ -112,6 +123,10 @@ class BaseMCPServer:
 
         # 子类可在构造后调用 _setup() 完成初始化
         self._setup()
+
+        # 内置工具：大型结果分页读取
+        if self.tool_registry.get("fetch_result_page") is None:
+            self.tool_registry.register(FetchResultPageTool())
         self._ready = True
 
     def _setup(self) -> None:
@@ -225,12 +240,11 @@ class BaseMCPServer:
 
             # 记录 MCP 请求完成（包含完整排查信息）
             if mcp_logger and mcp_request_id:
-                response_str = json.dumps(response.to_dict(), ensure_ascii=False)
                 mcp_logger.log_response(
                     request_id=mcp_request_id,
                     duration_ms=duration_ms,
                     success=True,
-                    response_size=len(response_str),
+                    response_size=len(dumps(response.to_dict())),
                     response_summary=self._generate_response_summary(request.method, result),
                     response_data=self._extract_response_data(request.method, result),
                 )
@@ -455,24 +469,15 @@ class BaseMCPServer:
 
         # 转换为 MCP 格式
         if result.success:
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": json.dumps(result.data, ensure_ascii=False, indent=2),
-                    }
-                ],
-            }
+            text = encode_tool_result(name, result.data, paginate=tool.page_results)
         else:
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": json.dumps({"error": result.error}, ensure_ascii=False),
-                    }
-                ],
-                "isError": True,
-            }
+            text = dumps_text({"error": result.error})
+        get_metrics_registry().record_payload("tool", name, len(text.encode("utf-8")))
+
+        response = {"content": [{"type": "text", "text": text}]}
+        if not result.success:
+            response["isError"] = True
+        return response
 
     async def _handle_resources_list(self, params: dict) -> dict:
         """列出所有可用资源"""
@@ -576,6 +581,11 @@ def create_mcp_app(
         allow_headers=["*"],
     )
 
+    # 大响应 gzip 压缩（客户端声明 Accept-Encoding: gzip 时生效）
+    gzip_min_size = SerializationConfig.from_env().gzip_min_size
+    if gzip_min_size > 0:
+        app.add_middleware(GZipMiddleware, minimum_size=gzip_min_size)
+
     @app.get("/")
     async def root():
         """服务器信息"""
@@ -588,6 +598,8 @@ def create_mcp_app(
                 "mcp": "/mcp",
                 "health": "/health",
                 "ready": "/ready",
+                "metrics": "/metrics",
+                "profile": "/debug/profile",
             },
         }
 
@@ -612,6 +624,10 @@ def create_mcp_app(
             return JSONResponse(content=status, status_code=503)
         return status
 
+    # 调用指标（Prometheus / JSON）与按需采样分析
+    app.add_route("/metrics", metrics_endpoint, methods=["GET"])
+    app.add_route("/debug/profile", profile_endpoint, methods=["GET"])
+
     @app.get("/stats")
     async def stats():
         """服务统计信息"""
@@ -654,7 +670,7 @@ def create_mcp_app(
                     user_agent=user_agent,
                 )
                 responses.append(resp.to_dict())
-            return JSONResponse(content=responses)
+            return CompactJSONResponse(content=responses)
 
         # 处理单个请求
         req = JSONRPCRequest.from_dict(body)
@@ -664,7 +680,7 @@ def create_mcp_app(
             client_name=client_name,
             user_agent=user_agent,
         )
-        return JSONResponse(content=resp.to_dict())
+        return CompactJSONResponse(content=resp.to_dict())
 
     @app.get("/mcp")
     async def mcp_sse(request: Request):
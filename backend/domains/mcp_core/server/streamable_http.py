@@ -14,7 +14,6 @@ Streamable HTTP 传输层
     run_streamable_http_server(server)
 """
 
-import json
 import time
 import logging
 from typing import Optional
@@ -29,6 +28,10 @@ from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
 import mcp.types as types
 
 from .server import BaseMCPServer
+from .serialization import SerializationConfig, dumps_text, encode_tool_result
+from ..observability.endpoints import metrics_endpoint, profile_endpoint
+from ..observability.metrics import get_metrics_registry
+from ..queue.scheduler import JobPriority, scheduling_context
 
 # 延迟导入日志模块（避免循环导入）
 _logger = None
@@ -123,6 +126,14 @@ class MCPServerAdapter:
 
         return coerced
 
+    def _get_session_id(self) -> Optional[str]:
+        """获取当前请求的 MCP 会话ID（用作调度器客户端标识）"""
+        try:
+            request = self.mcp_server.request_context.request
+            return request.headers.get("mcp-session-id") if request is not None else None
+        except (LookupError, AttributeError):
+            return None
+
     def _log_mcp_request(
         self,
         method: str,
@@ -147,14 +158,14 @@ class MCPServerAdapter:
             "server_port": self.config.port,
             "client_ip": "",  # Streamable HTTP 没有直接的 request 对象
             "tool_name": tool_name,
-            "tool_arguments": json.dumps(tool_arguments, ensure_ascii=False) if tool_arguments else "",
+            "tool_arguments": dumps_text(tool_arguments) if tool_arguments else "",
             "resource_uri": resource_uri,
             "error_message": error_message,
         }
 
         # 添加响应摘要
         if response_data:
-            log_data["response_data"] = json.dumps(response_data, ensure_ascii=False)[:2000]
+            log_data["response_data"] = dumps_text(response_data)[:2000]
             log_data["response_summary"] = self._make_response_summary(method, tool_name, response_data)
 
         # 使用 structlog 记录
@@ -214,7 +225,12 @@ class MCPServerAdapter:
             try:
                 # 类型转换：MCP 客户端可能将数字以字符串形式传入
                 coerced_arguments = self._coerce_tool_arguments(name, arguments)
-                result = await self.base_server.tool_registry.execute(name, coerced_arguments)
+                # 智能体调用按会话做公平调度，优先级低于前端交互
+                with scheduling_context(
+                    client_id=self._get_session_id(),
+                    priority=JobPriority.AGENT,
+                ):
+                    result = await self.base_server.tool_registry.execute(name, coerced_arguments)
 
                 if result.success:
                     # 记录成功日志
@@ -226,12 +242,12 @@ class MCPServerAdapter:
                         success=True,
                         response_data=result.data if isinstance(result.data, dict) else {"result": str(result.data)[:500]},
                     )
-                    return [
-                        types.TextContent(
-                            type="text",
-                            text=json.dumps(result.data, ensure_ascii=False, indent=2),
-                        )
-                    ]
+                    tool = self.base_server.tool_registry.get(name)
+                    text = encode_tool_result(
+                        name, result.data, paginate=tool is not None and tool.page_results,
+                    )
+                    get_metrics_registry().record_payload("tool", name, len(text.encode("utf-8")))
+                    return [types.TextContent(type="text", text=text)]
                 else:
                     # 记录失败日志
                     self._log_mcp_request(
@@ -246,7 +262,7 @@ class MCPServerAdapter:
                     return [
                         types.TextContent(
                             type="text",
-                            text=json.dumps({"error": result.error}, ensure_ascii=False),
+                            text=dumps_text({"error": result.error}),
                         )
                     ]
             except Exception as e:
@@ -264,7 +280,7 @@ class MCPServerAdapter:
                 return [
                     types.TextContent(
                         type="text",
-                        text=json.dumps({"error": str(e)}, ensure_ascii=False),
+                        text=dumps_text({"error": str(e)}),
                     )
                 ]
 
@@ -457,6 +473,8 @@ def create_streamable_http_app(
                 "mcp": "/mcp",
                 "health": "/health",
                 "ready": "/ready",
+                "metrics": "/metrics",
+                "profile": "/debug/profile",
             },
         })
 
@@ -482,6 +500,8 @@ def create_streamable_http_app(
         Route("/", endpoint=root_handler, methods=["GET"]),
         Route("/health", endpoint=health_handler, methods=["GET"]),
         Route("/ready", endpoint=ready_handler, methods=["GET"]),
+        Route("/metrics", endpoint=metrics_endpoint, methods=["GET"]),
+        Route("/debug/profile", endpoint=profile_endpoint, methods=["GET"]),
         # 使用 Route 挂载 ASGI 应用（endpoint 可以是实现 ASGI 接口的类）
         Route("/mcp", endpoint=mcp_asgi_app),
     ]
@@ -496,6 +516,12 @@ def create_streamable_http_app(
         )
     ]
 
+    # 大响应 gzip 压缩（客户端声明 Accept-Encoding: gzip 时生效，SSE 流不压缩）
+    gzip_min_size = SerializationConfig.from_env().gzip_min_size
+    if gzip_min_size > 0:
+        from starlette.middleware.gzip import GZipMiddleware
+        middleware.append(Middleware(GZipMiddleware, minimum_size=gzip_min_size))
+
     app = Starlette(
         debug=False,
         routes=routes,
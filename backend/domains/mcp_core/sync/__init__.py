@@ -7,6 +7,7 @@
 """
 
 from .base import BaseSyncService
+from .manifest import SyncManifest
 from .factor_sync import FactorSyncService
 from .note_sync import NoteSyncService
 from .strategy_sync import StrategySyncService
@@ -14,9 +15,11 @@ from .experience_sync import ExperienceSyncService
 from .edge_sync import EdgeSyncService
 from .manager import SyncManager
 from .trigger import SyncTrigger, get_sync_trigger
+from .worker import SyncWorker, SyncWorkerConfig
 
 __all__ = [
     "BaseSyncService",
+    "SyncManifest",
     "FactorSyncService",
     "NoteSyncService",
     "StrategySyncService",
@@ -25,4 +28,6 @@ __all__ = [
     "SyncManager",
     "SyncTrigger",
     "get_sync_trigger",
+    "SyncWorker",
+    "SyncWorkerConfig",
 ]
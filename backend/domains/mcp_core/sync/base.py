@@ -2,6 +2,10 @@
 同步服务基类
 
 定义数据同步的通用接口和工具方法。
+
+增量判断优先使用同步清单（manifest.py）中的内容哈希，
+没有基线的实体退回文件 mtime 与数据库 updated_at 的比较。
+清单只在实体仍存在于数据库时生效（数据库重置后文件会重新导入）。
 """
 
 import json
@@ -10,14 +14,23 @@ import os
 import shutil
 import tempfile
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 import yaml
 
+from .manifest import SyncManifest, content_hash
+
 logger = logging.getLogger(__name__)
 
+# 优先使用 libyaml 加速解析（未编译 libyaml 时退回纯 Python 实现）
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# 并行解析文件的线程数
+SYNC_PARSE_WORKERS = int(os.getenv("SYNC_PARSE_WORKERS", str(min(8, (os.cpu_count() or 1) + 4))))
+
 
 class BaseSyncService(ABC):
     """
@@ -27,6 +40,12 @@ class BaseSyncService(ABC):
     子类需要实现具体的导入/导出逻辑。
     """
 
+    # 同步清单名，对应 {data_dir}/.sync/{MANIFEST_NAME}.json
+    MANIFEST_NAME = "default"
+
+    # 文件名（不含扩展名）对应的数据库列，用于确认清单中的实体仍在库中
+    IDENTITY_COLUMN: Optional[str] = None
+
     def __init__(self, data_dir: Path, store: Any = None):
         """
         初始化同步服务
@@ -37,6 +56,7 @@ class BaseSyncService(ABC):
         """
         self.data_dir = data_dir
         self.store = store
+        self._manifest: Optional[SyncManifest] = None
 
     @abstractmethod
     def export_all(self, overwrite: bool = False) -> Dict[str, int]:
@@ -61,6 +81,26 @@ class BaseSyncService(ABC):
         """
         pass
 
+    def export_many(self, keys: List[Any]) -> Dict[str, int]:
+        """
+        批量导出指定实体（供后台同步队列调用）
+
+        默认逐个调用 export_single；可批量读库的子类应覆盖此方法。
+
+        Args:
+            keys: 实体键列表（与 export_single 的参数一致）
+
+        Returns:
+            {"exported": N, "errors": K}
+        """
+        stats = {"exported": 0, "errors": 0}
+        for key in keys:
+            if self.export_single(key):
+                stats["exported"] += 1
+            else:
+                stats["errors"] += 1
+        return stats
+
     def sync(self, direction: str = "file_to_db") -> Dict[str, int]:
         """
         同步数据
@@ -149,12 +189,148 @@ class BaseSyncService(ABC):
         # 添加 1 秒容差
         return db_mtime > file_mtime + timedelta(seconds=1)
 
+    # ===== 同步清单 =====
+
+    @property
+    def manifest(self) -> SyncManifest:
+        """同步清单（延迟加载）"""
+        if self._manifest is None:
+            self._manifest = SyncManifest(self.data_dir / ".sync" / f"{self.MANIFEST_NAME}.json")
+        return self._manifest
+
+    def manifest_key(self, filepath: Path) -> str:
+        """文件在清单中的键（相对数据目录的路径）"""
+        try:
+            return filepath.relative_to(self.data_dir).as_posix()
+        except ValueError:
+            return filepath.as_posix()
+
+    def content_hash(self, data: Any) -> str:
+        """计算导出数据的内容哈希"""
+        return content_hash(data)
+
+    def should_export(self, filepath: Path, db_hash: str, entity: Any, overwrite: bool = False) -> bool:
+        """
+        判断是否应该导出到文件
+
+        有数据库基线时：数据库内容未变则跳过；数据库变化且文件未被修改则导出；
+        两侧都有变化时按时间戳裁决。无基线时退回时间戳比较。
+        """
+        if overwrite or not filepath.exists():
+            return True
+        key = self.manifest_key(filepath)
+        if self.manifest.has_db_baseline(key):
+            if self.manifest.db_unchanged(key, db_hash):
+                return False
+            if self.manifest.file_unchanged(key, filepath):
+                return True
+        return self.should_update_file(self.get_file_mtime(filepath), self.get_db_mtime(entity))
+
+    def should_import(self, filepath: Path, entity: Any, db_hash: Optional[str] = None) -> bool:
+        """
+        判断是否应该用文件更新数据库
+
+        有文件基线时：文件未变则跳过；文件变化且数据库未变则导入；
+        两侧都有变化（或数据库侧未知）时按时间戳裁决。无基线时退回时间戳比较。
+        """
+        key = self.manifest_key(filepath)
+        if self.manifest.get(key) is not None:
+            if self.manifest.file_unchanged(key, filepath):
+                return False
+            if db_hash is None or self.manifest.db_unchanged(key, db_hash):
+                return True
+        return self.should_update_db(self.get_file_mtime(filepath), self.get_db_mtime(entity))
+
+    def record_synced(self, filepath: Path, db_hash: Optional[str] = None) -> None:
+        """
+        记录实体同步完成（失败只记录日志）
+
+        Args:
+            filepath: 已同步的文件
+            db_hash: 与文件一致的数据库侧哈希；导入后数据库内容未知时传 None
+        """
+        try:
+            self.manifest.record(self.manifest_key(filepath), filepath, db_hash)
+        except Exception as e:
+            logger.debug(f"sync_manifest_record_error: {filepath}, {e}")
+
+    def save_manifest(self) -> None:
+        """写回同步清单（失败只记录日志）"""
+        try:
+            self.manifest.save()
+        except Exception as e:
+            logger.warning(f"sync_manifest_save_error: {e}")
+
+    def db_identities(self) -> Optional[Set[str]]:
+        """
+        数据库中已有实体的标识集合（IDENTITY_COLUMN 列的全部取值，单次查询）
+
+        Returns:
+            标识集合；未配置 IDENTITY_COLUMN 时返回 None（只按清单判断），
+            查询失败时返回空集合（全部文件重新解析）
+        """
+        if self.store is None or not self.IDENTITY_COLUMN:
+            return None
+        try:
+            return {str(v) for v in self.store.distinct_values(self.IDENTITY_COLUMN)}
+        except Exception as e:
+            logger.warning(f"sync_identity_query_error: {self.IDENTITY_COLUMN}, {e}")
+            return set()
+
+    def changed_files(self, paths: List[Path], identities: Optional[Set[str]] = None) -> List[Path]:
+        """
+        过滤出需要解析的文件
+
+        清单记录的内容未变化、且对应实体仍在数据库中时才跳过；
+        数据库被重置而数据目录保留时，清单仍然匹配，但文件必须重新导入。
+
+        Args:
+            paths: 文件列表
+            identities: 数据库中已有实体的标识集合，为空时调用 db_identities 查询
+        """
+        if identities is None:
+            identities = self.db_identities()
+        return [
+            p for p in paths
+            if not self.manifest.file_unchanged(self.manifest_key(p), p)
+            or (identities is not None and p.stem not in identities)
+        ]
+
+    def read_files_parallel(
+        self,
+        paths: List[Path],
+        reader: Callable[[Path], Any],
+    ) -> Iterator[Tuple[Path, Any, Optional[Exception]]]:
+        """
+        并行读取并解析文件
+
+        Args:
+            paths: 文件列表
+            reader: 解析函数（如 read_yaml）
+
+        Yields:
+            (文件, 解析结果, 异常)，按输入顺序返回
+        """
+        def read(path: Path) -> Tuple[Path, Any, Optional[Exception]]:
+            try:
+                return path, reader(path), None
+            except Exception as e:
+                return path, None, e
+
+        if len(paths) <= 1 or SYNC_PARSE_WORKERS <= 1:
+            for path in paths:
+                yield read(path)
+            return
+
+        with ThreadPoolExecutor(max_workers=SYNC_PARSE_WORKERS) as executor:
+            yield from executor.map(read, paths)
+
     # ===== YAML 工具 =====
 
     def read_yaml(self, filepath: Path) -> Dict[str, Any]:
         """读取 YAML 文件"""
         with open(filepath, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f) or {}
+            return yaml.load(f, Loader=_YamlLoader) or {}
 
     def write_yaml(self, filepath: Path, data: Dict[str, Any]) -> None:
         """写入 YAML 文件"""
@@ -205,7 +381,7 @@ class BaseSyncService(ABC):
         content = text[end_idx + 3:].strip()
 
         try:
-            metadata = yaml.safe_load(frontmatter) or {}
+            metadata = yaml.load(frontmatter, Loader=_YamlLoader) or {}
         except yaml.YAMLError:
             metadata = {}
 
@@ -70,6 +70,8 @@ class EdgeSyncService(BaseSyncService):
         "related",       # 通用关联
     ]
 
+    MANIFEST_NAME = "edges"
+
     def __init__(self, data_dir: Path, store: Any = None):
         """
         初始化知识边同步服务
@@ -93,6 +95,18 @@ class EdgeSyncService(BaseSyncService):
         safe_id = entity_id.replace("/", "_").replace("\\", "_")
         return self._get_tag_entity_dir(entity_type) / f"{safe_id}.yaml"
 
+    def _tags_hash(self, tags: List[str]) -> str:
+        """标签集合的内容哈希（与顺序无关）"""
+        return self.content_hash(sorted(set(tags)))
+
+    def _tags_unchanged(self, filepath: Path, db_tags: List[str]) -> bool:
+        """标签文件与数据库标签自上次同步后是否均未变化"""
+        key = self.manifest_key(filepath)
+        return (
+            self.manifest.db_unchanged(key, self._tags_hash(db_tags))
+            and self.manifest.file_unchanged(key, filepath)
+        )
+
     # ==================== 关系同步 (其他关系) ====================
 
     def _get_relation_file(self, relation: str) -> Path:
@@ -180,6 +194,7 @@ class EdgeSyncService(BaseSyncService):
                 logger.error(f"tag_export_entity_error: {entity_type}:{entity_id}, {e}")
                 stats["errors"] += 1
 
+        self.save_manifest()
         return stats
 
     def _export_single_entity_tags(
@@ -194,12 +209,16 @@ class EdgeSyncService(BaseSyncService):
         data = {"tags": tags}
 
         if filepath.exists() and not overwrite:
+            if self._tags_unchanged(filepath, tags):
+                return "skipped"
             existing = self.read_yaml(filepath)
             if existing == data:
+                self.record_synced(filepath, self._tags_hash(tags))
                 return "skipped"
 
         self.ensure_dir(filepath.parent)
         self.write_yaml_atomic(filepath, data)
+        self.record_synced(filepath, self._tags_hash(tags))
         return "exported"
 
     def _export_all_relations(self, overwrite: bool) -> Dict[str, int]:
@@ -347,14 +366,23 @@ class EdgeSyncService(BaseSyncService):
         etype = EdgeEntityType(entity_type)
 
         db_tags_map = self.store.get_all_entity_tags_by_type(etype)
-        file_entities = set()
+        yaml_files = sorted(entity_dir.glob("*.yaml"))
+        file_entities = {f.stem for f in yaml_files}
+
+        # 文件与数据库自上次同步后均未变化的实体无需解析
+        changed = []
+        for yaml_file in yaml_files:
+            if self._tags_unchanged(yaml_file, db_tags_map.get(yaml_file.stem, [])):
+                stats["unchanged"] += 1
+            else:
+                changed.append(yaml_file)
 
-        for yaml_file in entity_dir.glob("*.yaml"):
+        for yaml_file, data, error in self.read_files_parallel(changed, self.read_yaml):
             entity_id = yaml_file.stem
-            file_entities.add(entity_id)
 
             try:
-                data = self.read_yaml(yaml_file)
+                if error is not None:
+                    raise error
                 if not data:
                     continue
 
@@ -370,10 +398,7 @@ class EdgeSyncService(BaseSyncService):
                 # 只在 full_sync 模式下删除数据库中多余的标签
                 tags_to_remove = (db_tags - file_tags_set) if full_sync else set()
 
-                if not tags_to_add and not tags_to_remove:
-                    stats["unchanged"] += 1
-                    continue
-
+                failed = False
                 for tag in tags_to_add:
                     try:
                         self.store.add_tag(etype, entity_id, tag)
@@ -381,6 +406,7 @@ class EdgeSyncService(BaseSyncService):
                     except Exception as e:
                         logger.error(f"tag_import_add_error: {entity_id}, {tag}, {e}")
                         stats["errors"] += 1
+                        failed = True
 
                 for tag in tags_to_remove:
                     try:
@@ -389,6 +415,16 @@ class EdgeSyncService(BaseSyncService):
                     except Exception as e:
                         logger.error(f"tag_import_remove_error: {entity_id}, {tag}, {e}")
                         stats["errors"] += 1
+                        failed = True
+
+                if not tags_to_add and not tags_to_remove:
+                    stats["unchanged"] += 1
+
+                # 导入后数据库与文件一致时记录双侧基线
+                if not failed and (db_tags | tags_to_add) - tags_to_remove == file_tags_set:
+                    self.record_synced(yaml_file, self._tags_hash(file_tags))
+                else:
+                    self.record_synced(yaml_file)
 
             except Exception as e:
                 logger.error(f"tag_import_file_error: {yaml_file}, {e}")
@@ -406,6 +442,7 @@ class EdgeSyncService(BaseSyncService):
                             logger.error(f"tag_import_cleanup_error: {entity_id}, {e}")
                             stats["errors"] += 1
 
+        self.save_manifest()
         return stats
 
     def _import_all_relations(self, full_sync: bool = False) -> Dict[str, int]:
@@ -592,12 +629,16 @@ class EdgeSyncService(BaseSyncService):
             if not tags:
                 if filepath.exists():
                     filepath.unlink()
+                    self.manifest.forget(self.manifest_key(filepath))
+                    self.save_manifest()
                     logger.debug(f"tag_file_removed: {entity_type}:{entity_id}")
                 return True
 
             self.ensure_dir(filepath.parent)
             data = {"tags": tags}
             self.write_yaml_atomic(filepath, data)
+            self.record_synced(filepath, self._tags_hash(tags))
+            self.save_manifest()
             logger.debug(f"tag_exported: {entity_type}:{entity_id}, {len(tags)} tags")
             return True
 
@@ -740,11 +781,18 @@ class EdgeSyncService(BaseSyncService):
                 file_entities = set()
 
                 if entity_dir.exists():
-                    for yaml_file in entity_dir.glob("*.yaml"):
+                    yaml_files = sorted(entity_dir.glob("*.yaml"))
+                    file_entities = {f.stem for f in yaml_files}
+                    # 两侧自上次同步后均未变化的实体视为已同步，无需解析
+                    changed = [
+                        f for f in yaml_files
+                        if not self._tags_unchanged(f, db_tags_map.get(f.stem, []))
+                    ]
+
+                    for yaml_file, data, error in self.read_files_parallel(changed, self.read_yaml):
                         entity_id = yaml_file.stem
-                        file_entities.add(entity_id)
-
-                        data = self.read_yaml(yaml_file)
+                        if error is not None:
+                            raise error
                         if not data:
                             continue
 
@@ -768,6 +816,8 @@ class EdgeSyncService(BaseSyncService):
                                     "entity": f"{entity_type}:{entity_id}",
                                     "tags": list(missing_in_file)
                                 })
+                        else:
+                            self.record_synced(yaml_file, self._tags_hash(list(db_tags)))
 
                 # 检查数据库中有但文件中没有的实体
                 for entity_id in db_tags_map:
@@ -820,6 +870,7 @@ class EdgeSyncService(BaseSyncService):
             except Exception as e:
                 logger.error(f"verify_relations_error: {relation}, {e}")
 
+        self.save_manifest()
         return result
 
     def restore_from_file(self) -> Dict[str, int]:
@@ -48,6 +48,9 @@ class ExperienceSyncService(BaseSyncService):
         updated_at: "2024-01-15T10:30:00"
     """
 
+    MANIFEST_NAME = "experiences"
+    IDENTITY_COLUMN = "uuid"
+
     def __init__(self, data_dir: Path, store: Any = None):
         """
         初始化经验同步服务
@@ -100,17 +103,15 @@ class ExperienceSyncService(BaseSyncService):
 
                 filepath = self.experiences_dir / f"{exp.uuid}.yaml"
 
-                # 检查是否需要更新
-                if filepath.exists() and not overwrite:
-                    file_mtime = self.get_file_mtime(filepath)
-                    db_mtime = self.get_db_mtime(exp)
-                    if not self.should_update_file(file_mtime, db_mtime):
-                        stats["skipped"] += 1
-                        continue
-
-                # 转换为 YAML
+                # 转换为 YAML，按内容哈希判断是否需要更新
                 data = self._experience_to_yaml(exp)
+                db_hash = self.content_hash(data)
+                if not self.should_export(filepath, db_hash, exp, overwrite):
+                    stats["skipped"] += 1
+                    continue
+
                 self.write_yaml(filepath, data)
+                self.record_synced(filepath, db_hash)
                 stats["exported"] += 1
 
             except Exception as e:
@@ -123,6 +124,7 @@ class ExperienceSyncService(BaseSyncService):
         except Exception as e:
             logger.error(f"experience_links_export_error: {e}")
 
+        self.save_manifest()
         logger.info(f"experiences_exported: {stats}")
         return stats
 
@@ -143,14 +145,23 @@ class ExperienceSyncService(BaseSyncService):
             logger.info("experience_sync_import_skipped: experiences_dir not exists")
             return stats
 
-        for yaml_file in self.experiences_dir.glob("*.yaml"):
+        # 只解析上次同步后有变化的文件
+        yaml_files = sorted(self.experiences_dir.glob("*.yaml"))
+        changed = self.changed_files(yaml_files)
+        stats["unchanged"] += len(yaml_files) - len(changed)
+
+        for yaml_file, data, error in self.read_files_parallel(changed, self.read_yaml):
             try:
-                result = self._import_experience_file(yaml_file)
+                if error is not None:
+                    raise error
+                result = self._import_experience_file(yaml_file, data)
                 stats[result] += 1
             except Exception as e:
                 logger.error(f"experience_import_error: {yaml_file}, {e}")
                 stats["errors"] += 1
 
+        self.save_manifest()
+
         # 导入关联关系
         try:
             self._import_links()
@@ -204,14 +215,19 @@ class ExperienceSyncService(BaseSyncService):
 
         return data
 
-    def _import_experience_file(self, filepath: Path) -> str:
+    def _import_experience_file(self, filepath: Path, data: Optional[Dict[str, Any]] = None) -> str:
         """
         导入单个经验文件
 
+        Args:
+            filepath: 经验文件
+            data: 已解析的文件内容，为空时读取文件
+
         Returns:
             "created", "updated", "unchanged", 或 "errors"
         """
-        data = self.read_yaml(filepath)
+        if data is None:
+            data = self.read_yaml(filepath)
         if not data:
             return "errors"
 
@@ -246,19 +262,24 @@ class ExperienceSyncService(BaseSyncService):
             exp_data['context'] = ExperienceContext.from_dict(context)
 
         if existing:
-            file_mtime = self.get_file_mtime(filepath)
-            db_mtime = self.get_db_mtime(existing)
+            db_data = self._experience_to_yaml(existing)
+            db_hash = self.content_hash(db_data)
 
-            if self.should_update_db(file_mtime, db_mtime):
+            if db_data == data:
+                # 两侧内容一致：建立基线
+                self.record_synced(filepath, db_hash)
+                return "unchanged"
+            if self.should_import(filepath, existing, db_hash):
                 self.store.update(existing.id, **exp_data)
+                self.record_synced(filepath)
                 return "updated"
-            else:
-                return "unchanged"
+            return "unchanged"
 
         # 创建新经验
         from domains.experience_hub.core.models import Experience
         experience = Experience.from_dict(exp_data)
         self.store.add(experience)
+        self.record_synced(filepath)
         return "created"
 
     def _export_links(self) -> None:
@@ -341,26 +362,61 @@ class ExperienceSyncService(BaseSyncService):
             exp = self.store.get(experience_id)
             if exp is None:
                 return False
+            self._export_experience(exp)
+            self.save_manifest()
+            return True
 
-            # 确保经验有 UUID
-            if not exp.uuid:
-                exp.uuid = str(uuid_lib.uuid4())
-                try:
-                    self.store.update(exp.id, uuid=exp.uuid)
-                except Exception as e:
-                    logger.warning(f"failed_to_persist_uuid: {exp.id}, {e}")
+        except Exception as e:
+            logger.error(f"experience_export_single_error: {experience_id}, {e}")
+            return False
 
-            self.ensure_dir(self.experiences_dir)
+    def export_many(self, experience_ids: List[int]) -> Dict[str, int]:
+        """
+        批量导出经验（单次查询读取全部经验）
 
-            filepath = self.experiences_dir / f"{exp.uuid}.yaml"
-            data = self._experience_to_yaml(exp)
-            self.write_yaml_atomic(filepath, data)
+        Args:
+            experience_ids: 经验 ID 列表
 
-            return True
+        Returns:
+            {"exported": N, "errors": K}
+        """
+        stats = {"exported": 0, "errors": 0}
+        if self.store is None:
+            return stats
 
+        try:
+            experiences = self.store.get_many(experience_ids)
         except Exception as e:
-            logger.error(f"experience_export_single_error: {experience_id}, {e}")
-            return False
+            logger.error(f"experience_export_many_error: {e}")
+            stats["errors"] = len(experience_ids)
+            return stats
+
+        for exp in experiences:
+            try:
+                self._export_experience(exp)
+                stats["exported"] += 1
+            except Exception as e:
+                logger.error(f"experience_export_single_error: {exp.id}, {e}")
+                stats["errors"] += 1
+        self.save_manifest()
+        return stats
+
+    def _export_experience(self, exp: Any) -> None:
+        """写出单个经验文件"""
+        # 确保经验有 UUID
+        if not exp.uuid:
+            exp.uuid = str(uuid_lib.uuid4())
+            try:
+                self.store.update(exp.id, uuid=exp.uuid)
+            except Exception as e:
+                logger.warning(f"failed_to_persist_uuid: {exp.id}, {e}")
+
+        self.ensure_dir(self.experiences_dir)
+
+        filepath = self.experiences_dir / f"{exp.uuid}.yaml"
+        data = self._experience_to_yaml(exp)
+        self.write_yaml_atomic(filepath, data)
+        self.record_synced(filepath, self.content_hash(data))
 
     def import_single(self, experience_id: int) -> bool:
         """
@@ -385,6 +441,7 @@ class ExperienceSyncService(BaseSyncService):
                 return False
 
             result = self._import_experience_file(filepath)
+            self.save_manifest()
             return result in ("created", "updated", "unchanged")
 
         except Exception as e:
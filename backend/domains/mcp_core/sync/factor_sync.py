@@ -33,6 +33,9 @@ class FactorSyncService(BaseSyncService):
         - 时间戳：created_at, updated_at
     """
 
+    MANIFEST_NAME = "factors"
+    IDENTITY_COLUMN = "filename"
+
     # 需要同步的字段（不含 code_content 和 code_path）
     SYNC_FIELDS = [
         'filename', 'factor_type', 'uuid',
@@ -86,23 +89,22 @@ class FactorSyncService(BaseSyncService):
             filepath = self.metadata_dir / f"{factor.filename}.yaml"
 
             try:
-                # 检查是否需要更新
-                if filepath.exists() and not overwrite:
-                    file_mtime = self.get_file_mtime(filepath)
-                    db_mtime = self.get_db_mtime(factor)
-                    if not self.should_update_file(file_mtime, db_mtime):
-                        stats["skipped"] += 1
-                        continue
-
-                # 转换为 YAML 数据
+                # 转换为 YAML 数据，按内容哈希判断是否需要更新
                 data = self._factor_to_yaml_data(factor)
+                db_hash = self.content_hash(data)
+                if not self.should_export(filepath, db_hash, factor, overwrite):
+                    stats["skipped"] += 1
+                    continue
+
                 self.write_yaml(filepath, data)
+                self.record_synced(filepath, db_hash)
                 stats["exported"] += 1
 
             except Exception as e:
                 logger.error(f"factor_export_error: {factor.filename}, {e}")
                 stats["errors"] += 1
 
+        self.save_manifest()
         logger.info(f"factor_metadata_exported: {stats}")
         return stats
 
@@ -123,20 +125,34 @@ class FactorSyncService(BaseSyncService):
             logger.info("factor_sync_import_skipped: metadata_dir not exists")
             return stats
 
-        for yaml_file in self.metadata_dir.glob("*.yaml"):
+        try:
+            existing_map = {f.filename: f for f in self.store.get_all(include_excluded=True)}
+        except Exception as e:
+            logger.error(f"factor_sync_import_error: {e}")
+            stats["errors"] = 1
+            return stats
+
+        # 只解析上次同步后有变化的文件
+        yaml_files = sorted(self.metadata_dir.glob("*.yaml"))
+        changed = self.changed_files(yaml_files, set(existing_map))
+        stats["unchanged"] += len(yaml_files) - len(changed)
+
+        for yaml_file, data, error in self.read_files_parallel(changed, self.read_yaml):
             filename = yaml_file.stem
 
+            if error is not None:
+                logger.error(f"factor_import_error: {filename}, {error}")
+                stats["errors"] += 1
+                continue
+
             try:
-                # 读取 YAML
-                data = self.read_yaml(yaml_file)
                 if not data:
                     continue
 
                 # 确保 filename 一致
                 data['filename'] = filename
 
-                # 查找现有记录
-                existing = self.store.get(filename, include_excluded=True)
+                existing = existing_map.get(filename)
 
                 if existing is None:
                     # 创建新记录（需要有代码文件才能创建）
@@ -145,14 +161,18 @@ class FactorSyncService(BaseSyncService):
                     stats["unchanged"] += 1
                     continue
 
-                # 比较时间戳
-                file_mtime = self.get_file_mtime(yaml_file)
-                db_mtime = self.get_db_mtime(existing)
+                db_data = self._factor_to_yaml_data(existing)
+                db_hash = self.content_hash(db_data)
 
-                if self.should_update_db(file_mtime, db_mtime):
+                if db_data == data:
+                    # 两侧内容一致：建立基线
+                    self.record_synced(yaml_file, db_hash)
+                    stats["unchanged"] += 1
+                elif self.should_import(yaml_file, existing, db_hash):
                     # 更新数据库
                     update_data = self._yaml_data_to_update_dict(data)
                     self.store.update(filename, **update_data)
+                    self.record_synced(yaml_file)
                     stats["updated"] += 1
                 else:
                     stats["unchanged"] += 1
@@ -161,6 +181,7 @@ class FactorSyncService(BaseSyncService):
                 logger.error(f"factor_import_error: {filename}, {e}")
                 stats["errors"] += 1
 
+        self.save_manifest()
         logger.info(f"factor_metadata_imported: {stats}")
         return stats
 
@@ -232,15 +253,52 @@ class FactorSyncService(BaseSyncService):
             if factor is None:
                 return False
 
-            filepath = self.metadata_dir / f"{filename}.yaml"
-            data = self._factor_to_yaml_data(factor)
-            self.write_yaml(filepath, data)
+            self._export_factor(factor)
+            self.save_manifest()
             return True
 
         except Exception as e:
             logger.error(f"factor_export_single_error: {filename}, {e}")
             return False
 
+    def export_many(self, filenames: List[str]) -> Dict[str, int]:
+        """
+        批量导出因子元数据（单次查询读取全部因子）
+
+        Args:
+            filenames: 因子文件名列表
+
+        Returns:
+            {"exported": N, "errors": K}
+        """
+        stats = {"exported": 0, "errors": 0}
+        if self.store is None:
+            return stats
+
+        try:
+            factors = self.store.get_many(filenames, include_excluded=True)
+        except Exception as e:
+            logger.error(f"factor_export_many_error: {e}")
+            stats["errors"] = len(filenames)
+            return stats
+
+        for factor in factors:
+            try:
+                self._export_factor(factor)
+                stats["exported"] += 1
+            except Exception as e:
+                logger.error(f"factor_export_single_error: {factor.filename}, {e}")
+                stats["errors"] += 1
+        self.save_manifest()
+        return stats
+
+    def _export_factor(self, factor: Any) -> None:
+        """写出单个因子元数据文件并记录同步清单"""
+        filepath = self.metadata_dir / f"{factor.filename}.yaml"
+        data = self._factor_to_yaml_data(factor)
+        self.write_yaml_atomic(filepath, data)
+        self.record_synced(filepath, self.content_hash(data))
+
     def import_single(self, filename: str) -> bool:
         """
         导入单个因子的元数据
@@ -0,0 +1,171 @@
+"""
+同步清单（Sync Manifest）
+
+记录每个实体上一次同步完成时两侧的内容哈希:
+- file: 文件内容的 SHA-256（附带 mtime_ns/size 作为免读缓存）
+- db: 数据库记录导出数据的 SHA-256（未知时为 None）
+
+增量同步据此判断哪些实体在上次同步后发生了变化：
+文件的 stat 未变时无需读取和解析文件，数据库侧只需在内存中计算哈希，
+不再依赖文件 mtime 与数据库 updated_at 的比较，避免时钟偏差导致的误判。
+
+清单按同步服务分文件存放在 {data_dir}/.sync/ 下，属于本机缓存，
+删除后首次同步会退回时间戳比较并重建清单。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def content_hash(data: Any) -> str:
+    """计算结构化数据的内容哈希（键排序，与序列化格式无关）"""
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SyncManifest:
+    """
+    单个同步服务的内容哈希清单
+
+    键为文件相对数据目录的路径，线程安全。
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    @property
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """延迟加载清单"""
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    self._entries = self._load()
+        return self._entries
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != MANIFEST_VERSION:
+                return {}
+            return data.get("entries", {})
+        except Exception as e:
+            logger.warning(f"sync_manifest_load_error: {self.path}, {e}")
+            return {}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """获取实体的同步记录"""
+        with self._lock:
+            return self.entries.get(key)
+
+    def file_hash(self, filepath: Path, entry: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        计算文件内容哈希
+
+        stat（mtime_ns, size）与记录一致时直接复用记录中的哈希，不读取文件。
+        """
+        try:
+            st = filepath.stat()
+        except FileNotFoundError:
+            return None
+        if entry and entry.get("mtime_ns") == st.st_mtime_ns and entry.get("size") == st.st_size:
+            return entry.get("file")
+        with open(filepath, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def file_unchanged(self, key: str, filepath: Path) -> bool:
+        """文件自上次同步后是否未变化（无记录视为已变化）"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return False
+            digest = self.file_hash(filepath, entry)
+            if digest is None or digest != entry.get("file"):
+                return False
+            # 内容未变但 stat 变了（如 touch、git checkout）：刷新 stat 缓存
+            st = filepath.stat()
+            if entry.get("mtime_ns") != st.st_mtime_ns or entry.get("size") != st.st_size:
+                entry["mtime_ns"] = st.st_mtime_ns
+                entry["size"] = st.st_size
+                self._dirty = True
+            return True
+
+    def db_unchanged(self, key: str, db_hash: str) -> bool:
+        """数据库记录自上次同步后是否未变化（无数据库基线视为已变化）"""
+        with self._lock:
+            entry = self.entries.get(key)
+            return entry is not None and entry.get("db") is not None and entry["db"] == db_hash
+
+    def has_db_baseline(self, key: str) -> bool:
+        """是否记录了数据库侧哈希"""
+        with self._lock:
+            entry = self.entries.get(key)
+            return entry is not None and entry.get("db") is not None
+
+    def record(self, key: str, filepath: Path, db_hash: Optional[str] = None) -> None:
+        """
+        记录同步完成后的状态
+
+        Args:
+            key: 清单键
+            filepath: 已同步的文件
+            db_hash: 与文件内容一致的数据库侧哈希；两侧是否一致未知时传 None
+        """
+        try:
+            st = filepath.stat()
+        except FileNotFoundError:
+            self.forget(key)
+            return
+        with open(filepath, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        with self._lock:
+            self.entries[key] = {
+                "file": digest,
+                "mtime_ns": st.st_mtime_ns,
+                "size": st.st_size,
+                "db": db_hash,
+            }
+            self._dirty = True
+
+    def forget(self, key: str) -> None:
+        """删除实体的同步记录"""
+        with self._lock:
+            if self.entries.pop(key, None) is not None:
+                self._dirty = True
+
+    def save(self) -> None:
+        """写回清单（原子替换，无变化时跳过）"""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"version": MANIFEST_VERSION, "entries": self.entries}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            ignore_file = self.path.parent / ".gitignore"
+            if not ignore_file.exists():
+                # 清单是本机缓存，不随私有数据仓库提交
+                ignore_file.write_text("*\n", encoding="utf-8")
+            fd, tmp_path = tempfile.mkstemp(suffix=".json", prefix=".tmp_", dir=self.path.parent)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
@@ -50,6 +50,9 @@ class NoteSyncService(BaseSyncService):
     注意：使用 UUID 作为文件名，保证文件名稳定（标题变更不影响文件名）
     """
 
+    MANIFEST_NAME = "notes"
+    IDENTITY_COLUMN = "uuid"
+
     # 笔记类型到目录的映射
     # 研究流程: 观察 -> 假设 -> 检验
     TYPE_DIRS = {
@@ -109,17 +112,15 @@ class NoteSyncService(BaseSyncService):
 
                 filepath = self._get_note_filepath(note)
 
-                # 检查是否需要更新
-                if filepath.exists() and not overwrite:
-                    file_mtime = self.get_file_mtime(filepath)
-                    db_mtime = self.get_db_mtime(note)
-                    if not self.should_update_file(file_mtime, db_mtime):
-                        stats["skipped"] += 1
-                        continue
-
-                # 转换为 Markdown
+                # 转换为 Markdown，按内容哈希判断是否需要更新
                 metadata, content = self._note_to_markdown(note)
+                db_hash = self.content_hash([metadata, content])
+                if not self.should_export(filepath, db_hash, note, overwrite):
+                    stats["skipped"] += 1
+                    continue
+
                 self.write_markdown_with_frontmatter(filepath, metadata, content)
+                self.record_synced(filepath, db_hash)
 
                 # 清理旧格式文件
                 self._cleanup_old_files(note)
@@ -130,6 +131,7 @@ class NoteSyncService(BaseSyncService):
                 logger.error(f"note_export_error: {note.id}, {e}")
                 stats["errors"] += 1
 
+        self.save_manifest()
         logger.info(f"notes_exported: {stats}")
         return stats
 
@@ -151,19 +153,27 @@ class NoteSyncService(BaseSyncService):
             return stats
 
         # 遍历所有类型目录
+        md_files: List[Path] = []
         for type_dir in self.TYPE_DIRS.values():
             dir_path = self.notes_dir / type_dir
-            if not dir_path.exists():
-                continue
+            if dir_path.exists():
+                md_files.extend(sorted(dir_path.glob("*.md")))
 
-            for md_file in dir_path.glob("*.md"):
-                try:
-                    result = self._import_note_file(md_file)
-                    stats[result] += 1
-                except Exception as e:
-                    logger.error(f"note_import_error: {md_file}, {e}")
-                    stats["errors"] += 1
+        # 只解析上次同步后有变化的文件
+        changed = self.changed_files(md_files)
+        stats["unchanged"] += len(md_files) - len(changed)
 
+        for md_file, parsed, error in self.read_files_parallel(changed, self.read_markdown_with_frontmatter):
+            try:
+                if error is not None:
+                    raise error
+                result = self._import_note_file(md_file, parsed)
+                stats[result] += 1
+            except Exception as e:
+                logger.error(f"note_import_error: {md_file}, {e}")
+                stats["errors"] += 1
+
+        self.save_manifest()
         logger.info(f"notes_imported: {stats}")
         return stats
 
@@ -246,16 +256,24 @@ class NoteSyncService(BaseSyncService):
 
         return metadata, content
 
-    def _import_note_file(self, filepath: Path) -> str:
+    def _import_note_file(
+        self,
+        filepath: Path,
+        parsed: Optional[tuple[Dict[str, Any], str]] = None,
+    ) -> str:
         """
         导入单个笔记文件
 
         优先使用 UUID 匹配，其次使用 ID 匹配。
 
+        Args:
+            filepath: 笔记文件
+            parsed: 已解析的 (metadata, content)，为空时读取文件
+
         Returns:
             "created", "updated", "unchanged", 或 "errors"
         """
-        metadata, content = self.read_markdown_with_frontmatter(filepath)
+        metadata, content = parsed if parsed is not None else self.read_markdown_with_frontmatter(filepath)
 
         if not metadata:
             return "errors"
@@ -284,14 +302,18 @@ class NoteSyncService(BaseSyncService):
 
         if existing:
             # 更新现有记录
-            file_mtime = self.get_file_mtime(filepath)
-            db_mtime = self.get_db_mtime(existing)
+            db_metadata, db_content = self._note_to_markdown(existing)
+            db_hash = self.content_hash([db_metadata, db_content])
 
-            if self.should_update_db(file_mtime, db_mtime):
+            if (db_metadata, db_content) == (metadata, content):
+                # 两侧内容一致：建立基线
+                self.record_synced(filepath, db_hash)
+                return "unchanged"
+            if self.should_import(filepath, existing, db_hash):
                 self.store.update(existing.id, **note_data)
+                self.record_synced(filepath)
                 return "updated"
-            else:
-                return "unchanged"
+            return "unchanged"
 
         # 创建新笔记
         from domains.note_hub.core.models import Note
@@ -303,6 +325,7 @@ class NoteSyncService(BaseSyncService):
         note_data['uuid'] = note_uuid
         note = Note.from_dict(note_data)
         self.store.add(note)
+        self.record_synced(filepath)
         return "created"
 
     def get_status(self) -> Dict[str, Any]:
@@ -349,32 +372,67 @@ class NoteSyncService(BaseSyncService):
             note = self.store.get(note_id)
             if note is None:
                 return False
+            self._export_note(note)
+            self.save_manifest()
+            return True
 
-            # 确保笔记有 UUID
-            if not note.uuid:
-                note.uuid = str(uuid_lib.uuid4())
-                try:
-                    self.store.update(note.id, uuid=note.uuid)
-                except Exception as e:
-                    logger.warning(f"failed_to_persist_uuid: {note.id}, {e}")
-
-            # 确保目录存在
-            note_type = getattr(note, 'note_type', 'observation')
-            type_dir = self.TYPE_DIRS.get(note_type, 'observations')
-            self.ensure_dir(self.notes_dir / type_dir)
+        except Exception as e:
+            logger.error(f"note_export_single_error: {note_id}, {e}")
+            return False
 
-            filepath = self._get_note_filepath(note)
-            metadata, content = self._note_to_markdown(note)
-            self.write_markdown_with_frontmatter_atomic(filepath, metadata, content)
+    def export_many(self, note_ids: List[int]) -> Dict[str, int]:
+        """
+        批量导出笔记（单次查询读取全部笔记）
 
-            # 清理旧格式文件
-            self._cleanup_old_files(note)
+        Args:
+            note_ids: 笔记 ID 列表
 
-            return True
+        Returns:
+            {"exported": N, "errors": K}
+        """
+        stats = {"exported": 0, "errors": 0}
+        if self.store is None:
+            return stats
 
+        try:
+            notes = self.store.get_many(note_ids)
         except Exception as e:
-            logger.error(f"note_export_single_error: {note_id}, {e}")
-            return False
+            logger.error(f"note_export_many_error: {e}")
+            stats["errors"] = len(note_ids)
+            return stats
+
+        for note in notes:
+            try:
+                self._export_note(note)
+                stats["exported"] += 1
+            except Exception as e:
+                logger.error(f"note_export_single_error: {note.id}, {e}")
+                stats["errors"] += 1
+        self.save_manifest()
+        return stats
+
+    def _export_note(self, note: Any) -> None:
+        """写出单个笔记文件"""
+        # 确保笔记有 UUID
+        if not note.uuid:
+            note.uuid = str(uuid_lib.uuid4())
+            try:
+                self.store.update(note.id, uuid=note.uuid)
+            except Exception as e:
+                logger.warning(f"failed_to_persist_uuid: {note.id}, {e}")
+
+        # 确保目录存在
+        note_type = getattr(note, 'note_type', 'observation')
+        type_dir = self.TYPE_DIRS.get(note_type, 'observations')
+        self.ensure_dir(self.notes_dir / type_dir)
+
+        filepath = self._get_note_filepath(note)
+        metadata, content = self._note_to_markdown(note)
+        self.write_markdown_with_frontmatter_atomic(filepath, metadata, content)
+        self.record_synced(filepath, self.content_hash([metadata, content]))
+
+        # 清理旧格式文件
+        self._cleanup_old_files(note)
 
     def import_single(self, note_id: int) -> bool:
         """
@@ -403,6 +461,7 @@ class NoteSyncService(BaseSyncService):
                 return False
 
             result = self._import_note_file(filepath)
+            self.save_manifest()
             return result in ("created", "updated", "unchanged")
 
         except Exception as e:
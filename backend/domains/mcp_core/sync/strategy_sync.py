@@ -68,6 +68,9 @@ class StrategySyncService(BaseSyncService):
         'created_at', 'updated_at',
     ]
 
+    MANIFEST_NAME = "strategies"
+    IDENTITY_COLUMN = "id"
+
     def __init__(self, data_dir: Path, store: Any = None):
         """
         初始化策略同步服务
@@ -112,16 +115,14 @@ class StrategySyncService(BaseSyncService):
                 filename = strategy.id
                 config_path = self.configs_dir / f"{filename}.yaml"
 
-                # 检查是否需要更新
-                if config_path.exists() and not overwrite:
-                    file_mtime = self.get_file_mtime(config_path)
-                    db_mtime = self.get_db_mtime(strategy)
-                    if not self.should_update_file(file_mtime, db_mtime):
-                        stats["skipped"] += 1
-                        continue
+                # 按内容哈希判断是否需要更新（资金曲线一并计入）
+                config_data = self._strategy_to_yaml(strategy, filename)
+                db_hash = self.content_hash([config_data, strategy.equity_curve])
+                if not self.should_export(config_path, db_hash, strategy, overwrite):
+                    stats["skipped"] += 1
+                    continue
 
                 # 导出配置
-                config_data = self._strategy_to_yaml(strategy, filename)
                 self.write_yaml(config_path, config_data)
 
                 # 导出资金曲线（如果有）
@@ -131,12 +132,14 @@ class StrategySyncService(BaseSyncService):
                     if equity_data:
                         self.write_json(equity_path, equity_data)
 
+                self.record_synced(config_path, db_hash)
                 stats["exported"] += 1
 
             except Exception as e:
                 logger.error(f"strategy_export_error: {strategy.id}, {e}")
                 stats["errors"] += 1
 
+        self.save_manifest()
         logger.info(f"strategies_exported: {stats}")
         return stats
 
@@ -157,14 +160,23 @@ class StrategySyncService(BaseSyncService):
             logger.info("strategy_sync_import_skipped: configs_dir not exists")
             return stats
 
-        for yaml_file in self.configs_dir.glob("*.yaml"):
+        # 只解析上次同步后有变化的文件
+        yaml_files = sorted(self.configs_dir.glob("*.yaml"))
+        changed = self.changed_files(yaml_files)
+        stats["unchanged"] += len(yaml_files) - len(changed)
+
+        for yaml_file, data, error in self.read_files_parallel(changed, self.read_yaml):
             try:
-                result = self._import_strategy_file(yaml_file)
+                if error is not None:
+                    raise error
+                result = self._import_strategy_file(yaml_file, data)
                 stats[result] += 1
             except Exception as e:
                 logger.error(f"strategy_import_error: {yaml_file}, {e}")
                 stats["errors"] += 1
 
+        self.save_manifest()
+
         logger.info(f"strategies_imported: {stats}")
         return stats
 
@@ -215,14 +227,19 @@ class StrategySyncService(BaseSyncService):
 
         return data
 
-    def _import_strategy_file(self, filepath: Path) -> str:
+    def _import_strategy_file(self, filepath: Path, data: Optional[Dict[str, Any]] = None) -> str:
         """
         导入单个策略文件
 
+        Args:
+            filepath: 策略配置文件
+            data: 已解析的文件内容，为空时读取文件
+
         Returns:
             "created", "updated", "unchanged", 或 "errors"
         """
-        data = self.read_yaml(filepath)
+        if data is None:
+            data = self.read_yaml(filepath)
         if not data:
             return "errors"
 
@@ -251,19 +268,17 @@ class StrategySyncService(BaseSyncService):
             # 尝试更新现有策略
             existing = self.store.get(strategy_id)
             if existing:
-                file_mtime = self.get_file_mtime(filepath)
-                db_mtime = self.get_db_mtime(existing)
-
-                if self.should_update_db(file_mtime, db_mtime):
+                if self.should_import(filepath, existing):
                     self.store.update(strategy_id, **data)
+                    self.record_synced(filepath)
                     return "updated"
-                else:
-                    return "unchanged"
+                return "unchanged"
 
         # 创建新策略
         from domains.strategy_hub.services.models import Strategy
         strategy = Strategy.from_dict(data)
         self.store.add(strategy)
+        self.record_synced(filepath)
         return "created"
 
     def export_single(self, strategy_id: str) -> bool:
@@ -301,6 +316,8 @@ class StrategySyncService(BaseSyncService):
                 if equity_data:
                     self.write_json_atomic(equity_path, equity_data)
 
+            self.record_synced(config_path, self.content_hash([config_data, strategy.equity_curve]))
+            self.save_manifest()
             return True
 
         except Exception as e:
@@ -326,6 +343,7 @@ class StrategySyncService(BaseSyncService):
 
         try:
             result = self._import_strategy_file(filepath)
+            self.save_manifest()
             return result in ("created", "updated", "unchanged")
         except Exception as e:
             logger.error(f"strategy_import_single_error: {strategy_id}, {e}")
@@ -5,11 +5,16 @@
 同步操作采用 Fire-and-Forget 模式：
 - 同步失败不影响主业务逻辑
 - 记录日志便于问题排查
+
+默认启用后台同步（Write-Behind）：Store 写入只登记脏实体，
+由 SyncWorker 合并、批量导出，见 worker.py。
 """
 
 import logging
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Hashable, List, Optional
+
+from .worker import SyncWorker, SyncWorkerConfig
 
 logger = logging.getLogger(__name__)
 
@@ -22,12 +27,17 @@ class SyncTrigger:
     使用延迟初始化避免循环导入。
     """
 
-    def __init__(self, private_data_dir: Optional[Path] = None):
+    def __init__(
+        self,
+        private_data_dir: Optional[Path] = None,
+        worker_config: Optional[SyncWorkerConfig] = None,
+    ):
         """
         初始化同步触发器
 
         Args:
             private_data_dir: 私有数据目录，默认为 private/
+            worker_config: 后台同步配置，默认从环境变量读取
         """
         if private_data_dir is None:
             from domains.mcp_core.paths import get_private_data_dir
@@ -35,6 +45,10 @@ class SyncTrigger:
 
         self.data_dir = private_data_dir
         self._services: dict[str, Any] = {}
+        config = worker_config or SyncWorkerConfig.from_env()
+        self.worker: Optional[SyncWorker] = (
+            SyncWorker(self._export_batch, config) if config.enabled else None
+        )
 
     def _get_service(self, service_type: str) -> Optional[Any]:
         """
@@ -93,6 +107,10 @@ class SyncTrigger:
         Returns:
             是否成功（失败不影响调用方）
         """
+        if self.worker is not None:
+            self.worker.enqueue("strategy", strategy_id)
+            return True
+
         try:
             service = self._get_service("strategy")
             if service and hasattr(service, 'export_single'):
@@ -114,6 +132,10 @@ class SyncTrigger:
         Returns:
             是否成功
         """
+        if self.worker is not None:
+            self.worker.enqueue("factor", filename)
+            return True
+
         try:
             service = self._get_service("factor")
             if service and hasattr(service, 'export_single'):
@@ -135,6 +157,10 @@ class SyncTrigger:
         Returns:
             是否成功
         """
+        if self.worker is not None:
+            self.worker.enqueue("note", note_id)
+            return True
+
         try:
             service = self._get_service("note")
             if service and hasattr(service, 'export_single'):
@@ -156,6 +182,10 @@ class SyncTrigger:
         Returns:
             是否成功
         """
+        if self.worker is not None:
+            self.worker.enqueue("experience", experience_id)
+            return True
+
         try:
             service = self._get_service("experience")
             if service and hasattr(service, 'export_single'):
@@ -178,6 +208,10 @@ class SyncTrigger:
         Returns:
             是否成功
         """
+        if self.worker is not None:
+            self.worker.enqueue("tag", (entity_type, entity_id))
+            return True
+
         try:
             service = self._get_service("edge")
             if service and hasattr(service, 'export_single'):
@@ -199,6 +233,15 @@ class SyncTrigger:
         Returns:
             是否成功
         """
+        if self.worker is not None:
+            relation = edge.relation.value if hasattr(edge.relation, 'value') else edge.relation
+            if relation == "has_tag":
+                source_type = edge.source_type.value if hasattr(edge.source_type, 'value') else edge.source_type
+                self.worker.enqueue("tag", (source_type, edge.source_id))
+            else:
+                self.worker.enqueue("relation", relation)
+            return True
+
         try:
             service = self._get_service("edge")
             if service and hasattr(service, 'export_edge'):
@@ -210,6 +253,65 @@ class SyncTrigger:
             logger.warning(f"sync_edge_failed: {edge.source_id} -> {edge.target_id}, {e}")
         return False
 
+    # ==================== 后台同步 ====================
+
+    def _export_batch(self, kind: str, keys: List[Hashable]) -> None:
+        """
+        后台同步回调：导出一批同类实体
+
+        Args:
+            kind: 实体类型 (strategy, factor, note, experience, tag, relation)
+            keys: 去重后的实体键
+        """
+        if kind in ("tag", "relation"):
+            service = self._get_service("edge")
+            if service is None:
+                return
+            # 逐个导出，单个键失败不影响同批其余键
+            failed = 0
+            for key in keys:
+                try:
+                    if kind == "tag":
+                        service.export_single(*key)
+                    else:
+                        service.export_relation(key)
+                except Exception as e:
+                    failed += 1
+                    logger.warning(f"sync_{kind}_failed: {key}, {e}")
+            logger.debug(f"{kind}_synced: {len(keys) - failed}/{len(keys)}")
+            return
+
+        service = self._get_service(kind)
+        if service is None:
+            return
+        result = service.export_many(keys)
+        logger.debug(f"{kind}_synced: {result.get('exported', 0)}/{len(keys)}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        立即写出所有待同步实体
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            是否在超时前全部完成
+        """
+        if self.worker is None:
+            return True
+        return self.worker.flush(timeout)
+
+    def shutdown(self, timeout: Optional[float] = 30.0) -> None:
+        """写完待同步实体并停止后台线程"""
+        if self.worker is not None:
+            self.worker.stop(timeout)
+
+    def get_stats(self) -> dict[str, Any]:
+        """后台同步统计"""
+        if self.worker is None:
+            return {"write_behind": False}
+        return {"write_behind": True, **self.worker.get_stats()}
+
 
 # 单例
 _trigger: Optional[SyncTrigger] = None
@@ -0,0 +1,221 @@
+"""
+后台同步队列（Write-Behind）
+
+Store 层的实时同步不再在请求路径内读库写文件，而是登记"脏实体"，
+由后台线程统一处理:
+- 合并：同一实体在防抖窗口内的多次更新只导出一次
+- 批量：同类实体按批交给同步服务，一次查询读取全部记录
+- 不饿死：持续更新的实体最迟在 max_delay 后导出
+- 关闭前刷新：flush()/stop() 等待队列写完，进程退出时自动 stop
+
+环境变量:
+- SYNC_WRITE_BEHIND: 是否启用后台同步（默认 true，false 时退回同步导出）
+- SYNC_DEBOUNCE_SECONDS: 防抖窗口（秒）
+- SYNC_MAX_DELAY_SECONDS: 最长延迟（秒）
+- SYNC_BATCH_SIZE: 单批最大实体数
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (实体类型, 实体键)
+SyncKey = Tuple[str, Hashable]
+
+
+@dataclass
+class SyncWorkerConfig:
+    """后台同步配置"""
+    enabled: bool = True
+    debounce: float = 1.0  # 最后一次更新后等待多久导出（秒）
+    max_delay: float = 10.0  # 首次登记后最迟多久导出（秒）
+    batch_size: int = 200  # 单批最大实体数
+
+    @classmethod
+    def from_env(cls) -> "SyncWorkerConfig":
+        """从环境变量读取配置"""
+        config = cls()
+        config.enabled = os.getenv("SYNC_WRITE_BEHIND", "true").lower() == "true"
+        if os.getenv("SYNC_DEBOUNCE_SECONDS"):
+            config.debounce = float(os.environ["SYNC_DEBOUNCE_SECONDS"])
+        if os.getenv("SYNC_MAX_DELAY_SECONDS"):
+            config.max_delay = float(os.environ["SYNC_MAX_DELAY_SECONDS"])
+        if os.getenv("SYNC_BATCH_SIZE"):
+            config.batch_size = int(os.environ["SYNC_BATCH_SIZE"])
+        return config
+
+
+class SyncWorker:
+    """
+    合并写入的后台同步队列
+
+    Args:
+        handler: 批处理回调 handler(kind, keys)，在后台线程中调用
+        config: 队列配置
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str, List[Hashable]], None],
+        config: Optional[SyncWorkerConfig] = None,
+    ):
+        self.handler = handler
+        self.config = config or SyncWorkerConfig.from_env()
+        # 实体 -> (首次登记时间, 最近登记时间)，dict 保持登记顺序
+        self._pending: Dict[SyncKey, Tuple[float, float]] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._inflight = 0
+        self._flushing = 0
+        self._stopped = False
+        self._atexit_registered = False
+        self._stats = {"enqueued": 0, "coalesced": 0, "exported": 0, "batches": 0, "errors": 0}
+
+    def enqueue(self, kind: str, key: Hashable) -> None:
+        """登记脏实体（立即返回）"""
+        with self._cond:
+            if self._stopped:
+                stopped = True
+            else:
+                stopped = False
+                now = time.monotonic()
+                item = (kind, key)
+                if item in self._pending:
+                    self._pending[item] = (self._pending[item][0], now)
+                    self._stats["coalesced"] += 1
+                else:
+                    self._pending[item] = (now, now)
+                self._stats["enqueued"] += 1
+                self._ensure_thread()
+                self._cond.notify()
+
+        if stopped:
+            # 已停止（进程退出中）：直接同步导出，避免丢失
+            self._process([(kind, key)])
+
+    def _ensure_thread(self) -> None:
+        """启动后台线程（调用方持有锁）"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="sync-write-behind", daemon=True)
+        self._thread.start()
+        if not self._atexit_registered:
+            atexit.register(self.stop)
+            self._atexit_registered = True
+
+    def _take_due(self) -> Optional[List[SyncKey]]:
+        """
+        等待并取出到期的实体（调用方持有锁）
+
+        Returns:
+            到期实体列表；队列为空且已停止时返回 None
+        """
+        while True:
+            if not self._pending:
+                if self._stopped:
+                    return None
+                self._cond.wait()
+                continue
+
+            now = time.monotonic()
+            force = self._stopped or self._flushing > 0
+            due: List[SyncKey] = []
+            next_due = None
+            for item, (first, last) in self._pending.items():
+                ready_at = min(last + self.config.debounce, first + self.config.max_delay)
+                if force or ready_at <= now:
+                    due.append(item)
+                    if len(due) >= self.config.batch_size:
+                        break
+                elif next_due is None or ready_at < next_due:
+                    next_due = ready_at
+
+            if due:
+                for item in due:
+                    del self._pending[item]
+                self._inflight += len(due)
+                return due
+            self._cond.wait(timeout=max(0.0, next_due - now))
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                due = self._take_due()
+                if due is None:
+                    return
+            try:
+                self._process(due)
+            finally:
+                with self._cond:
+                    self._inflight -= len(due)
+                    self._cond.notify_all()
+
+    def _process(self, items: List[SyncKey]) -> None:
+        """按实体类型分组调用批处理回调（失败只记录日志）"""
+        groups: Dict[str, List[Hashable]] = {}
+        for kind, key in items:
+            groups.setdefault(kind, []).append(key)
+
+        for kind, keys in groups.items():
+            try:
+                self.handler(kind, keys)
+                with self._cond:
+                    self._stats["exported"] += len(keys)
+                    self._stats["batches"] += 1
+            except Exception as e:
+                logger.warning(f"sync_write_behind_failed: {kind}, {len(keys)} items, {e}")
+                with self._cond:
+                    self._stats["errors"] += len(keys)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        立即导出所有待同步实体并等待完成
+
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
+
+        Returns:
+            是否在超时前全部完成
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                while self._pending or self._inflight:
+                    if self._thread is None or not self._thread.is_alive():
+                        if self._pending:
+                            self._ensure_thread()
+                        else:
+                            break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(timeout=remaining)
+                return True
+            finally:
+                self._flushing -= 1
+
+    def stop(self, timeout: Optional[float] = 30.0) -> None:
+        """写完队列后停止后台线程（之后的登记改为同步导出）"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """队列统计"""
+        with self._cond:
+            return {
+                **self._stats,
+                "pending": len(self._pending),
+                "inflight": self._inflight,
+            }
@@ -207,7 +207,8 @@ class SearchNotesTool(BaseTool):
     def description(self) -> str:
         return """搜索经验概览。
 
-在标题和内容中搜索关键词，返回匹配的笔记列表。
+结合关键词全文检索（支持中文）与语义向量检索，按融合相关度排序，
+返回匹配的笔记列表及内容高亮片段。用词不同但含义相近的笔记也能被召回。
 
 使用场景:
 - 查找之前记录的经验
@@ -238,10 +239,11 @@ class SearchNotesTool(BaseTool):
             keyword = params.get("keyword", "")
             limit = params.get("limit", 20)
 
-            notes = self.note_service.search_notes(keyword, limit)
+            hits = self.note_service.search_notes_ranked(keyword, limit)
 
             note_list = []
-            for note in notes:
+            for hit in hits:
+                note = hit.entity
                 note_list.append({
                     "id": note.id,
                     "title": note.title,
@@ -250,6 +252,8 @@ class SearchNotesTool(BaseTool):
                     "note_type": note.note_type,
                     "is_archived": note.is_archived,
                     "updated_at": str(note.updated_at) if note.updated_at else None,
+                    "score": round(hit.score, 4),
+                    "highlight": hit.highlights.get("content", ""),
                 })
 
             return ToolResult(
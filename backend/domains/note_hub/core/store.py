@@ -22,11 +22,34 @@ from domains.mcp_core.base.store import (
     reset_store_instance,
 )
 from domains.mcp_core.database.query_builder import QueryBuilder
+from domains.mcp_core.database.hybrid import VectorIndex, VectorIndexSpec, merge_hits
+from domains.mcp_core.database.search import (
+    SearchHit,
+    SearchIndexSpec,
+    TextSearchIndex,
+    highlight,
+)
 
 from .models import Note, NoteType
 
 logger = logging.getLogger(__name__)
 
+# 笔记检索索引（标题 > 内容 > 标签）
+NOTE_SEARCH_INDEX = TextSearchIndex(SearchIndexSpec(
+    table="notes",
+    fields=[("title", "A"), ("content", "B"), ("tags", "C")],
+    title_column="title",
+))
+
+# 笔记向量索引（写入后后台生成 embedding）
+NOTE_VECTOR_INDEX = VectorIndex(VectorIndexSpec(
+    table="notes",
+    text_sql="coalesce(title, '') || E'\\n' || coalesce(content, '')",
+))
+
+# 触发重新向量化的字段
+EMBEDDING_FIELDS = {'title', 'content'}
+
 
 class NoteStore(BaseStore[Note]):
     """
@@ -51,6 +74,12 @@ class NoteStore(BaseStore[Note]):
     # 向后兼容别名
     ALLOWED_COLUMNS = allowed_columns
 
+    # 显式列出模型列，不加载 search_vector / embedding 等派生列
+    select_sql = ', '.join(sorted(allowed_columns))
+
+    search_index = NOTE_SEARCH_INDEX
+    vector_index = NOTE_VECTOR_INDEX
+
     def _row_to_entity(self, row: Dict[str, Any]) -> Note:
         """将数据库行转换为 Note 对象"""
         valid_fields = {k: v for k, v in row.items() if k in Note.__dataclass_fields__}
@@ -70,7 +99,7 @@ class NoteStore(BaseStore[Note]):
         """获取单个笔记"""
         with self._cursor() as cursor:
             cursor.execute(
-                'SELECT * FROM notes WHERE id = %s',
+                f'SELECT {self.select_sql} FROM notes WHERE id = %s',
                 (note_id,)
             )
             row = cursor.fetchone()
@@ -78,11 +107,22 @@ class NoteStore(BaseStore[Note]):
                 return self._row_to_entity(dict(row))
         return None
 
+    def get_many(self, note_ids: List[int]) -> List[Note]:
+        """批量获取笔记（单次查询，不存在的 ID 被忽略）"""
+        if not note_ids:
+            return []
+        with self._cursor() as cursor:
+            cursor.execute(
+                f'SELECT {self.select_sql} FROM notes WHERE id = ANY(%s)',
+                (list(note_ids),)
+            )
+            return [self._row_to_entity(dict(row)) for row in cursor.fetchall()]
+
     def get_by_uuid(self, uuid: str) -> Optional[Note]:
         """通过 UUID 获取笔记"""
         with self._cursor() as cursor:
             cursor.execute(
-                'SELECT * FROM notes WHERE uuid = %s',
+                f'SELECT {self.select_sql} FROM notes WHERE uuid = %s',
                 (uuid,)
             )
             row = cursor.fetchone()
@@ -94,7 +134,7 @@ class NoteStore(BaseStore[Note]):
         """获取所有笔记"""
         with self._cursor() as cursor:
             cursor.execute(
-                'SELECT * FROM notes ORDER BY updated_at DESC LIMIT %s OFFSET %s',
+                f'SELECT {self.select_sql} FROM notes ORDER BY updated_at DESC LIMIT %s OFFSET %s',
                 (limit, offset)
             )
             return [self._row_to_entity(dict(row)) for row in cursor.fetchall()]
@@ -133,9 +173,10 @@ class NoteStore(BaseStore[Note]):
             logger.error(f"添加笔记失败: {e}")
             return None
 
-        # 触发实时同步
+        # 触发实时同步与后台向量化
         if note_id:
             self._trigger_sync(note_id)
+            self.vector_index.enqueue([note_id], self._cursor)
 
         return note_id
 
@@ -171,9 +212,11 @@ class NoteStore(BaseStore[Note]):
             )
             updated = cursor.rowcount > 0
 
-        # 触发实时同步
+        # 触发实时同步，正文变化时重新向量化
         if updated:
             self._trigger_sync(note_id)
+            if EMBEDDING_FIELDS & safe_fields.keys():
+                self.vector_index.enqueue([note_id], self._cursor)
 
         return updated
 
@@ -264,12 +307,10 @@ class NoteStore(BaseStore[Note]):
             (笔记列表, 总数)
         """
         builder = self._create_query_builder()
+        builder.select_columns(sorted(self.allowed_columns))
 
         if search:
-            builder.where_raw(
-                "(title ILIKE %s OR content ILIKE %s)",
-                [f'%{search}%', f'%{search}%']
-            )
+            self.search_index.apply(builder, search, self._cursor)
 
         if tags:
             for tag in tags:
@@ -307,9 +348,121 @@ class NoteStore(BaseStore[Note]):
         return notes, total
 
     def search(self, keyword: str, limit: int = 20) -> List[Note]:
-        """全文搜索笔记"""
-        notes, _ = self.query(search=keyword, limit=limit)
-        return notes
+        """搜索笔记（关键词 + 语义混合检索）"""
+        return [hit.entity for hit in self.search_hybrid(keyword, limit=limit)]
+
+    def _search_builder(
+        self,
+        note_type: Optional[str],
+        is_archived: Optional[bool],
+    ) -> QueryBuilder:
+        """检索查询的基础构建器（列投影 + 筛选条件）"""
+        builder = self._create_query_builder()
+        builder.select_columns(sorted(self.allowed_columns))
+        if note_type:
+            builder.where("note_type", note_type)
+        if is_archived is not None:
+            builder.where("is_archived", is_archived)
+        return builder
+
+    def _row_to_hit(self, row: Dict[str, Any], keyword: str, score_column: str) -> SearchHit:
+        """将检索结果行转换为命中结果（附带高亮片段）"""
+        return SearchHit(
+            entity=self._row_to_entity(row),
+            score=float(row.get(score_column) or 0.0),
+            highlights={
+                'title': highlight(row.get('title') or '', keyword),
+                'content': highlight(row.get('content') or '', keyword),
+            },
+        )
+
+    def search_ranked(
+        self,
+        keyword: str,
+        limit: int = 20,
+        offset: int = 0,
+        note_type: Optional[str] = None,
+        is_archived: Optional[bool] = None,
+    ) -> List[SearchHit]:
+        """
+        全文搜索笔记，按相关度排序并返回高亮片段
+
+        Args:
+            keyword: 搜索关键词
+            limit: 限制数量
+            offset: 偏移量
+            note_type: 笔记类型筛选
+            is_archived: 归档状态筛选
+
+        Returns:
+            命中列表（highlights 包含 title/content 片段）
+        """
+        if not keyword or not keyword.strip():
+            return []
+
+        builder = self._search_builder(note_type, is_archived)
+        self.search_index.apply(builder, keyword, self._cursor, rank=True)
+        builder.order_by_expression("search_rank DESC", tiebreaker="id")
+        builder.limit(limit)
+        builder.offset(offset)
+
+        sql, params = builder.build()
+        with self._cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = [dict(row) for row in cursor.fetchall()]
+
+        return [self._row_to_hit(row, keyword, 'search_rank') for row in rows]
+
+    def search_semantic(
+        self,
+        query: str,
+        limit: int = 20,
+        note_type: Optional[str] = None,
+        is_archived: Optional[bool] = None,
+    ) -> List[SearchHit]:
+        """
+        语义搜索笔记（向量近邻，HNSW 索引）
+
+        Returns:
+            命中列表（score 为余弦相似度）；向量不可用时返回空列表
+        """
+        if not query or not query.strip():
+            return []
+        builder = self._search_builder(note_type, is_archived)
+        rows = self.vector_index.search(self._cursor, builder, query, limit)
+        return [self._row_to_hit(row, query, 'similarity') for row in rows]
+
+    def search_hybrid(
+        self,
+        keyword: str,
+        limit: int = 20,
+        note_type: Optional[str] = None,
+        is_archived: Optional[bool] = None,
+    ) -> List[SearchHit]:
+        """
+        混合搜索笔记：全文检索与语义检索各取候选，过滤低相关候选后按倒数排名融合（RRF）
+
+        Args:
+            keyword: 搜索关键词或自然语言问题
+            limit: 限制数量
+            note_type: 笔记类型筛选
+            is_archived: 归档状态筛选
+
+        Returns:
+            命中列表（score 为 RRF 得分）
+        """
+        candidates = max(limit * 2, 20)
+        text_hits = self.search_ranked(
+            keyword, limit=candidates, note_type=note_type, is_archived=is_archived
+        )
+        vector_hits = self.search_semantic(
+            keyword, limit=candidates, note_type=note_type, is_archived=is_archived
+        )
+        return merge_hits(text_hits, vector_hits, limit)
+
+    def backfill_embeddings(self, max_rows: int = 10000) -> int:
+        """补齐存量笔记的向量（首次启用或切换模型后执行）"""
+        return self.vector_index.backfill(self._cursor, max_rows=max_rows)
 
     def get_tags(self, include_archived: bool = False) -> List[str]:
         """获取所有标签（去重）
@@ -360,7 +513,7 @@ class NoteStore(BaseStore[Note]):
         with self._cursor() as cursor:
             if include_archived:
                 cursor.execute(
-                    '''SELECT * FROM notes
+                    f'''SELECT {self.select_sql} FROM notes
                     WHERE note_type = %s
                     ORDER BY updated_at DESC
                     LIMIT %s''',
@@ -368,7 +521,7 @@ class NoteStore(BaseStore[Note]):
                 )
             else:
                 cursor.execute(
-                    '''SELECT * FROM notes
+                    f'''SELECT {self.select_sql} FROM notes
                     WHERE note_type = %s AND is_archived = FALSE
                     ORDER BY updated_at DESC
                     LIMIT %s''',
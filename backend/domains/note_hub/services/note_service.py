@@ -16,6 +16,8 @@ from typing import Optional, List, Tuple, Dict, Any
 from ..core.models import Note, NoteType
 from ..core.store import NoteStore, get_note_store
 
+from domains.mcp_core.database.search import SearchHit
+
 from domains.mcp_core.edge import (
     KnowledgeEdge,
     EdgeEntityType,
@@ -170,6 +172,10 @@ class NoteService:
         """搜索笔记"""
         return self.store.search(keyword, limit)
 
+    def search_notes_ranked(self, keyword: str, limit: int = 20) -> List[SearchHit]:
+        """搜索笔记（关键词 + 语义混合检索，按融合得分排序，附带高亮片段）"""
+        return self.store.search_hybrid(keyword, limit=limit)
+
     def get_tags(self, include_archived: bool = False) -> List[str]:
         """获取所有标签
 
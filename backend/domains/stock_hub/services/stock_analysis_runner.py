@@ -5,11 +5,12 @@ import os
 import threading
 import uuid
 from collections.abc import Callable
-from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import Future
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
 
+from domains.mcp_core.queue.scheduler import get_scheduler
 from domains.stock_hub.services.stock_analysis_service import (
     StockAnalysisService,
     get_stock_analysis_service,
@@ -40,7 +41,9 @@ class AnalysisTaskInfo:
 
 
 class StockAnalysisRunner:
-    """使用线程池异步执行 stock_hub 分析任务。"""
+    """通过全局作业调度器异步执行 stock_hub 分析任务。"""
+
+    SCHEDULER_GROUP = "stock_analysis"
 
     def __init__(
         self,
@@ -51,7 +54,8 @@ class StockAnalysisRunner:
             max_workers = _get_default_workers()
 
         self._service = service or get_stock_analysis_service()
-        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._scheduler = get_scheduler()
+        self._scheduler.set_group_limit(self.SCHEDULER_GROUP, max_workers)
         self._tasks: dict[str, AnalysisTaskInfo] = {}
         self._futures: dict[str, Future] = {}
         self._lock = threading.Lock()
@@ -132,7 +136,14 @@ class StockAnalysisRunner:
 
         with self._lock:
             self._tasks[task_id] = task
-            future = self._executor.submit(self._run_task, task_id, func, kwargs)
+            future = self._scheduler.submit(
+                self._run_task,
+                task_id,
+                func,
+                kwargs,
+                group=self.SCHEDULER_GROUP,
+                name=f"stock_analysis:{task_type}",
+            )
             self._futures[task_id] = future
 
         return task_id
@@ -23,6 +23,7 @@ from .tools.strategy_tools import (
     SearchStrategiesTool,
     GetStrategyStatsTool,
     RunBacktestTool,
+    RunWalkForwardTool,
 )
 from .tools.analysis_tools import (
     CompareBacktestLiveTool,
@@ -56,6 +57,7 @@ class StrategyHubMCPServer(BaseMCPServer):
 
         # 回测工具
         self.register_tool(RunBacktestTool(), "mutation")
+        self.register_tool(RunWalkForwardTool(), "mutation")
 
         # 分析类工具 (参数搜索/分析已移至 factor-hub)
         self.register_tool(CompareBacktestLiveTool(), "query")
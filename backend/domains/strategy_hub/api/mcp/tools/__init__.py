@@ -12,6 +12,7 @@ from .strategy_tools import (
     UpdateStrategyTool,
     DeleteStrategyTool,
     RunBacktestTool,
+    RunWalkForwardTool,
 )
 from .analysis_tools import (
     CompareBacktestLiveTool,
@@ -29,6 +30,7 @@ __all__ = [
     "UpdateStrategyTool",
     "DeleteStrategyTool",
     "RunBacktestTool",
+    "RunWalkForwardTool",
     # 分析工具
     "CompareBacktestLiveTool",
     "CompareStrategyCoinsTool",
@@ -340,6 +340,83 @@ class DeleteStrategyTool(BaseTool):
             return ToolResult.fail(str(e))
 
 
+# 策略配置列表的 schema 定义（回测与走步回测共用）
+STRATEGY_LIST_SCHEMA = {
+    "type": "array",
+    "description": "策略配置列表",
+    "items": {
+        "type": "object",
+        "properties": {
+            "factor_list": {
+                "type": "array",
+                "description": (
+                    "因子列表，每个因子为 [名称, ascending, 参数, 权重]。"
+                    "ascending 决定排序和选币: "
+                    "true=升序(做多选因子值最小的N个币); "
+                    "false=降序(做多选因子值最大的N个币)。"
+                    "参数: 计算窗口(小时)，如 1200。权重: 固定为 1。"
+                    "示例: [[\"Momentum\", false, 1200, 1]] 表示做多动量最大的币"
+                ),
+            },
+            "filter_list": {
+                "type": "array",
+                "description": (
+                    "前置过滤因子列表，每个过滤因子为 [名称, 参数, 过滤条件, ascending]。"
+                    "参数: 计算窗口(小时)。"
+                    "过滤条件: \"pct:<0.2\"(百分位<20%), \"rank:<10\"(排名<10), \"val:>100\"(原值>100)。"
+                    "ascending 决定排名计算方式(对pct/rank有效，对val无效): "
+                    "true=升序(值最小的排名第1); false=降序(值最大的排名第1)。"
+                    "示例: [[\"QuoteVolumeMean\", 24, \"pct:<0.2\", true]] 保留成交量最小的20%币种"
+                ),
+            },
+            "filter_list_post": {
+                "type": "array",
+                "description": (
+                    "后置过滤因子列表（在选币后应用），格式同 filter_list。"
+                ),
+            },
+            "long_select_coin_num": {
+                "type": "number",
+                "description": "多头选币数量。[0,1): 比例(如 0.1=10%); >=1: 绝对数量",
+                "default": 0.1,
+            },
+            "short_select_coin_num": {
+                "type": "number",
+                "description": "空头选币数量(0=不做空)。[0,1): 比例; >=1: 绝对数量",
+                "default": 0,
+            },
+            "long_cap_weight": {
+                "type": "number",
+                "description": "多头仓位权重。实际占比=long/(long+short)。纯多头: long=1,short=0",
+                "default": 1,
+            },
+            "short_cap_weight": {
+                "type": "number",
+                "description": "空头仓位权重。多空平衡: long=1,short=1; 纯空头: long=0,short=1",
+                "default": 0,
+            },
+            "hold_period": {
+                "type": "string",
+                "description": "持仓周期，如 \"1H\", \"4H\", \"24H\"",
+                "default": "1H",
+            },
+            "market": {
+                "type": "string",
+                "description": (
+                    "币池与交易类型: "
+                    "spot_spot(现货币池+现货交易), "
+                    "swap_swap(合约币池+合约交易), "
+                    "spot_swap(现货币池+优先合约), "
+                    "mix_spot(合并币池+优先现货), "
+                    "mix_swap(合并币池+优先合约)"
+                ),
+                "default": "swap_swap",
+            },
+        },
+    },
+}
+
+
 class RunBacktestTool(BaseTool):
     """运行回测工具"""
 
@@ -365,80 +442,7 @@ class RunBacktestTool(BaseTool):
                     "type": "string",
                     "description": "策略名称",
                 },
-                "strategy_list": {
-                    "type": "array",
-                    "description": "策略配置列表",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "factor_list": {
-                                "type": "array",
-                                "description": (
-                                    "因子列表，每个因子为 [名称, ascending, 参数, 权重]。"
-                                    "ascending 决定排序和选币: "
-                                    "true=升序(做多选因子值最小的N个币); "
-                                    "false=降序(做多选因子值最大的N个币)。"
-                                    "参数: 计算窗口(小时)，如 1200。权重: 固定为 1。"
-                                    "示例: [[\"Momentum\", false, 1200, 1]] 表示做多动量最大的币"
-                                ),
-                            },
-                            "filter_list": {
-                                "type": "array",
-                                "description": (
-                                    "前置过滤因子列表，每个过滤因子为 [名称, 参数, 过滤条件, ascending]。"
-                                    "参数: 计算窗口(小时)。"
-                                    "过滤条件: \"pct:<0.2\"(百分位<20%), \"rank:<10\"(排名<10), \"val:>100\"(原值>100)。"
-                                    "ascending 决定排名计算方式(对pct/rank有效，对val无效): "
-                                    "true=升序(值最小的排名第1); false=降序(值最大的排名第1)。"
-                                    "示例: [[\"QuoteVolumeMean\", 24, \"pct:<0.2\", true]] 保留成交量最小的20%币种"
-                                ),
-                            },
-                            "filter_list_post": {
-                                "type": "array",
-                                "description": (
-                                    "后置过滤因子列表（在选币后应用），格式同 filter_list。"
-                                ),
-                            },
-                            "long_select_coin_num": {
-                                "type": "number",
-                                "description": "多头选币数量。[0,1): 比例(如 0.1=10%); >=1: 绝对数量",
-                                "default": 0.1,
-                            },
-                            "short_select_coin_num": {
-                                "type": "number",
-                                "description": "空头选币数量(0=不做空)。[0,1): 比例; >=1: 绝对数量",
-                                "default": 0,
-                            },
-                            "long_cap_weight": {
-                                "type": "number",
-                                "description": "多头仓位权重。实际占比=long/(long+short)。纯多头: long=1,short=0",
-                                "default": 1,
-                            },
-                            "short_cap_weight": {
-                                "type": "number",
-                                "description": "空头仓位权重。多空平衡: long=1,short=1; 纯空头: long=0,short=1",
-                                "default": 0,
-                            },
-                            "hold_period": {
-                                "type": "string",
-                                "description": "持仓周期，如 \"1H\", \"4H\", \"24H\"",
-                                "default": "1H",
-                            },
-                            "market": {
-                                "type": "string",
-                                "description": (
-                                    "币池与交易类型: "
-                                    "spot_spot(现货币池+现货交易), "
-                                    "swap_swap(合约币池+合约交易), "
-                                    "spot_swap(现货币池+优先合约), "
-                                    "mix_spot(合并币池+优先现货), "
-                                    "mix_swap(合并币池+优先合约)"
-                                ),
-                                "default": "swap_swap",
-                            },
-                        },
-                    },
-                },
+                "strategy_list": STRATEGY_LIST_SCHEMA,
                 "start_date": {
                     "type": "string",
                     "description": "回测开始日期 (YYYY-MM-DD)，不传则使用数据最早日期",
@@ -502,3 +506,107 @@ class RunBacktestTool(BaseTool):
             return ToolResult.fail(str(e))
 
 
+class RunWalkForwardTool(BaseTool):
+    """运行走步回测工具"""
+
+    category = "mutation"
+    execution_mode = ExecutionMode.COMPUTE  # CPU 密集型任务，窗口计算复用 BacktestRunner 线程池
+    page_results = True  # 逐窗口的回测指标
+
+    @property
+    def name(self) -> str:
+        return "run_walk_forward"
+
+    @property
+    def description(self) -> str:
+        return """运行走步（滚动窗口）回测。
+
+在完整区间上只回测一次（数据加载、因子计算和选币只做一次），
+再从完整资金曲线切分出各窗口并行计算绩效指标，返回逐窗口指标表。
+
+窗口可通过 window/step 自动生成（如 12 个月度窗口: window="1M"），
+也可通过 windows 显式指定。start_date 早于首个窗口时，之前的部分作为因子预热期。"""
+
+    @property
+    def input_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type": "string",
+                    "description": "策略名称",
+                },
+                "strategy_list": STRATEGY_LIST_SCHEMA,
+                "start_date": {
+                    "type": "string",
+                    "description": "完整区间开始日期 (YYYY-MM-DD)",
+                },
+                "end_date": {
+                    "type": "string",
+                    "description": "完整区间结束日期 (YYYY-MM-DD)",
+                },
+                "window": {
+                    "type": "string",
+                    "description": "窗口长度，数字+单位(D=天, W=周, M=月)，如 \"30D\", \"1M\"",
+                    "default": "1M",
+                },
+                "step": {
+                    "type": "string",
+                    "description": "滚动步长，格式同 window，默认等于窗口长度（窗口不重叠）",
+                },
+                "windows": {
+                    "type": "array",
+                    "description": "显式指定窗口列表 [[开始日期, 结束日期], ...]，指定后忽略 window/step",
+                    "items": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                    },
+                },
+                "leverage": {
+                    "type": "number",
+                    "description": "杠杆倍数，仅合约交易有效",
+                    "default": 1,
+                },
+            },
+            "required": ["name", "strategy_list"],
+        }
+
+    async def execute(
+        self,
+        name: str,
+        strategy_list: list,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        window: str = "1M",
+        step: Optional[str] = None,
+        windows: Optional[list] = None,
+        leverage: float = 1.0,
+    ) -> ToolResult:
+        try:
+            from domains.strategy_hub.services.backtest_runner import BacktestRequest
+            from domains.strategy_hub.services.walk_forward import (
+                WalkForwardRequest,
+                get_walk_forward_service,
+            )
+
+            request = WalkForwardRequest(
+                base=BacktestRequest(
+                    name=name,
+                    strategy_list=strategy_list,
+                    start_date=start_date,
+                    end_date=end_date,
+                    leverage=leverage,
+                ),
+                windows=[tuple(w) for w in windows] if windows else None,
+                window=window,
+                step=step,
+            )
+
+            result = await get_walk_forward_service().run_async(request)
+            if result.status == "failed":
+                return ToolResult.fail(result.error or "走步回测失败")
+
+            return ToolResult.ok(result.to_dict())
+        except Exception as e:
+            logger.exception("走步回测执行失败")
+            return ToolResult.fail(str(e))
@@ -39,6 +39,14 @@ from .coin_similarity import (
     get_coin_similarity_service,
     reset_coin_similarity_service,
 )
+from .walk_forward import (
+    WalkForwardRequest,
+    WalkForwardResult,
+    WalkForwardService,
+    generate_windows,
+    get_walk_forward_service,
+    reset_walk_forward_service,
+)
 from .equity_correlation import (
     EquityCorrelationService,
     EquityCorrelationResult,
@@ -92,4 +100,11 @@ __all__ = [
     'EquityCorrelationResult',
     'get_equity_correlation_service',
     'reset_equity_correlation_service',
+    # 走步回测
+    'WalkForwardRequest',
+    'WalkForwardResult',
+    'WalkForwardService',
+    'generate_windows',
+    'get_walk_forward_service',
+    'reset_walk_forward_service',
 ]
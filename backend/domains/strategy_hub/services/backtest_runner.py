@@ -14,7 +14,7 @@ import json
 import logging
 import threading
 import re
-from concurrent.futures import ThreadPoolExecutor, Future
+from concurrent.futures import Future
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Tuple
@@ -25,6 +25,7 @@ from .strategy_store import StrategyStore, get_strategy_store
 from .cache_isolation import isolated_cache, cleanup_task_cache
 from .task_store import BacktestTaskStore, get_task_store
 from domains.mcp_core.paths import get_data_dir, setup_factor_paths
+from domains.mcp_core.queue.scheduler import JobPriority, get_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -99,6 +100,10 @@ class BacktestRequest:
     # 任务执行记录关联（用于任务管理系统）
     execution_id: Optional[str] = None  # 关联的执行记录ID
 
+    # 调度（不影响回测结果）
+    priority: Optional[JobPriority] = None  # 调度优先级，默认取当前请求上下文
+    client_id: Optional[str] = None  # 提交方标识，用于公平份额，默认取当前请求上下文
+
     def get_factor_list(self) -> List[str]:
         """从策略配置中提取因子列表"""
         factors = []
@@ -134,9 +139,12 @@ class BacktestRunner:
     回测执行器
 
     封装回测引擎调用，提供任务隔离和生命周期管理。
-    支持异步执行和任务状态跟踪。
+    支持异步执行和任务状态跟踪。任务通过全局作业调度器准入执行，
+    与其他执行器共享 CPU 槽位，max_workers 作为 backtest 分组的并发上限。
     """
 
+    SCHEDULER_GROUP = "backtest"
+
     def __init__(
         self,
         store: Optional[StrategyStore] = None,
@@ -160,7 +168,8 @@ class BacktestRunner:
         self.tasks_dir = get_data_dir() / "tasks"
         self.tasks_dir.mkdir(parents=True, exist_ok=True)
 
-        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._scheduler = get_scheduler()
+        self._scheduler.set_group_limit(self.SCHEDULER_GROUP, max_workers)
         self._running_tasks: Dict[str, TaskInfo] = {}
         self._futures: Dict[str, Future] = {}
         self._lock = threading.Lock()
@@ -343,11 +352,15 @@ class BacktestRunner:
                 "min_kline_num": request.min_kline_num,
             }, f, ensure_ascii=False, indent=2)
 
-        # 提交异步执行
-        future = self._executor.submit(
+        # 提交到调度器排队执行
+        future = self._scheduler.submit(
             self._run_backtest,
             task_id,
             request,
+            group=self.SCHEDULER_GROUP,
+            priority=request.priority,
+            client_id=request.client_id,
+            name=f"backtest:{request.name}",
         )
 
         # 注册任务（在锁内同时注册 task_info 和 future，避免竞态条件）
@@ -384,10 +397,9 @@ class BacktestRunner:
         if future is None:
             raise RuntimeError(f"任务提交失败: {task_id}")
 
-        # 在事件循环中非阻塞等待线程池任务完成
-        loop = asyncio.get_event_loop()
+        # 在事件循环中非阻塞等待调度器任务完成（排队期间不占用线程）
         try:
-            await loop.run_in_executor(None, future.result)
+            await asyncio.wrap_future(future)
         except Exception as e:
             # 获取任务状态以获取详细错误信息
             task_info = self.get_status(task_id)
@@ -413,7 +425,12 @@ class BacktestRunner:
         """
         with self._lock:
             if task_id in self._running_tasks:
-                return self._running_tasks[task_id]
+                task_info = self._running_tasks[task_id]
+                if task_info.status == TaskStatus.PENDING:
+                    task_info.queue_position = self.get_queue_position(task_id)
+                else:
+                    task_info.queue_position = None
+                return task_info
 
         # 从数据库查询
         strategy = self.store.get(task_id)
@@ -451,12 +468,13 @@ class BacktestRunner:
         cancelled = False
 
         with self._lock:
-            if task_id in self._futures:
-                future = self._futures[task_id]
-                if future.cancel():
-                    self._update_task_status(task_id, TaskStatus.CANCELLED)
-                    logger.info(f"取消任务: {task_id}")
-                    cancelled = True
+            future = self._futures.get(task_id)
+
+        # 排队中的任务可直接从调度器移除（_update_task_status 内部会获取锁）
+        if future is not None and future.cancel():
+            self._update_task_status(task_id, TaskStatus.CANCELLED)
+            logger.info(f"取消任务: {task_id}")
+            cancelled = True
 
         # 如果任务不在内存中（后端重启的情况），直接清理数据库记录
         if not cancelled:
@@ -486,11 +504,42 @@ class BacktestRunner:
 
         return cleanup_task_cache(task_id, self.tasks_dir)
 
+    def get_queue_position(self, task_id: str) -> Optional[int]:
+        """
+        获取任务在调度器中的排队位置
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            排队位置（0 表示下一个执行），已开始或不存在时返回 None
+        """
+        future = self._futures.get(task_id)
+        if future is None:
+            return None
+        return self._scheduler.get_position(future.job_id)
+
     def list_running_tasks(self) -> List[TaskInfo]:
         """列出正在运行的任务"""
         with self._lock:
             return list(self._running_tasks.values())
 
+    def submit_compute(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        通过调度器在 backtest 分组中执行计算任务
+
+        供走步回测等批量作业复用回测并发上限，优先级和客户端取当前上下文。
+
+        Args:
+            fn: 计算函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            Future 对象
+        """
+        return self._scheduler.submit(fn, *args, group=self.SCHEDULER_GROUP, **kwargs)
+
     def _run_backtest(self, task_id: str, request: BacktestRequest):
         """
         执行回测
@@ -544,44 +593,11 @@ class BacktestRunner:
             _setup_backtest_engine_paths()
 
             # 动态导入回测引擎（使用 engine 模块）
-            from domains.engine.core.model.backtest_config import BacktestConfig
             from domains.engine.core.backtest import run_backtest
 
             logger.info(f"任务 {task_id}: 开始构建回测配置")
 
-            # 构建回测配置 - 完整暴露 config/backtest_config.py 的配置能力
-            conf = BacktestConfig(
-                name=request.name,
-                # 时间配置
-                start_date=request.start_date or '2024-01-01',
-                end_date=request.end_date or '2024-12-31',
-                # 账户配置
-                account_type=request.account_type,
-                initial_usdt=request.initial_usdt,
-                leverage=request.leverage,
-                margin_rate=request.margin_rate,
-                # 手续费
-                swap_c_rate=request.swap_c_rate,
-                spot_c_rate=request.spot_c_rate,
-                # 最小下单量
-                swap_min_order_limit=request.swap_min_order_limit,
-                spot_min_order_limit=request.spot_min_order_limit,
-                # 价格计算
-                avg_price_col=request.avg_price_col,
-                # 币种过滤
-                min_kline_num=request.min_kline_num,
-                black_list=request.black_list,
-                white_list=request.white_list,
-            )
-
-            # 转换策略配置格式 (MCP 格式 -> 引擎格式)
-            engine_strategy_list = self._convert_strategy_list(request.strategy_list)
-
-            # 加载策略配置
-            conf.load_strategy_config(engine_strategy_list)
-            # iter_round = 0 表示单次回测，结果存到 backtest_path (回测结果)
-            # iter_round != 0 表示参数遍历，结果存到 backtest_iter_path (遍历结果)
-            # 这里是单次回测，保持默认值 0
+            conf = self.build_backtest_config(request)
 
             logger.info(f"任务 {task_id}: 配置构建完成，开始执行回测")
 
@@ -600,6 +616,55 @@ class BacktestRunner:
             logger.error(f"任务 {task_id}: 回测执行失败: {e}")
             raise
 
+    def build_backtest_config(self, request: BacktestRequest):
+        """
+        根据回测请求构建引擎配置
+
+        Args:
+            request: 回测请求
+
+        Returns:
+            已加载策略配置的 BacktestConfig 对象
+        """
+        _setup_backtest_engine_paths()
+        from domains.engine.core.model.backtest_config import BacktestConfig
+
+        # 构建回测配置 - 完整暴露 config/backtest_config.py 的配置能力
+        conf = BacktestConfig(
+            name=request.name,
+            # 时间配置
+            start_date=request.start_date or '2024-01-01',
+            end_date=request.end_date or '2024-12-31',
+            # 账户配置
+            account_type=request.account_type,
+            initial_usdt=request.initial_usdt,
+            leverage=request.leverage,
+            margin_rate=request.margin_rate,
+            # 手续费
+            swap_c_rate=request.swap_c_rate,
+            spot_c_rate=request.spot_c_rate,
+            # 最小下单量
+            swap_min_order_limit=request.swap_min_order_limit,
+            spot_min_order_limit=request.spot_min_order_limit,
+            # 价格计算
+            avg_price_col=request.avg_price_col,
+            # 币种过滤
+            min_kline_num=request.min_kline_num,
+            black_list=request.black_list,
+            white_list=request.white_list,
+        )
+
+        # 转换策略配置格式 (MCP 格式 -> 引擎格式)
+        engine_strategy_list = self._convert_strategy_list(request.strategy_list)
+
+        # 加载策略配置
+        conf.load_strategy_config(engine_strategy_list)
+        # iter_round = 0 表示单次回测，结果存到 backtest_path (回测结果)
+        # iter_round != 0 表示参数遍历，结果存到 backtest_iter_path (遍历结果)
+        # 这里是单次回测，保持默认值 0
+
+        return conf
+
     def _execute_mock_backtest(
         self,
         task_id: str,
@@ -1070,8 +1135,19 @@ class BacktestRunner:
         return engine_list
 
     def shutdown(self, wait: bool = True):
-        """关闭执行器"""
-        self._executor.shutdown(wait=wait)
+        """关闭执行器（取消排队中的任务，调度器为全局共享，不随之关闭）"""
+        with self._lock:
+            futures = list(self._futures.items())
+        for task_id, future in futures:
+            if future.cancel():
+                self._update_task_status(task_id, TaskStatus.CANCELLED)
+        if wait:
+            for _, future in futures:
+                if not future.cancelled():
+                    try:
+                        future.result()
+                    except Exception:
+                        pass
         logger.info("BacktestRunner 已关闭")
 
 
@@ -258,6 +258,7 @@ class TaskInfo:
     completed_at: Optional[datetime] = None
     error_message: Optional[str] = None
     progress: float = 0.0
+    queue_position: Optional[int] = None  # 调度器排队位置，运行后为 None
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -268,6 +269,7 @@ class TaskInfo:
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
             "error_message": self.error_message,
             "progress": self.progress,
+            "queue_position": self.queue_position,
         }
 
 
@@ -0,0 +1,415 @@
+"""
+走步回测服务
+
+对同一策略的多个滚动窗口进行批量评估。
+
+与逐窗口提交 BacktestRequest 不同，走步回测只在完整区间上执行一次
+回测引擎（数据加载、因子计算、选币均只做一次），再从共享的完整资金
+曲线中切分出各窗口，按窗口独立归一化后计算绩效指标。窗口评估任务提交
+到 BacktestRunner 的线程池中并行执行。
+
+说明:
+- 窗口起点的持仓沿用完整区间回测的状态，而不是空仓开始，
+  这与实盘滚动样本外评估的口径一致
+- 完整区间起点早于首个窗口时，之前的部分仅作为因子预热期
+"""
+
+import asyncio
+import dataclasses
+import logging
+import re
+import shutil
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .backtest_runner import BacktestRequest, BacktestRunner, get_backtest_runner
+from .cache_isolation import isolated_cache
+
+logger = logging.getLogger(__name__)
+
+# 窗口长度格式: 数字 + 单位 (D=天, W=周, M=月)，如 "30D", "2W", "1M"
+_PERIOD_PATTERN = re.compile(r"^(\d+)\s*([DWM])$", re.IGNORECASE)
+
+# 资金曲线列名（与回测引擎输出的 资金曲线.csv 一致）
+TIME_COL = "candle_begin_time"
+EQUITY_COL = "净值"
+
+
+@dataclass
+class WalkForwardRequest:
+    """走步回测请求"""
+    base: BacktestRequest  # 基础回测请求（策略配置、账户、手续费等）
+
+    # 窗口配置: 显式指定 windows 时忽略 window/step
+    windows: Optional[List[Tuple[str, str]]] = None  # [(开始日期, 结束日期)]，日期均包含
+    window: str = "1M"  # 窗口长度
+    step: Optional[str] = None  # 滚动步长，默认等于窗口长度（不重叠）
+
+
+@dataclass
+class WalkForwardResult:
+    """走步回测结果"""
+    job_id: str
+    name: str
+    status: str = "pending"
+    full_start_date: Optional[str] = None
+    full_end_date: Optional[str] = None
+    windows: List[Dict[str, Any]] = field(default_factory=list)  # 每个窗口一行指标
+    error: Optional[str] = None
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """窗口指标表"""
+        return pd.DataFrame(self.windows)
+
+    def get_summary(self) -> Dict[str, Any]:
+        """跨窗口汇总统计"""
+        df = self.to_dataframe()
+        if df.empty or "annual_return" not in df.columns:
+            return {"window_count": len(df)}
+        valid = df.dropna(subset=["annual_return"])
+        return {
+            "window_count": len(df),
+            "valid_window_count": len(valid),
+            "positive_window_ratio": float((valid["cumulative_return"] > 1).mean()) if len(valid) else 0.0,
+            "mean_annual_return": float(valid["annual_return"].mean()) if len(valid) else 0.0,
+            "median_annual_return": float(valid["annual_return"].median()) if len(valid) else 0.0,
+            "worst_max_drawdown": float(valid["max_drawdown"].min()) if len(valid) else 0.0,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            "job_id": self.job_id,
+            "name": self.name,
+            "status": self.status,
+            "full_start_date": self.full_start_date,
+            "full_end_date": self.full_end_date,
+            "summary": self.get_summary(),
+            "windows": self.windows,
+            "error": self.error,
+        }
+
+
+def _parse_period(period: str) -> pd.DateOffset:
+    """解析窗口长度字符串为 DateOffset"""
+    match = _PERIOD_PATTERN.match(period.strip())
+    if not match:
+        raise ValueError(f"无效的窗口长度: {period}，格式应为数字+单位(D/W/M)，如 30D、1M")
+    n, unit = int(match.group(1)), match.group(2).upper()
+    if n <= 0:
+        raise ValueError(f"窗口长度必须为正数: {period}")
+    if unit == "D":
+        return pd.DateOffset(days=n)
+    if unit == "W":
+        return pd.DateOffset(weeks=n)
+    return pd.DateOffset(months=n)
+
+
+def generate_windows(
+    start_date: str,
+    end_date: str,
+    window: str = "1M",
+    step: Optional[str] = None,
+) -> List[Tuple[str, str]]:
+    """
+    生成滚动窗口
+
+    Args:
+        start_date: 开始日期
+        end_date: 结束日期（包含）
+        window: 窗口长度，如 "30D"、"1M"
+        step: 滚动步长，默认等于窗口长度
+
+    Returns:
+        [(窗口开始日期, 窗口结束日期)] 列表，日期均包含；最后一个窗口截断到 end_date
+    """
+    window_offset = _parse_period(window)
+    step_offset = _parse_period(step) if step else window_offset
+
+    start = pd.Timestamp(start_date).normalize()
+    end = pd.Timestamp(end_date).normalize()
+    if start > end:
+        raise ValueError(f"开始日期晚于结束日期: {start_date} > {end_date}")
+
+    windows = []
+    cursor = start
+    while cursor <= end:
+        window_end = min(cursor + window_offset - pd.Timedelta(days=1), end)
+        windows.append((cursor.strftime("%Y-%m-%d"), window_end.strftime("%Y-%m-%d")))
+        cursor = cursor + step_offset
+    return windows
+
+
+def _max_consecutive(mask: np.ndarray) -> int:
+    """布尔序列中最长连续 True 的长度"""
+    if not mask.any():
+        return 0
+    # 在首尾补 False 后，差分为 +1 的位置是连续段起点，-1 是终点
+    padded = np.concatenate(([0], mask.astype(np.int8), [0]))
+    diff = np.diff(padded)
+    starts = np.flatnonzero(diff == 1)
+    ends = np.flatnonzero(diff == -1)
+    return int((ends - starts).max())
+
+
+def calc_window_metrics(
+    equity_df: pd.DataFrame,
+    start_date: str,
+    end_date: str,
+) -> Dict[str, Any]:
+    """
+    从完整资金曲线中切分窗口并计算绩效指标
+
+    窗口净值以窗口开始前最后一根K线的净值为基准归一化，
+    指标口径与回测引擎的策略评价一致（sharpe_ratio 为年化收益/回撤比）。
+
+    Args:
+        equity_df: 完整资金曲线，需包含 candle_begin_time 和 净值 列，按时间升序
+        start_date: 窗口开始日期（包含）
+        end_date: 窗口结束日期（包含）
+
+    Returns:
+        窗口指标字典
+    """
+    row: Dict[str, Any] = {"start_date": start_date, "end_date": end_date}
+
+    times = equity_df[TIME_COL]
+    start = pd.Timestamp(start_date)
+    stop = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+    start_idx = int(times.searchsorted(start, side="left"))
+    stop_idx = int(times.searchsorted(stop, side="left"))
+
+    row["periods"] = stop_idx - start_idx
+    if stop_idx <= start_idx:
+        row["error"] = "窗口内无资金曲线数据"
+        return row
+
+    equity = equity_df[EQUITY_COL].to_numpy(dtype=float)
+    time_values = times.to_numpy()
+
+    # 基准: 窗口前一根K线的净值；窗口从曲线起点开始时使用首根K线
+    base_idx = start_idx - 1 if start_idx > 0 else start_idx
+    base = equity[base_idx]
+    if not np.isfinite(base) or base <= 0:
+        row["error"] = "窗口基准净值无效"
+        return row
+
+    nav = equity[start_idx:stop_idx] / base
+    window_times = time_values[start_idx:stop_idx]
+    prev_nav = np.concatenate(([1.0], nav[:-1]))
+    returns = nav / prev_nav - 1
+    if start_idx == 0:
+        # 无前置K线时首根的收益不可得
+        returns = returns[1:]
+
+    # 年化收益
+    span_days = (window_times[-1] - time_values[base_idx]) / np.timedelta64(1, "D")
+    cumulative = float(nav[-1])
+    annual = cumulative ** (365 / span_days) - 1 if span_days > 0 and cumulative > 0 else 0.0
+
+    # 最大回撤（包含基准点 1.0）
+    nav_with_base = np.concatenate(([1.0], nav))
+    running_max = np.maximum.accumulate(nav_with_base)
+    drawdown = nav_with_base / running_max - 1
+    trough = int(drawdown.argmin())
+    max_drawdown = float(drawdown[trough])
+    peak = int(nav_with_base[: trough + 1].argmax())
+    all_times = np.concatenate(([time_values[base_idx]], window_times))
+
+    wins = returns > 0
+    losses = returns < 0
+    win_periods = int(wins.sum())
+    loss_periods = int(losses.sum())
+    avg_win = float(returns[wins].mean()) if win_periods else 0.0
+    avg_loss = float(returns[losses].mean()) if loss_periods else 0.0
+
+    row.update({
+        "cumulative_return": round(cumulative, 6),
+        "annual_return": round(float(annual), 6),
+        "max_drawdown": round(max_drawdown, 6),
+        "max_drawdown_start": str(pd.Timestamp(all_times[peak])) if max_drawdown < 0 else None,
+        "max_drawdown_end": str(pd.Timestamp(all_times[trough])) if max_drawdown < 0 else None,
+        "sharpe_ratio": round(float(annual) / abs(max_drawdown), 4) if max_drawdown < 0 else 0.0,
+        "win_periods": win_periods,
+        "loss_periods": loss_periods,
+        "win_rate": round(win_periods / (win_periods + loss_periods), 6) if win_periods + loss_periods else 0.0,
+        "avg_return_per_period": round(float(returns.mean()), 8) if len(returns) else 0.0,
+        "profit_loss_ratio": round(avg_win / abs(avg_loss), 4) if avg_loss < 0 else 0.0,
+        "max_single_profit": round(float(returns.max()), 6) if len(returns) else 0.0,
+        "max_single_loss": round(float(returns.min()), 6) if len(returns) else 0.0,
+        "max_consecutive_wins": _max_consecutive(wins),
+        "max_consecutive_losses": _max_consecutive(losses),
+        "return_std": round(float(returns.std(ddof=1)), 8) if len(returns) > 1 else 0.0,
+    })
+    return row
+
+
+def _remove_result_folder(folder: Path) -> None:
+    """删除作业专属的引擎结果目录（目录名带作业ID，不影响其他回测）"""
+    if not folder.exists():
+        return
+    try:
+        shutil.rmtree(folder)
+        logger.info(f"清理走步回测结果目录: {folder}")
+    except Exception as e:
+        logger.warning(f"清理走步回测结果目录失败: {e}")
+
+
+class WalkForwardService:
+    """
+    走步回测服务
+
+    完整区间只回测一次，各窗口指标由共享资金曲线并行计算。
+    """
+
+    def __init__(self, runner: Optional[BacktestRunner] = None):
+        """
+        初始化服务
+
+        Args:
+            runner: 回测执行器，窗口计算复用其线程池
+        """
+        self.runner = runner or get_backtest_runner()
+
+    @staticmethod
+    def resolve_windows(request: WalkForwardRequest) -> List[Tuple[str, str]]:
+        """解析请求中的窗口列表"""
+        if request.windows:
+            windows = sorted((str(s), str(e)) for s, e in request.windows)
+            for start, end in windows:
+                if pd.Timestamp(start) > pd.Timestamp(end):
+                    raise ValueError(f"窗口开始日期晚于结束日期: {start} > {end}")
+            return windows
+
+        base = request.base
+        if not base.start_date or not base.end_date:
+            raise ValueError("未指定 windows 时必须提供 start_date 和 end_date")
+        return generate_windows(base.start_date, base.end_date, request.window, request.step)
+
+    def run(self, request: WalkForwardRequest) -> WalkForwardResult:
+        """
+        执行走步回测（阻塞）
+
+        Args:
+            request: 走步回测请求
+
+        Returns:
+            走步回测结果
+        """
+        job_id = str(uuid.uuid4())
+        result = WalkForwardResult(job_id=job_id, name=request.base.name)
+
+        try:
+            windows = self.resolve_windows(request)
+            if not windows:
+                raise ValueError("没有可评估的窗口")
+
+            # 完整区间覆盖所有窗口（显式窗口可能重叠，结束日期取最大值）；
+            # 基础请求的开始日期更早时保留为预热期
+            full_start = min(
+                filter(None, [request.base.start_date, *(start for start, _ in windows)]), key=pd.Timestamp
+            )
+            full_end = max(
+                filter(None, [request.base.end_date, *(end for _, end in windows)]), key=pd.Timestamp
+            )
+            result.full_start_date = full_start
+            result.full_end_date = full_end
+            result.status = "running"
+
+            # 结果目录名带作业ID，同一策略的并发或重复作业互不覆盖
+            full_request = dataclasses.replace(
+                request.base,
+                name=f"{request.base.name}_walk_forward_{job_id}",
+                start_date=full_start,
+                end_date=full_end,
+                execution_id=None,
+            )
+
+            logger.info(
+                f"走步回测 {job_id}: {request.base.name}, 完整区间 {full_start} ~ {full_end}, "
+                f"{len(windows)} 个窗口"
+            )
+
+            equity_df = self.runner.submit_compute(
+                self._run_full_range, job_id, full_request
+            ).result()
+
+            futures = [
+                self.runner.submit_compute(calc_window_metrics, equity_df, start, end)
+                for start, end in windows
+            ]
+            for (start, end), future in zip(windows, futures):
+                try:
+                    result.windows.append(future.result())
+                except Exception as e:
+                    logger.warning(f"走步回测 {job_id}: 窗口 {start} ~ {end} 计算失败: {e}")
+                    result.windows.append({"start_date": start, "end_date": end, "error": str(e)})
+
+            result.status = "completed"
+            logger.info(f"走步回测完成: {job_id}")
+
+        except Exception as e:
+            logger.exception(f"走步回测失败: {job_id}")
+            result.status = "failed"
+            result.error = str(e)
+
+        return result
+
+    async def run_async(self, request: WalkForwardRequest) -> WalkForwardResult:
+        """在线程中执行走步回测，避免阻塞事件循环"""
+        return await asyncio.to_thread(self.run, request)
+
+    def _run_full_range(self, job_id: str, request: BacktestRequest) -> pd.DataFrame:
+        """
+        在完整区间上执行一次回测，返回完整（未采样的）资金曲线
+
+        资金曲线读入内存后删除本作业的引擎结果目录，窗口指标只依赖返回的 DataFrame。
+
+        Args:
+            job_id: 作业ID（用于缓存隔离）
+            request: 完整区间回测请求
+
+        Returns:
+            按时间升序的资金曲线 DataFrame
+        """
+        from domains.engine.core.backtest import run_backtest
+
+        with isolated_cache(job_id, self.runner.tasks_dir, cleanup_on_exit=True):
+            conf = self.runner.build_backtest_config(request)
+            try:
+                run_backtest(conf)
+
+                equity_file = conf.get_result_folder() / "资金曲线.csv"
+                if not equity_file.exists():
+                    raise RuntimeError(f"回测未生成资金曲线: {equity_file}")
+                equity_df = pd.read_csv(
+                    equity_file, encoding="utf-8-sig", usecols=[TIME_COL, EQUITY_COL]
+                )
+            finally:
+                _remove_result_folder(conf.get_result_folder())
+
+        equity_df[TIME_COL] = pd.to_datetime(equity_df[TIME_COL])
+        return equity_df.sort_values(TIME_COL).reset_index(drop=True)
+
+
+# 单例模式
+_walk_forward_service: Optional[WalkForwardService] = None
+
+
+def get_walk_forward_service() -> WalkForwardService:
+    """获取走步回测服务单例"""
+    global _walk_forward_service
+    if _walk_forward_service is None:
+        _walk_forward_service = WalkForwardService()
+    return _walk_forward_service
+
+
+def reset_walk_forward_service() -> None:
+    """重置服务单例"""
+    global _walk_forward_service
+    _walk_forward_service = None
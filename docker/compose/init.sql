@@ -4,6 +4,42 @@
 -- 启用 pgvector 扩展（向量检索）
 CREATE EXTENSION IF NOT EXISTS vector;
 
+-- 启用 pg_trgm 扩展（子串匹配、相似度）
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- 全文检索切分函数：中文输出单字 + 二元组（查询模式只输出二元组），英文按单词切分
+-- 与 backend/domains/mcp_core/database/search.py 中的 segment_text 保持一致
+CREATE OR REPLACE FUNCTION search_segment(src TEXT, for_query BOOLEAN DEFAULT FALSE)
+RETURNS TEXT AS $$
+DECLARE
+    token TEXT;
+    tokens TEXT[] := ARRAY[]::TEXT[];
+    n INTEGER;
+BEGIN
+    IF src IS NULL OR src = '' THEN
+        RETURN '';
+    END IF;
+    FOR token IN
+        SELECT m[1] FROM regexp_matches(lower(src), '([㐀-鿿]+|[a-z0-9]+)', 'g') AS m
+    LOOP
+        n := char_length(token);
+        IF token ~ '^[a-z0-9]' OR n = 1 THEN
+            tokens := tokens || token;
+        ELSE
+            IF NOT for_query THEN
+                FOR i IN 1..n LOOP
+                    tokens := tokens || substr(token, i, 1);
+                END LOOP;
+            END IF;
+            FOR i IN 1..n - 1 LOOP
+                tokens := tokens || substr(token, i, 2);
+            END LOOP;
+        END IF;
+    END LOOP;
+    RETURN array_to_string(tokens, ' ');
+END;
+$$ LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE;
+
 -- 因子表
 CREATE TABLE IF NOT EXISTS factors (
     id SERIAL PRIMARY KEY,
@@ -22,6 +58,7 @@ CREATE TABLE IF NOT EXISTS factors (
     -- 代码相关
     code_path TEXT DEFAULT '',
     code_content TEXT DEFAULT '',
+    code_hash VARCHAR(64) DEFAULT '',  -- 代码指纹（规范化 AST 的 SHA-256）
     code_complexity FLOAT,
 
     -- 评分和验证
@@ -66,14 +103,26 @@ CREATE INDEX IF NOT EXISTS idx_factors_uuid ON factors(uuid);
 CREATE INDEX IF NOT EXISTS idx_factors_factor_type ON factors(factor_type);
 CREATE INDEX IF NOT EXISTS idx_factors_excluded ON factors(excluded);
 CREATE INDEX IF NOT EXISTS idx_factors_tags ON factors(tags);
+CREATE INDEX IF NOT EXISTS idx_factors_code_hash ON factors(code_hash);
 
 -- 向量索引（HNSW 算法，用于近似最近邻搜索）
 CREATE INDEX IF NOT EXISTS idx_factors_embedding ON factors
 USING hnsw (embedding vector_cosine_ops);
 
--- 全文搜索索引
-CREATE INDEX IF NOT EXISTS idx_factors_search ON factors
-USING GIN(to_tsvector('simple', coalesce(filename, '') || ' ' || coalesce(description, '') || ' ' || coalesce(analysis, '')));
+-- 全文搜索（tsvector 生成列，写入时自动维护）
+ALTER TABLE factors ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((filename)::text, ''))), 'A') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((description)::text, ''))), 'B') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((formula)::text, ''))), 'B') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((style)::text, ''))), 'C') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((tags)::text, ''))), 'C') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((analysis)::text, ''))), 'D')
+) STORED;
+CREATE INDEX IF NOT EXISTS idx_factors_search_vector ON factors USING GIN (search_vector);
+
+-- 子串匹配索引（ILIKE '%kw%'）
+CREATE INDEX IF NOT EXISTS idx_factors_filename_trgm ON factors USING GIN (filename gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_factors_style_trgm ON factors USING GIN (style gin_trgm_ops);
 
 -- 回测结果表
 CREATE TABLE IF NOT EXISTS backtest_results (
@@ -177,9 +226,19 @@ CREATE INDEX IF NOT EXISTS idx_notes_is_archived ON notes(is_archived);
 CREATE INDEX IF NOT EXISTS idx_notes_promoted ON notes(promoted_to_experience_id) WHERE promoted_to_experience_id IS NOT NULL;
 CREATE INDEX IF NOT EXISTS idx_notes_type_archived ON notes(note_type, is_archived);
 
--- 笔记全文搜索索引
-CREATE INDEX IF NOT EXISTS idx_notes_search ON notes
-USING GIN(to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(content, '')));
+-- 笔记全文搜索（tsvector 生成列，写入时自动维护）
+ALTER TABLE notes ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((title)::text, ''))), 'A') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((content)::text, ''))), 'B') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((tags)::text, ''))), 'C')
+) STORED;
+CREATE INDEX IF NOT EXISTS idx_notes_search_vector ON notes USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_notes_title_trgm ON notes USING GIN (title gin_trgm_ops);
+
+-- 笔记向量（后台生成；维度须与 EMBEDDING_DIM 一致，默认 512）
+ALTER TABLE notes ADD COLUMN IF NOT EXISTS embedding vector(512);
+ALTER TABLE notes ADD COLUMN IF NOT EXISTS embedding_model VARCHAR(100);
+CREATE INDEX IF NOT EXISTS idx_notes_embedding ON notes USING hnsw (embedding vector_cosine_ops);
 
 -- 笔记更新时间触发器
 CREATE TRIGGER update_notes_updated_at
@@ -246,9 +305,12 @@ INSERT INTO log_topics (name, display_name, description, field_schema, retention
 ON CONFLICT (name) DO NOTHING;
 
 -- 日志条目表（使用 JSONB 存储灵活的日志数据）
+-- 按天范围分区（UTC），日分区 logs_pYYYYMMDD 由 LogStore 后台任务预建、按保留期整表删除
+-- （见 backend/domains/mcp_core/logging/partitions.py），logs_default 接收没有日分区的数据
+CREATE SEQUENCE IF NOT EXISTS logs_id_seq;
 CREATE TABLE IF NOT EXISTS logs (
-    id BIGSERIAL PRIMARY KEY,
-    -- 时间戳（纳秒精度）
+    id BIGINT NOT NULL DEFAULT nextval('logs_id_seq'),
+    -- 时间戳（分区键）
     timestamp TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
     -- 关联的主题
     topic_id INTEGER NOT NULL REFERENCES log_topics(id) ON DELETE CASCADE,
@@ -265,10 +327,16 @@ CREATE TABLE IF NOT EXISTS logs (
     -- 扩展数据（JSONB 格式，包含所有额外字段）
     data JSONB DEFAULT '{}',
     -- 原始日志行（可选，用于调试）
-    raw_line TEXT DEFAULT ''
-);
+    raw_line TEXT DEFAULT '',
+    -- 分区表的主键必须包含分区键
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+ALTER SEQUENCE logs_id_seq OWNED BY logs.id;
+
+-- 默认分区
+CREATE TABLE IF NOT EXISTS logs_default PARTITION OF logs DEFAULT;
 
--- 日志表索引
+-- 日志表索引（在父表上创建，自动应用到所有分区）
 -- 时间范围查询（最常用）
 CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs(timestamp DESC);
 -- 按主题+时间查询
@@ -283,10 +351,43 @@ CREATE INDEX IF NOT EXISTS idx_logs_trace_id ON logs(trace_id) WHERE trace_id !=
 CREATE INDEX IF NOT EXISTS idx_logs_data ON logs USING GIN(data jsonb_path_ops);
 -- 全文搜索索引
 CREATE INDEX IF NOT EXISTS idx_logs_message_search ON logs USING GIN(to_tsvector('simple', message));
+-- 常用 JSONB 字段表达式索引（工具名、模型、状态）
+CREATE INDEX IF NOT EXISTS idx_logs_tool_name ON logs((data->>'tool_name'), timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_logs_model ON logs((data->>'model'), timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_logs_status ON logs((data->>'status'), timestamp DESC);
+
+-- 日志分钟级预聚合（计数、错误数、耗时分位数、token 合计），由 LogStore 后台任务增量维护
+CREATE TABLE IF NOT EXISTS log_rollups (
+    bucket TIMESTAMPTZ NOT NULL,
+    topic_id INTEGER NOT NULL,
+    level VARCHAR(10) NOT NULL,
+    service VARCHAR(100) NOT NULL,
+    tool_name VARCHAR(200) NOT NULL DEFAULT '',
+    model VARCHAR(200) NOT NULL DEFAULT '',
+    status VARCHAR(20) NOT NULL DEFAULT '',
+    count BIGINT NOT NULL DEFAULT 0,
+    error_count BIGINT NOT NULL DEFAULT 0,
+    first_at TIMESTAMPTZ,
+    last_at TIMESTAMPTZ,
+    duration_count BIGINT NOT NULL DEFAULT 0,
+    duration_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    duration_p50 DOUBLE PRECISION,
+    duration_p95 DOUBLE PRECISION,
+    duration_p99 DOUBLE PRECISION,
+    duration_max DOUBLE PRECISION,
+    input_tokens BIGINT NOT NULL DEFAULT 0,
+    output_tokens BIGINT NOT NULL DEFAULT 0,
+    total_tokens BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, topic_id, level, service, tool_name, model, status)
+);
+CREATE INDEX IF NOT EXISTS idx_log_rollups_topic_bucket ON log_rollups(topic_id, bucket);
 
--- 分区表（按月分区，提高查询性能和数据清理效率）
--- 注意：PostgreSQL 12+ 支持声明式分区
--- 如果需要分区，可以将 logs 表改为分区表
+-- 预聚合进度：[start_at, watermark) 已聚合
+CREATE TABLE IF NOT EXISTS log_rollup_state (
+    id INTEGER PRIMARY KEY DEFAULT 1,
+    start_at TIMESTAMPTZ NOT NULL,
+    watermark TIMESTAMPTZ NOT NULL
+);
 
 -- 日志清理函数
 CREATE OR REPLACE FUNCTION cleanup_old_logs()
@@ -305,7 +406,8 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
--- 可以设置定时任务调用 cleanup_old_logs()，例如使用 pg_cron 扩展
+-- LogStore 后台任务会定期删除过期分区并按主题保留期清理；
+-- 未运行 LogStore 时可设置定时任务调用 cleanup_old_logs()，例如使用 pg_cron 扩展
 
 -- ============================================
 -- Research Hub 数据表
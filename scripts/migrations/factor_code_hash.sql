@@ -0,0 +1,8 @@
+-- 因子代码指纹列迁移
+--
+-- 服务运行时只检测该列是否存在，不执行 DDL。对数据库执行一次:
+--     psql "$DATABASE_URL" -f scripts/migrations/factor_code_hash.sql
+-- 全部语句幂等，可重复执行。执行后用 backfill_code_hashes 为存量因子补齐指纹。
+
+ALTER TABLE factors ADD COLUMN IF NOT EXISTS code_hash VARCHAR(64) DEFAULT '';
+CREATE INDEX IF NOT EXISTS idx_factors_code_hash ON factors(code_hash);
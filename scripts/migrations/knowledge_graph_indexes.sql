@@ -0,0 +1,18 @@
+-- 知识图谱索引迁移
+--
+-- 服务运行时只检测这些索引是否存在，不执行 DDL。对数据库执行一次:
+--     psql "$DATABASE_URL" -f scripts/migrations/knowledge_graph_indexes.sql
+-- 全部语句幂等，可重复执行；大表建议改用 CREATE INDEX CONCURRENTLY 逐条执行。
+
+-- 图遍历覆盖索引：前沿扩展按 source_id / target_id 查邻接边时可走 index-only scan
+CREATE INDEX IF NOT EXISTS idx_kg_relations_source_traversal
+    ON kg_relations (source_id, relation_type, target_id, id);
+CREATE INDEX IF NOT EXISTS idx_kg_relations_target_traversal
+    ON kg_relations (target_id, relation_type, source_id, id);
+
+-- 批量写入的冲突键（create_entities_batch / create_relations_batch 的 ON CONFLICT 目标）
+-- 已有重复数据时创建会失败，需先合并重复实体/关系；索引缺失时批量写入回退为逐条写入
+CREATE UNIQUE INDEX IF NOT EXISTS uq_kg_entities_type_name
+    ON kg_entities (entity_type, name);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_kg_relations_edge
+    ON kg_relations (source_id, target_id, relation_type);
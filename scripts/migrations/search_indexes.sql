@@ -0,0 +1,75 @@
+-- 全文检索结构迁移（已有数据库）
+--
+-- 新建数据库由 docker/compose/init.sql 与 experience_hub/core/schema.sql 创建同样的结构；
+-- 服务运行时只检测结构是否存在，不执行 DDL。对已有数据库执行一次:
+--     psql "$DATABASE_URL" -f scripts/migrations/search_indexes.sql
+-- 添加生成列会重写整表，建议在低峰期执行。全部语句幂等，可重复执行。
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- 全文检索切分函数：中文输出单字 + 二元组（查询模式只输出二元组），英文按单词切分
+-- 与 backend/domains/mcp_core/database/search.py 中的 segment_text 保持一致
+CREATE OR REPLACE FUNCTION search_segment(src TEXT, for_query BOOLEAN DEFAULT FALSE)
+RETURNS TEXT AS $$
+DECLARE
+    token TEXT;
+    tokens TEXT[] := ARRAY[]::TEXT[];
+    n INTEGER;
+BEGIN
+    IF src IS NULL OR src = '' THEN
+        RETURN '';
+    END IF;
+    FOR token IN
+        SELECT m[1] FROM regexp_matches(lower(src), '([㐀-鿿]+|[a-z0-9]+)', 'g') AS m
+    LOOP
+        n := char_length(token);
+        IF token ~ '^[a-z0-9]' OR n = 1 THEN
+            tokens := tokens || token;
+        ELSE
+            IF NOT for_query THEN
+                FOR i IN 1..n LOOP
+                    tokens := tokens || substr(token, i, 1);
+                END LOOP;
+            END IF;
+            FOR i IN 1..n - 1 LOOP
+                tokens := tokens || substr(token, i, 2);
+            END LOOP;
+        END IF;
+    END LOOP;
+    RETURN array_to_string(tokens, ' ');
+END;
+$$ LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE;
+
+-- 因子
+ALTER TABLE factors ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((filename)::text, ''))), 'A') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((description)::text, ''))), 'B') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((formula)::text, ''))), 'B') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((style)::text, ''))), 'C') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((tags)::text, ''))), 'C') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((analysis)::text, ''))), 'D')
+) STORED;
+CREATE INDEX IF NOT EXISTS idx_factors_search_vector ON factors USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_factors_filename_trgm ON factors USING GIN (filename gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_factors_style_trgm ON factors USING GIN (style gin_trgm_ops);
+
+-- 笔记
+ALTER TABLE notes ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((title)::text, ''))), 'A') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((content)::text, ''))), 'B') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((tags)::text, ''))), 'C')
+) STORED;
+CREATE INDEX IF NOT EXISTS idx_notes_search_vector ON notes USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_notes_title_trgm ON notes USING GIN (title gin_trgm_ops);
+
+-- 经验
+ALTER TABLE experiences ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((title)::text, ''))), 'A') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((content->>'problem')::text, ''))), 'B') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((content->>'approach')::text, ''))), 'B') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((content->>'result')::text, ''))), 'B') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((content->>'lesson')::text, ''))), 'B') ||
+    setweight(to_tsvector('simple'::regconfig, search_segment(coalesce((context->'tags')::text, ''))), 'C')
+) STORED;
+CREATE INDEX IF NOT EXISTS idx_experiences_search_vector ON experiences USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_experiences_title_trgm ON experiences USING GIN (title gin_trgm_ops);
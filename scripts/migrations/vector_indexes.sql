@@ -0,0 +1,25 @@
+-- 向量检索结构迁移（已有数据库）
+--
+-- 新建数据库由 docker/compose/init.sql 与 experience_hub/core/schema.sql 创建同样的结构；
+-- 服务运行时只检测 embedding 列是否存在且维度与 EMBEDDING_DIM 一致，不执行 DDL。
+-- 对已有数据库执行一次（维度默认 512，须与 EMBEDDING_DIM 一致）:
+--     psql "$DATABASE_URL" -v embedding_dim=512 -f scripts/migrations/vector_indexes.sql
+-- 全部语句幂等，可重复执行；更换维度需先手动删除 embedding 列。
+-- 迁移后调用 VectorIndex.backfill() 补齐存量记录的向量。
+
+\if :{?embedding_dim}
+\else
+\set embedding_dim 512
+\endif
+
+CREATE EXTENSION IF NOT EXISTS vector;
+
+-- 笔记
+ALTER TABLE notes ADD COLUMN IF NOT EXISTS embedding vector(:embedding_dim);
+ALTER TABLE notes ADD COLUMN IF NOT EXISTS embedding_model VARCHAR(100);
+CREATE INDEX IF NOT EXISTS idx_notes_embedding ON notes USING hnsw (embedding vector_cosine_ops);
+
+-- 经验
+ALTER TABLE experiences ADD COLUMN IF NOT EXISTS embedding vector(:embedding_dim);
+ALTER TABLE experiences ADD COLUMN IF NOT EXISTS embedding_model VARCHAR(100);
+CREATE INDEX IF NOT EXISTS idx_experiences_embedding ON experiences USING hnsw (embedding vector_cosine_ops);
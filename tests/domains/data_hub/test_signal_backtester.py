@@ -0,0 +1,144 @@
+"""data_hub.services.signal_backtester 单元测试。"""
+
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+MODULE_PATH = (
+    Path(__file__).resolve().parents[3]
+    / "backend"
+    / "domains"
+    / "data_hub"
+    / "services"
+    / "signal_backtester.py"
+)
+
+
+def load_module():
+    """直接加载模块，避免触发 domains.data_hub 包级的回测引擎依赖。"""
+    spec = importlib.util.spec_from_file_location("test_signal_backtester_module", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_klines(n: int = 500, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    spread = np.abs(rng.normal(0, 0.005, n))
+    return pd.DataFrame({
+        "candle_begin_time": pd.date_range("2024-01-01", periods=n, freq="h"),
+        "close": close,
+        "high": close * (1 + spread),
+        "low": close * (1 - spread),
+        "funding_fee": np.where(np.arange(n) % 8 == 0, 0.0001, 0.0),
+    })
+
+
+def reference_trades(df, signal, holding, stop_loss, take_profit, direction, fee_rate):
+    """逐根 K 线循环的参考实现。"""
+    close, high, low = df["close"].to_numpy(), df["high"].to_numpy(), df["low"].to_numpy()
+    funding = df["funding_fee"].to_numpy()
+    trades = []
+    last_exit = -1
+    for i in np.flatnonzero(signal):
+        if i <= last_exit or i >= len(close) - 1:
+            continue
+        entry = close[i]
+        ret, exit_idx = None, None
+        for h in range(1, holding + 1):
+            j = i + h
+            if j >= len(close):
+                break
+            if direction == 1:
+                adverse, favorable = low[j] / entry - 1, high[j] / entry - 1
+            else:
+                adverse, favorable = -(high[j] / entry - 1), -(low[j] / entry - 1)
+            if stop_loss is not None and adverse <= stop_loss:
+                ret, exit_idx = stop_loss, j
+                break
+            if take_profit is not None and favorable >= take_profit:
+                ret, exit_idx = take_profit, j
+                break
+        if exit_idx is None:
+            exit_idx = i + holding
+            if exit_idx >= len(close):
+                continue
+            ret = direction * (close[exit_idx] / entry - 1)
+        ret -= direction * funding[i + 1:exit_idx + 1].sum() + 2 * fee_rate
+        trades.append(ret)
+        last_exit = exit_idx
+    return np.array(trades)
+
+
+def test_grid_matches_loop_reference():
+    """批量网格结果与逐笔循环实现一致。"""
+    module = load_module()
+    df = make_klines()
+    signal = np.random.default_rng(1).random(len(df)) < 0.05
+
+    for direction in (1, -1):
+        config = module.SignalBacktestConfig(direction=direction, fee_rate=0.0005)
+        backtester = module.SignalBacktester(df, config)
+        grid = backtester.run_grid(
+            {"sig": signal},
+            holding_bars=[6, 24],
+            stop_loss=[None, -0.01],
+            take_profit=[None, 0.015],
+        )
+        assert len(grid) == 8
+
+        for _, row in grid.iterrows():
+            expected = reference_trades(
+                df, signal, row["holding_bars"], row["stop_loss"], row["take_profit"],
+                direction, 0.0005,
+            )
+            assert row["trades"] == len(expected)
+            assert np.isclose(row["total_return"], np.prod(1 + expected) - 1)
+            assert np.isclose(row["win_rate"], (expected > 0).mean())
+
+
+def test_simulate_trades_respects_holding_and_exit_reason():
+    """逐笔明细不重叠，且止损离场收益等于止损阈值减费用。"""
+    module = load_module()
+    df = make_klines()
+    signal = np.zeros(len(df), dtype=bool)
+    signal[::10] = True
+
+    config = module.SignalBacktestConfig(fee_rate=0.0)
+    trades = module.SignalBacktester(df, config).simulate_trades(
+        signal, holding_bars=24, stop_loss=-0.01
+    )
+
+    assert len(trades) > 0
+    assert (trades["entry_time"].iloc[1:].to_numpy() > trades["exit_time"].iloc[:-1].to_numpy()).all()
+    assert (trades["holding_bars"] <= 24).all()
+    stopped = trades[trades["exit_reason"] == "stop_loss"]
+    assert np.allclose(stopped["return"], -0.01 - _funding(df, stopped))
+
+
+def _funding(df, trades):
+    cum = df["funding_fee"].cumsum().to_numpy()
+    times = df["candle_begin_time"].to_numpy()
+    entry = np.searchsorted(times, trades["entry_time"].to_numpy())
+    exit_ = np.searchsorted(times, trades["exit_time"].to_numpy())
+    return cum[exit_] - cum[entry]
+
+
+def test_vol_target_sizing_caps_leverage():
+    """波动率目标仓位不超过 max_leverage。"""
+    module = load_module()
+    df = make_klines()
+    signal = np.zeros(len(df), dtype=bool)
+    signal[200::30] = True
+
+    config = module.SignalBacktestConfig(sizing="vol_target", target_vol=10.0, max_leverage=2.0)
+    trades = module.SignalBacktester(df, config).simulate_trades(signal, holding_bars=12)
+
+    assert len(trades) > 0
+    assert (trades["size"] <= 2.0).all()
+    assert (trades["size"] > 0).all()
@@ -0,0 +1,93 @@
+"""factor_hub.services.code_dedup 产物复用单元测试。"""
+
+import importlib
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+from domains.factor_hub.core.models import Factor, VerificationStatus
+
+DOMAINS_DIR = Path(__file__).resolve().parents[3] / "backend" / "domains"
+
+
+@pytest.fixture(scope="module")
+def code_dedup():
+    """
+    加载 code_dedup 模块
+
+    factor_hub.services 包级 __init__ 会导入 scipy 等分析依赖，这里只注册包的搜索路径而不执行 __init__，
+    测试结束后恢复 sys.modules。
+    """
+    name = "domains.factor_hub.services"
+    saved = {k: v for k, v in sys.modules.items() if k.startswith(name)}
+    if name not in sys.modules:
+        package_dir = DOMAINS_DIR / "factor_hub" / "services"
+        spec = importlib.util.spec_from_file_location(
+            name, package_dir / "__init__.py", submodule_search_locations=[str(package_dir)]
+        )
+        sys.modules[name] = importlib.util.module_from_spec(spec)
+    try:
+        yield importlib.import_module("domains.factor_hub.services.code_dedup")
+    finally:
+        for key in [k for k in sys.modules if k.startswith(name)]:
+            if key not in saved:
+                del sys.modules[key]
+
+
+class FactorStore:
+    """只实现复用所需接口的因子存储。"""
+
+    def __init__(self, groups, factors):
+        self.groups = groups
+        self.factors = {f.filename: f for f in factors}
+        self.updates = {}
+
+    def get_duplicate_groups(self, include_excluded=False):
+        return self.groups
+
+    def get_many(self, filenames):
+        return [self.factors[name] for name in filenames if name in self.factors]
+
+    def update(self, filename, **fields):
+        self.updates[filename] = fields
+        return True
+
+
+def test_reuse_copies_only_from_cluster_primary(code_dedup):
+    """字段只取自主因子；主因子缺失的字段不从其他成员补齐，已有值不覆盖。"""
+    primary = Factor(
+        filename="Mom_5", style="动量", formula="close / close.shift(5) - 1",
+        verification_status=VerificationStatus.PASSED,
+    )
+    partial = Factor(filename="Mom_5_copy", description="另一个来源的描述", ic=0.05)
+    empty = Factor(filename="Mom_5_v2")
+    store = FactorStore(
+        {"hash": ["Mom_5_copy", "Mom_5", "Mom_5_v2"]},
+        [primary, partial, empty],
+    )
+    service = code_dedup.CodeDedupService(store)
+
+    result = service.reuse_artifacts()
+
+    assert service.find_clusters()[0].primary == "Mom_5"
+    assert store.updates == {
+        "Mom_5_copy": {"style": "动量", "formula": "close / close.shift(5) - 1"},
+        "Mom_5_v2": {"style": "动量", "formula": "close / close.shift(5) - 1"},
+    }
+    assert (result["clusters"], result["factors_updated"], result["fields_reused"]) == (1, 2, 4)
+
+
+def test_reuse_respects_targets_and_dry_run(code_dedup):
+    primary = Factor(filename="Rev_5", style="反转", verification_status=VerificationStatus.PASSED)
+    store = FactorStore(
+        {"hash": ["Rev_5", "Rev_5_a", "Rev_5_b"]},
+        [primary, Factor(filename="Rev_5_a"), Factor(filename="Rev_5_b")],
+    )
+    service = code_dedup.CodeDedupService(store)
+
+    result = service.reuse_artifacts(filenames=["Rev_5_b", "Rev_5"], dry_run=True)
+
+    assert result["updates"] == {"Rev_5_b": ["style"]}
+    assert store.updates == {}
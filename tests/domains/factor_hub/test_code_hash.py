@@ -0,0 +1,30 @@
+"""因子代码指纹单元测试。"""
+
+from domains.factor_hub.core.code_hash import compute_code_hash
+
+CODE = '''
+import pandas as pd
+
+
+def signal(df, n):
+    """动量因子"""
+    # 收益率
+    return df['close'].pct_change(n)
+'''
+
+
+def test_formatting_comments_and_docstrings_do_not_change_hash():
+    """注释、文档字符串、空白差异不影响指纹；语义变化会改变指纹。"""
+    reformatted = "import pandas as pd\ndef signal(df,  n):  # 改名前的副本\n    return df['close'].pct_change( n )\n"
+    changed = CODE.replace("pct_change(n)", "pct_change(n + 1)")
+
+    assert compute_code_hash(CODE) == compute_code_hash(reformatted)
+    assert compute_code_hash(CODE) != compute_code_hash(changed)
+    assert compute_code_hash("") == ""
+
+
+def test_unparseable_code_falls_back_to_text_normalization():
+    """语法错误的代码按去注释、压缩空白后的文本计算指纹。"""
+    broken = "def signal(df:\n    return  df\n"
+    assert compute_code_hash(broken) == compute_code_hash("# 注释\ndef signal(df:\n return df\n")
+    assert len(compute_code_hash(broken)) == 64
@@ -0,0 +1,71 @@
+"""factor_hub.core.store 可选列检测单元测试。"""
+
+from contextlib import contextmanager
+
+import pytest
+
+from domains.factor_hub.core import store as store_module
+from domains.factor_hub.core.store import Factor, FactorStore
+
+
+def make_store(code_hash_present: bool):
+    """不连接数据库的因子存储，记录执行的 SQL，列检测结果由参数决定"""
+    executed = []
+
+    class Cursor:
+        rowcount = 1
+
+        def execute(self, sql, params=None):
+            executed.append((sql, params))
+
+        def fetchone(self):
+            return {'present': code_hash_present}
+
+        def fetchall(self):
+            return []
+
+    @contextmanager
+    def cursor():
+        yield Cursor()
+
+    store = FactorStore.__new__(FactorStore)
+    store._cursor = cursor
+    store._trigger_metadata_sync = lambda filename: None
+    store._init_db()
+    executed.clear()
+    return store, executed
+
+
+@pytest.fixture(autouse=True)
+def no_cache_invalidation(monkeypatch):
+    monkeypatch.setattr(store_module, "invalidate_tool_cache", lambda *tags: None)
+
+
+def test_missing_code_hash_column_is_left_out_of_reads_and_writes():
+    """未执行迁移的数据库：查询投影、写入和更新都不引用 code_hash。"""
+    store, executed = make_store(code_hash_present=False)
+
+    store.query()
+    store.query(columns=FactorStore.list_columns)
+    store.add(Factor(filename="Mom_5", code_content="x = 1"))
+    store.update("Mom_5", code_content="x = 2")
+
+    assert len(executed) == 4
+    assert all("code_hash" not in sql for sql, _ in executed)
+    assert "code_hash" in FactorStore.allowed_columns
+    assert store.get_duplicate_groups() == {}
+    assert store.find_by_code_hash("abc") == []
+    assert store.backfill_code_hashes() == 0
+    assert len(executed) == 4
+
+
+def test_present_code_hash_column_is_read_and_written():
+    store, executed = make_store(code_hash_present=True)
+
+    store.query()
+    store.add(Factor(filename="Mom_5", code_content="x = 1"))
+
+    select_sql, insert_sql = executed[0][0], executed[1][0]
+    assert "code_hash" in select_sql
+    assert "code_hash" in insert_sql
+    assert insert_sql.count("%s") == len(executed[1][1])
@@ -0,0 +1,181 @@
+"""factor_hub.services.field_filler 批量填充单元测试。"""
+
+import asyncio
+import importlib
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from domains.factor_hub.core.store import Factor
+from domains.mcp_core.llm.config import LLMSettings, ModelConfig
+
+DOMAINS_DIR = Path(__file__).resolve().parents[3] / "backend" / "domains"
+
+STYLE_SYSTEM = "你是量化研究员。{% if formula %}参考公式 {formula}。{% endif %}"
+STYLE_USER = "根据代码判断 {factor_name_hint} 的风格:\n{code}"
+
+
+@pytest.fixture(scope="module")
+def field_filler():
+    """
+    加载 field_filler 模块
+
+    factor_hub.services 包级 __init__ 会导入 scipy 等分析依赖，这里只注册包的搜索路径而不执行 __init__，
+    测试结束后恢复 sys.modules。
+    """
+    name = "domains.factor_hub.services"
+    saved = {k: v for k, v in sys.modules.items() if k.startswith(name)}
+    if name not in sys.modules:
+        package_dir = DOMAINS_DIR / "factor_hub" / "services"
+        spec = importlib.util.spec_from_file_location(
+            name, package_dir / "__init__.py", submodule_search_locations=[str(package_dir)]
+        )
+        sys.modules[name] = importlib.util.module_from_spec(spec)
+    try:
+        yield importlib.import_module("domains.factor_hub.services.field_filler")
+    finally:
+        for key in [k for k in sys.modules if k.startswith(name)]:
+            if key not in saved:
+                del sys.modules[key]
+
+
+@pytest.fixture
+def filler(field_filler):
+    """不读取配置目录、不连接 LLM 的填充器"""
+    instance = field_filler.FieldFiller.__new__(field_filler.FieldFiller)
+    instance.user_vars = {"factor_name_hint": "该因子"}
+    instance.llm_settings = LLMSettings(
+        default_model="test", models={"test": ModelConfig(model="m", max_tokens=4096)},
+    )
+    instance.field_configs = {
+        "style": field_filler.FieldConfig(
+            field="style", description="风格",
+            system_prompt=STYLE_SYSTEM, user_prompt=STYLE_USER, max_length=20,
+            model=field_filler.ModelConfig(max_tokens=1024),
+        ),
+        "llm_score": field_filler.FieldConfig(
+            field="llm_score", description="评分",
+            system_prompt="打分", user_prompt="{code}", output_format="number",
+        ),
+    }
+    return instance
+
+
+def make_factor(filename: str, code: str, formula: str = "") -> Factor:
+    return Factor(filename=filename, code_content=code, formula=formula)
+
+
+def test_parse_batch_response_keeps_valid_entries_only(filler):
+    """乱序、部分缺失、重复和越界的条目各自处理，合法条目不受影响。"""
+    content = "输出如下:\n" + json.dumps({"results": [
+        {"id": 3, "value": "反转"},
+        {"id": 1, "value": "  动量  "},
+        {"id": 1, "value": "重复条目"},
+        {"id": 9, "value": "越界"},
+        {"id": "x", "value": "非法序号"},
+        {"id": 2, "value": ""},
+        "非字典",
+    ]}, ensure_ascii=False) + "\n以上。"
+
+    assert filler._parse_batch_response(content, "style", 3) == {1: "动量", 3: "反转"}
+
+
+def test_parse_batch_response_rejects_malformed_json(filler):
+    assert filler._parse_batch_response("无法完成", "style", 2) == {}
+    assert filler._parse_batch_response('{"results": [{"id": 1, "value": "动量"}', "style", 2) == {}
+    assert filler._parse_batch_response('{"items": [{"id": 1, "value": "动量"}]}', "style", 2) == {}
+    assert filler._parse_batch_response('[{"id": 1, "value": "动量"}]', "style", 2) == {}
+
+
+def test_parse_batch_response_validates_number_fields(filler):
+    content = json.dumps({"results": [
+        {"id": 1, "value": "评分 8.5"},
+        {"id": 2, "value": "无法评分"},
+        {"id": 3, "value": 7},
+    ]}, ensure_ascii=False)
+    assert filler._parse_batch_response(content, "llm_score", 3) == {1: "8.5", 3: "7"}
+
+
+def test_group_duplicates_ignores_identity_fields(filler):
+    """代码语义相同、仅文件名和注释不同的因子归为一组。"""
+    code = "def signal(df, n):\n    return df['close'].pct_change(n)\n"
+    copy = "def signal(df, n):  # 复制后改名\n    return df['close'].pct_change(n)\n"
+    factors = [
+        make_factor("Mom_5", code),
+        make_factor("Mom_5_copy", copy),
+        make_factor("Rev_5", code.replace("pct_change(n)", "pct_change(n) * -1")),
+        make_factor("Mom_5_formula", code, formula="close / close.shift(n) - 1"),
+    ]
+
+    groups = filler._group_duplicates("style", factors)
+
+    assert [[f.filename for f in group] for _, group in groups] == [
+        ["Mom_5", "Mom_5_copy"], ["Rev_5"], ["Mom_5_formula"],
+    ]
+    assert groups[0][0]["filename"] == "Mom_5"
+
+
+def test_plan_batches_respects_size_output_and_prompt_budget(filler, field_filler, monkeypatch):
+    groups = [({"filename": f"F{i}", "code": "x = 1"}, [make_factor(f"F{i}", "x = 1")]) for i in range(10)]
+
+    # 输出上限：4096 // 1024 = 4 个因子一批
+    assert [len(b) for b in filler._plan_batches("style", groups, batch_size=8)] == [4, 4, 2]
+    assert [len(b) for b in filler._plan_batches("style", groups, batch_size=3)] == [3, 3, 3, 1]
+
+    # prompt 预算：单个因子块超过预算时每批只放一个
+    monkeypatch.setattr(field_filler, "BATCH_PROMPT_TOKEN_BUDGET", 1)
+    assert [len(b) for b in filler._plan_batches("style", groups[:3], batch_size=8)] == [1, 1, 1]
+
+
+def test_build_batch_prompt_renders_template_once_with_factor_blocks(filler):
+    dicts = [
+        {"filename": "A", "code": "a = 1", "formula": "close"},
+        {"filename": "B", "code": "b = 2", "formula": ""},
+    ]
+
+    system, user = filler._build_batch_prompt("style", dicts)
+
+    # 批内有因子提供 formula，条件块保留并改为引用
+    assert "参考公式 <formula>（见各因子块）" in system
+    assert "本次请求包含 2 个相互独立的因子" in system
+    assert user.count("该因子") == 1
+    assert '<Factor id="1">\n<formula>\nclose\n</formula>\n<code>\na = 1\n</code>\n</Factor>' in user
+    assert '<Factor id="2">\n<code>\nb = 2\n</code>\n</Factor>' in user
+
+
+def test_fill_batch_fallbacks_respect_concurrency_limit(filler):
+    """批量响应只解析出部分因子时，回退的单条调用同样受并发上限约束。"""
+    running = {"now": 0, "max": 0}
+    calls = []
+
+    async def call_llm(system, user, purpose="", factor_name="", field_config=None):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+        calls.append(purpose)
+        if purpose.endswith("_batch"):
+            return True, json.dumps({"results": [{"id": 2, "value": "反转"}]}), ""
+        return True, "动量", ""
+
+    filler._call_llm = call_llm
+    batch = [
+        ({"filename": f"F{i}", "code": f"x = {i}"}, [make_factor(f"F{i}", f"x = {i}")])
+        for i in range(1, 5)
+    ]
+
+    async def run():
+        return await filler._fill_batch(
+            batch, "style", store=None, semaphore=asyncio.Semaphore(1), delay=0, is_first=True,
+        )
+
+    results = asyncio.run(run())
+
+    assert running["max"] == 1
+    assert calls == ["fill_style_batch"] + ["fill_style"] * 3
+    assert [(r.filename, r.new_value) for r in results] == [
+        ("F1", "动量"), ("F2", "反转"), ("F3", "动量"), ("F4", "动量"),
+    ]
@@ -0,0 +1,59 @@
+"""mcp_core.base 有界 LRU 缓存与资源缓存单元测试。"""
+
+import asyncio
+import time
+
+from domains.mcp_core.base.cache import BoundedCache, estimate_size, get_cache_stats
+from domains.mcp_core.base.resource import BaseResourceProvider, ResourceContent
+from domains.mcp_core.observability.metrics import render_cache_prometheus
+
+
+def test_bounded_cache_limits_entries_bytes_and_expires():
+    cache = BoundedCache("test:limits", max_entries=3, max_bytes=1000, sizeof=len)
+    for key in "abc":
+        cache.set(key, "x" * 100)
+    assert cache.get("a") is not None  # a 变为最近使用
+
+    cache.set("d", "x" * 100)
+    assert "b" not in cache and len(cache) == 3
+
+    cache.set("big", "x" * 900)
+    assert cache.nbytes <= 1000 and "big" in cache
+    assert not cache.set("huge", "x" * 2000)
+    assert cache.stats.rejected == 1
+
+    cache.set("short", "x", ttl=0.01)
+    time.sleep(0.02)
+    assert cache.purge_expired() == 1
+    stats = get_cache_stats()["test:limits"]
+    assert stats["evictions"] >= 1 and stats["expirations"] == 1
+    assert 'quant_cache_rejected_total{name="test:limits"} 1' in render_cache_prometheus({"test:limits": stats})
+
+    assert estimate_size(list(range(10000))) > estimate_size(list(range(10)))
+    assert estimate_size({i: i for i in range(10000)}) > estimate_size({i: i for i in range(10)})
+    assert estimate_size(set(range(10000))) > estimate_size(set(range(10)))
+
+
+class ItemResources(BaseResourceProvider):
+    def __init__(self):
+        super().__init__(default_cache_ttl=60, max_cache_entries=2)
+        self.reads = 0
+        self.register_dynamic(pattern="test://item/{id}", name="item", description="", handler=self._read)
+
+    async def _read(self, id: str) -> ResourceContent:
+        self.reads += 1
+        return ResourceContent.json(f"test://item/{id}", {"id": id})
+
+
+def test_resource_cache_is_bounded():
+    provider = ItemResources()
+
+    async def run():
+        for uri in ("test://item/1", "test://item/1", "test://item/2", "test://item/3", "test://item/1"):
+            await provider.read_resource(uri)
+
+    asyncio.run(run())
+
+    assert provider.reads == 4
+    stats = provider.get_cache_stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 2 and stats["hits"] == 1
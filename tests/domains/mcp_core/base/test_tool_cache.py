@@ -0,0 +1,176 @@
+"""mcp_core.base 只读工具结果缓存单元测试。"""
+
+import asyncio
+import json
+import math
+from datetime import datetime
+from decimal import Decimal
+
+from domains.mcp_core.base import tool_cache as tool_cache_module
+from domains.mcp_core.base.tool import BaseTool, ToolRegistry, ToolResult
+from domains.mcp_core.base.tool_cache import ToolCacheConfig, ToolResultCache, factor_cache_tag
+from domains.mcp_core.server.serialization import dumps
+
+
+class RankingTool(BaseTool):
+    cache_ttl = 60.0
+    cache_tags = ("market_data", "factor:{factor_name}")
+
+    def __init__(self, **services):
+        super().__init__(**services)
+        self.calls = 0
+
+    @property
+    def name(self):
+        return "ranking"
+
+    @property
+    def description(self):
+        return "ranking"
+
+    @property
+    def input_schema(self):
+        return {"type": "object", "properties": {"factor_name": {"type": "string"}}}
+
+    async def execute(self, factor_name: str) -> ToolResult:
+        self.calls += 1
+        await asyncio.sleep(0.02)
+        if factor_name == "Broken":
+            return ToolResult.fail("boom")
+        return ToolResult.ok({"factor": factor_name, "run": self.calls})
+
+
+def _registry(monkeypatch):
+    cache = ToolResultCache(ToolCacheConfig(max_entries=2))
+    monkeypatch.setattr(tool_cache_module, "_tool_cache", cache)
+    registry = ToolRegistry()
+    tool = RankingTool()
+    registry.register(tool)
+    return registry, tool, cache
+
+
+def test_concurrent_identical_calls_are_coalesced(monkeypatch):
+    registry, tool, cache = _registry(monkeypatch)
+
+    async def run():
+        results = await asyncio.gather(
+            *[registry.execute("ranking", {"factor_name": "Bias"}) for _ in range(5)]
+        )
+        again = await registry.execute("ranking", {"factor_name": "Bias"})
+        return results, again
+
+    results, again = asyncio.run(run())
+
+    assert tool.calls == 1
+    assert all(r.data == {"factor": "Bias", "run": 1} for r in results + [again])
+    stats = cache.get_stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 4, 1)
+
+    # 失败结果不缓存
+    asyncio.run(registry.execute("ranking", {"factor_name": "Broken"}))
+    asyncio.run(registry.execute("ranking", {"factor_name": "Broken"}))
+    assert tool.calls == 3
+
+
+def test_tag_invalidation_and_lru_bound(monkeypatch):
+    registry, tool, cache = _registry(monkeypatch)
+
+    def call(name):
+        return asyncio.run(registry.execute("ranking", {"factor_name": name})).data["run"]
+
+    assert call("Bias") == 1
+    assert call("Bias") == 1
+
+    cache.invalidate("factor:RSI")
+    assert call("Bias") == 1
+    cache.invalidate("factor:Bias")
+    assert call("Bias") == 2
+    tool_cache_module.invalidate_tool_cache("market_data")
+    assert call("Bias") == 3
+
+    # max_entries=2：第三个键淘汰最久未用的键
+    call("RSI")
+    call("Momentum")
+    assert cache.get_stats()["entries"] == 2
+    assert cache.evictions >= 1
+
+
+def test_backend_defaults_to_redis_when_redis_url_set(monkeypatch):
+    monkeypatch.delenv("TOOL_CACHE_BACKEND", raising=False)
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    assert ToolCacheConfig.from_env().backend == "memory"
+    monkeypatch.setenv("REDIS_URL", "redis://cache:6379")
+    assert ToolCacheConfig.from_env().backend == "redis"
+    monkeypatch.setenv("TOOL_CACHE_BACKEND", "memory")
+    assert ToolCacheConfig.from_env().backend == "memory"
+
+
+def test_invalidation_from_another_process_reuses_one_client(monkeypatch):
+    """其他 Hub 失效标签后本进程不再命中旧结果；invalidate 复用同一个同步客户端。"""
+    import fakeredis
+    import redis
+
+    server = fakeredis.FakeServer()
+    created = []
+
+    def from_url(url, **kwargs):
+        created.append(url)
+        return fakeredis.FakeRedis(server=server)
+
+    monkeypatch.setattr(redis.Redis, "from_url", staticmethod(from_url))
+    config = ToolCacheConfig(backend="redis")
+    data_hub = ToolResultCache(config, redis_client=fakeredis.aioredis.FakeRedis(server=server))
+    factor_hub = ToolResultCache(config, redis_client=fakeredis.aioredis.FakeRedis(server=server))
+    runs = []
+
+    async def execute():
+        runs.append(1)
+        return ToolResult.ok({"run": len(runs)})
+
+    def call():
+        return asyncio.run(data_hub.get_or_execute(
+            "get_factor_ranking", {"factor_name": "Bias"}, 60, ["factor:Bias"], execute,
+        )).data["run"]
+
+    assert call() == 1
+    assert call() == 1
+    factor_hub.invalidate("factor:Bias")
+    factor_hub.flush_invalidations(timeout=5)
+    assert call() == 2
+    factor_hub.invalidate("factor:Bias", "market_data")
+    factor_hub.flush_invalidations(timeout=5)
+    assert call() == 3
+    assert len(created) == 1
+
+
+def test_shared_hit_matches_fresh_result_encoding():
+    """共享层命中与直接执行的结果编码一致：时间戳、Decimal 和 NaN 不因缓存层改变。"""
+    import fakeredis
+
+    server = fakeredis.FakeServer()
+    config = ToolCacheConfig(backend="redis")
+    data_hub = ToolResultCache(config, redis_client=fakeredis.aioredis.FakeRedis(server=server))
+    other_hub = ToolResultCache(config, redis_client=fakeredis.aioredis.FakeRedis(server=server))
+    data = {"time": datetime(2024, 1, 2, 8, 0), "ic": Decimal("0.05"), "ir": math.nan, "rank": [1, 2]}
+
+    async def execute():
+        return ToolResult.ok(data)
+
+    def call(cache):
+        return asyncio.run(cache.get_or_execute(
+            "get_factor_ranking", {"factor_name": "Bias"}, 60, ["factor:Bias"], execute,
+        ))
+
+    call(data_hub)
+    shared = call(other_hub)
+
+    assert (other_hub.hits, other_hub.misses) == (1, 0)
+    assert dumps(shared.data) == dumps(data)
+    assert shared.data == json.loads(dumps(data))
+
+
+def test_factor_tag_is_shared_by_store_and_tools():
+    from domains.factor_hub.api.mcp.tools.analysis_tools import GetFactorICTool
+
+    assert factor_cache_tag("Bias") == factor_cache_tag(" Bias.py ") == "factor:Bias"
+    assert GetFactorICTool().cache_tags_for({"filename": "Bias.py"}) == [factor_cache_tag("Bias")]
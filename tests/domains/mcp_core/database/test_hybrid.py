@@ -0,0 +1,184 @@
+"""mcp_core.database.hybrid 与本地向量化单元测试。"""
+
+import math
+from contextlib import contextmanager
+
+import pytest
+
+from domains.mcp_core.database.hybrid import (
+    EmbeddingIndexer,
+    VectorIndex,
+    VectorIndexSpec,
+    merge_hits,
+    reciprocal_rank_fusion,
+)
+from domains.mcp_core.database.query_builder import QueryBuilder
+from domains.mcp_core.database.search import SearchHit
+from domains.mcp_core.llm.embedding import Embedder, EmbeddingConfig, HashingEmbedder
+
+
+class Item:
+    def __init__(self, id):
+        self.id = id
+
+
+def cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+def test_hashing_embedder_is_deterministic_and_lexically_similar():
+    """本地向量确定、归一化，词汇重叠越多相似度越高。"""
+    embedder = HashingEmbedder(EmbeddingConfig(provider="local", dimensions=256))
+    query, near, far = embedder.embed(["动量因子失效", "动量因子在震荡市失效", "估值修复"])
+
+    assert embedder.embed(["动量因子失效"])[0] == query
+    assert math.isclose(cosine(query, query), 1.0, rel_tol=1e-9)
+    assert cosine(query, near) > cosine(query, far)
+    assert embedder.model_name == "local:hashing:256"
+
+
+def test_rrf_rewards_agreement_between_rankings():
+    """两路都靠前的结果排在只出现在单路的结果之前。"""
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d", "a"]], k=60)
+    assert [key for key, _ in fused] == ["b", "a", "d", "c"]
+
+    text_hits = [SearchHit(Item(1), highlights={"content": "<mark>动量</mark>"}), SearchHit(Item(2))]
+    vector_hits = [SearchHit(Item(3)), SearchHit(Item(1), highlights={"content": "原文"})]
+    merged = merge_hits(text_hits, vector_hits, limit=2, min_similarity=0)
+    assert [h.entity.id for h in merged] == [1, 3]
+    assert merged[0].highlights == {"content": "<mark>动量</mark>"}
+
+
+def test_unrelated_query_returns_nothing_after_similarity_floor():
+    """近邻检索总会返回最近的记录，低于相似度下限的候选不参与融合。"""
+    embedder = HashingEmbedder(EmbeddingConfig(provider="local", dimensions=256))
+    corpus = ["动量因子在震荡市失效", "反转因子的换手率偏高", "估值因子与市值相关"]
+    vectors = embedder.embed(corpus)
+
+    def vector_hits(query):
+        q = embedder.embed_query(query)
+        hits = [SearchHit(Item(i), score=cosine(q, v)) for i, v in enumerate(vectors)]
+        return sorted(hits, key=lambda h: h.score, reverse=True)
+
+    # 无关查询：全文无命中，向量近邻的相似度都很低
+    unrelated = vector_hits("weather forecast tomorrow")
+    assert len(unrelated) == 3
+    assert merge_hits([], unrelated, limit=10, min_similarity=0.3) == []
+
+    # 相关查询仍能召回
+    related = merge_hits([], vector_hits("动量因子失效"), limit=10, min_similarity=0.3)
+    assert [h.entity.id for h in related] == [0]
+
+
+def test_merge_hits_applies_text_rank_floor():
+    """文本候选同样可以按 ts_rank 下限过滤。"""
+    text_hits = [SearchHit(Item(1), score=0.5), SearchHit(Item(2), score=0.01)]
+    merged = merge_hits(text_hits, [], limit=10, min_text_rank=0.05)
+    assert [h.entity.id for h in merged] == [1]
+
+
+def test_vector_search_orders_by_distance_with_filters(monkeypatch):
+    """近邻查询保留筛选条件，ORDER BY 直接使用距离表达式以走 HNSW 索引。"""
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "local")
+    monkeypatch.setenv("EMBEDDING_DIM", "8")
+    from domains.mcp_core.llm import embedding
+    monkeypatch.setattr(embedding, "_embedder", None)
+
+    executed = []
+
+    class Cursor:
+        def execute(self, sql, params=None):
+            executed.append((sql, params))
+
+        def fetchone(self):
+            return {"embedding_type": "vector(8)", "has_model": True}
+
+        def fetchall(self):
+            return [{"id": 7, "similarity": 0.9}]
+
+    @contextmanager
+    def cursor_factory():
+        yield Cursor()
+
+    index = VectorIndex(VectorIndexSpec(table="notes", text_sql="title"))
+    builder = QueryBuilder(table="notes", allowed_columns={"id", "title", "note_type"})
+    builder.select_columns(["id", "title"]).where("note_type", "hypothesis")
+
+    rows = index.search(cursor_factory, builder, "动量", limit=50)
+
+    assert rows == [{"id": 7, "similarity": 0.9}]
+    # 运行时只检测列结构，不执行 DDL
+    assert "pg_attribute" in executed[0][0]
+    assert not any(sql.lstrip().upper().startswith(("ALTER", "CREATE")) for sql, _ in executed)
+    assert ("SET LOCAL hnsw.ef_search = %s", (50,)) in executed
+    sql, params = executed[-1]
+    assert sql == (
+        "SELECT id, title, 1 - (embedding <=> %s::vector) AS similarity FROM notes"
+        " WHERE note_type = %s AND embedding IS NOT NULL AND embedding_model = %s"
+        " ORDER BY embedding <=> %s::vector LIMIT %s"
+    )
+    assert params[1:3] == ["hypothesis", "local:hashing:8"]
+    assert params[0] == params[3] and params[-1] == 50
+
+
+def test_vector_index_unavailable_on_dimension_mismatch():
+    """向量列维度与 embedder 不一致时不可用，调用方退回纯文本检索。"""
+    executed = []
+
+    class Cursor:
+        def execute(self, sql, params=None):
+            executed.append(sql)
+
+        def fetchone(self):
+            return {"embedding_type": "vector(1536)", "has_model": True}
+
+    @contextmanager
+    def cursor_factory():
+        yield Cursor()
+
+    index = VectorIndex(VectorIndexSpec(table="notes", text_sql="title"))
+    assert not index.ensure(512, cursor_factory)
+    # 只检测一次
+    assert not index.ensure(512, cursor_factory)
+    assert len(executed) == 1
+
+
+def test_indexer_coalesces_writes_into_batches():
+    """短时间内的多次写入合并为一批，同一 ID 只向量化一次。"""
+
+    class FakeIndex:
+        def __init__(self):
+            self.writes = []
+
+        def ensure(self, dimensions):
+            return True
+
+        def fetch_texts(self, ids):
+            return [(i, f"笔记 {i}") for i in ids]
+
+        def write(self, vectors, model_name):
+            self.writes.append(([i for i, _ in vectors], model_name))
+            return len(vectors)
+
+    embedder = HashingEmbedder(EmbeddingConfig(provider="local", dimensions=16))
+    indexer = EmbeddingIndexer(embedder_factory=lambda: embedder, batch_size=100, flush_interval=0.1)
+    index = FakeIndex()
+    try:
+        for i in [1, 2, 3, 2, 1, 4]:
+            indexer.enqueue(index, [i])
+        assert indexer.flush(timeout=5)
+    finally:
+        indexer.stop()
+
+    assert index.writes == [([1, 2, 3, 4], "local:hashing:16")]
+    stats = indexer.get_stats()
+    assert stats["indexed"] == 4 and stats["batches"] == 1 and stats["pending"] == 0
+
+
+def test_embedder_requires_embed_batch():
+    """Embedder 为抽象基类，子类必须实现 _embed_batch。"""
+    class Incomplete(Embedder):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete(EmbeddingConfig())
@@ -0,0 +1,94 @@
+"""mcp_core.database.pool 单元测试。"""
+
+import threading
+
+import psycopg2
+import pytest
+
+from domains.mcp_core.database import pool as pool_module
+from domains.mcp_core.database.pool import ConnectionPool, PoolConfig, PoolTimeoutError
+
+
+class FakeConnection:
+    """模拟 psycopg2 连接。"""
+
+    def __init__(self):
+        self.closed = 0
+        self.autocommit = True
+        self.commits = 0
+        self.rollbacks = 0
+
+    def get_transaction_status(self):
+        return psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def fake_connect(monkeypatch):
+    created = []
+
+    def connect(*args, **kwargs):
+        conn = FakeConnection()
+        created.append((conn, kwargs))
+        return conn
+
+    monkeypatch.setattr(pool_module.psycopg2, "connect", connect)
+    return created
+
+
+def test_pool_is_bounded_and_reuses_connections(fake_connect):
+    """连接数受上限约束，归还后复用，满载时等待超时。"""
+    pool = ConnectionPool("postgresql://test", PoolConfig(max_size=2, statement_timeout_ms=5000))
+
+    first = pool.acquire()
+    second = pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire(timeout=0.05)
+
+    pool.release(first)
+    assert pool.acquire() is first
+
+    stats = pool.get_stats()
+    assert stats["created"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["in_use"] == 2
+    assert fake_connect[0][1]["options"] == "-c statement_timeout=5000"
+    pool.release(second)
+
+
+def test_waiter_is_woken_on_release(fake_connect):
+    """满载时等待方在连接归还后立即获得连接，并记录等待耗时。"""
+    pool = ConnectionPool("postgresql://test", PoolConfig(max_size=1))
+    held = pool.acquire()
+    acquired = []
+
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(timeout=2)))
+    waiter.start()
+    threading.Timer(0.05, pool.release, args=(held,)).start()
+    waiter.join(timeout=3)
+
+    assert acquired == [held]
+    assert pool.get_stats()["waits"] == 1
+    assert pool.get_stats()["max_wait_ms"] >= 40
+
+
+def test_broken_connection_is_discarded(fake_connect):
+    """连接级错误时丢弃连接，下次借出新建连接。"""
+    pool = ConnectionPool("postgresql://test", PoolConfig(max_size=1))
+
+    with pytest.raises(psycopg2.OperationalError):
+        with pool.connection() as conn:
+            raise psycopg2.OperationalError("server closed the connection")
+
+    assert conn.closed
+    with pool.connection() as fresh:
+        assert fresh is not conn
+    assert pool.get_stats()["discarded"] == 1
@@ -0,0 +1,38 @@
+"""mcp_core.database.query_builder 单元测试。"""
+
+from domains.mcp_core.database.query_builder import QueryBuilder
+
+
+def make_builder() -> QueryBuilder:
+    return QueryBuilder(
+        table="factors",
+        allowed_columns={"filename", "style", "llm_score", "code_content"},
+        numeric_fields={"llm_score"},
+    )
+
+
+def test_paginated_query_with_projection_and_window_total():
+    """列投影、窗口总数、稳定排序和分页参数都下推到 SQL。"""
+    sql, params = (
+        make_builder()
+        .select_columns(["filename", "style", "password"])
+        .with_total_count()
+        .where("llm_score", [">=4.0", "<4.5"])
+        .order_by("llm_score DESC", tiebreaker="filename")
+        .limit(20)
+        .offset(40)
+        .build()
+    )
+
+    assert sql == (
+        "SELECT filename, style, COUNT(*) OVER() AS total_count FROM factors"
+        " WHERE llm_score >= %s AND llm_score < %s"
+        " ORDER BY llm_score DESC, filename ASC LIMIT %s OFFSET %s"
+    )
+    assert params == [4.0, 4.5, 20, 40]
+
+
+def test_count_ignores_projection_and_pagination():
+    """COUNT 查询只保留筛选条件。"""
+    builder = make_builder().select_columns(["filename"]).where("style", "动量").limit(10)
+    assert builder.build_count() == ("SELECT COUNT(*) as count FROM factors WHERE style = %s", ["动量"])
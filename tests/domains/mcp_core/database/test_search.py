@@ -0,0 +1,137 @@
+"""mcp_core.database.search 单元测试。"""
+
+from contextlib import contextmanager
+
+from domains.mcp_core.database import search as search_module
+from domains.mcp_core.database.query_builder import QueryBuilder
+from domains.mcp_core.database.search import (
+    SearchIndexSpec,
+    TextSearchIndex,
+    highlight,
+    segment_text,
+)
+
+
+class ProbeCursor:
+    """记录执行的 SQL，检测查询返回指定的结构状态。"""
+
+    def __init__(self, executed, fulltext, trigram):
+        self.executed = executed
+        self.row = {"fulltext": fulltext, "trigram": trigram}
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+
+    def fetchone(self):
+        return self.row
+
+
+def make_cursor_factory(executed, fulltext=True, trigram=True):
+    @contextmanager
+    def factory():
+        yield ProbeCursor(executed, fulltext, trigram)
+    return factory
+
+
+def make_index() -> TextSearchIndex:
+    return TextSearchIndex(SearchIndexSpec(
+        table="notes",
+        fields=[("title", "A"), ("content", "B")],
+        title_column="title",
+    ))
+
+
+def test_segment_and_highlight_chinese_text():
+    """中文按单字/二元组切分，高亮命中词并截取片段。"""
+    assert segment_text("动量因子 IC") == ["动", "量", "因", "子", "动量", "量因", "因子", "ic"]
+    assert segment_text("动量因子", for_query=True) == ["动量", "量因", "因子"]
+
+    text = "前言" * 50 + "短期动量因子在震荡市中失效"
+    snippet = highlight(text, "动量因子", max_length=40)
+    assert "<mark>动量因子</mark>" in snippet
+    assert snippet.startswith("...")
+    assert highlight("无关内容", "动量") == "无关内容"
+
+
+def test_ranked_search_sql_uses_tsvector_and_trigram():
+    """检测到索引结构后按 tsvector 匹配，标题子串兜底，按相关度排序。"""
+    executed = []
+    index = make_index()
+    builder = QueryBuilder(table="notes", allowed_columns={"id", "title", "content"})
+    builder.where("id", ">10")
+
+    index.apply(builder, "动量", make_cursor_factory(executed), rank=True)
+    builder.order_by_expression("search_rank DESC", tiebreaker="id").limit(5)
+    sql, params = builder.build()
+
+    # 运行时只检测结构，不执行 DDL
+    assert len(executed) == 1
+    assert "information_schema.columns" in executed[0]
+    assert not any(s.lstrip().upper().startswith(("ALTER", "CREATE")) for s in executed)
+    assert sql == (
+        "SELECT *, (ts_rank(search_vector, plainto_tsquery('simple', search_segment(%s, TRUE)))"
+        " + similarity(title, %s)) AS search_rank FROM notes"
+        " WHERE id > %s AND (search_vector @@ plainto_tsquery('simple', search_segment(%s, TRUE))"
+        " OR title ILIKE %s) ORDER BY search_rank DESC, id ASC LIMIT %s"
+    )
+    assert params == ["动量", "动量", 10, "动量", "%动量%", 5]
+
+    # 每个进程只检测一次
+    count = len(executed)
+    index.apply(QueryBuilder(table="notes", allowed_columns={"title"}), "x", make_cursor_factory(executed))
+    assert len(executed) == count
+
+
+def test_falls_back_to_ilike_when_column_missing():
+    """未执行迁移（生成列不存在）时降级为 ILIKE，结果语义不变。"""
+    index = make_index()
+    builder = QueryBuilder(table="notes", allowed_columns={"title"})
+    index.apply(builder, "momentum", make_cursor_factory([], fulltext=False))
+
+    assert not index.fulltext_available
+    assert index.trigram_available
+    assert builder.build() == (
+        "SELECT * FROM notes WHERE ((title)::text ILIKE %s OR (content)::text ILIKE %s)",
+        ["%momentum%", "%momentum%"],
+    )
+
+
+def test_probe_failure_falls_back_to_ilike():
+    """检测查询失败时同样降级，不向调用方抛出异常。"""
+    @contextmanager
+    def broken():
+        raise RuntimeError("connection refused")
+        yield
+
+    index = make_index()
+    builder = QueryBuilder(table="notes", allowed_columns={"title"})
+    index.apply(builder, "momentum", broken)
+
+    assert not index.fulltext_available
+    assert not index.trigram_available
+    assert "ILIKE" in builder.build()[0]
+
+
+def test_probe_failure_is_retried_after_backoff(monkeypatch):
+    """检测失败不记为已检测：退避期内不重复检测，之后恢复检测并启用全文检索。"""
+    now = {"t": 1000.0}
+    monkeypatch.setattr(search_module.time, "monotonic", lambda: now["t"])
+    attempts = []
+
+    @contextmanager
+    def broken():
+        attempts.append(1)
+        raise RuntimeError("connection refused")
+        yield
+
+    index = make_index()
+    index.ensure(broken)
+    index.ensure(broken)
+    assert len(attempts) == 1
+
+    executed = []
+    now["t"] += search_module._PROBE_RETRY_SECONDS
+    index.ensure(make_cursor_factory(executed))
+    assert index.fulltext_available and index.trigram_available
+    index.ensure(make_cursor_factory(executed))
+    assert len(executed) == 1
@@ -0,0 +1,100 @@
+"""mcp_core.edge.store.trace_lineage 单元测试（SQLite 执行同一条递归 CTE）。"""
+
+import re
+import sqlite3
+from contextlib import contextmanager
+
+from domains.mcp_core.edge.models import EdgeEntityType
+from domains.mcp_core.edge.store import EdgeStore
+
+
+def make_store(edges):
+    """
+    用内存 SQLite 承载 knowledge_edges
+
+    trace_lineage 的 SQL 只用到标准递归 CTE，去掉 PostgreSQL 类型转换并替换占位符后
+    可在 SQLite 中原样执行。
+    """
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute(
+        "CREATE TABLE knowledge_edges (id INTEGER PRIMARY KEY, source_type TEXT, source_id TEXT, "
+        "target_type TEXT, target_id TEXT, relation TEXT, is_bidirectional INTEGER DEFAULT 0, "
+        "metadata TEXT DEFAULT '{}', created_at TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO knowledge_edges (id, source_type, source_id, target_type, target_id, relation) "
+        "VALUES (?, ?, ?, ?, ?, 'derived_from')",
+        [(i, s[0], s[1], t[0], t[1]) for i, (s, t) in enumerate(edges, start=1)],
+    )
+    statements = []
+
+    class Cursor:
+        def execute(self, sql, params=None):
+            statements.append(sql)
+            sql = re.sub(r"%s::\w+", "?", sql).replace("%s", "?")
+            self._rows = conn.execute(sql, params or ()).fetchall()
+
+        def fetchall(self):
+            return [dict(row) for row in self._rows]
+
+    @contextmanager
+    def cursor():
+        yield Cursor()
+
+    store = EdgeStore.__new__(EdgeStore)
+    store._cursor = cursor
+    return store, statements
+
+
+def lineage(result):
+    return [(item["depth"], item["edge"]["source_id"], item["edge"]["target_id"]) for item in result]
+
+
+def test_trace_lineage_terminates_on_cycle():
+    """环路 a -> b -> c -> a：每条边只返回一次，取最小深度，单条 SQL 完成。"""
+    f, d = EdgeEntityType.FACTOR.value, EdgeEntityType.DATA.value
+    store, statements = make_store([
+        ((f, "a"), (f, "b")),
+        ((f, "b"), (f, "c")),
+        ((f, "c"), (f, "a")),
+        ((f, "c"), (d, "BTC-USDT")),
+    ])
+
+    result = store.trace_lineage(EdgeEntityType.FACTOR, "a", max_depth=10)
+
+    assert lineage(result) == [
+        (1, "a", "b"),
+        (2, "b", "c"),
+        (3, "c", "a"),
+        (3, "c", "BTC-USDT"),
+    ]
+    assert len(statements) == 1
+
+
+def test_trace_lineage_respects_max_depth():
+    """超过 max_depth 的边不返回；max_depth < 1 时不查询。"""
+    f = EdgeEntityType.FACTOR.value
+    chain = [((f, f"n{i}"), (f, f"n{i + 1}")) for i in range(6)]
+    store, statements = make_store(chain)
+
+    assert lineage(store.trace_lineage(EdgeEntityType.FACTOR, "n0", max_depth=2)) == [
+        (1, "n0", "n1"),
+        (2, "n1", "n2"),
+    ]
+    assert [depth for depth, _, _ in lineage(store.trace_lineage(EdgeEntityType.FACTOR, "n0"))] == [1, 2, 3, 4, 5]
+    assert store.trace_lineage(EdgeEntityType.FACTOR, "n0", max_depth=0) == []
+    assert len(statements) == 2
+
+
+def test_trace_lineage_forward_follows_incoming_edges():
+    """forward 方向沿入边追溯下游实体。"""
+    f, s = EdgeEntityType.FACTOR.value, EdgeEntityType.STRATEGY.value
+    store, _ = make_store([
+        ((f, "mom"), (f, "raw")),
+        ((s, "trend"), (f, "mom")),
+    ])
+
+    result = store.trace_lineage(EdgeEntityType.FACTOR, "raw", direction="forward", max_depth=3)
+
+    assert lineage(result) == [(1, "mom", "raw"), (2, "trend", "mom")]
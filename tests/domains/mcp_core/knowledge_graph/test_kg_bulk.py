@@ -0,0 +1,110 @@
+"""知识图谱批量写入单元测试（模拟 ON CONFLICT DO NOTHING + 查回已存在行的语义）。"""
+
+from contextlib import contextmanager
+
+import psycopg2.extras
+
+from domains.mcp_core.knowledge_graph.models import EntityType, Relation, RelationType, Triple
+from domains.mcp_core.knowledge_graph.store import KnowledgeGraphStore
+
+
+class UpsertTable:
+    """按冲突键去重的内存表：新行写入，已存在的行原样返回（不改写）。"""
+
+    def __init__(self):
+        # (entity_type, name) -> (id, uuid)
+        self.entities = {("concept", "动量"): (1, "uuid-existing")}
+        # (source_id, target_id, relation_type) -> 行
+        self.relations = {}
+        self.statements = []
+
+    def uuid_of(self, entity_id):
+        return next(u for i, u in self.entities.values() if i == entity_id)
+
+    def execute_values(self, cursor, sql, values, page_size=100, fetch=False):
+        self.statements.append(sql)
+        rows = []
+        if "INSERT INTO kg_entities" in sql:
+            for value in values:
+                key = (value[1], value[2])
+                entity_id, entity_uuid = self.entities.setdefault(key, (len(self.entities) + 1, value[0]))
+                rows.append({"id": entity_id, "uuid": entity_uuid, "entity_type": key[0], "name": key[1]})
+        else:
+            for value in values:
+                key = (value[1], value[2], value[0])
+                if key not in self.relations:
+                    # COALESCE(输入 UUID, 实体表 UUID)
+                    self.relations[key] = {
+                        "id": 100 + len(self.relations),
+                        "source_id": key[0],
+                        "target_id": key[1],
+                        "relation_type": key[2],
+                        "source_uuid": value[3] or self.uuid_of(key[0]),
+                        "target_uuid": value[4] or self.uuid_of(key[1]),
+                    }
+                rows.append(self.relations[key])
+        return rows
+
+
+def make_store(table, monkeypatch):
+    store = KnowledgeGraphStore.__new__(KnowledgeGraphStore)
+    store._change_listeners = []
+
+    @contextmanager
+    def cursor():
+        yield None
+
+    store._cursor = cursor
+    monkeypatch.setattr(KnowledgeGraphStore, "_upsert_available", True)
+    monkeypatch.setattr(psycopg2.extras, "execute_values", table.execute_values)
+    return store
+
+
+def test_save_triples_batch_uses_two_statements(monkeypatch):
+    """全部实体一次写入、全部关系一次写入，重复实体与关系复用同一条记录。"""
+    table = UpsertTable()
+    store = make_store(table, monkeypatch)
+    changes = []
+    store.add_change_listener(changes.append)
+
+    triples = [
+        Triple("动量", EntityType.CONCEPT, RelationType.RELATED_TO, "反转", EntityType.CONCEPT),
+        Triple("MOM_20", EntityType.FACTOR, RelationType.DERIVED_FROM, "动量", EntityType.CONCEPT),
+        Triple("动量", EntityType.CONCEPT, RelationType.RELATED_TO, "反转", EntityType.CONCEPT, 0.5),
+    ]
+    results = store.save_triples_batch(triples)
+
+    assert len(table.statements) == 2
+    assert [(s.name, s.id, o.name, o.id) for s, o, _ in results] == [
+        ("动量", 1, "反转", 2),
+        ("MOM_20", 3, "动量", 1),
+        ("动量", 1, "反转", 2),
+    ]
+    assert [r.id for _, _, r in results] == [100, 101, 100]
+    assert results[1][2].source_id == 3 and results[1][2].target_id == 1
+    assert changes == ["insert", "insert"]
+
+    # 关系携带两端实体的 UUID，已存在实体使用库中的 UUID
+    for subject, obj, relation in results:
+        assert relation.source_uuid == subject.uuid
+        assert relation.target_uuid == obj.uuid
+    assert results[0][0].uuid == "uuid-existing"
+    assert results[1][2].target_uuid == "uuid-existing"
+    assert all(r["source_uuid"] and r["target_uuid"] for r in table.relations.values())
+
+    # 已存在的行不被改写
+    assert all("DO NOTHING" in sql and "DO UPDATE" not in sql for sql in table.statements)
+
+
+def test_create_relations_batch_resolves_missing_uuids(monkeypatch):
+    """调用方未提供 UUID 时由同一语句按实体 ID 补齐。"""
+    table = UpsertTable()
+    table.entities[("concept", "反转")] = (2, "uuid-reversal")
+    store = make_store(table, monkeypatch)
+
+    relation = Relation(relation_type=RelationType.RELATED_TO, source_id=1, target_id=2)
+    [saved] = store.create_relations_batch([relation])
+
+    assert saved.id == 100
+    assert (saved.source_uuid, saved.target_uuid) == ("uuid-existing", "uuid-reversal")
+    assert "COALESCE(i.source_uuid, s.uuid)" in table.statements[0]
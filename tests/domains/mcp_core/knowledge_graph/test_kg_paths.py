@@ -0,0 +1,105 @@
+"""知识图谱路径查询单元测试（内存图，统计查询次数）。"""
+
+from contextlib import contextmanager
+
+from domains.mcp_core.knowledge_graph.models import Entity, EntityType, Relation, RelationType
+from domains.mcp_core.knowledge_graph.query import KnowledgeGraphQuery
+from domains.mcp_core.knowledge_graph.store import KnowledgeGraphStore
+
+
+class MemoryGraphStore:
+    """实现 KnowledgeGraphQuery 所需批量接口的内存图。"""
+
+    def __init__(self, edges):
+        self.calls = 0
+        self.relations = {}
+        entity_ids = set()
+        for relation_id, (source, target) in enumerate(edges, start=1):
+            self.relations[relation_id] = Relation(
+                id=relation_id,
+                relation_type=RelationType.RELATED_TO,
+                source_id=source,
+                target_id=target,
+            )
+            entity_ids.update((source, target))
+        self.entities = {
+            i: Entity(id=i, entity_type=EntityType.CONCEPT, name=f"e{i}")
+            for i in entity_ids
+        }
+
+    def expand_frontier(self, entity_ids, direction="both", relation_types=None):
+        self.calls += 1
+        rows = []
+        for r in self.relations.values():
+            if r.source_id in entity_ids:
+                rows.append((r.id, r.source_id, r.target_id))
+            if r.target_id in entity_ids:
+                rows.append((r.id, r.target_id, r.source_id))
+        return sorted(rows, reverse=True)
+
+    def get_entities_by_ids(self, entity_ids, include_embedding=False):
+        self.calls += 1
+        return {i: self.entities[i] for i in entity_ids if i in self.entities}
+
+    def get_relations_by_ids(self, relation_ids):
+        self.calls += 1
+        return {i: self.relations[i] for i in relation_ids if i in self.relations}
+
+
+# 1-2-3-4-5 链，外加捷径 1-6-5 与 2-4
+EDGES = [(1, 2), (2, 3), (3, 4), (4, 5), (1, 6), (6, 5), (2, 4)]
+
+
+def test_find_path_uses_one_query_per_level():
+    """双向 BFS 找到最短路径，查询次数与层数相关而非与邻居数相关。"""
+    store = MemoryGraphStore(EDGES)
+    path = KnowledgeGraphQuery(store).find_path(1, 5)
+
+    assert [e.id for e in path.entities] == [1, 6, 5]
+    assert [(r.source_id, r.target_id) for r in path.relations] == [(1, 6), (6, 5)]
+    assert store.calls <= 4
+    assert KnowledgeGraphQuery(MemoryGraphStore(EDGES)).find_path(1, 5, max_depth=1) is None
+
+
+def test_find_all_paths_returns_simple_paths_shortest_first():
+    """枚举不超过最大深度的简单路径，短路径优先。"""
+    store = MemoryGraphStore(EDGES)
+    paths = KnowledgeGraphQuery(store).find_all_paths(1, 5, max_depth=4, max_paths=10)
+
+    node_paths = [[e.id for e in p.entities] for p in paths]
+    assert node_paths[0] == [1, 6, 5]
+    assert sorted(node_paths[1:]) == [[1, 2, 3, 4, 5], [1, 2, 4, 5]]
+    assert [len(p) for p in node_paths] == sorted(len(p) for p in node_paths)
+    assert store.calls <= 4 + 2
+
+    limited = KnowledgeGraphQuery(MemoryGraphStore(EDGES)).find_all_paths(1, 5, max_depth=3)
+    assert sorted([e.id for e in p.entities] for p in limited) == [[1, 2, 4, 5], [1, 6, 5]]
+
+
+def test_traversal_index_check_runs_no_ddl(monkeypatch, caplog):
+    """遍历索引只检测是否存在：缺失时告警，不在查询路径上执行 DDL。"""
+    executed = []
+
+    class Cursor:
+        def execute(self, sql, params=None):
+            executed.append(sql)
+
+        def fetchall(self):
+            if "pg_indexes" in executed[-1]:
+                return [{"indexname": "idx_kg_relations_source_traversal"}]
+            return []
+
+    @contextmanager
+    def cursor():
+        yield Cursor()
+
+    store = KnowledgeGraphStore.__new__(KnowledgeGraphStore)
+    store._cursor = cursor
+    monkeypatch.setattr(KnowledgeGraphStore, "_traversal_indexes_checked", False)
+
+    store.expand_frontier([1])
+    store.expand_frontier([2])
+
+    assert sum("pg_indexes" in sql for sql in executed) == 1
+    assert not any(sql.lstrip().upper().startswith("CREATE") for sql in executed)
+    assert "idx_kg_relations_target_traversal" in caplog.text
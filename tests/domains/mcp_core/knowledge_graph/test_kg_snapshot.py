@@ -0,0 +1,132 @@
+"""知识图谱内存邻接快照单元测试。"""
+
+import math
+
+from domains.mcp_core.knowledge_graph.models import EntityType, RelationType
+from domains.mcp_core.knowledge_graph.snapshot import (
+    GraphSnapshot,
+    GraphSnapshotConfig,
+    GraphSnapshotManager,
+)
+
+ENTITIES = [(1, "factor"), (2, "factor"), (3, "concept"), (4, "market_regime"), (5, "unknown")]
+RELATIONS = [
+    (10, "related_to", 1, 3),
+    (11, "related_to", 2, 3),
+    (12, "effective_in", 1, 4),
+    (13, "effective_in", 2, 4),
+    (14, "derived_from", 3, 5),
+    (15, "related_to", 3, 3),  # 自环
+    (16, "related_to", 1, 99),  # 悬挂关系
+]
+
+
+class RowStore:
+    """只实现快照所需接口的存储。"""
+
+    def __init__(self):
+        self.entities = list(ENTITIES)
+        self.relations = list(RELATIONS)
+        self.listeners = []
+        self.loads = []
+
+    def add_change_listener(self, listener):
+        self.listeners.append(listener)
+
+    def get_graph_watermark(self):
+        return (
+            max(e[0] for e in self.entities), len(self.entities),
+            max(r[0] for r in self.relations), len(self.relations),
+        )
+
+    def load_graph_rows(self, after_entity_id=0, after_relation_id=0):
+        self.loads.append((after_entity_id, after_relation_id))
+        return (
+            [e for e in self.entities if e[0] > after_entity_id],
+            [r for r in self.relations if r[0] > after_relation_id],
+        )
+
+
+def test_snapshot_answers_degree_neighbor_and_pattern_queries():
+    """度数、邻居、共同邻居、模式匹配与 SQL 语义一致。"""
+    snapshot = GraphSnapshot.from_rows(ENTITIES, RELATIONS)
+
+    assert snapshot.relation_count == 6
+    assert snapshot.degree(3) == 4  # 两条入边 + 一条出边 + 自环（计一次）
+    assert snapshot.degree(1, "outgoing") == 2
+    assert snapshot.degree(42) == 0
+    assert snapshot.neighbors(1).tolist() == [3, 4]
+    assert snapshot.neighbors(3, "incoming", [RelationType.RELATED_TO]).tolist() == [1, 2, 3]
+    assert snapshot.common_neighbors(1, 2).tolist() == [3, 4]
+    assert snapshot.top_degree(EntityType.FACTOR, limit=1) == [(1, 2)]
+    assert snapshot.match_pattern(EntityType.FACTOR, RelationType.EFFECTIVE_IN) == [13, 12]
+    assert snapshot.match_pattern(target_type=EntityType.CONCEPT) == [15, 14, 11, 10]  # 未知类型归为 concept
+    assert snapshot.type_counts()["entity_types"] == {"factor": 2, "concept": 2, "market_regime": 1}
+
+    rank = snapshot.pagerank()
+    assert math.isclose(rank.sum(), 1.0, rel_tol=1e-6)
+    assert snapshot.pagerank_top(limit=1)[0][0] == 3
+
+
+def test_manager_refreshes_incrementally_and_rebuilds_on_delete():
+    """新增只加载增量，删除后全量重建。"""
+    store = RowStore()
+    manager = GraphSnapshotManager(store, GraphSnapshotConfig(enabled=True, refresh_interval=3600))
+    assert manager.get().degree(1) == 2
+    assert store.loads == [(0, 0)]
+
+    # 本进程新增：按通知增量加载
+    store.entities.append((6, "factor"))
+    store.relations.append((17, "related_to", 6, 1))
+    store.listeners[0]("insert")
+    assert manager.get().degree(1) == 3
+    assert store.loads[-1] == (5, 16)
+
+    # 未变更时不再访问存储
+    manager.get()
+    assert len(store.loads) == 2
+
+    # 删除：行数对不上，全量重建
+    store.relations = [r for r in store.relations if r[0] != 10]
+    store.listeners[0]("delete")
+    assert manager.get().degree(1) == 2
+    assert store.loads[-1] == (0, 0)
+    assert manager.get_stats()["full_builds"] == 2
+
+
+def test_rows_committed_during_refresh_are_not_added_twice():
+    """读取水位与加载之间提交的行进入快照后，下次增量加载不会重复追加。"""
+    store = RowStore()
+    manager = GraphSnapshotManager(store, GraphSnapshotConfig(enabled=True, refresh_interval=0))
+    manager.get()
+
+    store.entities.append((6, "factor"))
+    load = store.load_graph_rows
+
+    def load_with_concurrent_commit(after_entity_id=0, after_relation_id=0):
+        # 其他进程在本次读取水位之后、加载之前提交了一条关系
+        if not any(r[0] == 17 for r in store.relations):
+            store.relations.append((17, "related_to", 6, 1))
+        return load(after_entity_id, after_relation_id)
+
+    store.load_graph_rows = load_with_concurrent_commit
+    first = manager.get()
+    second = manager.get()
+
+    assert first.relation_count == second.relation_count == 7
+    assert second.degree(6) == 1
+    assert second.watermark == store.get_graph_watermark()
+    assert manager.get_stats()["full_builds"] == 1
+
+
+def test_extend_skips_ids_already_in_snapshot():
+    snapshot = GraphSnapshot.from_rows(ENTITIES, RELATIONS)
+
+    extended = snapshot.extend(
+        [(5, "unknown"), (6, "factor")],
+        [(14, "derived_from", 3, 5), (17, "related_to", 6, 1)],
+    )
+
+    assert extended.entity_ids.tolist() == [1, 2, 3, 4, 5, 6]
+    assert sorted(extended.relation_ids.tolist()) == [10, 11, 12, 13, 14, 15, 17]
+    assert extended.degree(5) == 1
@@ -0,0 +1,108 @@
+"""LLM 响应缓存单元测试。"""
+
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from domains.mcp_core.llm.cache import (
+    CachedResponse,
+    LLMCacheConfig,
+    LLMResponseCache,
+    MemoryLLMCache,
+    SQLiteLLMCache,
+)
+from domains.mcp_core.llm.client import LLMClient
+from domains.mcp_core.llm.config import LLMSettings, ModelConfig
+
+MESSAGES = [
+    {"role": "system", "content": "你是量化研究助手"},
+    {"role": "user", "content": "分析因子 MOM_20"},
+]
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        return AIMessage(content=f"回答{self.calls}", response_metadata={"finish_reason": "stop"})
+
+    async def astream(self, messages):
+        self.calls += 1
+        for piece in ["流式", "回答"]:
+            yield AIMessageChunk(content=piece)
+
+
+def make_client(cache):
+    settings = LLMSettings(default_model="test", models={"test": ModelConfig(model="m", temperature=0)})
+    client = LLMClient(settings=settings, cache=cache)
+    model = FakeModel()
+    client.get_model = lambda *args, **kwargs: model
+    return client, model
+
+
+def test_identical_requests_hit_cache_and_stream_replays_chunks():
+    """相同请求只调用一次模型；温度不同视为不同请求；流式命中按原分片回放。"""
+    client, model = make_client(MemoryLLMCache(LLMCacheConfig(enabled=True, backend="memory")))
+
+    async def run():
+        first = await client.ainvoke(MESSAGES)
+        second = await client.ainvoke(MESSAGES)
+        other = await client.ainvoke(MESSAGES, temperature=0.7)
+        bypass = await client.ainvoke(MESSAGES, use_cache=False)
+        stream_messages = MESSAGES[:1] + [{"role": "user", "content": "分析因子 REV_5"}]
+        streamed = [c.content async for c in client.astream(stream_messages)]
+        replayed = [c.content async for c in client.astream(stream_messages)]
+        return first, second, other, bypass, streamed, replayed
+
+    first, second, other, bypass, streamed, replayed = asyncio.run(run())
+    assert first == second == "回答1"
+    assert other == "回答2" and bypass == "回答3"
+    assert streamed == replayed == ["流式", "回答"]
+    assert model.calls == 4
+    assert client.cache.get_stats()["hits"] == 2
+
+
+def test_sqlite_cache_persists_and_honours_ttl_and_capacity(tmp_path, monkeypatch):
+    """SQLite 缓存跨实例复用，过期条目失效，超出容量淘汰最久未访问的条目。"""
+    config = LLMCacheConfig(enabled=True, path=tmp_path / "llm.sqlite3", ttl=60, max_entries=2)
+    cache = SQLiteLLMCache(config)
+    cache.set("a", CachedResponse(chunks=["A"]))
+    assert SQLiteLLMCache(config).get("a").content == "A"
+
+    monkeypatch.setattr(SQLiteLLMCache, "EVICT_EVERY", 1)
+    cache.set("b", CachedResponse(chunks=["B"]))
+    cache.get("a")  # a 最近被访问
+    cache.set("c", CachedResponse(chunks=["C"]))
+    assert cache.size() == 2 and cache.get("b") is None
+
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + 120)
+    assert cache.get("a") is None
+
+
+def test_locked_database_is_a_cache_miss(tmp_path, monkeypatch):
+    """SQLite 被其他进程锁住时读缓存按未命中处理，不向调用方抛错。"""
+    cache = SQLiteLLMCache(LLMCacheConfig(enabled=True, path=tmp_path / "llm.sqlite3"))
+    cache.set("a", CachedResponse(chunks=["A"]))
+
+    def locked(key):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(cache, "_get", locked)
+    assert cache.get("a") is None
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_cache_backends_must_implement_storage_methods():
+    class Incomplete(LLMResponseCache):
+        def _get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete(LLMCacheConfig())
@@ -0,0 +1,130 @@
+"""LLM 自适应限流单元测试。"""
+
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from domains.mcp_core.llm.client import LLMClient
+from domains.mcp_core.llm.config import LLMSettings, ModelConfig
+from domains.mcp_core.llm.limiter import (
+    LLMRateLimiter,
+    ModelRateLimiter,
+    RateLimitConfig,
+)
+
+MESSAGES = [{"role": "user", "content": "分析因子 MOM_20"}]
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class FakeModel:
+    def __init__(self, failures=0, latency=0.0):
+        self.calls = 0
+        self.failures = failures
+        self.latency = latency
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.calls <= self.failures:
+            raise RateLimitError("429 Too Many Requests")
+        return AIMessage(content=f"回答{self.calls}", usage_metadata={
+            "input_tokens": 10, "output_tokens": 5, "total_tokens": 15,
+        })
+
+
+def make_client(model, **limit_kwargs):
+    config = RateLimitConfig(backoff_base=0.01, **limit_kwargs)
+    settings = LLMSettings(default_model="test", models={"test": ModelConfig(model="m", temperature=0)})
+    client = LLMClient(settings=settings, rate_limiter=LLMRateLimiter(config))
+    client.cache = None
+    client.get_model = lambda *args, **kwargs: model
+    return client
+
+
+def test_rate_limit_halves_concurrency_and_retries():
+    """429 时并发窗口减半并重试，成功后加性恢复。"""
+    model = FakeModel(failures=2)
+    client = make_client(model, initial_concurrency=8)
+
+    assert asyncio.run(client.ainvoke(MESSAGES)) == "回答3"
+    limiter = client.rate_limiter.get(client.settings.resolve_config())
+    stats = limiter.get_stats()
+    assert stats["rate_limited"] == 2
+    assert stats["concurrency_limit"] == 2
+    assert stats["inflight"] == 0
+
+
+def test_identical_inflight_requests_are_coalesced():
+    """同时进行的相同请求只调用一次模型，不同请求各自调用。"""
+    model = FakeModel(latency=0.05)
+    client = make_client(model)
+
+    async def run():
+        return await asyncio.gather(
+            client.ainvoke(MESSAGES),
+            client.ainvoke(MESSAGES),
+            client.ainvoke(MESSAGES),
+            client.ainvoke([{"role": "user", "content": "分析因子 REV_5"}]),
+        )
+
+    results = asyncio.run(run())
+    assert results[0] == results[1] == results[2]
+    assert model.calls == 2
+
+
+def test_request_bucket_paces_calls():
+    """RPM 令牌桶耗尽后按回补速率等待。"""
+    limiter = ModelRateLimiter("m", RateLimitConfig(), requests_per_minute=600)
+    limiter._requests.level = 1
+
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire_sync()
+        limiter.release(latency=0.0)
+    # 600 RPM = 每 0.1s 回补一个请求
+    assert time.monotonic() - start >= 0.15
+
+
+def test_cancelled_leader_does_not_cancel_coalesced_followers():
+    """首个调用方被取消时，共享调用继续执行，后到的调用方拿到结果。"""
+    model = FakeModel(latency=0.05)
+    client = make_client(model)
+
+    async def run():
+        leader = asyncio.ensure_future(client.ainvoke(MESSAGES))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(client.ainvoke(MESSAGES))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        result = await follower
+        return leader.cancelled(), result, dict(client._inflight)
+
+    leader_cancelled, result, inflight = asyncio.run(run())
+    assert leader_cancelled
+    assert result == "回答1"
+    assert model.calls == 1
+    assert inflight == {}
+
+
+def test_streams_do_not_wait_for_the_concurrency_window():
+    """并发窗口被批量调用占满时，流式调用仍可立即开始。"""
+    class StreamingModel:
+        async def astream(self, messages):
+            yield AIMessageChunk(content="流式")
+
+    client = make_client(StreamingModel(), initial_concurrency=1)
+    limiter = client.rate_limiter.get(client.settings.resolve_config())
+
+    async def run():
+        await limiter.acquire()  # 批量调用占用唯一名额
+        chunks = [chunk.content async for chunk in client.astream(MESSAGES)]
+        return chunks, limiter.get_stats()
+
+    chunks, stats = asyncio.run(asyncio.wait_for(run(), timeout=2))
+    assert chunks == ["流式"]
+    assert stats["inflight"] == 1
+    assert stats["concurrency_limit"] == 1
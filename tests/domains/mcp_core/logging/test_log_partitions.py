@@ -0,0 +1,111 @@
+"""mcp_core.logging.partitions 单元测试。"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+from domains.mcp_core.logging.partitions import (
+    LogMaintenanceConfig,
+    LogPartitionManager,
+    partition_day,
+    partition_name,
+    rollup_window,
+)
+
+
+class FakeConnection:
+    """模拟 asyncpg 连接：维护分区列表并记录执行的语句。"""
+
+    def __init__(self, partitions):
+        self.partitions = list(partitions)
+        self.executed = []
+
+    async def fetch(self, sql, *args):
+        if "pg_inherits" in sql:
+            return [{"relname": name} for name in self.partitions]
+        if "log_topics" in sql:
+            return [{"id": 1, "retention_days": 7}]
+        return []
+
+    async def fetchval(self, sql, *args):
+        return 7
+
+    async def execute(self, sql, *args, timeout=None):
+        self.executed.append(" ".join(sql.split()))
+        if sql.startswith("ALTER TABLE logs ATTACH PARTITION"):
+            self.partitions.append(sql.split()[5])
+        return "DELETE 0"
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+
+def test_rollup_window_uses_whole_minutes_within_coverage():
+    start_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    watermark = datetime(2024, 1, 2, 12, 0, tzinfo=timezone.utc)
+    coverage = (start_at, watermark)
+
+    assert rollup_window(None, None, coverage) == coverage
+    lo, hi = rollup_window(
+        datetime(2024, 1, 2, 9, 30, 15, tzinfo=timezone.utc), None, coverage
+    )
+    assert lo == datetime(2024, 1, 2, 9, 31, tzinfo=timezone.utc) and hi == watermark
+    # 查询区间全部晚于 watermark 或不足一分钟时只查原始日志
+    assert rollup_window(watermark, None, coverage) is None
+    assert rollup_window(None, None, None) is None
+
+
+def test_ensure_partitions_and_retention():
+    async def run():
+        today = datetime.now(timezone.utc).date()
+        old = partition_name(today - timedelta(days=30))
+        conn = FakeConnection(["logs_default", old, partition_name(today)])
+        manager = LogPartitionManager(LogMaintenanceConfig(partitions_ahead=2))
+
+        created = await manager.ensure_partitions(conn)
+        assert created == [partition_name(today + timedelta(days=d)) for d in (1, 2)]
+        # 新分区先迁入默认分区中落在该日的数据再挂载
+        assert any("DELETE FROM logs_default" in sql for sql in conn.executed)
+
+        result = await manager.apply_retention(conn)
+        assert result["dropped_partitions"] == [old]
+        assert partition_day(old) == today - timedelta(days=30)
+        assert partition_day("logs_default") is None
+
+    asyncio.run(run())
+
+
+class LockConnection(FakeConnection):
+    """咨询锁可被其他实例持有的连接。"""
+
+    def __init__(self, partitions, lock_free):
+        super().__init__(partitions)
+        self.lock_free = lock_free
+
+    async def fetchval(self, sql, *args):
+        if "pg_try_advisory_lock" in sql:
+            return self.lock_free
+        return await super().fetchval(sql, *args)
+
+
+def test_exclusive_skips_when_lock_held_and_releases_after_use():
+    async def run():
+        manager = LogPartitionManager(LogMaintenanceConfig())
+
+        held = LockConnection([], lock_free=False)
+        async with manager.exclusive(held) as acquired:
+            assert acquired is False
+        assert not any("pg_advisory_unlock" in sql for sql in held.executed)
+
+        free = LockConnection([], lock_free=True)
+        try:
+            async with manager.exclusive(free) as acquired:
+                assert acquired is True
+                raise RuntimeError("维护失败")
+        except RuntimeError:
+            pass
+        # 维护出错时同样释放锁，连接归还连接池后不残留会话锁
+        assert free.executed[-1] == "SELECT pg_advisory_unlock($1)"
+
+    asyncio.run(run())
@@ -0,0 +1,115 @@
+"""mcp_core.logging.store 写入快速路径单元测试。"""
+
+import asyncio
+from datetime import datetime
+
+from domains.mcp_core.logging.store import LOG_COLUMNS, LogEntry, LogStore
+
+
+class FakeConnection:
+    """模拟 asyncpg 连接：记录主题查询与 COPY 写入。"""
+
+    def __init__(self, topics):
+        self.topics = dict(topics)
+        self.topic_queries = 0
+        self.copies = []
+
+    async def fetch(self, sql, *args):
+        self.topic_queries += 1
+        if "unnest" in sql:
+            for name in args[0]:
+                self.topics.setdefault(name, len(self.topics) + 1)
+            return [{"id": self.topics[name], "name": name} for name in args[0]]
+        return [{"id": tid, "name": name} for name, tid in self.topics.items()]
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.copies.append((table, list(records), columns))
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def acquire(self, timeout=None):
+        pool = self
+
+        class _Ctx:
+            async def __aenter__(self):
+                return pool.conn
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Ctx()
+
+
+def _entry(topic):
+    return LogEntry(
+        timestamp=datetime(2024, 1, 1), topic=topic, level="info",
+        service="test", message="m", data={"k": 1},
+    )
+
+
+def test_flush_uses_copy_and_caches_topic_ids():
+    async def run():
+        conn = FakeConnection({"system": 1})
+        store = LogStore(database_url="postgresql://x", batch_size=1000)
+        store._pool = FakePool(conn)
+        await store._load_topics()
+        conn.topic_queries = 0
+
+        for topic in ("system", "mcp", "mcp", "system"):
+            store.write_nowait(_entry(topic))
+        await store._flush()
+
+        table, records, columns = conn.copies[0]
+        assert table == "logs" and columns == LOG_COLUMNS
+        assert [r[1] for r in records] == [1, 2, 2, 1]
+        # 未命中的主题一次批量解析，之后全部命中缓存
+        assert conn.topic_queries == 1
+
+        store.write_nowait(_entry("mcp"))
+        await store._flush()
+        assert conn.topic_queries == 1
+        assert store.get_ingest_stats()["written"] == 5
+
+    asyncio.run(run())
+
+
+def test_bounded_buffer_drops_oldest_and_wakes_flusher():
+    async def run():
+        store = LogStore(database_url="postgresql://x", batch_size=3, max_buffer_size=4)
+        for i in range(2):
+            store.write_nowait(_entry(f"t{i}"))
+        assert not store._wakeup.is_set()
+        for i in range(2, 6):
+            store.write_nowait(_entry(f"t{i}"))
+        assert store._wakeup.is_set()
+
+        stats = store.get_ingest_stats()
+        assert stats["buffered"] == 4
+        assert stats["dropped"] == 2 and stats["received"] == 6
+        assert [e.topic for e in store._buffer] == ["t2", "t3", "t4", "t5"]
+
+    asyncio.run(run())
+
+
+def test_schema_init_skipped_while_another_instance_holds_lock():
+    """其他实例持有维护锁时不执行迁移与建表。"""
+    class LockedConnection(FakeConnection):
+        def __init__(self):
+            super().__init__({})
+            self.fetchvals = []
+
+        async def fetchval(self, sql, *args):
+            self.fetchvals.append(sql)
+            return False
+
+    async def run():
+        conn = LockedConnection()
+        store = LogStore(database_url="postgresql://x")
+        store._pool = FakePool(conn)
+        await store._init_db()
+        assert conn.fetchvals == ["SELECT pg_try_advisory_lock($1)"]
+
+    asyncio.run(run())
@@ -0,0 +1,106 @@
+"""mcp_core.observability 指标与采样分析单元测试。"""
+
+import asyncio
+import threading
+
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from domains.mcp_core.base.tool import BaseTool, ToolRegistry, ToolResult
+from domains.mcp_core.observability import metrics as metrics_module
+from domains.mcp_core.observability.endpoints import metrics_endpoint, profile_endpoint
+from domains.mcp_core.observability.metrics import LatencyHistogram, render_prometheus
+from domains.mcp_core.observability.profiler import SamplingProfiler
+
+
+class SleepTool(BaseTool):
+    execution_timeout = 0.05
+
+    @property
+    def name(self):
+        return "sleep"
+
+    @property
+    def description(self):
+        return "sleep"
+
+    @property
+    def input_schema(self):
+        return {"type": "object", "properties": {"seconds": {"type": "number"}}}
+
+    async def execute(self, seconds: float = 0.0) -> ToolResult:
+        await asyncio.sleep(seconds)
+        return ToolResult.ok({"slept": seconds})
+
+
+def test_histogram_quantiles_within_precision():
+    hist = LatencyHistogram(precision=0.01)
+    for value in range(1, 1001):
+        hist.record(float(value))
+
+    for q, expected in ((0.5, 500), (0.95, 950), (0.99, 990)):
+        assert abs(hist.quantile(q) - expected) / expected <= 0.01
+    assert hist.quantile(1.0) == 1000
+    assert hist.summary()["count"] == 1000
+
+
+def test_registry_execute_records_latency_errors_and_timeouts(monkeypatch):
+    monkeypatch.setattr(metrics_module, "_metrics_registry", None)
+    registry = ToolRegistry()
+    registry.register(SleepTool())
+
+    async def run():
+        assert (await registry.execute("sleep", {"seconds": 0})).success
+        assert not (await registry.execute("sleep", {"seconds": 1})).success
+
+    asyncio.run(run())
+    data = metrics_module.get_metrics_registry().snapshot()["tool"]["sleep"]
+    assert data["calls"] == 2 and data["errors"] == 1 and data["timeouts"] == 1
+    assert data["latency_ms"]["max"] >= 50
+    text = render_prometheus(metrics_module.get_metrics_registry())
+    assert 'quant_tool_calls_total{name="sleep"} 2' in text
+
+
+def test_profiler_samples_busy_thread():
+    stop = threading.Event()
+
+    def busy_loop():
+        while not stop.is_set():
+            sum(range(1000))
+
+    worker = threading.Thread(target=busy_loop, name="busy")
+    worker.start()
+    try:
+        result = SamplingProfiler().sample(duration=0.2, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert result.samples > 0
+    assert any("thread:busy" in stack and "busy_loop" in stack for stack in result.stacks)
+    tree = result.tree()
+    assert tree["value"] == result.samples
+
+
+def test_endpoints_require_loopback_or_api_key(monkeypatch):
+    """指标与采样端点只接受本机请求或携带 MCP_API_KEY；采样分析默认关闭。"""
+    monkeypatch.delenv("MCP_API_KEY", raising=False)
+    monkeypatch.delenv("PROFILER_ENABLED", raising=False)
+    app = Starlette(routes=[
+        Route("/metrics", metrics_endpoint, methods=["GET"]),
+        Route("/debug/profile", profile_endpoint, methods=["GET"]),
+    ])
+    local = TestClient(app, client=("127.0.0.1", 50000))
+    remote = TestClient(app, client=("10.0.0.8", 50000))
+
+    assert local.get("/metrics").status_code == 200
+    assert remote.get("/metrics").status_code == 403
+    assert remote.get("/debug/profile").status_code == 403
+    # 本机请求也需显式开启采样分析
+    assert local.get("/debug/profile").json() == {"error": "profiler disabled"}
+
+    monkeypatch.setenv("MCP_API_KEY", "secret")
+    assert remote.get("/metrics", headers={"Authorization": "Bearer secret"}).status_code == 200
+    assert remote.get("/metrics", headers={"X-API-Key": "secret"}).status_code == 200
+    assert remote.get("/metrics", headers={"X-API-Key": "wrong"}).status_code == 403
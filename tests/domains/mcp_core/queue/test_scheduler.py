@@ -0,0 +1,134 @@
+"""mcp_core.queue.scheduler 单元测试。"""
+
+import asyncio
+import threading
+
+from domains.mcp_core.queue.scheduler import (
+    JobPriority,
+    JobScheduler,
+    SchedulerConfig,
+    scheduling_context,
+)
+
+
+def make_scheduler(max_slots: int = 2, **kwargs) -> JobScheduler:
+    """构造不受机器负载影响的调度器。"""
+    config = SchedulerConfig(max_slots=max_slots, cpu_load_threshold=float("inf"), **kwargs)
+    return JobScheduler(config)
+
+
+def test_interactive_uses_reserved_slot_while_batch_queues():
+    """batch 占满非预留槽位时，interactive 仍可立即运行，batch 继续排队。"""
+    scheduler = make_scheduler(max_slots=2, reserved_interactive_slots=1)
+    gate = threading.Event()
+    try:
+        first = scheduler.submit(gate.wait, priority=JobPriority.BATCH, client_id="a")
+        second = scheduler.submit(gate.wait, priority=JobPriority.BATCH, client_id="b")
+        interactive = scheduler.submit(lambda: "done", priority=JobPriority.INTERACTIVE)
+
+        assert interactive.result(timeout=2) == "done"
+        assert scheduler.is_running(first.job_id)
+        assert scheduler.get_position(second.job_id) == 0
+    finally:
+        gate.set()
+        scheduler.shutdown()
+
+
+def test_group_reserves_slot_for_interactive():
+    """batch 作业占满分组的非预留部分时，同分组的 interactive 作业仍可立即运行。"""
+    scheduler = make_scheduler(max_slots=8, reserved_interactive_slots=1)
+    scheduler.set_group_limit("backtest", 3)
+    gate = threading.Event()
+    try:
+        sweep = [
+            scheduler.submit(gate.wait, group="backtest", priority=JobPriority.BATCH, client_id=f"c{i}")
+            for i in range(4)
+        ]
+        interactive = scheduler.submit(lambda: "done", group="backtest", priority=JobPriority.INTERACTIVE)
+
+        assert interactive.result(timeout=2) == "done"
+        assert [scheduler.is_running(f.job_id) for f in sweep] == [True, True, False, False]
+    finally:
+        gate.set()
+        scheduler.shutdown()
+
+
+def test_priority_order_and_client_round_robin():
+    """高优先级先准入；同优先级内按客户端轮转。"""
+    scheduler = make_scheduler(max_slots=1, reserved_interactive_slots=0)
+    gate = threading.Event()
+    order = []
+    try:
+        blocker = scheduler.submit(gate.wait, priority=JobPriority.INTERACTIVE)
+        futures = [
+            scheduler.submit(order.append, "a1", priority=JobPriority.BATCH, client_id="a"),
+            scheduler.submit(order.append, "a2", priority=JobPriority.BATCH, client_id="a"),
+            scheduler.submit(order.append, "b1", priority=JobPriority.BATCH, client_id="b"),
+            scheduler.submit(order.append, "agent", priority=JobPriority.AGENT, client_id="c"),
+        ]
+        assert scheduler.get_position(futures[3].job_id) == 0
+
+        gate.set()
+        blocker.result(timeout=2)
+        for future in futures:
+            future.result(timeout=2)
+
+        assert order == ["agent", "a1", "b1", "a2"]
+    finally:
+        gate.set()
+        scheduler.shutdown()
+
+
+def test_client_quota_and_cancel_while_queued():
+    """单客户端超出配额时排队，排队中的作业可取消。"""
+    scheduler = make_scheduler(
+        max_slots=4,
+        reserved_interactive_slots=0,
+        client_quota={JobPriority.AGENT: 1},
+    )
+    gate = threading.Event()
+    try:
+        with scheduling_context(client_id="session-1", priority=JobPriority.AGENT):
+            running = scheduler.submit(gate.wait)
+            queued = scheduler.submit(gate.wait)
+        other = scheduler.submit(gate.wait, priority=JobPriority.AGENT, client_id="session-2")
+
+        assert scheduler.is_running(running.job_id)
+        assert scheduler.is_running(other.job_id)
+        assert scheduler.get_position(queued.job_id) == 0
+
+        assert queued.cancel()
+        assert scheduler.get_position(queued.job_id) is None
+        assert scheduler.get_stats()["queued"]["agent"] == 0
+    finally:
+        gate.set()
+        scheduler.shutdown()
+
+
+def test_run_async_respects_group_limit():
+    """协程作业遵守分组并发上限。"""
+    scheduler = make_scheduler(max_slots=4)
+    scheduler.set_group_limit("llm_fill", 1)
+    active = 0
+    peak = 0
+    positions = []
+
+    async def job():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    async def main():
+        await asyncio.gather(*[
+            scheduler.run_async(job, group="llm_fill", on_queued=positions.append)
+            for _ in range(3)
+        ])
+
+    try:
+        asyncio.run(main())
+        assert peak == 1
+        assert positions == [0, 1]
+    finally:
+        scheduler.shutdown()
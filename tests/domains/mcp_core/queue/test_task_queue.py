@@ -0,0 +1,96 @@
+"""mcp_core.queue.task_queue 索引与分页单元测试（fakeredis）。"""
+
+import asyncio
+import json
+from datetime import datetime
+
+import fakeredis.aioredis
+
+from domains.mcp_core.queue.task_queue import TaskQueue, TaskStatus, meta_key
+
+
+def make_queue() -> TaskQueue:
+    return TaskQueue(redis_client=fakeredis.aioredis.FakeRedis(decode_responses=True))
+
+
+def test_list_tasks_uses_indexes_and_cursor_pagination():
+    """按状态/类型过滤并游标分页，状态变化同步更新索引。"""
+    async def main():
+        queue = make_queue()
+        ids = []
+        for i in range(25):
+            ids.append(await queue.submit("backtest" if i % 2 == 0 else "analysis", {"i": i}))
+        for task_id in ids[:5]:
+            await queue._update_task_status(task_id, TaskStatus.COMPLETED, result={"ok": True})
+
+        pages = []
+        cursor = None
+        while True:
+            page, cursor = await queue.list_tasks_page(limit=10, cursor=cursor)
+            pages.append([t.task_id for t in page])
+            if cursor is None:
+                break
+
+        completed = await queue.list_tasks(status=TaskStatus.COMPLETED, limit=50)
+        pending_backtests = await queue.list_tasks(
+            status=TaskStatus.PENDING, task_type="backtest", limit=50
+        )
+        counts = (
+            await queue.count_tasks(),
+            await queue.count_tasks(status=TaskStatus.PENDING),
+            await queue.count_tasks(task_type="analysis"),
+        )
+        return ids, pages, completed, pending_backtests, counts
+
+    ids, pages, completed, pending_backtests, counts = asyncio.run(main())
+
+    listed = [task_id for page in pages for task_id in page]
+    assert listed == list(reversed(ids))
+    assert [len(page) for page in pages[:3]] == [10, 10, 5]
+    assert {t.task_id for t in completed} == set(ids[:5])
+    assert all(t.status == TaskStatus.PENDING for t in pending_backtests)
+    assert {t.task_id for t in pending_backtests} == set(ids[6::2])
+    assert counts == (25, 20, 12)
+
+
+def test_cursor_is_stable_for_identical_timestamps():
+    """创建时间相同时游标不丢失、不重复。"""
+    async def main():
+        queue = make_queue()
+        created_at = datetime.now().isoformat()
+        for i in range(7):
+            await queue.save_meta({
+                "task_id": f"t{i}",
+                "task_type": "backtest",
+                "status": TaskStatus.PENDING.value,
+                "created_at": created_at,
+            })
+
+        seen = []
+        cursor = None
+        while True:
+            page, cursor = await queue.list_tasks_page(limit=3, cursor=cursor)
+            seen.extend(t.task_id for t in page)
+            if cursor is None:
+                return seen
+
+    seen = asyncio.run(main())
+    assert sorted(seen) == [f"t{i}" for i in range(7)]
+
+
+def test_rebuild_indexes_from_existing_meta():
+    """升级前写入的元数据可重建索引。"""
+    async def main():
+        queue = make_queue()
+        await queue.redis.set(meta_key("legacy"), json.dumps({
+            "task_id": "legacy",
+            "task_type": "backtest",
+            "status": TaskStatus.FAILED.value,
+            "created_at": datetime.now().isoformat(),
+        }))
+        assert await queue.list_tasks() == []
+        assert await queue.rebuild_indexes() == 1
+        return await queue.list_tasks(status=TaskStatus.FAILED)
+
+    tasks = asyncio.run(main())
+    assert [t.task_id for t in tasks] == ["legacy"]
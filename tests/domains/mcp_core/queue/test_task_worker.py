@@ -0,0 +1,237 @@
+"""mcp_core.queue.worker 单元测试（fakeredis）。"""
+
+import asyncio
+import time
+
+import fakeredis
+import fakeredis.aioredis
+
+from domains.mcp_core.queue.task_queue import PROCESSING_KEY, TaskQueue, TaskStatus
+from domains.mcp_core.queue.worker import TaskWorker, WorkerConfig, claimed_key, worker_key
+
+
+def make_queue() -> TaskQueue:
+    return TaskQueue(redis_client=fakeredis.aioredis.FakeRedis(decode_responses=True))
+
+
+def make_config(**kwargs) -> WorkerConfig:
+    defaults = dict(concurrency=1, heartbeat_interval=0.05, reap_interval=0.05, poll_interval=0.01)
+    defaults.update(kwargs)
+    return WorkerConfig(**defaults)
+
+
+def test_worker_consumes_queue_and_wakes_waiter():
+    """worker 消费队列，等待方通过 pub/sub 立即拿到结果。"""
+    async def main():
+        queue = make_queue()
+
+        @queue.register("echo")
+        async def echo(params):
+            return {"value": params["value"] * 2}
+
+        worker = TaskWorker(queue, make_config())
+        worker_task = asyncio.create_task(worker.run())
+
+        task_id = await queue.submit("echo", {"value": 21})
+        started = time.monotonic()
+        result = await queue.get_result(task_id, wait=True, timeout=5)
+        elapsed = time.monotonic() - started
+
+        worker.stop()
+        await worker_task
+        return result, elapsed, await queue.redis.zcard(PROCESSING_KEY)
+
+    result, elapsed, processing = asyncio.run(main())
+    assert result.status == TaskStatus.COMPLETED
+    assert result.result == {"value": 42}
+    assert elapsed < 0.5
+    assert processing == 0
+
+
+def test_expired_task_is_requeued_then_failed_after_max_attempts():
+    """心跳中断的任务被重新入队，超过最大执行次数后标记失败。"""
+    async def main():
+        queue = make_queue()
+        worker = TaskWorker(queue, make_config(max_attempts=2))
+        task_id = await queue.submit("lost", {})
+
+        # 模拟某 worker 领取后崩溃
+        await queue.redis.rpop("task:queue:default")
+        meta = await queue.get_meta(task_id)
+        meta.update(status=TaskStatus.RUNNING.value, attempts=1, worker_id="dead")
+        await queue.save_meta(meta)
+        await queue.redis.zadd(PROCESSING_KEY, {task_id: time.time() - 1})
+
+        assert await worker.recover_expired() == 1
+        requeued = await queue.get_meta(task_id)
+        requeued_status = requeued["status"]
+        queued_ids = await queue.redis.lrange("task:queue:default", 0, -1)
+
+        # 第二次执行同样丢失
+        await queue.redis.rpop("task:queue:default")
+        requeued.update(status=TaskStatus.RUNNING.value, attempts=2)
+        await queue.save_meta(requeued)
+        await queue.redis.zadd(PROCESSING_KEY, {task_id: time.time() - 1})
+        await worker.recover_expired()
+        final = await queue.get_result(task_id)
+        return task_id, requeued_status, queued_ids, final
+
+    task_id, requeued_status, queued_ids, final = asyncio.run(main())
+    assert requeued_status == TaskStatus.PENDING.value
+    assert queued_ids == [task_id]
+    assert final.status == TaskStatus.FAILED
+
+
+def test_cancel_running_task_via_heartbeat():
+    """运行中的任务收到取消请求后由 worker 中止。"""
+    async def main():
+        queue = make_queue()
+
+        @queue.register("slow")
+        async def slow(params):
+            await asyncio.sleep(10)
+
+        worker = TaskWorker(queue, make_config())
+        worker_task = asyncio.create_task(worker.run())
+        task_id = await queue.submit("slow", {})
+
+        while (await queue.get_meta(task_id))["status"] != TaskStatus.RUNNING.value:
+            await asyncio.sleep(0.01)
+        assert await queue.cancel(task_id)
+        result = await queue.get_result(task_id, wait=True, timeout=5)
+
+        worker.stop()
+        await worker_task
+        return result
+
+    result = asyncio.run(main())
+    assert result.status == TaskStatus.CANCELLED
+
+
+def test_worker_killed_between_claim_and_execution():
+    """worker 领取任务后、登记 processing 前崩溃，任务由其他 worker 回收并执行。"""
+    async def main():
+        queue = make_queue()
+
+        @queue.register("echo")
+        async def echo(params):
+            return {"value": params["value"]}
+
+        crashed = TaskWorker(queue, make_config())
+        task_id = await queue.submit("echo", {"value": 7})
+
+        # 模拟崩溃: 领取后进程退出，心跳键随之过期
+        assert await crashed._claim() == task_id
+        claimed_before = await queue.redis.lrange(claimed_key(crashed.worker_id), 0, -1)
+        queued_before = await queue.redis.llen("task:queue:default")
+
+        survivor = TaskWorker(queue, make_config())
+        recovered = await survivor.recover_expired()
+        status = await survivor.process(await survivor._claim())
+        result = await queue.get_result(task_id)
+        claimed_after = await queue.redis.llen(claimed_key(crashed.worker_id))
+        return task_id, claimed_before, queued_before, recovered, status, result, claimed_after
+
+    task_id, claimed_before, queued_before, recovered, status, result, claimed_after = asyncio.run(main())
+    assert claimed_before == [task_id]
+    assert queued_before == 0
+    assert recovered == 1
+    assert status == TaskStatus.COMPLETED
+    assert result.result == {"value": 7}
+    assert claimed_after == 0
+
+
+def test_live_worker_claims_are_not_recovered():
+    """心跳正常的 worker 已领取的任务不会被其他 worker 回收。"""
+    async def main():
+        queue = make_queue()
+        owner = TaskWorker(queue, make_config())
+        task_id = await queue.submit("echo", {})
+        await owner._beat()
+        await owner._claim()
+
+        other = TaskWorker(queue, make_config())
+        recovered = await other.recover_orphaned_claims()
+        claimed = await queue.redis.lrange(claimed_key(owner.worker_id), 0, -1)
+        alive = await queue.redis.exists(worker_key(owner.worker_id))
+        return task_id, recovered, claimed, alive
+
+    task_id, recovered, claimed, alive = asyncio.run(main())
+    assert alive
+    assert recovered == 0
+    assert claimed == [task_id]
+
+
+def test_cancel_after_claim_prevents_execution():
+    """worker 读到排队状态后、开始执行前任务被取消：任务不再执行。"""
+    async def main():
+        queue = make_queue()
+        calls = []
+
+        @queue.register("echo")
+        async def echo(params):
+            calls.append(params)
+
+        worker = TaskWorker(queue, make_config())
+        task_id = await queue.submit("echo", {})
+        assert await worker._claim() == task_id
+
+        release_claim = worker._release_claim
+        cancelled = []
+
+        async def cancel_then_release(tid):
+            # 取消发生在 process 检查状态之后、写入运行状态之前
+            cancelled.append(await queue.cancel(tid))
+            await release_claim(tid)
+
+        worker._release_claim = cancel_then_release
+        status = await worker.process(task_id)
+        processing = await queue.redis.zcard(PROCESSING_KEY)
+        return cancelled, status, calls, await queue.get_result(task_id), processing
+
+    cancelled, status, calls, result, processing = asyncio.run(main())
+    assert cancelled == [True]
+    assert status is None
+    assert calls == []
+    assert result.status == TaskStatus.CANCELLED
+    assert processing == 0
+
+
+def test_cancel_racing_with_completion_keeps_terminal_status():
+    """取消读取元数据后、提交前任务已完成：取消重读后放弃，完成状态和索引不被覆盖。"""
+    server = fakeredis.FakeServer()
+    completer = fakeredis.FakeRedis(server=server, decode_responses=True)
+
+    async def main():
+        queue = TaskQueue(redis_client=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+        task_id = await queue.submit("echo", {})
+        meta = await queue.get_meta(task_id)
+        meta.update(status=TaskStatus.RUNNING.value, worker_id="w1")
+        await queue.save_meta(meta)
+
+        transition = queue.transition
+        attempts = []
+
+        async def racing_transition(tid, apply, queue_extra=None):
+            def apply_after_worker_finished(current):
+                if not attempts:
+                    # 模拟 worker 在 WATCH 之后写入完成状态
+                    with completer.pipeline(transaction=True) as pipe:
+                        TaskQueue._queue_meta_write(pipe, dict(current, status=TaskStatus.COMPLETED.value))
+                        pipe.execute()
+                attempts.append(current["status"])
+                return apply(current)
+            return await transition(tid, apply_after_worker_finished, queue_extra)
+
+        queue.transition = racing_transition
+        cancelled = await queue.cancel(task_id)
+        final = await queue.get_meta(task_id)
+        counts = [await queue.count_tasks(s) for s in (TaskStatus.RUNNING, TaskStatus.COMPLETED)]
+        return cancelled, attempts, final, counts
+
+    cancelled, attempts, final, counts = asyncio.run(main())
+    assert attempts == [TaskStatus.RUNNING.value, TaskStatus.COMPLETED.value]
+    assert not cancelled
+    assert final["status"] == TaskStatus.COMPLETED.value
+    assert "cancel_requested" not in final
+    assert counts == [0, 1]
@@ -0,0 +1,86 @@
+"""mcp_core.server 工具结果序列化与分页单元测试。"""
+
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+
+from domains.mcp_core.server import serialization
+from domains.mcp_core.server.serialization import (
+    FetchResultPageTool,
+    ResultPageStore,
+    SerializationConfig,
+    dumps_text,
+    encode_tool_result,
+)
+
+
+def test_dumps_handles_numpy_pandas_and_nan():
+    df = pd.DataFrame({
+        "time": pd.to_datetime(["2024-01-01", None]),
+        "value": [1.5, np.nan],
+        "rank": np.array([1, 2], dtype="int64"),
+    })
+    text = dumps_text({
+        "df": df,
+        "series": df["value"],
+        "scalar": np.float64(0.25),
+        "array": np.array([1.0, np.inf]),
+        "nan": float("nan"),
+        1: "non-str key",
+    })
+
+    assert "\n" not in text and ": " not in text
+    assert json.loads(text) == {
+        "df": [
+            {"time": "2024-01-01T00:00:00", "value": 1.5, "rank": 1},
+            {"time": None, "value": None, "rank": 2},
+        ],
+        "series": [1.5, None],
+        "scalar": 0.25,
+        "array": [1.0, None],
+        "nan": None,
+        "1": "non-str key",
+    }
+
+
+def test_large_table_is_paged_through_handle(monkeypatch):
+    store = ResultPageStore(SerializationConfig(page_rows=2, max_handles=4))
+    monkeypatch.setattr(serialization, "_page_store", store)
+
+    small = {"rows": [1, 2], "meta": "ok"}
+    assert json.loads(encode_tool_result("ranking", small, paginate=True)) == small
+
+    first = json.loads(encode_tool_result("ranking", {"rows": list(range(5)), "meta": "ok"}, paginate=True))
+    assert first["rows"] == [0, 1] and first["meta"] == "ok"
+    page = first["_page"]
+    assert (page["field"], page["total"], page["next_offset"]) == ("rows", 5, 2)
+
+    tool = FetchResultPageTool()
+    rows, offset = list(first["rows"]), page["next_offset"]
+    while offset is not None:
+        result = asyncio.run(tool.execute(handle=page["handle"], offset=offset, limit=10))
+        assert result.success and len(result.data["rows"]) <= 2
+        rows.extend(result.data["rows"])
+        offset = result.data["page"]["next_offset"]
+    assert rows == list(range(5))
+
+    assert not asyncio.run(tool.execute(handle="missing")).success
+
+
+def test_paging_is_opt_in_and_handles_are_reused(monkeypatch):
+    store = ResultPageStore(SerializationConfig(page_rows=2, max_handles=4))
+    monkeypatch.setattr(serialization, "_page_store", store)
+    data = {"rows": list(range(5))}
+
+    # 未声明 page_results 的工具原样返回完整结果
+    assert json.loads(encode_tool_result("list_factors", data)) == data
+    assert len(store) == 0
+
+    # 相同结果（如工具结果缓存命中）复用同一句柄
+    first = json.loads(encode_tool_result("ranking", data, paginate=True))["_page"]["handle"]
+    again = json.loads(encode_tool_result("ranking", {"rows": list(range(5))}, paginate=True))["_page"]["handle"]
+    other = json.loads(encode_tool_result("ranking", {"rows": list(range(6))}, paginate=True))["_page"]["handle"]
+    assert first == again != other
+    assert len(store) == 2
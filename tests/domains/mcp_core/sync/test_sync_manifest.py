@@ -0,0 +1,120 @@
+"""同步清单（内容哈希增量同步）单元测试。"""
+
+from dataclasses import dataclass, replace
+from datetime import datetime
+
+from domains.mcp_core.sync.experience_sync import ExperienceSyncService
+from domains.mcp_core.sync.factor_sync import FactorSyncService
+
+
+@dataclass
+class Factor:
+    filename: str
+    style: str = "动量"
+    updated_at: datetime = datetime(2024, 1, 1)
+
+
+class FactorStore:
+    """只实现同步所需接口的因子存储。"""
+
+    def __init__(self, factors):
+        self.factors = {f.filename: f for f in factors}
+        self.updates = []
+
+    def get_all(self, include_excluded=False):
+        return list(self.factors.values())
+
+    def update(self, filename, **fields):
+        self.updates.append((filename, fields))
+        self.factors[filename] = replace(self.factors[filename], style=fields.get("style"))
+
+
+def count_reads(service, monkeypatch):
+    reads = []
+    original = service.read_yaml
+
+    def read_yaml(path):
+        reads.append(path.stem)
+        return original(path)
+
+    monkeypatch.setattr(service, "read_yaml", read_yaml)
+    return reads
+
+
+def test_unchanged_entities_are_not_reparsed_or_rewritten(tmp_path, monkeypatch):
+    """基线建立后只有内容变化的实体会被读取、导入或重写。"""
+    store = FactorStore([Factor("A"), Factor("B")])
+    service = FactorSyncService(tmp_path, store)
+    assert service.export_all(overwrite=True)["exported"] == 2
+
+    # 新实例从磁盘加载清单：文件与数据库都未变化，一个文件都不解析
+    service = FactorSyncService(tmp_path, store)
+    reads = count_reads(service, monkeypatch)
+    assert service.import_all()["unchanged"] == 2
+    assert reads == []
+    assert service.export_all()["skipped"] == 2
+
+    # 编辑文件：只解析并导入该文件
+    path = tmp_path / "metadata" / "A.yaml"
+    path.write_text(path.read_text(encoding="utf-8").replace("动量", "反转"), encoding="utf-8")
+    stats = service.import_all()
+    assert (stats["updated"], stats["unchanged"]) == (1, 1)
+    assert reads == ["A"]
+    assert store.updates[0][1]["style"] == "反转"
+
+    # 数据库变化（与 mtime 无关）：只重写该文件
+    store.factors["B"] = replace(store.factors["B"], style="波动")
+    stats = service.export_all()
+    assert (stats["exported"], stats["skipped"]) == (1, 1)
+    assert "波动" in (tmp_path / "metadata" / "B.yaml").read_text(encoding="utf-8")
+    assert service.export_all()["skipped"] == 2
+
+
+class ExperienceStore:
+    """只实现同步所需接口的经验存储。"""
+
+    def __init__(self):
+        self.experiences = {}
+
+    def get_all(self, limit=100):
+        return list(self.experiences.values())
+
+    def get_by_uuid(self, uuid):
+        return self.experiences.get(uuid)
+
+    def get(self, exp_id):
+        return next((e for e in self.experiences.values() if e.id == exp_id), None)
+
+    def add(self, experience):
+        experience.id = len(self.experiences) + 1
+        self.experiences[experience.uuid] = experience
+        return experience.id
+
+    def distinct_values(self, column):
+        return {getattr(e, column) for e in self.experiences.values()}
+
+
+def test_database_reset_reimports_files_with_matching_manifest(tmp_path, monkeypatch):
+    """数据库重置而数据目录保留时，清单仍匹配的文件也要重新导入。"""
+    from domains.experience_hub.core.models import Experience
+
+    store = ExperienceStore()
+    for n in range(2):
+        store.add(Experience(uuid=f"exp-{n}", title=f"经验 {n}"))
+    service = ExperienceSyncService(tmp_path, store)
+    assert service.export_all(overwrite=True)["exported"] == 2
+
+    # 库未变化：清单命中，不解析
+    service = ExperienceSyncService(tmp_path, store)
+    reads = count_reads(service, monkeypatch)
+    assert service.import_all()["unchanged"] == 2
+    assert reads == []
+
+    # 清空数据库，保留 experiences/ 与 .sync/ 清单
+    store.experiences.clear()
+    service = ExperienceSyncService(tmp_path, store)
+    reads = count_reads(service, monkeypatch)
+    stats = service.import_all()
+    assert (stats["created"], stats["unchanged"]) == (2, 0)
+    assert sorted(reads) == ["exp-0", "exp-1"]
+    assert set(store.experiences) == {"exp-0", "exp-1"}
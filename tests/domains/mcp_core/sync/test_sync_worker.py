@@ -0,0 +1,83 @@
+"""后台同步队列单元测试。"""
+
+import threading
+
+from domains.mcp_core.sync.worker import SyncWorker, SyncWorkerConfig
+
+
+class Recorder:
+    def __init__(self, fail_kind=None):
+        self.batches = []
+        self.fail_kind = fail_kind
+        self.lock = threading.Lock()
+
+    def __call__(self, kind, keys):
+        if kind == self.fail_kind:
+            raise RuntimeError("boom")
+        with self.lock:
+            self.batches.append((kind, list(keys)))
+
+
+def test_repeated_updates_are_coalesced_and_batched():
+    """同一实体多次登记只导出一次，同类实体合并为一批。"""
+    recorder = Recorder()
+    worker = SyncWorker(recorder, SyncWorkerConfig(debounce=60, max_delay=60, batch_size=100))
+
+    for _ in range(50):
+        worker.enqueue("note", 1)
+    worker.enqueue("note", 2)
+    worker.enqueue("factor", "MOM.py")
+    assert recorder.batches == []  # 防抖窗口内不导出
+
+    assert worker.flush(timeout=5)
+    assert sorted(recorder.batches) == [("factor", ["MOM.py"]), ("note", [1, 2])]
+    stats = worker.get_stats()
+    assert stats["coalesced"] == 49 and stats["exported"] == 3 and stats["pending"] == 0
+    worker.stop()
+
+
+def test_debounce_expiry_errors_and_stop():
+    """到期自动导出；单类失败不影响其他；停止后登记改为同步导出。"""
+    recorder = Recorder(fail_kind="tag")
+    worker = SyncWorker(recorder, SyncWorkerConfig(debounce=0.01, max_delay=1, batch_size=1))
+
+    worker.enqueue("tag", ("factor", "MOM.py"))
+    worker.enqueue("experience", 1)
+    worker.enqueue("experience", 2)
+    assert worker.flush(timeout=5)
+    assert recorder.batches == [("experience", [1]), ("experience", [2])]
+    assert worker.get_stats()["errors"] == 1
+
+    worker.stop()
+    worker.enqueue("note", 3)
+    assert recorder.batches[-1] == ("note", [3])
+
+
+def test_trigger_edge_batch_continues_after_key_failure(tmp_path):
+    """标签/关系批次中单个键导出失败时，其余键照常导出。"""
+    from domains.mcp_core.sync.trigger import SyncTrigger
+
+    class EdgeService:
+        def __init__(self):
+            self.tags = []
+            self.relations = []
+
+        def export_single(self, entity_type, entity_id):
+            if entity_id == "bad":
+                raise OSError("disk full")
+            self.tags.append((entity_type, entity_id))
+
+        def export_relation(self, relation):
+            if relation == "bad":
+                raise OSError("disk full")
+            self.relations.append(relation)
+
+    trigger = SyncTrigger(tmp_path, SyncWorkerConfig(enabled=False))
+    service = EdgeService()
+    trigger._services["edge"] = service
+
+    trigger._export_batch("tag", [("factor", "a"), ("factor", "bad"), ("data", "b")])
+    trigger._export_batch("relation", ["bad", "derived_from"])
+
+    assert service.tags == [("factor", "a"), ("data", "b")]
+    assert service.relations == ["derived_from"]
@@ -0,0 +1,144 @@
+"""strategy_hub.services.walk_forward 窗口切分与窗口指标单元测试。"""
+
+import importlib
+import importlib.util
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+DOMAINS_DIR = Path(__file__).resolve().parents[3] / "backend" / "domains"
+
+
+@pytest.fixture(scope="module")
+def walk_forward():
+    """
+    加载 walk_forward 模块
+
+    strategy_hub 包级 __init__ 会导入回测引擎，这里只注册包的搜索路径而不执行 __init__，
+    测试结束后恢复 sys.modules。
+    """
+    saved = {k: v for k, v in sys.modules.items() if k.startswith("domains.strategy_hub")}
+    for name in ("domains.strategy_hub", "domains.strategy_hub.services"):
+        if name in sys.modules:
+            continue
+        package_dir = DOMAINS_DIR.joinpath(*name.split(".")[1:])
+        spec = importlib.util.spec_from_file_location(
+            name, package_dir / "__init__.py", submodule_search_locations=[str(package_dir)]
+        )
+        sys.modules[name] = importlib.util.module_from_spec(spec)
+    try:
+        yield importlib.import_module("domains.strategy_hub.services.walk_forward")
+    finally:
+        for key in [k for k in sys.modules if k.startswith("domains.strategy_hub")]:
+            if key not in saved:
+                del sys.modules[key]
+
+
+def make_equity(start: str, periods: int, freq: str = "1h", seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0005, 0.01, periods)
+    return pd.DataFrame({
+        "candle_begin_time": pd.date_range(start, periods=periods, freq=freq),
+        "净值": np.cumprod(1 + returns),
+    })
+
+
+def test_generate_windows_count_and_truncation(walk_forward):
+    windows = walk_forward.generate_windows("2024-01-01", "2024-03-15", window="1M")
+    assert windows == [
+        ("2024-01-01", "2024-01-31"),
+        ("2024-02-01", "2024-02-29"),
+        ("2024-03-01", "2024-03-15"),
+    ]
+
+    # 单日区间只有一个窗口
+    assert walk_forward.generate_windows("2024-01-01", "2024-01-01", window="7D") == [
+        ("2024-01-01", "2024-01-01")
+    ]
+
+
+def test_generate_windows_step_and_overlap(walk_forward):
+    overlapping = walk_forward.generate_windows("2024-01-01", "2024-01-20", window="10D", step="5D")
+    assert overlapping == [
+        ("2024-01-01", "2024-01-10"),
+        ("2024-01-06", "2024-01-15"),
+        ("2024-01-11", "2024-01-20"),
+        ("2024-01-16", "2024-01-20"),
+    ]
+
+    # 步长大于窗口时窗口之间留空
+    gapped = walk_forward.generate_windows("2024-01-01", "2024-01-31", window="1W", step="2W")
+    assert gapped == [
+        ("2024-01-01", "2024-01-07"),
+        ("2024-01-15", "2024-01-21"),
+        ("2024-01-29", "2024-01-31"),
+    ]
+
+
+def test_generate_windows_rejects_invalid_input(walk_forward):
+    with pytest.raises(ValueError):
+        walk_forward.generate_windows("2024-02-01", "2024-01-01")
+    with pytest.raises(ValueError):
+        walk_forward.generate_windows("2024-01-01", "2024-02-01", window="0D")
+    with pytest.raises(ValueError):
+        walk_forward.generate_windows("2024-01-01", "2024-02-01", window="3Y")
+
+
+def test_calc_window_metrics_normalizes_to_window_start(walk_forward):
+    equity = make_equity("2024-01-01", 24 * 20)
+
+    row = walk_forward.calc_window_metrics(equity, "2024-01-06", "2024-01-10")
+
+    times = equity["candle_begin_time"]
+    in_window = (times >= "2024-01-06") & (times < "2024-01-11")
+    base = equity["净值"][times < "2024-01-06"].iloc[-1]
+    expected = equity["净值"][in_window].iloc[-1] / base
+
+    assert row["periods"] == 24 * 5
+    assert row["cumulative_return"] == pytest.approx(expected, rel=1e-6)
+    assert row["max_drawdown"] <= 0
+    assert row["win_periods"] + row["loss_periods"] <= row["periods"]
+    assert "error" not in row
+
+
+def test_calc_window_metrics_empty_window(walk_forward):
+    equity = make_equity("2024-01-01", 24 * 5)
+
+    row = walk_forward.calc_window_metrics(equity, "2024-03-01", "2024-03-31")
+
+    assert row["periods"] == 0
+    assert row["error"] == "窗口内无资金曲线数据"
+    assert "cumulative_return" not in row
+
+
+def test_run_covers_overlapping_explicit_windows(walk_forward):
+    """显式窗口按开始日期排序后，完整区间的结束日期仍取所有窗口中最晚的一个。"""
+    from concurrent.futures import Future
+
+    class Runner:
+        def submit_compute(self, fn, *args):
+            future = Future()
+            future.set_result(fn(*args))
+            return future
+
+    requested = []
+    service = walk_forward.WalkForwardService(runner=Runner())
+
+    def run_full_range(job_id, request):
+        requested.append((request.start_date, request.end_date))
+        return make_equity("2024-01-01", 24 * 40)
+
+    service._run_full_range = run_full_range
+    base = walk_forward.BacktestRequest(name="Rsi", strategy_list=[])
+    result = service.run(walk_forward.WalkForwardRequest(
+        base=base, windows=[("2024-01-05", "2024-01-10"), ("2024-01-01", "2024-02-05")],
+    ))
+
+    assert result.status == "completed"
+    assert requested == [("2024-01-01", "2024-02-05")]
+    assert (result.full_start_date, result.full_end_date) == ("2024-01-01", "2024-02-05")
+    assert all("error" not in row for row in result.windows)
+    assert result.windows[0]["periods"] == 24 * 36